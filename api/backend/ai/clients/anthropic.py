@@ -4,9 +4,13 @@
 
 from __future__ import annotations
 
+import json
+from typing import Callable
+
 import httpx
 
 from backend.ai import config as ai_config
+from backend.ai.clients import pool
 from backend.ai.clients.base import ChatResult
 
 _ENDPOINT = "https://api.anthropic.com/v1/messages"
@@ -87,6 +91,62 @@ def _build_system_field(
     return blocks
 
 
+def _stream_once(payload: dict, headers: dict, model: str, on_text: Callable[[str], None]) -> tuple[dict, int]:
+    """The same Messages call with ``"stream": true``, folded into one message.
+
+    Text deltas go to ``on_text`` as they arrive; the return value has the
+    ``content`` / ``stop_reason`` shape the plain call answers with.
+    """
+    with pool.stream(
+        "POST", _ENDPOINT, json={**payload, "stream": True}, headers=headers,
+        timeout=ai_config.TIMEOUT_SEC,
+    ) as r:
+        if r.is_error:
+            r.read()
+            _raise_for_status(r, model)
+        if not pool.is_event_stream(r):
+            r.read()
+            return r.json(), pool.handshakes_of(r)
+        texts: list[str] = []
+        stop_reason = ""
+        stopped = False
+        for event in pool.sse_data(r):
+            try:
+                chunk = json.loads(event)
+            except ValueError:
+                continue
+            kind = chunk.get("type") if isinstance(chunk, dict) else None
+            if kind == "content_block_delta":
+                delta = chunk.get("delta") or {}
+                if delta.get("type") == "text_delta" and delta.get("text"):
+                    texts.append(delta["text"])
+                    on_text(delta["text"])
+            elif kind == "message_delta":
+                stop_reason = str((chunk.get("delta") or {}).get("stop_reason") or "") or stop_reason
+            elif kind == "message_stop":
+                stopped = True
+            elif kind == "error":
+                error_type = str((chunk.get("error") or {}).get("type") or "").strip()
+                raise RuntimeError(
+                    f"Anthropic stream error (model={model}, attempts=1, "
+                    f"error.type={error_type or '<unavailable>'})"
+                )
+    if not stopped:
+        # A cut-off stream is an incomplete answer, not a short one.
+        raise RuntimeError(f"Anthropic stream ended before message_stop (model={model})")
+    data = {"stop_reason": stop_reason, "content": [{"type": "text", "text": "".join(texts)}]}
+    return data, pool.handshakes_of(r)
+
+
+def _raise_for_status(r: httpx.Response, model: str) -> None:
+    try:
+        r.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise RuntimeError(
+            f"Anthropic HTTP {r.status_code} (model={model}, attempts=1)"
+        ) from e
+
+
 def generate(
     api_key: str,
     model: str,
@@ -98,6 +158,7 @@ def generate(
     system_static: str = "",
     system_dynamic: str = "",
     response_schema: dict | None = None,
+    on_text: Callable[[str], None] | None = None,
 ) -> ChatResult:
     """Call Anthropic's Messages API exactly once and return its reply.
 
@@ -109,6 +170,9 @@ def generate(
     supplied, the static prefix is marked with ``cache_control`` so repeated
     pages of the same series reuse it cheaply. When omitted, ``system_text`` is
     sent verbatim.
+
+    ``on_text`` (optional) streams the one call and is handed each text delta
+    as it arrives; the reply is still judged whole, by the same stop checks.
     """
     if (image_b64 or "").strip():
         content: list[dict] = [
@@ -147,20 +211,17 @@ def generate(
     }
 
     try:
-        with httpx.Client(timeout=ai_config.TIMEOUT_SEC) as client:
-            r = client.post(_ENDPOINT, json=payload, headers=headers)
+        if on_text is None:
+            r = pool.post(_ENDPOINT, json=payload, headers=headers, timeout=ai_config.TIMEOUT_SEC)
+            _raise_for_status(r, model)
+            data, handshakes = r.json(), pool.handshakes_of(r)
+        else:
+            data, handshakes = _stream_once(payload, headers, model, on_text)
     except httpx.RequestError as e:
         raise RuntimeError(
             f"Anthropic transport error (model={model}, attempts=1, "
             f"errorType={type(e).__name__})"
         ) from e
-    try:
-        r.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        raise RuntimeError(
-            f"Anthropic HTTP {r.status_code} (model={model}, attempts=1)"
-        ) from e
-    data = r.json()
 
     stop_reason = str(data.get("stop_reason") or "").strip()
     if stop_reason and stop_reason not in ("end_turn", "stop_sequence"):
@@ -174,4 +235,4 @@ def generate(
     ).strip()
     if not text:
         raise RuntimeError("Anthropic returned empty text")
-    return ChatResult(text=text, used_model=model)
+    return ChatResult(text=text, used_model=model, handshakes=handshakes)
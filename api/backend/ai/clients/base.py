@@ -4,7 +4,8 @@
 Every client exposes a ``generate(api_key, model, system_text, user_parts)``
 function returning :class:`ChatResult` — a ``(text, used_model)`` pair.  The
 ``used_model`` may differ from the requested one (e.g. a Hugging Face router
-fallback).
+fallback). ``handshakes`` is how many new connections the call had to open
+(see :mod:`backend.ai.clients.pool`); 0 means it reused a pooled one.
 """
 
 from __future__ import annotations
@@ -15,3 +16,4 @@ from typing import NamedTuple
 class ChatResult(NamedTuple):
     text: str
     used_model: str
+    handshakes: int = 0
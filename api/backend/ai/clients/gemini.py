@@ -8,13 +8,19 @@ import hashlib
 import json
 import os
 import re
+from typing import Callable
 
 import httpx
 
 from backend.ai import config as ai_config
+from backend.ai.clients import pool
 from backend.ai.clients.base import ChatResult
 
 _ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}"
+_STREAM_ENDPOINT = (
+    "https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent"
+    "?alt=sse&key={key}"
+)
 
 # Per-request "thinking" control, set from the extension UI (ai.thinking):
 #   default -> model thinks normally, nothing is sent          [DEFAULT]
@@ -91,8 +97,89 @@ def _thinking_config_for(model: str, mode: str = "") -> dict | None:
 
 def _post_once(api_key: str, model: str, payload: dict) -> "httpx.Response":
     url = _ENDPOINT.format(model=model, key=api_key)
-    with httpx.Client(timeout=ai_config.TIMEOUT_SEC) as client:
-        return client.post(url, json=payload)
+    return pool.post(url, json=payload, timeout=ai_config.TIMEOUT_SEC)
+
+
+def _stream_once(
+    api_key: str, model: str, payload: dict, on_text: Callable[[str], None]
+) -> tuple[dict, int]:
+    """``streamGenerateContent`` for the same payload, folded into one document.
+
+    Each SSE event is a partial ``GenerateContentResponse``; its text parts
+    go to ``on_text`` as they arrive. The return value has the shape
+    ``generateContent`` would have answered with, so one set of checks
+    judges both.
+    """
+    url = _STREAM_ENDPOINT.format(model=model, key=api_key)
+    with pool.stream("POST", url, json=payload, timeout=ai_config.TIMEOUT_SEC) as r:
+        if r.is_error:
+            r.read()
+            _raise_for_status(r, model)
+        if not pool.is_event_stream(r):
+            r.read()
+            return r.json(), pool.handshakes_of(r)
+        texts: list[str] = []
+        finish = ""
+        feedback: dict = {}
+        seen_candidate = False
+        for event in pool.sse_data(r):
+            try:
+                chunk = json.loads(event)
+            except ValueError:
+                continue
+            if not isinstance(chunk, dict):
+                continue
+            if isinstance(chunk.get("error"), dict):
+                code, status, message = _safe_provider_error(event)
+                raise RuntimeError(
+                    f"Gemini stream error (model={model}, attempts=1, error.code={code}, "
+                    f"error.status={status}, error.message={message or '<unavailable>'})"
+                )
+            feedback = chunk.get("promptFeedback") or feedback
+            candidates = chunk.get("candidates") or []
+            if not candidates:
+                continue
+            seen_candidate = True
+            finish = str(candidates[0].get("finishReason") or "").strip() or finish
+            for part in (candidates[0].get("content") or {}).get("parts") or []:
+                text = str(part.get("text") or "")
+                if text:
+                    texts.append(text)
+                    on_text(text)
+    if seen_candidate and not finish:
+        # A cut-off stream is an incomplete answer, not a short one.
+        raise RuntimeError(f"Gemini stream ended without a finishReason (model={model})")
+    data: dict = {"promptFeedback": feedback}
+    if seen_candidate:
+        data["candidates"] = [
+            {"finishReason": finish, "content": {"parts": [{"text": "".join(texts)}]}}
+        ]
+    return data, pool.handshakes_of(r)
+
+
+def _raise_for_status(r: "httpx.Response", model: str) -> None:
+    try:
+        r.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        # Do not dump the raw body: gateways can echo request content. Extract
+        # only Google's structured error fields and redact credential-shaped
+        # values, while retaining length/hash to correlate repeated failures.
+        response_body = r.text or ""
+        response_sha256 = hashlib.sha256(response_body.encode("utf-8")).hexdigest()
+        provider_code, provider_status, provider_message = _safe_provider_error(response_body)
+        safe_fields = []
+        if provider_code:
+            safe_fields.append(f"error.code={provider_code}")
+        if provider_status:
+            safe_fields.append(f"error.status={provider_status}")
+        if provider_message:
+            safe_fields.append(f"error.message={provider_message}")
+        safe_detail = ", ".join(safe_fields) or "error.message=<unavailable>"
+        raise RuntimeError(
+            f"Gemini HTTP {r.status_code} (model={model}, attempts=1, {safe_detail}, "
+            f"responseBodyChars={len(response_body)}, "
+            f"responseBodySha256={response_sha256})"
+        ) from e
 
 
 def _supports_native_schema(model: str) -> bool:
@@ -207,6 +294,7 @@ def generate(
     image_mime: str = "image/jpeg",
     thinking: str = "",
     response_schema: dict | None = None,
+    on_text: Callable[[str], None] | None = None,
 ) -> ChatResult:
     """Call Gemini's ``generateContent`` exactly once and return its reply.
 
@@ -216,6 +304,11 @@ def generate(
 
     ``image_b64`` (optional) attaches the manga page as inline image data so
     a vision-capable model can see the speakers.
+
+    ``on_text`` (optional) makes the one call ``streamGenerateContent``
+    instead and is handed each piece of text as it arrives. The reply is
+    still judged whole: a stream that ends without ``STOP`` raises exactly
+    like an incomplete ``generateContent`` answer.
     """
     parts: list[dict] = []
     if (image_b64 or "").strip():
@@ -253,7 +346,12 @@ def generate(
         payload["generationConfig"]["thinkingConfig"] = thinking_cfg
 
     try:
-        r = _post_once(api_key, model, payload)
+        if on_text is None:
+            r = _post_once(api_key, model, payload)
+            _raise_for_status(r, model)
+            data, handshakes = r.json(), pool.handshakes_of(r)
+        else:
+            data, handshakes = _stream_once(api_key, model, payload, on_text)
     except httpx.RequestError as e:
         # Gemini puts the credential in its request URL. Never propagate the
         # provider exception string because it may contain that URL.
@@ -261,29 +359,6 @@ def generate(
             f"Gemini transport error (model={model}, attempts=1, "
             f"errorType={type(e).__name__})"
         ) from e
-    try:
-        r.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        # Do not dump the raw body: gateways can echo request content. Extract
-        # only Google's structured error fields and redact credential-shaped
-        # values, while retaining length/hash to correlate repeated failures.
-        response_body = r.text or ""
-        response_sha256 = hashlib.sha256(response_body.encode("utf-8")).hexdigest()
-        provider_code, provider_status, provider_message = _safe_provider_error(response_body)
-        safe_fields = []
-        if provider_code:
-            safe_fields.append(f"error.code={provider_code}")
-        if provider_status:
-            safe_fields.append(f"error.status={provider_status}")
-        if provider_message:
-            safe_fields.append(f"error.message={provider_message}")
-        safe_detail = ", ".join(safe_fields) or "error.message=<unavailable>"
-        raise RuntimeError(
-            f"Gemini HTTP {r.status_code} (model={model}, attempts=1, {safe_detail}, "
-            f"responseBodyChars={len(response_body)}, "
-            f"responseBodySha256={response_sha256})"
-        ) from e
-    data = r.json()
 
     candidates = data.get("candidates") or []
     if not candidates:
@@ -309,4 +384,4 @@ def generate(
     text = "".join(str(p.get("text") or "") for p in out_parts).strip()
     if not text:
         raise RuntimeError("Gemini returned empty text")
-    return ChatResult(text=text, used_model=model)
+    return ChatResult(text=text, used_model=model, handshakes=handshakes)
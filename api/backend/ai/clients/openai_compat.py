@@ -12,11 +12,14 @@ and resent after an error.
 
 from __future__ import annotations
 
+import json
 import re
+from typing import Callable
 
 import httpx
 
 from backend.ai import config as ai_config
+from backend.ai.clients import pool
 from backend.ai.clients.base import ChatResult
 
 
@@ -131,6 +134,64 @@ def _extract_text(data: dict) -> str:
     return text
 
 
+def _stream_once(
+    url: str, payload: dict, headers: dict, model: str, on_text: Callable[[str], None]
+) -> tuple[dict, int]:
+    """The same completion with ``"stream": true``, folded into one document.
+
+    Content deltas go to ``on_text`` as they arrive; the return value has the
+    ``choices`` shape :func:`_extract_text` reads. A gateway that ignores
+    ``stream`` and answers with the plain document is read as usual.
+    """
+    with pool.stream(
+        "POST", url, json={**payload, "stream": True}, headers=headers,
+        timeout=ai_config.TIMEOUT_SEC,
+    ) as r:
+        if r.is_error:
+            r.read()
+            _raise_for_status(r, model)
+        if not pool.is_event_stream(r):
+            r.read()
+            return r.json(), pool.handshakes_of(r)
+        texts: list[str] = []
+        finish = ""
+        done = False
+        for event in pool.sse_data(r):
+            if event.strip() == "[DONE]":
+                done = True
+                break
+            try:
+                chunk = json.loads(event)
+            except ValueError:
+                continue
+            if not isinstance(chunk, dict):
+                continue
+            if chunk.get("error"):
+                raise RuntimeError(f"AI stream error (model={model}, attempts=1)")
+            choices = chunk.get("choices") or []
+            if not choices:
+                continue
+            text = (choices[0].get("delta") or {}).get("content") or ""
+            if text:
+                texts.append(text)
+                on_text(text)
+            finish = str(choices[0].get("finish_reason") or "") or finish
+    if not (done or finish):
+        # A cut-off stream is an incomplete answer, not a short one.
+        raise RuntimeError(f"AI stream ended without a finish_reason (model={model})")
+    data = {"choices": [{"finish_reason": finish, "message": {"content": "".join(texts)}}]}
+    return data, pool.handshakes_of(r)
+
+
+def _raise_for_status(r: httpx.Response, model: str) -> None:
+    try:
+        r.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise RuntimeError(
+            f"AI HTTP {r.status_code} (model={model}, attempts=1)"
+        ) from e
+
+
 def generate(
     api_key: str,
     base_url: str,
@@ -142,8 +203,13 @@ def generate(
     image_b64: str = "",
     image_mime: str = "image/jpeg",
     response_schema: dict | None = None,
+    on_text: Callable[[str], None] | None = None,
 ) -> ChatResult:
-    """POST exactly one chat completion request using the requested model."""
+    """POST exactly one chat completion request using the requested model.
+
+    ``on_text`` (optional) streams that one request and is handed each
+    content delta as it arrives; the reply is still judged whole.
+    """
     url = base_url.rstrip("/") + "/chat/completions"
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -161,17 +227,15 @@ def generate(
     )
 
     try:
-        with httpx.Client(timeout=ai_config.TIMEOUT_SEC) as client:
-            r = client.post(url, json=payload, headers=headers)
+        if on_text is None:
+            r = pool.post(url, json=payload, headers=headers, timeout=ai_config.TIMEOUT_SEC)
+            _raise_for_status(r, model)
+            data, handshakes = r.json(), pool.handshakes_of(r)
+        else:
+            data, handshakes = _stream_once(url, payload, headers, model, on_text)
     except httpx.RequestError as e:
         raise RuntimeError(
             f"AI transport error (model={model}, attempts=1, "
             f"errorType={type(e).__name__})"
         ) from e
-    try:
-        r.raise_for_status()
-        return ChatResult(text=_extract_text(r.json()), used_model=model)
-    except httpx.HTTPStatusError as e:
-        raise RuntimeError(
-            f"AI HTTP {r.status_code} (model={model}, attempts=1)"
-        ) from e
+    return ChatResult(text=_extract_text(data), used_model=model, handshakes=handshakes)
@@ -0,0 +1,205 @@
+"""Shared, pooled HTTP clients for every AI provider call.
+
+
+Each provider call used to open ``with httpx.Client() as client`` around one
+request, so every AI translation paid a fresh TCP + TLS handshake — two or
+three network round trips to a host that answered the previous page a few
+seconds earlier. ``backend/lens/client.py`` stopped doing that for Lens; this
+is the same fix for the generation, probe and model-listing calls.
+
+ONE client per origin (scheme + host + port), not one per request:
+  * a connection can only be reused by requests to the same origin, so the
+    origin is the natural unit of a pool;
+  * credentials travel in per-request headers or query strings, never on the
+    client, so two users' keys sharing a pooled client share sockets only;
+  * the table is bounded and least-recently-used origins are dropped from it,
+    because ``base_url`` is caller-supplied and a pool per arbitrary URL is
+    unbounded. A dropped client is not closed: another thread may have been
+    handed it a moment earlier and still be mid-request. It is released, and
+    its sockets with it, when the last request holding it lets go.
+
+HTTP/2 is enabled for ``https`` origins when the optional ``h2`` package is
+installed. ALPN negotiates it per connection, so a gateway that only speaks
+HTTP/1.1 gets HTTP/1.1 from the same client — "where the provider supports it"
+is decided by the provider, not by a list here.
+
+Handshakes are counted with httpcore's request trace hook, so the saving is a
+number in ``translate.perf`` (``ai_handshakes``) rather than a claim.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+import httpx
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_MAX_ORIGINS = max(1, int(os.environ.get("TP_AI_HTTP_MAX_ORIGINS", "32")))
+# Pages of one batch reach the same provider seconds apart, so httpx's 5 s
+# default would drop the connection between most of them. Providers and their
+# CDNs keep idle connections for a minute or more; expiring ours well before
+# that keeps a reused socket from being one the server already closed.
+_KEEPALIVE_SEC = max(1.0, float(os.environ.get("TP_AI_KEEPALIVE_SEC", "20")))
+_limits = httpx.Limits(
+    max_connections=32, max_keepalive_connections=16, keepalive_expiry=_KEEPALIVE_SEC
+)
+
+_lock = threading.Lock()
+_clients: "OrderedDict[str, httpx.Client]" = OrderedDict()
+_totals = {"requests": 0, "streamed": 0, "handshakes": 0, "tls_handshakes": 0, "evicted_clients": 0}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def _client_for(url: str) -> httpx.Client:
+    """The pooled client for ``url``'s origin, created on first use."""
+    origin = _origin(url)
+    with _lock:
+        client = _clients.get(origin)
+        if client is not None:
+            _clients.move_to_end(origin)
+            return client
+        client = httpx.Client(
+            http2=_HTTP2_AVAILABLE and origin.startswith("https://"),
+            limits=_limits,
+        )
+        _clients[origin] = client
+        if len(_clients) > _MAX_ORIGINS:
+            # Forgotten, not closed: see the module docstring.
+            _clients.popitem(last=False)
+            _totals["evicted_clients"] += 1
+    return client
+
+
+class _HandshakeCounter:
+    """httpcore trace callback: counts new connections made for one request."""
+
+    __slots__ = ("tcp", "tls")
+
+    def __init__(self) -> None:
+        self.tcp = 0
+        self.tls = 0
+
+    def __call__(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.tcp += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls += 1
+
+
+def request(method: str, url: str, *, timeout: float, **kwargs: Any) -> httpx.Response:
+    """Send one request through the shared pool for ``url``'s origin.
+
+    Same contract as ``httpx.Client.request``; the only addition is
+    ``response.extensions["tp_handshakes"]`` — how many new TCP connections
+    this request had to open (0 when it rode a pooled one).
+    """
+    counter = _HandshakeCounter()
+    extensions = dict(kwargs.pop("extensions", None) or {})
+    extensions["trace"] = counter
+    try:
+        response = _client_for(url).request(
+            method, url, timeout=timeout, extensions=extensions, **kwargs
+        )
+    finally:
+        with _lock:
+            _totals["requests"] += 1
+            _totals["handshakes"] += counter.tcp
+            _totals["tls_handshakes"] += counter.tls
+    response.extensions["tp_handshakes"] = counter.tcp
+    return response
+
+
+@contextlib.contextmanager
+def stream(method: str, url: str, *, timeout: float, **kwargs: Any) -> Iterator[httpx.Response]:
+    """:func:`request` for a streamed answer: the body is read as it arrives.
+
+    Used as ``with pool.stream(...) as response``; the connection goes back
+    to the pool when the block exits. ``timeout`` bounds each read, not the
+    whole answer.
+    """
+    counter = _HandshakeCounter()
+    extensions = dict(kwargs.pop("extensions", None) or {})
+    extensions["trace"] = counter
+    try:
+        with _client_for(url).stream(
+            method, url, timeout=timeout, extensions=extensions, **kwargs
+        ) as response:
+            response.extensions["tp_handshakes"] = counter.tcp
+            yield response
+    finally:
+        with _lock:
+            _totals["requests"] += 1
+            _totals["streamed"] += 1
+            _totals["handshakes"] += counter.tcp
+            _totals["tls_handshakes"] += counter.tls
+
+
+def is_event_stream(response: httpx.Response) -> bool:
+    """Whether a streamed request really got an SSE answer.
+
+    Some OpenAI-compatible gateways ignore ``stream`` and answer with the
+    ordinary JSON document; the clients read that one as usual.
+    """
+    return "text/event-stream" in response.headers.get("content-type", "").lower()
+
+
+def sse_data(response: httpx.Response) -> Iterator[str]:
+    """The ``data`` payload of every server-sent event in ``response``."""
+    lines: list[str] = []
+    for line in response.iter_lines():
+        if not line:
+            if lines:
+                yield "\n".join(lines)
+                lines = []
+            continue
+        if line.startswith("data:"):
+            value = line[5:]
+            lines.append(value[1:] if value.startswith(" ") else value)
+    if lines:
+        yield "\n".join(lines)
+
+
+def post(url: str, *, timeout: float, **kwargs: Any) -> httpx.Response:
+    return request("POST", url, timeout=timeout, **kwargs)
+
+
+def get(url: str, *, timeout: float, **kwargs: Any) -> httpx.Response:
+    return request("GET", url, timeout=timeout, **kwargs)
+
+
+def handshakes_of(response: httpx.Response) -> int:
+    """The handshake count :func:`request` attached to ``response``."""
+    return int(response.extensions.get("tp_handshakes") or 0)
+
+
+def stats() -> dict[str, Any]:
+    """Process-wide pool counters, for capabilities and debugging."""
+    with _lock:
+        return {
+            **_totals,
+            "origins": len(_clients),
+            "http2": _HTTP2_AVAILABLE,
+            "keepaliveSec": _KEEPALIVE_SEC,
+        }
+
+
+def close_all() -> None:
+    """Close every pooled client. Called from the FastAPI lifespan on shutdown."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:  # noqa: BLE001 - shutting down regardless
+            pass
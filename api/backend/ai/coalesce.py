@@ -0,0 +1,316 @@
+"""Send the AI units of several pages of one batch as one provider call.
+
+Every page of a chapter used to be its own provider call, so a 40-page
+chapter was 40 requests against a key that may allow 15 a minute, and most
+pages spent their life in the rate gate. The marker protocol already carries
+any number of units through one call and back separable, so pages of the same
+batch that reach the AI close together go as one: their units are numbered on
+from each other, the one answer is decoded as usual, and
+:func:`markers.split_units` hands each page its own piece, numbered from
+``P0`` exactly as if the page had gone alone.
+
+A group opens with its first page and stays open for
+``ai_coalesce_window_ms``, and for as long as that page is still waiting for
+the group's one rate-gate token — so a backlog fills groups while an idle key
+pays one window of latency. The next page that would take a group past
+``ai_coalesce_max_pages``, ``ai_coalesce_max_tokens`` (estimated source
+tokens: the answer has to fit the model's output too) or the unit and
+character limits of one ``/v1/ai/translate`` request closes it and opens the
+next.
+
+Pages share a call only when everything that shapes the prompt is the same
+(:func:`group_key`), and never with a page image, which is context for one
+page alone. The price is blast radius: a call that fails fails every page in
+it, each with the error it would have got alone.
+
+Groups are process-local. ``/v1/ai/translate`` runs them on the event loop
+(:meth:`Ticket.start` / :meth:`Ticket.paced` / :meth:`Ticket.result`), queued
+jobs on their worker threads (:meth:`AiCoalescer.run_blocking`); the two
+never share a group.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from backend.ai import markers
+from backend.ai.translate import AiConfig, AiResult
+from backend.config import settings
+
+# The bounds ``/v1/ai/translate`` puts on one request, which is what a group
+# becomes.
+_MAX_UNITS = 200
+_MAX_CHARS = 60000
+
+# Provider calls saved are reported per minute, the unit rate limits use.
+_RPM_WINDOW_SEC = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough source tokens: one per Thai/CJK-range character, one per four others."""
+    wide = sum(1 for ch in text if ord(ch) >= 0x0E00)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def group_key(lane: str, target_lang: str, ai: AiConfig) -> str | None:
+    """What pages must have in common to share a call; None when this one may not.
+
+    ``lane`` keeps the event-loop and worker-thread groups apart.
+    """
+    if settings.ai_coalesce_window_ms <= 0 or not ai.batch_id:
+        return None
+    if ai.image_b64 or ai.speakers:
+        # A page image is context for its own page; a speaker map is numbered
+        # by its own page's markers.
+        return None
+    shape = [
+        lane, ai.batch_id, target_lang, ai.provider, ai.model, ai.base_url, ai.api_key,
+        ai.user_key, ai.thinking, ai.prompt_editable, ai.glossary, ai.characters,
+        ai.char_memory, ai.unit_memory, ai.series_state, ai.prev_context, ai.context_frozen,
+    ]
+    blob = json.dumps(shape, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class _Group:
+    def __init__(self, key: str, deadline: float) -> None:
+        self.key = key
+        self.deadline = deadline
+        self.texts: list[str] = []
+        self.counts: list[int] = []
+        self.tokens = 0
+        self.chars = 0
+        self.sealed = False
+        # Set when the group is sealed: no page may join past this point.
+        self.full = threading.Event()
+        self.paced: concurrent.futures.Future = concurrent.futures.Future()
+        self.done: concurrent.futures.Future = concurrent.futures.Future()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.wake: asyncio.Event | None = None
+
+    def fits(self, units: int, tokens: int, chars: int) -> bool:
+        return (
+            len(self.counts) < settings.ai_coalesce_max_pages
+            and len(self.texts) + units <= _MAX_UNITS
+            and self.chars + chars <= _MAX_CHARS
+            and self.tokens + tokens <= settings.ai_coalesce_max_tokens
+        )
+
+
+class Ticket:
+    """One page's place in a group."""
+
+    def __init__(self, owner: "AiCoalescer", group: _Group, index: int, offset: int, count: int) -> None:
+        self._owner = owner
+        self.group = group
+        self.index = index
+        self.offset = offset
+        self.count = count
+
+    @property
+    def first(self) -> bool:
+        """Whether this page opened the group, and so paces and calls for it."""
+        return self.index == 0
+
+    def start(
+        self,
+        pace: Callable[[], Awaitable[None]],
+        call: Callable[[str], Awaitable[AiResult]],
+    ) -> None:
+        """Run the group on the event loop: ``pace`` once, then ``call`` once.
+
+        First ticket only. The run is a task of its own, so the page that
+        started it going away does not take the rest of the group with it.
+        """
+        group = self.group
+        group.loop = asyncio.get_running_loop()
+        group.wake = asyncio.Event()
+        if group.full.is_set():
+            group.wake.set()
+        task = group.loop.create_task(self._owner._run_async(group, pace, call))
+        self._owner._tasks.add(task)
+        task.add_done_callback(self._owner._tasks.discard)
+
+    async def paced(self) -> None:
+        """Wait for the group's rate-gate token; raises what the gate raised."""
+        await asyncio.shield(asyncio.wrap_future(self.group.paced))
+
+    async def result(self) -> AiResult:
+        """This page's piece of the group's answer; raises what the call raised."""
+        whole = await asyncio.shield(asyncio.wrap_future(self.group.done))
+        return self.piece(whole)
+
+    def piece(self, whole: AiResult) -> AiResult:
+        counts = self.group.counts
+        text = markers.split_units(str(whole.get("aiTextFull") or ""), counts)[self.index]
+        meta = dict(whole.get("meta") or {})
+        omitted = []
+        for item in meta.get("omitted_ids") or []:
+            n = int(str(item)[1:]) if str(item)[1:].isdigit() else -1
+            if self.offset <= n < self.offset + self.count:
+                omitted.append(f"P{n - self.offset}")
+        meta["omitted_ids"] = omitted
+        meta["coalesced"] = {
+            **(meta.get("coalesced") or {}),
+            "pages": len(counts),
+            "index": self.index,
+            "units": sum(counts),
+        }
+        return AiResult(aiTextFull=text, meta=meta)
+
+
+class AiCoalescer:
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._open: dict[str, _Group] = {}
+        self._lock = threading.Lock()
+        self._tasks: set[asyncio.Task] = set()
+        self._counts = {"pages": 0, "calls": 0, "coalescedCalls": 0, "sealedFull": 0}
+        # (when, provider calls that call saved), for the per-minute figure.
+        self._saved: deque[tuple[float, int]] = deque()
+
+    def join(self, key: str, texts: list[str]) -> Ticket:
+        """Put ``texts`` (one page's units, in order) into ``key``'s open group."""
+        tokens = estimate_tokens("".join(texts))
+        chars = sum(len(t) for t in texts)
+        sealed: _Group | None = None
+        with self._lock:
+            group = self._open.get(key)
+            if group is not None and not group.fits(len(texts), tokens, chars):
+                sealed, group = group, None
+                self._seal_locked(sealed)
+                self._counts["sealedFull"] += 1
+            if group is None:
+                group = _Group(key, self._clock() + settings.ai_coalesce_window_ms / 1000.0)
+                self._open[key] = group
+            ticket = Ticket(self, group, len(group.counts), len(group.texts), len(texts))
+            group.texts.extend(texts)
+            group.counts.append(len(texts))
+            group.tokens += tokens
+            group.chars += chars
+            if len(group.counts) >= settings.ai_coalesce_max_pages:
+                self._seal_locked(group)
+        if sealed is not None:
+            self._wake(sealed)
+        self._wake(group)
+        return ticket
+
+    def _seal_locked(self, group: _Group) -> None:
+        group.sealed = True
+        if self._open.get(group.key) is group:
+            del self._open[group.key]
+        group.full.set()
+
+    def _seal(self, group: _Group) -> tuple[list[str], list[int]]:
+        with self._lock:
+            if not group.sealed:
+                self._seal_locked(group)
+            return list(group.texts), list(group.counts)
+
+    @staticmethod
+    def _wake(group: _Group) -> None:
+        if group.full.is_set() and group.loop is not None and group.wake is not None:
+            group.loop.call_soon_threadsafe(group.wake.set)
+
+    def _record(self, counts: list[int]) -> None:
+        now = self._clock()
+        with self._lock:
+            self._counts["pages"] += len(counts)
+            self._counts["calls"] += 1
+            if len(counts) > 1:
+                self._counts["coalescedCalls"] += 1
+                self._saved.append((now, len(counts) - 1))
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._saved and now - self._saved[0][0] > _RPM_WINDOW_SEC:
+            self._saved.popleft()
+
+    async def _run_async(
+        self,
+        group: _Group,
+        pace: Callable[[], Awaitable[None]],
+        call: Callable[[str], Awaitable[AiResult]],
+    ) -> None:
+        try:
+            await pace()
+        except BaseException as exc:
+            self._seal(group)
+            group.paced.set_exception(exc)
+            group.done.set_exception(exc)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return
+        group.paced.set_result(None)
+        remaining = group.deadline - self._clock()
+        if remaining > 0 and group.wake is not None:
+            try:
+                await asyncio.wait_for(group.wake.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        texts, counts = self._seal(group)
+        try:
+            whole = await call(markers.apply(texts))
+        except BaseException as exc:
+            group.done.set_exception(exc)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return
+        self._record(counts)
+        group.done.set_result(whole)
+
+    def run_blocking(self, key: str, texts: list[str], call: Callable[[str], AiResult]) -> AiResult:
+        """:meth:`join` then wait for the answer on this thread.
+
+        The page that opens the group waits out the window and makes the
+        call; there is no rate gate on this lane.
+        """
+        ticket = self.join(key, texts)
+        group = ticket.group
+        if ticket.first:
+            group.paced.set_result(None)
+            remaining = group.deadline - self._clock()
+            if remaining > 0:
+                group.full.wait(remaining)
+            marked, counts = self._seal(group)
+            try:
+                whole = call(markers.apply(marked))
+            except BaseException as exc:
+                group.done.set_exception(exc)
+                raise
+            self._record(counts)
+            group.done.set_result(whole)
+        return ticket.piece(group.done.result())
+
+    def saved_rpm(self) -> int:
+        """Provider calls coalescing saved over the last minute."""
+        with self._lock:
+            self._trim(self._clock())
+            return sum(n for _, n in self._saved)
+
+    def stats(self) -> dict[str, Any]:
+        saved_rpm = self.saved_rpm()
+        with self._lock:
+            counts = dict(self._counts)
+            open_groups = len(self._open)
+        return {
+            **counts,
+            "enabled": settings.ai_coalesce_window_ms > 0,
+            "windowMs": settings.ai_coalesce_window_ms,
+            "maxPages": settings.ai_coalesce_max_pages,
+            "maxTokens": settings.ai_coalesce_max_tokens,
+            "open": open_groups,
+            "pagesPerCall": round(counts["pages"] / counts["calls"], 2) if counts["calls"] else 0.0,
+            "savedCalls": counts["pages"] - counts["calls"],
+            "savedRpm": saved_rpm,
+        }
+
+
+ai_coalescer = AiCoalescer()
@@ -535,6 +535,32 @@ def sanitize(marked_text: str) -> str:
     return "\n".join(out_lines).strip("\n")
 
 
+def split_units(ai_text_full: str, counts: list[int]) -> list[str]:
+    """Cut one canonical answer to several concatenated inputs back apart.
+
+    ``ai_text_full`` answers ``apply`` of every input's units in order, and
+    ``counts[k]`` is how many of them input ``k`` contributed. Each piece is
+    renumbered from ``P0`` and keeps every value byte-for-byte, so it reads
+    exactly as that input's own answer would. An empty answer (nothing was
+    translatable) stays empty for every input.
+    """
+    if not ai_text_full:
+        return [""] * len(counts)
+    values = [""] * sum(counts)
+    matches = list(_MARKER_RE.finditer(ai_text_full))
+    for i, m in enumerate(matches):
+        idx = int(m.group(1))
+        end = matches[i + 1].start() if (i + 1) < len(matches) else len(ai_text_full)
+        if 0 <= idx < len(values):
+            values[idx] = ai_text_full[m.end():end].strip()
+    pieces: list[str] = []
+    start = 0
+    for n in counts:
+        pieces.append(_canonical_markers(values[start:start + n]))
+        start += n
+    return pieces
+
+
 def extract_paragraphs(text: str, expected: int) -> tuple[list[str], str] | None:
     """Pull out the paragraph texts in marker order.
 
@@ -14,6 +14,7 @@ from typing import Any, TypedDict
 
 import httpx
 
+from backend.ai.clients import pool
 from backend.ai.clients.openai_compat import _uses_reasoning_safe_parameters
 from backend.ai.config import PROVIDER_DEFAULTS, PROVIDER_PROTOCOLS
 from backend.ai.providers import (
@@ -70,8 +71,7 @@ def _post(provider: str, api_key: str, base_url: str, model: str) -> httpx.Respo
             "contents": [{"role": "user", "parts": [{"text": "Reply only OK."}]}],
             "generationConfig": {"maxOutputTokens": 8},
         }
-        with httpx.Client(timeout=PROBE_TIMEOUT_SEC) as client:
-            return client.post(url, json=payload)
+        return pool.post(url, json=payload, timeout=PROBE_TIMEOUT_SEC)
 
     if provider == "anthropic":
         url = "https://api.anthropic.com/v1/messages"
@@ -85,8 +85,7 @@ def _post(provider: str, api_key: str, base_url: str, model: str) -> httpx.Respo
             "max_tokens": 8,
             "messages": [{"role": "user", "content": "Reply only OK."}],
         }
-        with httpx.Client(timeout=PROBE_TIMEOUT_SEC) as client:
-            return client.post(url, headers=headers, json=payload)
+        return pool.post(url, headers=headers, json=payload, timeout=PROBE_TIMEOUT_SEC)
 
     url = base_url.rstrip("/") + "/chat/completions"
     headers = {
@@ -101,8 +100,7 @@ def _post(provider: str, api_key: str, base_url: str, model: str) -> httpx.Respo
         payload["max_completion_tokens"] = 8
     else:
         payload["max_tokens"] = 8
-    with httpx.Client(timeout=PROBE_TIMEOUT_SEC) as client:
-        return client.post(url, headers=headers, json=payload)
+    return pool.post(url, headers=headers, json=payload, timeout=PROBE_TIMEOUT_SEC)
 
 
 def probe(payload: dict[str, Any]) -> ProbeResult:
@@ -210,6 +210,11 @@ def prompt_metadata(lang: str, prompt_override: str = "") -> dict[str, str | int
     }
 
 
+# Sources shorter than this are interjections and particles ("Ha", "eh",
+# "!?"): their best translation depends on the scene, so nothing pins one.
+MIN_TERM_CHARS: Final[int] = 3
+
+
 def build_glossary_block(glossary: list[dict] | None, limit: int = 40) -> str:
     """Render a short glossary / translation-memory block for the prompt.
 
@@ -219,7 +224,7 @@ def build_glossary_block(glossary: list[dict] | None, limit: int = 40) -> str:
     page — the same role a human scanlator's term sheet plays.
 
     Accuracy guards:
-    - very short sources (< 3 chars) are skipped: they are almost always
+    - very short sources (< ``MIN_TERM_CHARS``) are skipped: they are almost always
       interjections/particles ("Ha", "eh", "!?") whose best translation
       depends on the scene — pinning them makes later pages stiff;
     - only the most recent ``limit`` unique source terms are kept so the
@@ -238,7 +243,7 @@ def build_glossary_block(glossary: list[dict] | None, limit: int = 40) -> str:
         tgt = str(entry.get("tgt") or "").strip()
         if not src or not tgt or src in seen:
             continue
-        if len(src) < 3:  # interjection/particle — context beats memory
+        if len(src) < MIN_TERM_CHARS:  # interjection/particle — context beats memory
             continue
         seen.add(src)
         lines.append(f"  - {src} → {tgt}")
@@ -255,7 +260,7 @@ def build_glossary_block(glossary: list[dict] | None, limit: int = 40) -> str:
     )
 
 
-def looks_like_term(src: str, tgt: str, min_len: int = 3) -> bool:
+def looks_like_term(src: str, tgt: str, min_len: int = MIN_TERM_CHARS) -> bool:
     """Heuristic: is ``src => tgt`` a reusable TERM (name/place/skill/item)?
 
     Guards the glossary and the brief's TERMS block against full sentences and
@@ -17,6 +17,7 @@ from typing import TypedDict
 import httpx
 
 from backend.ai import config as ai_config  # noqa: F401 - kept for callers
+from backend.ai.clients import pool
 from backend.ai.config import PROVIDER_ALIASES, PROVIDER_DEFAULTS, MODEL_ALIASES, LOCAL_PROVIDERS
 
 # Listing models is a quick GET and must never wait the full *generation*
@@ -186,10 +187,9 @@ def hf_router_models(api_key: str, base_url: str) -> list[str]:
 
     url = base_url.rstrip("/") + "/models"
     try:
-        with httpx.Client(timeout=LIST_TIMEOUT_SEC) as client:
-            r = client.get(url, headers={"Authorization": f"Bearer {api_key}"})
-            r.raise_for_status()
-            data = r.json()
+        r = pool.get(url, headers={"Authorization": f"Bearer {api_key}"}, timeout=LIST_TIMEOUT_SEC)
+        r.raise_for_status()
+        data = r.json()
     except Exception:
         return []
 
@@ -253,12 +253,12 @@ def openai_compat_models_status(
         }
 
     try:
-        with httpx.Client(timeout=timeout_sec) as client:
-            r = client.get(
-                url,
-                headers={"Authorization": f"Bearer {api_key}"},
-                params=params or None,
-            )
+        r = pool.get(
+            url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            params=params or None,
+            timeout=timeout_sec,
+        )
     except httpx.RequestError as exc:
         return _model_list_result(status="unreachable", error=type(exc).__name__)
 
@@ -363,8 +363,7 @@ def gemini_models_status(api_key: str) -> ModelListResult:
         return _model_list_result(status="missing")
     url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}&pageSize=1000"
     try:
-        with httpx.Client(timeout=LIST_TIMEOUT_SEC) as client:
-            r = client.get(url)
+        r = pool.get(url, timeout=LIST_TIMEOUT_SEC)
     except httpx.RequestError as exc:
         return _model_list_result(status="unreachable", error=type(exc).__name__)
     if r.status_code == 401:
@@ -407,8 +406,7 @@ def anthropic_models_status(api_key: str) -> ModelListResult:
         "anthropic-version": "2023-06-01",
     }
     try:
-        with httpx.Client(timeout=LIST_TIMEOUT_SEC) as client:
-            r = client.get(url, headers=headers)
+        r = pool.get(url, headers=headers, timeout=LIST_TIMEOUT_SEC)
     except httpx.RequestError as exc:
         return _model_list_result(status="unreachable", error=type(exc).__name__)
     if r.status_code == 401:
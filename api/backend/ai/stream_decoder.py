@@ -0,0 +1,179 @@
+"""Pick translated units out of a provider answer while it is still arriving.
+
+A 60-unit page with a thinking model takes 10–30 s to answer, and the whole
+answer used to be awaited before :func:`markers.decode_translation_response`
+saw any of it. The shapes that decoder accepts all close each unit's value
+well before the answer ends, so this one reads the answer as it streams and
+reports every unit the moment its value is complete:
+
+* the canonical envelope (and the same wrapped in a code fence): a unit is
+  done when its ``{"id": ..., "text": ...}`` entry's closing brace arrives;
+* flat ``{"P0": "...", ...}`` JSON: when the value string closes;
+* plain markers: when the next ``<<TP_Pn>>`` (or ``<<TP_MEMO>>``) begins, and
+  the last one at :meth:`UnitStreamDecoder.close`.
+
+What it reports is provisional. It never decides whether the answer is
+acceptable: the complete text still goes through
+:func:`markers.decode_translation_response`, which rejects an incomplete or
+ambiguous answer exactly as before, and a unit reported here may still end
+up discarded with the rest of a rejected answer. Any shape it does not
+recognise (``aiTextFull`` JSON, text before the first marker) simply reports
+nothing.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+from backend.ai.markers import MEMO_MARKER, _MARKER_RE
+
+_FENCE_OPEN_RE = re.compile(r"\A```(?:json)?[ \t]*\n", re.IGNORECASE)
+_XML_OPEN = "<AiTextFull>"
+_CLOSING_RE = re.compile(r"\s*(?:```|</AiTextFull>)\s*\Z", re.IGNORECASE)
+_PKEY_RE = re.compile(r"P\d+")
+
+
+class UnitStreamDecoder:
+    """Feed it chunks of one answer; it returns ``(index, text)`` per finished unit.
+
+    ``expected`` is the id sequence the request carried (``P0..Pn``). Each
+    index is reported at most once; ids outside ``expected`` are ignored.
+    """
+
+    def __init__(self, expected: list[str]) -> None:
+        self._index = {item: i for i, item in enumerate(expected)}
+        self._buf = ""
+        self._start = -1  # where the answer's body begins, once known
+        self._mode = ""   # "json" | "markers" | "other"
+        self._pos = 0
+        self._done: set[int] = set()
+        # JSON scanner state.
+        self._stack: list[str] = []
+        self._in_str = False
+        self._esc = False
+        self._str_start = 0
+        self._entry_start = -1
+        self._after_colon = False
+        self._key = ""
+
+    @property
+    def reported(self) -> int:
+        return len(self._done)
+
+    def feed(self, chunk: str) -> list[tuple[int, str]]:
+        if not chunk:
+            return []
+        self._buf += chunk
+        if not self._mode and not self._detect():
+            return []
+        if self._mode == "json":
+            return self._scan_json()
+        if self._mode == "markers":
+            return self._scan_markers(final=False)
+        return []
+
+    def close(self) -> list[tuple[int, str]]:
+        """The answer ended: report the unit only its end could close."""
+        if self._mode == "markers":
+            return self._scan_markers(final=True)
+        return []
+
+    def _detect(self) -> bool:
+        """Settle which shape the answer has, once enough of it is here."""
+        head = self._buf.lstrip()
+        if head.startswith("```"):
+            fence = _FENCE_OPEN_RE.match(head)
+            if fence is None:
+                if "\n" in head:
+                    self._mode = "other"
+                    return True
+                return False
+            head = head[fence.end():].lstrip()
+        elif head[: len(_XML_OPEN)].lower() == _XML_OPEN.lower():
+            head = head[len(_XML_OPEN):].lstrip()
+        if any(opening.lower().startswith(head.lower()) for opening in ("```", _XML_OPEN, "<<TP_P")):
+            return False  # too little of it yet to tell
+        if head.startswith("{"):
+            self._mode = "json"
+        elif head.startswith("<<TP_P"):
+            self._mode = "markers"
+        else:
+            self._mode = "other"
+        self._start = self._pos = len(self._buf) - len(head)
+        return True
+
+    def _report(self, out: list[tuple[int, str]], item: object, text: object) -> None:
+        index = self._index.get(item) if isinstance(item, str) else None
+        if index is None or index in self._done or not isinstance(text, str):
+            return
+        self._done.add(index)
+        out.append((index, text))
+
+    def _scan_json(self) -> list[tuple[int, str]]:
+        out: list[tuple[int, str]] = []
+        buf = self._buf
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._stack == ["{"]:
+                        self._top_level_string(out, buf[self._str_start:i + 1])
+                continue
+            if ch == '"':
+                self._in_str = True
+                self._str_start = i
+            elif ch in "{[":
+                self._stack.append(ch)
+                if self._stack == ["{", "[", "{"]:
+                    self._entry_start = i
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._stack == ["{", "["] and self._entry_start >= 0:
+                    self._entry(out, buf[self._entry_start:i + 1])
+                    self._entry_start = -1
+            elif len(self._stack) == 1:
+                if ch == ":":
+                    self._after_colon = True
+                elif ch == ",":
+                    self._after_colon = False
+        self._pos = len(buf)
+        return out
+
+    def _top_level_string(self, out: list[tuple[int, str]], token: str) -> None:
+        try:
+            value = json.loads(token)
+        except ValueError:
+            return
+        if not self._after_colon:
+            self._key = value
+        elif _PKEY_RE.fullmatch(self._key):
+            self._report(out, self._key, value)
+
+    def _entry(self, out: list[tuple[int, str]], token: str) -> None:
+        try:
+            entry = json.loads(token)
+        except ValueError:
+            return
+        if isinstance(entry, dict):
+            self._report(out, entry.get("id"), entry.get("text"))
+
+    def _scan_markers(self, *, final: bool) -> list[tuple[int, str]]:
+        out: list[tuple[int, str]] = []
+        body = self._buf[self._start:]
+        if final:
+            body = _CLOSING_RE.sub("", body)
+        memo_at = body.find(MEMO_MARKER)
+        end = memo_at if memo_at >= 0 else len(body)
+        matches = list(_MARKER_RE.finditer(body, 0, end))
+        closed = len(matches) if (final or memo_at >= 0) else len(matches) - 1
+        for k in range(max(0, closed)):
+            stop = matches[k + 1].start() if k + 1 < len(matches) else end
+            self._report(out, f"P{matches[k].group(1)}", body[matches[k].end():stop].strip())
+        return out
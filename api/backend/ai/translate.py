@@ -18,8 +18,9 @@ Incomplete output is rejected rather than repaired or retried.
 from __future__ import annotations
 
 import hashlib
+import time
 from dataclasses import dataclass, field
-from typing import Any, TypedDict
+from typing import Any, Callable, TypedDict
 
 from backend.ai import markers, parsing, prompts
 from backend.ai.errors import ModelOutputContractError
@@ -27,6 +28,7 @@ from backend.ai.clients import anthropic as anthropic_client
 from backend.ai.clients import gemini as gemini_client
 from backend.ai import throttle
 from backend.ai.clients import openai_compat
+from backend.ai.stream_decoder import UnitStreamDecoder
 from backend.ai.providers import (
     is_hf_provider,
     is_local_provider,
@@ -36,6 +38,7 @@ from backend.ai.providers import (
     resolve_model,
     resolve_provider,
 )
+from backend.config import settings
 from backend.lens.languages import normalize as normalize_lang
 from backend.security import assert_ai_base_url_allowed
 
@@ -65,6 +68,10 @@ class AiConfig:
     # Series memory master switch — default OFF (off = smallest prompt/response,
     # cheapest tokens, and a page translates the same as a clean run).
     char_memory: bool = False
+    # Per-unit translation memory (backend/ai/unit_memory.py) — default OFF.
+    # A remembered unit is answered without the model seeing it, so it loses
+    # the scene around it (who speaks, to whom): the batch has to ask for it.
+    unit_memory: bool = False
     # Vision: when the client opts in (send_image) the pipeline downscales the
     # page and fills image_b64/image_mime so the model can SEE the speakers.
     # Accepts True/"always" (every page) or "auto" (the pipeline attaches the
@@ -92,6 +99,9 @@ class AiConfig:
     prev_context: list = field(default_factory=list)
     # True = context above is frozen for the whole batch -> no <<TP_MEMO>>.
     context_frozen: bool = False
+    # The batch this page belongs to. Not part of the prompt: pages of one
+    # batch may share a provider call (backend/ai/coalesce.py).
+    batch_id: str = ""
 
 
 class AiResult(TypedDict):
@@ -113,6 +123,15 @@ def resolve_generation_model(provider: str, requested_model: str) -> str:
     return requested
 
 
+def _relay_units(on_unit: Callable[[int, str], None], units: list[tuple[int, str]]) -> None:
+    """Hand previewed units to the listener; a failing listener never fails the call."""
+    for index, text in units:
+        try:
+            on_unit(index, text)
+        except Exception:  # noqa: BLE001 - a preview must not cost the translation
+            pass
+
+
 def translate(
     original_text_full: str,
     target_lang: str,
@@ -121,6 +140,7 @@ def translate(
     is_retry: bool = False,
     reference_text_full: str = "",  # ⛔ DORMANT param — kept for backward compat but always ignored (Lens MT is no longer sent to the model)
     capture_request: bool = False,
+    on_unit: Callable[[int, str], None] | None = None,
 ) -> AiResult:
     """Translate ``original_text_full`` into ``target_lang`` using ``ai``.
 
@@ -133,6 +153,11 @@ def translate(
     and made the model copy the MT's stilted register; translating from the
     source alone is faster, cheaper, and produces more natural dialogue.
 
+    ``on_unit`` (optional) is called with ``(index, text)`` for each unit as
+    soon as its value closes in the streamed answer. Those are previews: the
+    result is still decoded from the whole answer, which is rejected exactly
+    as an unstreamed one would be. The Hugging Face path does not stream.
+
     Raises ``ValueError`` if no API key is supplied.  Returns a ``skipped``
     result (rather than raising) when the input has no real text.
     """
@@ -226,6 +251,20 @@ def translate(
     if not api_key and is_local_provider(provider):
         api_key = "local"
 
+    on_text: Callable[[str], None] | None = None
+    stream: UnitStreamDecoder | None = None
+    started = time.perf_counter()
+    first_unit_ms: float | None = None
+    if on_unit is not None and settings.ai_stream:
+        stream = UnitStreamDecoder(markers.expected_ids(original_text_full))
+
+        def on_text(chunk: str) -> None:
+            nonlocal first_unit_ms
+            units = stream.feed(chunk)
+            if units and first_unit_ms is None:
+                first_unit_ms = round((time.perf_counter() - started) * 1000, 1)
+            _relay_units(on_unit, units)
+
     used_model = model
     if provider == "gemini":
         result = gemini_client.generate(
@@ -233,6 +272,7 @@ def translate(
             image_b64=image_b64, image_mime=image_mime,
             thinking=str(getattr(ai, "thinking", "") or ""),
             response_schema=response_schema,
+            on_text=on_text,
         )
     elif provider == "anthropic":
         result = anthropic_client.generate(
@@ -240,6 +280,7 @@ def translate(
             image_b64=image_b64, image_mime=image_mime,
             system_static=system_static, system_dynamic=system_dynamic,
             response_schema=response_schema,
+            on_text=on_text,
         )
     elif is_hf_provider(provider, base_url):
         result = throttle.generate_with_backoff(
@@ -254,8 +295,11 @@ def translate(
             allow_hf_fallback=False,
             image_b64=image_b64, image_mime=image_mime,
             response_schema=response_schema,
+            on_text=on_text,
         )
     used_model = result.used_model
+    if stream is not None:
+        _relay_units(on_unit, stream.close())
 
     # Split off the optional <<TP_MEMO>> character-notes block BEFORE marker
     # sanitisation so it can never leak into the rendered translation.
@@ -294,9 +338,16 @@ def translate(
         "accepted_losslessly": decoded.accepted_losslessly,
         "content_modified": decoded.content_modified,
         "omitted_ids": list(decoded.missing_ids),
+        # New connections this one call opened; 0 = it rode a pooled one.
+        "http_handshakes": int(getattr(result, "handshakes", 0) or 0),
     }
     if characters:
         meta["characters"] = characters
+    if stream is not None:
+        # Units previewed while the answer streamed, and when the first one was.
+        meta["streamed_units"] = stream.reported
+        if first_unit_ms is not None:
+            meta["first_unit_ms"] = first_unit_ms
     if image_b64:
         meta["vision"] = True
     if capture_request:
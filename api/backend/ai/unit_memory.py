@@ -0,0 +1,182 @@
+"""Translation memory for single AI units.
+
+Manga repeats itself: the same sound effect on every other page, the same
+names, the same lines when a chapter is read again. The idempotency ledger in
+``/v1/ai/translate`` only replays a whole request, and the job lane's result
+cache only a whole page, so every one of those units used to go back to the
+provider. This memory answers them per unit: ``/v1/ai/translate`` and the job
+lane's AI layer (:mod:`backend.jobs.pipeline`) look each unit up before they
+build the marked prompt and send only the misses, then remember what the
+provider answered.
+
+It is off unless the batch asks for it (``AiConfig.unit_memory``). A
+remembered unit never reaches the model, so the model translates the rest of
+the page without it, and the remembered answer was written for another scene:
+a Thai line carries its speaker's gendered particles, and the same source
+line from a different speaker needs different ones. That trade is the
+reader's to make per batch, not the server's.
+
+Units shorter than the glossary's guard (:data:`backend.ai.prompts.MIN_TERM_CHARS`)
+are neither looked up nor remembered: "Ha", "eh" and one-syllable replies are
+exactly the units whose translation depends on the scene, which is why the
+glossary never pins them either. See :func:`rememberable`.
+
+A unit is keyed by its ``unit_hash`` and a signature of what decides its
+translation: target language, resolved provider and model, and the effective
+prompt style (:func:`backend.ai.prompts.prompt_metadata`). Page context —
+glossary, character sheet, page image — is deliberately left out: it steers
+the model towards consistency, which a remembered answer already has, and it
+changes with every page, so keying on it would leave nothing to reuse.
+
+Two tiers: an in-memory LRU bounded by unit count, and behind it an optional
+:class:`backend.jobs.disk_cache.DiskCache` file that survives restarts and is
+shared by every worker on the host. A batch's misses are read from it in one
+query and its answers written in one transaction; a disk hit is promoted into
+memory. Like the other caches it is not a store of record: a failed read is a
+miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+from backend.ai.prompts import MIN_TERM_CHARS
+from backend.config import settings
+from backend.jobs.disk_cache import DiskCache, default_path
+
+
+def unit_hash(text: str) -> str:
+    """Stable id tying every returned unit to its source text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def rememberable(text: str) -> bool:
+    """Whether a unit is long enough for its answer to be reused on another page."""
+    return len(str(text or "").strip()) >= MIN_TERM_CHARS
+
+
+def signature(target_lang: str, provider: str, model: str, prompt_meta: dict[str, Any]) -> str:
+    """What two translations of one unit must share to be interchangeable."""
+    shape = [
+        str(target_lang or "").strip().lower(), provider, model,
+        prompt_meta.get("promptVersion", ""), prompt_meta.get("promptHash", ""),
+    ]
+    return hashlib.sha256(json.dumps(shape).encode("utf-8")).hexdigest()[:16]
+
+
+class UnitMemory:
+    """``unit_hash`` -> translated text, per :func:`signature`."""
+
+    def __init__(self, max_entries: int, ttl_sec: float, disk: DiskCache | None = None,
+                 *, clock: Callable[[], float] = time.time) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_sec = max(1.0, float(ttl_sec))
+        self._disk = disk
+        self._clock = clock
+        self._items: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def _key(sig: str, unit_hash: str) -> str:
+        return f"unit:{sig}:{unit_hash}"
+
+    def get_many(self, sig: str, hashes: Iterable[str]) -> dict[str, str]:
+        """The remembered translation of every hash that has one.
+
+        Blocking when the disk tier is on: call it off the event loop.
+        """
+        if not self.enabled:
+            return {}
+        wanted = list(dict.fromkeys(hashes))
+        found: dict[str, str] = {}
+        now = self._clock()
+        with self._lock:
+            for h in wanted:
+                key = self._key(sig, h)
+                held = self._items.get(key)
+                if held is None:
+                    continue
+                if held[0] <= now:
+                    del self._items[key]
+                    continue
+                self._items.move_to_end(key)
+                found[h] = held[1]
+            self.hits += len(found)
+        missing = [h for h in wanted if h not in found]
+        if self._disk is not None and missing:
+            stored = self._disk.get_many(self._key(sig, h) for h in missing)
+            promoted: dict[str, str] = {}
+            for h in missing:
+                text = (stored.get(self._key(sig, h)) or {}).get("text")
+                if isinstance(text, str) and text:
+                    promoted[h] = text
+            if promoted:
+                self._remember(sig, promoted)
+                found.update(promoted)
+                with self._lock:
+                    self.disk_hits += len(promoted)
+        with self._lock:
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, sig: str, answers: dict[str, str]) -> None:
+        """Remember ``unit_hash -> text``. Blocking like :meth:`get_many`."""
+        answers = {h: t for h, t in answers.items() if h and t}
+        if not self.enabled or not answers:
+            return
+        self._remember(sig, answers)
+        with self._lock:
+            self.writes += len(answers)
+        if self._disk is not None:
+            self._disk.set_many({self._key(sig, h): {"text": text} for h, text in answers.items()})
+
+    def _remember(self, sig: str, answers: dict[str, str]) -> None:
+        expires = self._clock() + self.ttl_sec
+        with self._lock:
+            for h, text in answers.items():
+                key = self._key(sig, h)
+                self._items[key] = (expires, text)
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            out: dict[str, Any] = {
+                "enabled": self.enabled,
+                "entries": len(self._items),
+                "maxEntries": self.max_entries,
+                "ttlSec": self.ttl_sec,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+            }
+        out["disk"] = self._disk.stats() if self._disk is not None else {"enabled": False}
+        return out
+
+
+unit_memory = UnitMemory(
+    settings.unit_memory_max,
+    settings.unit_memory_ttl_sec,
+    DiskCache(
+        settings.unit_memory_path or default_path("unit-memory.sqlite3"),
+        max_bytes=settings.unit_memory_max_mb * 1024 * 1024,
+        ttl_sec=settings.unit_memory_ttl_sec,
+    ) if settings.unit_memory_disk and settings.unit_memory_max > 0 else None,
+)
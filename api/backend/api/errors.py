@@ -9,9 +9,11 @@ raw exception/provider response text must never be passed as ``extra``.
 from __future__ import annotations
 
 from typing import Any
+import asyncio
 import re
 import socket
 
+from backend import logfile
 from backend.log import event
 
 ERROR_SCHEMA = "tp.error/1"
@@ -83,6 +85,14 @@ def failure_event(route: str, detail: dict[str, Any], **safe_meta: Any) -> None:
     )
 
 
+async def afailure_event(route: str, detail: dict[str, Any], **safe_meta: Any) -> None:
+    """:func:`failure_event` for the event loop: the durable write runs on a thread."""
+    if not logfile.is_enabled():
+        failure_event(route, detail, **safe_meta)
+    else:
+        await asyncio.to_thread(failure_event, route, detail, **safe_meta)
+
+
 def provider_status(exc: BaseException) -> int | None:
     """Extract an upstream HTTP status from the clients' sanitised messages."""
     import re
@@ -21,7 +21,7 @@ from fastapi import Request
 
 from backend import trace
 from backend.config import settings
-from backend.log import event
+from backend.log import aevent, event
 from backend.api.errors import safe_cause_class
 
 _UVICORN_MODE = "uvicorn"
@@ -102,7 +102,7 @@ async def access_log_middleware(request: Request, call_next):
             response = await call_next(request)
         except Exception as exc:
             if settings.access_log_mode in _FAILURE_MODES:
-                event(
+                await aevent(
                     "http.error",
                     {
                         "method": request.method,
@@ -137,7 +137,7 @@ async def access_log_middleware(request: Request, call_next):
                         _note_scanner_probe(request.method, path)
                     else:
                         phrase = HTTPStatus(response.status_code).phrase
-                        event(
+                        await aevent(
                             "http.error",
                             {
                                 "method": request.method,
@@ -15,7 +15,7 @@ from fastapi import APIRouter, Response
 
 from backend.ai import probe as ai_probe
 from backend.ai import resolve as ai_resolve
-from backend.log import event
+from backend.log import aevent
 from backend.security import SecurityError
 
 router = APIRouter()
@@ -58,7 +58,7 @@ async def resolve(payload: dict[str, Any]) -> dict:
     try:
         result = dict(ai_resolve.resolve(payload))
         ok = bool(result.get("ok"))
-        event(
+        await aevent(
             "ai.resolve" if ok else "ai.resolve.error",
             {
                 "provider": result.get("provider") or str(payload.get("provider") or "auto"),
@@ -72,7 +72,7 @@ async def resolve(payload: dict[str, Any]) -> dict:
         )
         return result
     except SecurityError as exc:
-        event(
+        await aevent(
             "ai.resolve.error",
             {
                 "provider": str(payload.get("provider") or "auto"),
@@ -96,7 +96,7 @@ async def probe(payload: dict[str, Any]) -> dict:
     try:
         result = dict(ai_probe.probe(payload))
     except SecurityError as exc:
-        event(
+        await aevent(
             "ai.probe.error",
             {
                 "provider": str(payload.get("provider") or "auto"),
@@ -107,7 +107,7 @@ async def probe(payload: dict[str, Any]) -> dict:
             ok=False,
         )
         return _refused_base_url(payload, exc)
-    event(
+    await aevent(
         "ai.probe" if result.get("ok") else "ai.probe.error",
         {
             "provider": result.get("provider") or str(payload.get("provider") or "auto"),
@@ -29,9 +29,9 @@ Three things this does that ``/translate`` could not
 
 from __future__ import annotations
 
-import hashlib
 import asyncio
 import base64
+import functools
 import io
 import math
 import re
@@ -44,10 +44,11 @@ from typing import Any
 from fastapi import APIRouter, Header, HTTPException, Request
 
 from backend.ai import markers, parsing
+from backend.ai.coalesce import ai_coalescer, group_key as coalesce_group_key
 from backend.ai.errors import ModelOutputContractError
 from backend.api.local_client import wants_unlimited
 from backend.api.errors import (
-    payload as error_payload, failure_event, provider_status,
+    payload as error_payload, afailure_event, failure_event, provider_status,
     cancelled_payload, provider_http_semantics, safe_validation_reason,
     merged_request_correlation,
 )
@@ -57,6 +58,7 @@ from backend.ai.failure_reason import retry_after_sec as _ai_retry_after_sec
 from backend.ai import prompts as ai_prompts
 from backend.ai.rategate import rate_gate, RateGateRejected, RateGateTimeout
 from backend.ai.providers import resolve_provider
+from backend.ai.unit_memory import rememberable, signature as memory_signature, unit_hash, unit_memory
 from backend.ai.translate import (
     AiConfig,
     resolve_generation_model,
@@ -64,7 +66,7 @@ from backend.ai.translate import (
 )
 from backend.config import settings
 from backend.jobs.admission import AdmissionRejected, identity_of
-from backend.log import event
+from backend.log import aevent, event
 from backend.security import SecurityError
 from backend import cancellation, trace
 
@@ -112,11 +114,6 @@ def _ledger_put(key: str, value: dict) -> None:
             _ledger.popitem(last=False)
 
 
-def unit_hash(text: str) -> str:
-    """Stable id tying every returned unit to its source text."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
-
-
 def _language_neutral_unit(text: str) -> bool:
     """Whether the API must return a unit byte-for-byte.
 
@@ -193,10 +190,12 @@ def _build_config(payload: dict) -> AiConfig:
         glossary=memory.get("glossary") if isinstance(memory.get("glossary"), list) else [],
         characters=memory.get("characters") if isinstance(memory.get("characters"), list) else [],
         char_memory=bool(memory.get("enabled")) or bool(memory.get("characters")),
+        unit_memory=bool(memory.get("units")),
         series_state=str(memory.get("seriesState") or "").strip(),
         prev_context=memory.get("previousContext")
         if isinstance(memory.get("previousContext"), list)
         else [],
+        batch_id=cancellation.batch_id_of(payload),
     )
     image = payload.get("image") if isinstance(payload.get("image"), dict) else {}
     data_uri = str(image.get("dataUri") or "").strip()
@@ -388,6 +387,25 @@ async def ai_translate_v1(
             )
             return replayed
 
+    # With ``memory.units`` set, units this provider, model and prompt already
+    # translated are answered from the translation memory
+    # (backend/ai/unit_memory.py) and only the rest go to the model. A request
+    # left with nothing but language-neutral units, which are returned
+    # verbatim anyway, makes no call at all.
+    memory_sig = memory_signature(target_lang, resolved_provider, resolved_model, prompt_meta)
+    remembered: dict[str, str] = {}
+    if unit_memory.enabled and config.unit_memory:
+        remembered = await asyncio.to_thread(
+            unit_memory.get_many, memory_sig,
+            [unit_hash(u["text"]) for u in units
+             if rememberable(u["text"]) and not _language_neutral_unit(u["text"])],
+        )
+    sent_units = units
+    if remembered:
+        rest = [u for u in units if unit_hash(u["text"]) not in remembered]
+        sent_units = rest if any(not _language_neutral_unit(u["text"]) for u in rest) else []
+    memory_hits = sum(1 for u in units if unit_hash(u["text"]) in remembered)
+
     # Optional user-pinned RPM pacing. Auto/provider-managed requests arrive
     # with rate.enabled=false and skip this gate entirely; the real provider
     # response is then the source of truth for quota/backpressure.
@@ -404,19 +422,73 @@ async def ai_translate_v1(
         if rate["enabled"] and not unlimited
         else {}
     )
-    if rate["enabled"] and not unlimited:
+    async def _acquire_rate() -> None:
+        await rate_gate.acquire(
+            resolved_provider,
+            config.model,
+            config.api_key,
+            session=str(context.get("tp_tab_session") or trace_id),
+            job_id=str(payload.get("operationId") or idempotency_key or f"ai-v1-{time.time_ns()}"),
+            deadline_sec=settings.rate_max_wait_sec,
+            max_waiters=settings.rate_max_waiters_per_bucket,
+            rpm_override=rate["rpm"] or None,
+            burst_override=rate["burst"] or None,
+        )
+
+    # This endpoint is async, but every provider SDK below it is synchronous.
+    # Running that call on the event-loop was an accidental global mutex: while
+    # image A waited for Gemini, image B could not even enter this route. The
+    # AI-specific admission gate bounds provider concurrency; a worker thread
+    # keeps unrelated image pipelines and all other endpoints moving.
+    provider = payload.get("provider") if isinstance(payload.get("provider"), dict) else {}
+    identity_payload = {
+        "ai": {"api_key": str(provider.get("apiKey") or "")},
+        "context": payload.get("context") if isinstance(payload.get("context"), dict) else {},
+    }
+    identity = identity_of(identity_payload)
+    provider_timing: dict[str, float] = {}
+    def _translate_marked(marked_text: str) -> dict:
+        with trace.scope(trace_id):
+            provider_started = time.perf_counter()
+            try:
+                return ai_translate(marked_text, target_lang, config)
+            finally:
+                provider_timing["provider_ms"] = round(
+                    (time.perf_counter() - provider_started) * 1000, 1
+                )
+
+    # Pages of one batch that arrive together take one rate-gate token and one
+    # provider call between them (backend/ai/coalesce.py). The page that opens
+    # the group paces and calls for all of it. A local runtime has no quota to
+    # save, so it never waits for company.
+    coalesce_key = None if unlimited or not sent_units else coalesce_group_key("v1", target_lang, config)
+    ticket = ai_coalescer.join(coalesce_key, [u["text"] for u in sent_units]) if coalesce_key else None
+    if ticket is not None and ticket.first:
+        async def _pace_group() -> None:
+            if rate["enabled"]:
+                await _acquire_rate()
+
+        async def _call_group(marked_all: str) -> dict:
+            started = time.perf_counter()
+            async with request.app.state.ai_admission_gate.slot(identity):
+                waited = round((time.perf_counter() - started) * 1000, 1)
+                loop = asyncio.get_running_loop()
+                shared = await loop.run_in_executor(request.app.state.ai_executor, _translate_marked, marked_all)
+            meta = dict(shared.get("meta") or {})
+            meta["coalesced"] = {
+                "admissionWaitMs": waited,
+                "providerMs": provider_timing.get("provider_ms", 0.0),
+            }
+            return {**shared, "meta": meta}
+
+        ticket.start(_pace_group, _call_group)
+
+    if rate["enabled"] and not unlimited and sent_units:
         try:
-            await rate_gate.acquire(
-                resolved_provider,
-                config.model,
-                config.api_key,
-                session=str(context.get("tp_tab_session") or trace_id),
-                job_id=str(payload.get("operationId") or idempotency_key or f"ai-v1-{time.time_ns()}"),
-                deadline_sec=settings.rate_max_wait_sec,
-                max_waiters=settings.rate_max_waiters_per_bucket,
-                rpm_override=rate["rpm"] or None,
-                burst_override=rate["burst"] or None,
-            )
+            if ticket is not None:
+                await ticket.paced()
+            else:
+                await _acquire_rate()
         except (RateGateTimeout, RateGateRejected) as exc:
             # A 429 from THIS gate is not the same event as a 429 from the
             # provider, and the client must be able to tell them apart.
@@ -465,34 +537,23 @@ async def ai_translate_v1(
     # The marker protocol is what lets one model call carry many units and come
     # back separable. Reusing the existing one keeps this endpoint and the
     # legacy pipeline producing identical text for identical input.
-    marked = markers.apply([u["text"] for u in units])
-
-    # This endpoint is async, but every provider SDK below it is synchronous.
-    # Running that call on the event-loop was an accidental global mutex: while
-    # image A waited for Gemini, image B could not even enter this route. The
-    # AI-specific admission gate bounds provider concurrency; a worker thread
-    # keeps unrelated image pipelines and all other endpoints moving.
-    provider = payload.get("provider") if isinstance(payload.get("provider"), dict) else {}
-    identity_payload = {
-        "ai": {"api_key": str(provider.get("apiKey") or "")},
-        "context": payload.get("context") if isinstance(payload.get("context"), dict) else {},
-    }
-    identity = identity_of(identity_payload)
-    provider_timing: dict[str, float] = {}
-    def _run_ai() -> dict:
-        with trace.scope(trace_id):
-            provider_started = time.perf_counter()
-            try:
-                return ai_translate(marked, target_lang, config)
-            finally:
-                provider_timing["provider_ms"] = round(
-                    (time.perf_counter() - provider_started) * 1000, 1
-                )
+    marked = markers.apply([u["text"] for u in sent_units])
+    _run_ai = functools.partial(_translate_marked, marked)
 
     admission_started = time.perf_counter()
     admission_wait_ms = 0.0
     try:
-        if unlimited:
+        if not sent_units:
+            result = {"aiTextFull": "", "meta": {
+                "provider": resolved_provider, "model": resolved_model,
+                "target_lang": target_lang, "ai_flow": "unit_memory",
+            }}
+        elif ticket is not None:
+            result = await ticket.result()
+            shared = result["meta"]["coalesced"]
+            admission_wait_ms = shared["admissionWaitMs"]
+            provider_timing["provider_ms"] = shared["providerMs"]
+        elif unlimited:
             loop = asyncio.get_running_loop()
             result = await loop.run_in_executor(request.app.state.ai_executor, _run_ai)
         else:
@@ -504,7 +565,8 @@ async def ai_translate_v1(
                 result = await loop.run_in_executor(request.app.state.ai_executor, _run_ai)
         # The provider accepted this call. A streak of these raises the sustained
         # rate for THIS key only, so a paid key stops being paced at the free rate.
-        if rate["enabled"] and not unlimited:
+        # A shared call is reported once, by the page that made it.
+        if rate["enabled"] and not unlimited and sent_units and (ticket is None or ticket.first):
             rate_gate.report_success(resolved_provider, config.model, config.api_key)
     except AdmissionRejected as exc:
         detail = error_payload(
@@ -517,7 +579,7 @@ async def ai_translate_v1(
                    "automaticContentRetry": False, "automaticTransportRetry": False},
             correlation=correlation,
         )
-        failure_event("/v1/ai/translate", detail)
+        await afailure_event("/v1/ai/translate", detail)
         trace_failure(
             "admission_gate", exc, 503,
             units=len(units), rateWaitMs=rate_wait_ms,
@@ -571,7 +633,7 @@ async def ai_translate_v1(
                    "modelFallback": False, "schemaFallback": False},
             correlation=correlation,
         )
-        failure_event("/v1/ai/translate", detail)
+        await afailure_event("/v1/ai/translate", detail)
         raise HTTPException(
             status_code=502,
             detail=detail,
@@ -593,7 +655,7 @@ async def ai_translate_v1(
         # idempotency key without violating the one-generation-per-image rule.
         provider_limited = _ai_is_rate_limited(exc)
         provider_retry_sec = _ai_retry_after_sec(exc) if provider_limited else 0.0
-        if rate["enabled"] and not unlimited and provider_limited:
+        if rate["enabled"] and not unlimited and provider_limited and (ticket is None or ticket.first):
             rate_gate.report_rate_limited(
                 resolved_provider, config.model, config.api_key,
                 retry_after_sec=provider_retry_sec,
@@ -645,7 +707,7 @@ async def ai_translate_v1(
             retry_sec = max(1.0, float(provider_retry_sec or 1.0))
             detail["retryAfterMs"] = int(retry_sec * 1000)
             headers = {"Retry-After": str(max(1, math.ceil(retry_sec)))}
-        failure_event("/v1/ai/translate", detail)
+        await afailure_event("/v1/ai/translate", detail)
         raise HTTPException(status_code=502, detail=detail, headers=headers) from exc
 
     text_full = str(result.get("aiTextFull") or "")
@@ -663,8 +725,16 @@ async def ai_translate_v1(
     # model answered without any markers at all. None is not "no translations"
     # — it means the protocol broke — so it is reported as every unit missing
     # rather than as an empty success.
-    extracted_pair = markers.extract_paragraphs(text_full, len(units))
-    extracted: list[str] = list(extracted_pair[0]) if extracted_pair else []
+    extracted_pair = markers.extract_paragraphs(text_full, len(sent_units)) if sent_units else None
+    # The answer is numbered over the units that were sent; put it and the
+    # remembered units back in request order.
+    sent_at = {unit["id"]: index for index, unit in enumerate(sent_units)}
+    answered = list(extracted_pair[0]) if extracted_pair else []
+    extracted: list[str] = [
+        remembered.get(unit_hash(unit["text"]), "") if unit["id"] not in sent_at
+        else (answered[sent_at[unit["id"]]] if sent_at[unit["id"]] < len(answered) else "")
+        for unit in units
+    ]
 
     # Two different things end up in `missing`, and they have different causes
     # and different fixes:
@@ -682,11 +752,16 @@ async def ai_translate_v1(
     # is a prompt problem. `omitted_ids` comes from the decoder, which alone
     # knows which ids were absent before alignment filled them with "".
     result_meta = result.get("meta") if isinstance(result.get("meta"), dict) else {}
-    omitted_from_answer = {str(item) for item in (result_meta.get("omitted_ids") or [])}
+    omitted_sent = {str(item) for item in (result_meta.get("omitted_ids") or [])}
+    omitted_from_answer = [
+        f"P{index}" for index, unit in enumerate(units)
+        if unit["id"] in sent_at and f"P{sent_at[unit['id']]}" in omitted_sent
+    ]
     translations: list[dict[str, str]] = []
     missing: list[str] = []
     declined: list[str] = []
     passthrough: list[str] = []
+    learned: dict[str, str] = {}
     for index, unit in enumerate(units):
         text = markers.normalize_unit_text(extracted[index] if index < len(extracted) else "")
         if _language_neutral_unit(unit["text"]):
@@ -701,6 +776,8 @@ async def ai_translate_v1(
             passthrough.append(unit["id"])
         elif text:
             translations.append({"id": unit["id"], "text": text, "hash": unit_hash(unit["text"])})
+            if unit["id"] in sent_at and rememberable(unit["text"]):
+                learned[unit_hash(unit["text"])] = text
         else:
             # Structurally present but empty text remains observable. The
             # client treats this image as terminal; no automatic AI retry.
@@ -738,14 +815,14 @@ async def ai_translate_v1(
             "providerMs": provider_timing.get("provider_ms", 0.0),
             # Said out loud so a page that came back blank is distinguishable
             # from a page the model simply had nothing to say about.
-            "markersFound": bool(extracted_pair),
+            "markersFound": bool(extracted_pair) or not sent_units,
             "vision": bool(config.image_b64),
             "passthroughUnits": len(passthrough),
             "outputContract": meta.get("output_contract", ""),
             "responseShape": meta.get("response_shape", ""),
             "acceptedLosslessly": bool(meta.get("accepted_losslessly", False)),
             "contentModified": bool(meta.get("content_modified", False)),
-            "omittedIds": list(meta.get("omitted_ids") or []),
+            "omittedIds": omitted_from_answer,
             # Units whose entry arrived with an empty string. `missing` minus
             # `declinedIds` is the set the answer never mentioned.
             "declinedIds": declined,
@@ -757,23 +834,30 @@ async def ai_translate_v1(
                       if not rate["enabled"]
                       else rate_gate.snapshot(resolved_provider, config.model, config.api_key))
             ),
-            "providerAttempts": 1,
-            "generationAttempts": 1,
-            "httpAttempts": 1,
-            "providerHttpStatuses": [200],
+            "providerAttempts": 1 if sent_units else 0,
+            "generationAttempts": 1 if sent_units else 0,
+            "httpAttempts": 1 if sent_units else 0,
+            "providerHttpStatuses": [200] if sent_units else [],
+            # Units answered from the translation memory instead of the model.
+            "memoryHits": memory_hits,
+            "sentUnits": len(sent_units),
             "automaticContentRetry": False,
             "automaticTransportRetry": False,
             "modelFallback": False,
             "schemaFallback": False,
             "aiFlow": meta.get("ai_flow", ""),
+            # Pages that shared this page's provider call, itself included.
+            "coalescedPages": int((meta.get("coalesced") or {}).get("pages") or 1),
             **prompt_meta,
         },
     }
 
     if key:
         _ledger_put(key, body)
+    if learned and config.unit_memory:
+        await asyncio.to_thread(unit_memory.put_many, memory_sig, learned)
 
-    event(
+    await aevent(
         "v1.ai.translate",
         {
             "units": len(units),
@@ -789,6 +873,10 @@ async def ai_translate_v1(
             "rpm_now": body["meta"]["rate"].get("rpm"),
             "admission_wait_ms": body["meta"]["admissionWaitMs"],
             "provider_ms": body["meta"]["providerMs"],
+            "pages_per_call": body["meta"]["coalescedPages"],
+            "saved_rpm": ai_coalescer.saved_rpm(),
+            "memory_hits": memory_hits,
+            "sent_units": len(sent_units),
         },
         ok=not missing,
     )
@@ -819,6 +907,8 @@ async def ai_translate_v1(
          "rateWaitMs": body["meta"]["rateWaitMs"],
          "admissionWaitMs": body["meta"]["admissionWaitMs"],
          "providerMs": body["meta"]["providerMs"],
+         "coalescedPages": body["meta"]["coalescedPages"],
+         "memoryHits": memory_hits,
          "rate": body["meta"]["rate"],
          "vision": body["meta"]["vision"],
          "markersFound": body["meta"]["markersFound"],
@@ -41,7 +41,7 @@ from backend.config import settings
 from backend.jobs.admission import AdmissionRejected, identity_of
 from backend.log import event
 from backend.api.errors import (
-    payload as error_payload, failure_event, merged_request_correlation,
+    payload as error_payload, afailure_event, merged_request_correlation,
 )
 
 router = APIRouter()
@@ -205,7 +205,7 @@ async def detect_blocks(payload: dict[str, Any], request: Request) -> dict:
             extra={"retryAfterMs": int(exc.retry_after_sec * 1000),
                    "generationAttempts": 0}, correlation=correlation,
         )
-        failure_event("/v1/blocks", detail, reason="detector_session", **timings)
+        await afailure_event("/v1/blocks", detail, reason="detector_session", **timings)
         raise HTTPException(
             status_code=503,
             detail=detail,
@@ -220,7 +220,7 @@ async def detect_blocks(payload: dict[str, Any], request: Request) -> dict:
             extra={"retryAfterMs": int(exc.retry_after_sec * 1000)},
             correlation=correlation,
         )
-        failure_event("/v1/blocks", detail, reason="admission")
+        await afailure_event("/v1/blocks", detail, reason="admission")
         raise HTTPException(
             status_code=503,
             detail=detail,
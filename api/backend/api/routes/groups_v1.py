@@ -57,7 +57,7 @@ from backend.config import settings
 from backend.jobs.admission import AdmissionRejected, identity_of
 from backend.log import event
 from backend.api.errors import (
-    payload as error_payload, failure_event, merged_request_correlation,
+    payload as error_payload, afailure_event, merged_request_correlation,
 )
 from backend.lens.tree import iter_paragraphs
 from backend.render import textblocks_pass
@@ -391,7 +391,7 @@ async def group_paragraphs(payload: dict[str, Any], request: Request) -> dict:
             extra={"fallback": "resend `imageDataUri` or call `/v1/lens/raw` again"},
             correlation=correlation,
         )
-        failure_event("/v1/groups", detail)
+        await afailure_event("/v1/groups", detail)
         raise HTTPException(
             status_code=exc.status,
             detail=detail,
@@ -591,7 +591,7 @@ async def group_paragraphs(payload: dict[str, Any], request: Request) -> dict:
                    "generationAttempts": 0},
             correlation=correlation,
         )
-        failure_event("/v1/groups", detail, reason="detector_session", **timings)
+        await afailure_event("/v1/groups", detail, reason="detector_session", **timings)
         raise HTTPException(
             status_code=503,
             detail=detail,
@@ -606,7 +606,7 @@ async def group_paragraphs(payload: dict[str, Any], request: Request) -> dict:
             extra={"retryAfterMs": int(exc.retry_after_sec * 1000)},
             correlation=correlation,
         )
-        failure_event("/v1/groups", detail, reason="admission")
+        await afailure_event("/v1/groups", detail, reason="admission")
         raise HTTPException(
             status_code=503,
             detail=detail,
@@ -30,8 +30,8 @@
 from __future__ import annotations
 
 import asyncio
-import os
-import tempfile
+import functools
+import io
 import time
 from typing import Any
 
@@ -47,7 +47,7 @@ from backend.lens.tree import decode_tree, flatten_spans, tree_warnings
 from backend.log import event
 from backend.api.local_client import wants_unlimited
 from backend.api.errors import (
-    payload as error_payload, failure_event, provider_status, cancelled_payload,
+    payload as error_payload, afailure_event, provider_status, cancelled_payload,
     safe_cause_class, merged_request_correlation,
 )
 from backend.render import erase_boxes as erase_boxes_mod
@@ -77,32 +77,34 @@ def _optional_image_artifact(store: Any, raw: bytes, identity: str) -> tuple[dic
     }, "stored"
 
 
-def _fetch_raw_sync(raw: bytes, target_lang: str, trace_id: str) -> tuple[int, int, dict]:
-    """Blocking image inspection + Google round trip, always off the event loop."""
-    from backend.lens import client as lens_client
+def _inspect(raw: bytes) -> tuple[int, int, str]:
+    """Image size (header only) and sha256 of the upload: the CPU half."""
     from PIL import Image
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".img") as handle:
-        handle.write(raw)
-        path = handle.name
-    try:
-        with trace.scope(trace_id):
-            with Image.open(path) as img:
-                width, height = img.size
-            data = lens_client.fetch_lens_data(path, target_lang, settings.firebase_url)
-        return width, height, data
-    finally:
-        try:
-            os.unlink(path)
-        except OSError:
-            pass
+    from backend.utils.images import sha256_hex
+
+    # Straight from memory: the bytes were read once from the upload and a temp
+    # file would only add a write, two reads and an unlink.
+    with Image.open(io.BytesIO(raw)) as img:
+        width, height = img.size
+    return width, height, sha256_hex(raw)
 
 
-def _fetch_fallback_sync(raw: bytes, target_lang: str) -> tuple[dict, int, int]:
-    """Compatibility route worker: Lens plus the legacy server-side decode."""
-    width, height, data = _fetch_raw_sync(raw, target_lang, "")
-    document, _ = _decode(data, width=width, height=height, target_lang=target_lang)
-    return document, width, height
+async def _fetch_raw(raw: bytes, target_lang: str, trace_id: str = "") -> tuple[int, int, dict]:
+    """Image inspection + Google round trip without holding a thread for the wait.
+
+    Only the inspection goes to a thread; the Lens request itself is awaited
+    on the async client, so a route waiting on Google costs a socket. The
+    client's notes (cookie refresh, flight join, store hit) carry ``trace_id``.
+    """
+    from backend.lens import client as lens_client
+
+    width, height, digest = await asyncio.to_thread(_inspect, raw)
+    with trace.scope(trace_id):
+        data = await lens_client.fetch_lens_data_async(
+            raw, target_lang, settings.firebase_url, image_hash=digest
+        )
+    return width, height, data
 
 
 def _decode(
@@ -287,23 +289,17 @@ async def lens_raw(
             trace_id=tp_trace, stage="lens_cancel", correlation=correlation))
     identity = _lens_identity(tp_tab_session)
     try:
-        # fetch_lens_data is synchronous network I/O. Calling it directly from
-        # this async route made the event loop a one-image global mutex: the
-        # next upload started only after the previous Lens response completed.
+        # The Lens round trip is awaited, not run on lens_executor: a request
+        # waiting on Google holds a socket, not a thread, so concurrency is
+        # whatever the admission gate allows rather than the pool size.
         # A local caller is the only tenant of this server, so the fairness gate
         # has nobody to be fair to. Google Lens is still remote and is still
         # paced by the extension's own lane.
         if wants_unlimited(request):
-            loop = asyncio.get_running_loop()
-            width, height, data = await loop.run_in_executor(
-                request.app.state.lens_executor, _fetch_raw_sync, raw, target_lang, tp_trace
-            )
+            width, height, data = await _fetch_raw(raw, target_lang, tp_trace)
         else:
             async with request.app.state.admission_gate.slot(identity):
-                loop = asyncio.get_running_loop()
-                width, height, data = await loop.run_in_executor(
-                    request.app.state.lens_executor, _fetch_raw_sync, raw, target_lang, tp_trace
-                )
+                width, height, data = await _fetch_raw(raw, target_lang, tp_trace)
     except AdmissionRejected as exc:
         detail = error_payload(
             code="server_busy", message=str(exc),
@@ -313,7 +309,7 @@ async def lens_raw(
             extra={"retryAfterMs": int(exc.retry_after_sec * 1000)},
             correlation=correlation,
         )
-        failure_event("/v1/lens/raw", detail)
+        await afailure_event("/v1/lens/raw", detail)
         raise HTTPException(
             status_code=503,
             detail=detail,
@@ -331,7 +327,7 @@ async def lens_raw(
                 extra={"retryAfterMs": 30000},
                 correlation=correlation,
             )
-            failure_event("/v1/lens/raw", detail)
+            await afailure_event("/v1/lens/raw", detail)
             raise HTTPException(
                 status_code=503,
                 detail=detail,
@@ -348,7 +344,7 @@ async def lens_raw(
             extra={"errorType": type(exc).__name__},
             correlation=correlation,
         )
-        failure_event("/v1/lens/raw", detail)
+        await afailure_event("/v1/lens/raw", detail)
         raise HTTPException(status_code=502, detail=detail) from exc
     if cancellation.is_cancelled(cancel_payload):
         event("v1.lens.raw.cancelled", {"batch_id": batch_id}, ok=True)
@@ -367,7 +363,7 @@ async def lens_raw(
             extra={"responseType": type(data).__name__},
             correlation=correlation,
         )
-        failure_event("/v1/lens/raw", detail)
+        await afailure_event("/v1/lens/raw", detail)
         raise HTTPException(status_code=502, detail=detail)
 
     paragraphs = len(data.get("originalParagraphs") or [])
@@ -462,9 +458,11 @@ async def lens_fallback(
     identity = _lens_identity(tp_tab_session)
     try:
         async with request.app.state.admission_gate.slot(identity):
-            loop = asyncio.get_running_loop()
-            document, _, _ = await loop.run_in_executor(
-                request.app.state.lens_executor, _fetch_fallback_sync, raw, target_lang
+            width, height, data = await _fetch_raw(raw, target_lang)
+            # The legacy server-side decode is CPU work: that part keeps the pool.
+            document, _ = await asyncio.get_running_loop().run_in_executor(
+                request.app.state.lens_executor,
+                functools.partial(_decode, data, width=width, height=height, target_lang=target_lang),
             )
     except AdmissionRejected as exc:
         detail = error_payload(
@@ -475,7 +473,7 @@ async def lens_fallback(
             extra={"retryAfterMs": int(exc.retry_after_sec * 1000)},
             correlation=correlation,
         )
-        failure_event("/v1/lens/fallback", detail, reason="admission")
+        await afailure_event("/v1/lens/fallback", detail, reason="admission")
         raise HTTPException(
             status_code=503,
             detail=detail,
@@ -492,7 +490,7 @@ async def lens_fallback(
                 category="upstream_lens", retryable=True, http_status=503,
                 extra={"retryAfterMs": 30000}, correlation=correlation,
             )
-            failure_event("/v1/lens/fallback", detail, reason="session_unavailable")
+            await afailure_event("/v1/lens/fallback", detail, reason="session_unavailable")
             raise HTTPException(
                 status_code=503,
                 detail=detail,
@@ -508,7 +506,7 @@ async def lens_fallback(
             extra={"errorType": type(exc).__name__, "causeClass": safe_cause_class(exc)},
             correlation=correlation,
         )
-        failure_event("/v1/lens/fallback", detail, fallbackReason=reason[:80])
+        await afailure_event("/v1/lens/fallback", detail, fallbackReason=reason[:80])
         raise HTTPException(status_code=502, detail=detail) from exc
     if cancellation.is_cancelled(cancel_payload):
         raise HTTPException(status_code=409, detail=cancelled_payload(
@@ -20,12 +20,13 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 from backend import logfile, trace
 from backend.config import settings
 from backend.trace_dedupe import TraceIngestDedupe, legacy_shipment_id
 from backend.api.errors import payload as error_payload
+from backend.api.local_client import is_local_peer
 
 router = APIRouter()
 
@@ -165,4 +166,33 @@ async def where() -> dict:
         "files": sorted(p.name for p in logfile.log_dir().glob("*.log"))
         if logfile.log_dir().exists()
         else [],
+        # The writer thread: what is waiting, what was written, what a full
+        # queue dropped.
+        "queue": logfile.stats(),
     }
+
+
+@router.get("/v1/trace/profile")
+async def trace_profile(request: Request, top: int = 0) -> dict:
+    """Per-function timing histograms from ``TP_TRACE=profile``, busiest first.
+
+    Local callers only: the names and timings of every function on the
+    request path are for the operator, not for whoever can reach the port.
+    """
+    if not is_local_peer(request):
+        raise HTTPException(status_code=403, detail=error_payload(
+            code="trace_profile_local_only",
+            message="The trace profile is served to local callers only.",
+            user_message="The trace profile is only available on the server's own network.",
+            origin="api", stage="trace_profile", category="configuration",
+            retryable=False, http_status=403,
+        ))
+    if not trace.profiling():
+        raise HTTPException(status_code=503, detail=error_payload(
+            code="trace_profile_disabled",
+            message="Profiling is disabled (set TP_TRACE=profile).",
+            user_message="Function profiling is disabled on this server.",
+            origin="api", stage="trace_profile", category="configuration",
+            retryable=False, http_status=503,
+        ))
+    return {"ok": True, **trace.profile(max(0, top))}
@@ -8,7 +8,16 @@ import time
 
 from fastapi import APIRouter
 
+from backend.ai.clients import pool as ai_pool
+from backend.ai.coalesce import ai_coalescer
+from backend.ai.unit_memory import unit_memory
 from backend.config import settings
+from backend.jobs import cache as cache_mod
+from backend.jobs.ai_pending import ai_pending
+from backend.jobs.backgrounds import backgrounds
+from backend.jobs.intermediates import intermediates
+from backend.jobs import cpu_lane
+from backend.lens import store as lens_store
 from backend.lens.languages import UI_LANGUAGES
 from backend.warmup import warmup as run_warmup
 
@@ -24,12 +33,36 @@ _SOURCES = [
 
 @router.get("/meta")
 async def meta() -> dict:
-    """Languages / sources the UI should offer, plus whether a server AI key exists."""
+    """Languages / sources the UI should offer, plus whether a server AI key exists.
+
+    ``cache`` carries the persistent result tier's counters (hits, misses,
+    evictions, bytes) so its budget can be sized from a running server, and
+    ``cache.lens`` the same for the shared Lens response tier plus how often
+    a worker waited on another's upload instead of repeating it, and
+    ``cache.intermediates`` what the per-page stage reuse holds and served,
+    ``cache.backgrounds`` the same for background artifacts and
+    ``cache.units`` for the per-unit translation memory;
+    ``http.ai`` says how many AI requests rode a pooled connection, and
+    ``cpuLane`` whether the image stages run in worker processes,
+    ``aiPending`` how many deferred AI layers are parked or still running,
+    and ``aiCoalesce`` how many pages shared each provider call.
+    """
     return {
         "ok": True,
         "languages": UI_LANGUAGES,
         "sources": _SOURCES,
         "has_env_ai_key": bool(settings.ai_api_key),
+        "cache": {
+            "results": cache_mod.result_disk_cache.stats(),
+            "lens": lens_store.stats(),
+            "intermediates": intermediates.stats(),
+            "backgrounds": backgrounds.stats(),
+            "units": unit_memory.stats(),
+        },
+        "http": {"ai": ai_pool.stats()},
+        "cpuLane": cpu_lane.stats(),
+        "aiPending": ai_pending.stats(),
+        "aiCoalesce": ai_coalescer.stats(),
     }
 
 
@@ -15,6 +15,27 @@ Backpressure moved with it. There is no queue to fill, so a saturated server
 answers 503 with ``Retry-After`` and the extension keeps the work it has not
 submitted. See :mod:`backend.jobs.admission`.
 
+A client that sends ``Accept: text/event-stream`` (or ``"stream": true`` in
+the payload) gets the same job as Server-Sent Events instead: one ``stage``
+event per finished pipeline stage, the Lens overlay in the ``html_ready`` one
+while the AI is still answering, an ``ai_unit`` one per translated unit as
+the provider's streamed answer closes it (a preview: the result is what was
+accepted), then a single ``result`` or ``error``. The error event carries
+the status and detail the plain response would have answered with, since by
+then the 200 has already gone out.
+
+With ``render.ai: "deferred"`` an AI job answers as soon as the Lens layers
+are rendered, carrying ``aiPending.token`` where the AI layer would be.
+``GET /v1/translate/ai/{token}`` long-polls for the patch that completes it;
+a streamed job stays open after its ``result``, relaying the layer's
+``ai_unit`` stages as they come, and sends the same patch as an ``ai_patch``
+event. The admission slot stays held until the provider has answered.
+
+With ``render.background: "artifact"`` the erased background is not inlined
+as a data URI; ``backgroundArtifact.url`` (``GET /v1/background/{id}``)
+serves the encoded file. ``"patches"`` sends only the erased regions
+(``erasePatches``, tp.erase-patches/1) for the client to draw over its copy.
+
 The legacy ``/translate`` + ``/translate/{id}`` + ``/translate/poll`` endpoints
 are untouched: an extension that has not updated yet keeps working exactly as
 before, and ``GET /v1/capabilities`` is how a client finds out which of the two
@@ -24,10 +45,12 @@ it is talking to.
 from __future__ import annotations
 
 import asyncio
+import json
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 
 from backend import cancellation, trace, logfile
 from backend.config import settings
@@ -37,16 +60,21 @@ from backend.ai.providers import resolve_provider, is_local_provider
 from backend.ai.rategate import rate_gate, RateGateRejected, RateGateTimeout
 from backend.api.local_client import wants_unlimited
 from backend.api.errors import (
-    payload as error_payload, failure_event, provider_status,
+    payload as error_payload, afailure_event, failure_event, provider_status,
     ai_rate_feedback_allowed, cancelled_payload, stage_failure_semantics,
     merged_request_correlation,
 )
 from backend.jobs.admission import AdmissionGate, AdmissionRejected, identity_of
+from backend.jobs.ai_pending import PendingError, ai_pending
+from backend.jobs.backgrounds import BackgroundError, backgrounds
 from backend.log import event
 from backend.security import SecurityError
 
 
-def _process_payload(payload: dict[str, Any]) -> dict[str, Any]:
+def _process_payload(
+    payload: dict[str, Any],
+    progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
     """Import the pipeline on first use.
 
     Kept lazy so this module — the routing, admission and error mapping — can
@@ -55,7 +83,7 @@ def _process_payload(payload: dict[str, Any]) -> dict[str, Any]:
     """
     from backend.jobs.pipeline import process_payload
 
-    return process_payload(payload)
+    return process_payload(payload, progress=progress)
 
 router = APIRouter()
 
@@ -64,6 +92,7 @@ API_VERSION = "2026-08"
 # Schemas this build speaks. A client checks these rather than sniffing fields.
 SCHEMAS = [
     "tp.erase-boxes/1",
+    "tp.erase-patches/1",
     "tp.lens-document/1",
     "tp.ai.request/1",
     "tp.ai.result/1",
@@ -150,7 +179,24 @@ async def capabilities(request: Request) -> dict:
         "schemas": SCHEMAS,
         "features": {
             "syncTranslate": True,
+            # `POST /v1/translate` with `Accept: text/event-stream`: stage
+            # events as they finish, the Lens overlay before the AI answers.
+            "streamTranslate": True,
+            # `ai_unit` stage events: each translated unit as soon as the
+            # provider's streamed answer closes it (TP_AI_STREAM). With
+            # `render.ai: "deferred"` they follow the `result` event, before
+            # `ai_patch`.
+            "aiUnitStream": settings.ai_stream,
+            # `render.ai: "deferred"`: the Lens overlay first, the AI layer
+            # from `GET /v1/translate/ai/{token}` when it is ready.
+            "aiDeferred": True,
             "clientBackground": True,
+            # `render.background: "artifact"`: the erased background as a file
+            # from `GET /v1/background/{id}` instead of a data URI in the JSON.
+            "backgroundArtifact": True,
+            # `render.background: "patches"`: only the erased regions, as
+            # `erasePatches` (tp.erase-patches/1), drawn over the client's page.
+            "erasePatches": True,
             "legacyJobQueue": True,
             "aiTranslate": True,
             # The browser fetched Lens itself and only needs the geometry
@@ -172,7 +218,11 @@ async def capabilities(request: Request) -> dict:
             # `trace` remains the boolean understood by existing clients.
             # New clients can show whether the server records compact stage
             # notes or the expensive function-by-function diagnostic.
-            "traceDetail": trace.mode(),
+            # Profile mode is compact notes plus server-side timing, so the
+            # browser ships compact lines: an unknown value would read as "full".
+            "traceDetail": "compact" if trace.profiling() else trace.mode(),
+            # `GET /v1/trace/profile`: per-function timing histograms.
+            "traceProfile": trace.profiling(),
             # Additive fields: old extensions ignore them; new ones can show
             # the exact run/file and recover trace shipping after API restart.
             "traceSession": trace.session_id() if trace.enabled() else "",
@@ -215,9 +265,214 @@ async def capabilities(request: Request) -> dict:
     }
 
 
+# A comment line this often keeps proxies from closing a stream that is
+# quietly waiting on a slow provider.
+_SSE_KEEPALIVE_SEC = 15.0
+
+
+def _pending_future(result: Any) -> Any:
+    """The running AI layer behind a deferred result, or ``None``."""
+    token = str(((result or {}).get("aiPending") or {}).get("token") or "") if isinstance(result, dict) else ""
+    if not token:
+        return None
+    try:
+        return ai_pending.get(token)
+    except PendingError:
+        return None
+
+
+def _wants_stream(payload: dict[str, Any], request: Request) -> bool:
+    if payload.get("stream") is True:
+        return True
+    return "text/event-stream" in str(request.headers.get("accept") or "").lower()
+
+
+def _sse(name: str, data: Any) -> str:
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"event: {name}\ndata: {body}\n\n"
+
+
+async def _stream(payload: dict[str, Any], request: Request) -> AsyncIterator[str]:
+    """Run :func:`_translate` and relay its stages as Server-Sent Events."""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def progress(stage: str, data: dict[str, Any]) -> None:
+        # Called on the pipeline's worker thread, or its AI thread.
+        loop.call_soon_threadsafe(events.put_nowait, ("stage", {"stage": stage, **data}))
+
+    def finished(task: asyncio.Task) -> None:
+        # Stage events were queued by call_soon_threadsafe before the worker
+        # returned, so this always lands after the last of them.
+        if not task.cancelled():
+            task.exception()
+        events.put_nowait(None)
+
+    task = asyncio.ensure_future(_translate(payload, request, progress=progress))
+    task.add_done_callback(finished)
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(events.get(), timeout=_SSE_KEEPALIVE_SEC)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is None:
+                break
+            yield _sse(*item)
+        if task.cancelled():
+            yield _sse("error", {"status": 409, "detail": {"code": "cancelled"}})
+            return
+        exc = task.exception()
+        if exc is None:
+            result = task.result()
+            yield _sse("result", result)
+            token = str((result.get("aiPending") or {}).get("token") or "")
+            if token:
+                async for line in _stream_patch(token, events):
+                    yield line
+        elif isinstance(exc, HTTPException):
+            headers = exc.headers or {}
+            yield _sse("error", {
+                "status": exc.status_code,
+                "detail": exc.detail,
+                "retryAfter": headers.get("Retry-After"),
+            })
+        else:
+            yield _sse("error", {
+                "status": 500,
+                "detail": {"code": "internal_error", "message": type(exc).__name__},
+            })
+    finally:
+        # The client went away mid-job: stop waiting on its behalf. The
+        # pipeline thread finishes on its own and its result is still cached.
+        if not task.done():
+            task.cancel()
+
+
+async def _stream_patch(token: str, events: asyncio.Queue) -> AsyncIterator[str]:
+    """Relay the deferred layer's stages from ``events`` until its patch lands."""
+    future = ai_pending.get(token)
+    waiter = asyncio.wrap_future(future)
+    getter: asyncio.Future | None = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({waiter, getter}, timeout=_SSE_KEEPALIVE_SEC,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                item, getter = getter.result(), None
+                if item is not None:
+                    yield _sse(*item)
+                continue
+            if done:
+                break
+            yield ": keepalive\n\n"
+        # The AI thread queued its last stages before it completed the
+        # future, so they are already here.
+        while not events.empty():
+            item = events.get_nowait()
+            if item is not None:
+                yield _sse(*item)
+        exc = waiter.exception()
+        if exc is None:
+            yield _sse("ai_patch", waiter.result())
+        else:
+            yield _sse("error", {"status": 502, "detail": _pending_failure(exc, token)})
+    finally:
+        if getter is not None:
+            getter.cancel()
+        # The client left first. The wrapper is left running, not cancelled:
+        # cancelling it would cancel the queued tail of the AI layer with it.
+        waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+
+def _pending_failure(exc: BaseException, token: str) -> dict[str, Any]:
+    """Error detail for a deferred AI layer that failed after the first answer."""
+    failed_stage = str(getattr(exc, "tp_stage", "") or "provider_request")
+    mapped = _provider_http_failure(exc)
+    upstream_status = provider_status(exc)
+    semantics = stage_failure_semantics(
+        failed_stage, default_code=mapped.code,
+        default_message=mapped.message, default_retryable=mapped.retryable,
+        upstream_status=upstream_status,
+    )
+    detail = error_payload(
+        code=semantics["code"], message=semantics["message"],
+        user_message=semantics["message"], origin=semantics["origin"],
+        stage=failed_stage, category=semantics["category"],
+        retryable=semantics["retryable"],
+        http_status=int(semantics.get("httpStatus") or mapped.status),
+        trace_id="", upstream_status=upstream_status,
+        extra={"generationAttempts": 1, "aiPending": token},
+    )
+    failure_event("/v1/translate/ai", detail)
+    return detail
+
+
+@router.get("/v1/translate/ai/{token}")
+async def translate_ai_patch(token: str, wait: float = 20.0) -> dict:
+    """The AI layer of a deferred job, once its provider has answered.
+
+    Waits up to ``wait`` seconds (capped at 55) and answers ``pending: true``
+    if it is still running, so a client polls at the provider's pace rather
+    than its own. The patch's keys replace the same keys of the first result.
+    """
+    try:
+        future = ai_pending.get(token)
+    except PendingError as exc:
+        raise HTTPException(status_code=exc.status, detail={"code": exc.code, "message": str(exc)}) from exc
+    try:
+        # shield: a poll timing out must not cancel the provider call.
+        patch = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)),
+            timeout=max(0.0, min(float(wait), 55.0)),
+        )
+    except asyncio.TimeoutError:
+        return {"ok": True, "pending": True, "token": token}
+    except Exception as exc:
+        detail = _pending_failure(exc, token)
+        raise HTTPException(status_code=int(detail.get("httpStatus") or 502), detail=detail) from exc
+    return {"ok": True, "pending": False, "token": token, "patch": patch}
+
+
+@router.get("/v1/background/{artifact_id}")
+async def background_artifact(artifact_id: str) -> Response:
+    """The erased background a ``render.background: "artifact"`` result names.
+
+    The id is the file's content address, so the bytes behind it never change
+    and the client may cache them for as long as it likes. A 410 means the
+    store let it go; the client asks for the page again.
+    """
+    try:
+        data, mime = backgrounds.get(artifact_id)
+    except BackgroundError as exc:
+        raise HTTPException(status_code=exc.status, detail={"code": exc.code, "message": str(exc)}) from exc
+    return Response(
+        content=data,
+        media_type=mime,
+        headers={"Cache-Control": f"private, max-age={int(backgrounds.ttl_sec)}, immutable"},
+    )
+
+
 @router.post("/v1/translate")
-async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
-    """Run one translation and return its result."""
+async def translate_sync(payload: dict[str, Any], request: Request) -> Any:
+    """Run one translation and return its result, or stream it (see module doc)."""
+    if _wants_stream(payload, request):
+        return StreamingResponse(
+            _stream(payload, request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return await _translate(payload, request)
+
+
+async def _translate(
+    payload: dict[str, Any],
+    request: Request,
+    progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
     if cancellation.is_cancelled(payload):
         context = payload.get("context") if isinstance(payload.get("context"), dict) else {}
         raise HTTPException(status_code=409, detail=cancelled_payload(
@@ -240,7 +495,7 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
             retryable=False, http_status=400, trace_id=trace_id,
             correlation=correlation,
         )
-        failure_event("/v1/translate", detail)
+        await afailure_event("/v1/translate", detail)
         raise HTTPException(status_code=400, detail=detail)
     lane = _lane_for(payload)
     gate = _gate(request, lane)
@@ -266,7 +521,7 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
         # Runs on a worker thread, so it must adopt the trace id itself — the
         # thread-local does not cross an executor boundary.
         with trace.scope(trace_id):
-            return _process_payload(payload)
+            return _process_payload(payload, progress)
 
     # Pace this key exactly as `/v1/ai/translate` does, but only for a job that
     # will really reach a provider — `_lane_for` already made that judgement.
@@ -301,7 +556,7 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
                 extra={"retryAfterMs": 5000, "generationAttempts": 0},
                 correlation=correlation,
             )
-            failure_event("/v1/translate", detail, mode=mode, source=source)
+            await afailure_event("/v1/translate", detail, mode=mode, source=source)
             raise HTTPException(
                 status_code=429,
                 detail=detail,
@@ -318,8 +573,11 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
         if wants_unlimited(request):
             result = await loop.run_in_executor(executor, _run)
         else:
-            async with gate.slot(identity):
+            async with gate.slot(identity) as slot:
                 result = await loop.run_in_executor(executor, _run)
+                pending = _pending_future(result)
+                if pending is not None:
+                    slot.hold_until(pending)
     except asyncio.CancelledError as exc:
         event("v1.translate.cancelled", {"mode": mode, "source": source}, ok=True)
         trace.write(
@@ -344,7 +602,7 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
                    "generationAttempts": 0},
             correlation=correlation,
         )
-        failure_event("/v1/translate", detail, mode=mode, source=source, lane=lane)
+        await afailure_event("/v1/translate", detail, mode=mode, source=source, lane=lane)
         raise HTTPException(
             status_code=503,
             detail=detail,
@@ -359,7 +617,7 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
             stage="request_validation", category="input", retryable=False,
             http_status=400, trace_id=trace_id, correlation=correlation,
         )
-        failure_event("/v1/translate", detail, mode=mode, source=source)
+        await afailure_event("/v1/translate", detail, mode=mode, source=source)
         raise HTTPException(status_code=400, detail=detail) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -446,14 +704,31 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
             extra={"generationAttempts": generation_attempts},
             correlation=correlation,
         )
-        failure_event("/v1/translate", detail, mode=mode, source=source)
+        await afailure_event("/v1/translate", detail, mode=mode, source=source)
         raise HTTPException(
             status_code=effective_status,
             detail=detail,
             headers=headers,
         ) from exc
-    if paced:
+    pending = _pending_future(result)
+    if paced and pending is None:
         rate_gate.report_success(rate_provider, rate_model, api_key)
+    elif paced:
+        # The provider has not answered yet; tell the rate gate when it does.
+        def _rate_feedback(f: Any) -> None:
+            exc = f.exception()
+            if exc is None:
+                rate_gate.report_success(rate_provider, rate_model, api_key)
+            elif (_provider_http_failure(exc).status == 429
+                  and ai_rate_feedback_allowed(str(getattr(exc, "tp_stage", "") or ""))):
+                rate_gate.report_rate_limited(
+                    rate_provider, rate_model, api_key,
+                    retry_after_sec=_ai_retry_after_sec(exc),
+                )
+
+        pending.add_done_callback(
+            lambda f: loop.call_soon_threadsafe(_rate_feedback, f)
+        )
 
     if cancellation.is_cancelled(payload):
         event("v1.translate.cancelled", {"mode": mode, "source": source}, ok=True)
@@ -477,6 +752,8 @@ async def translate_sync(payload: dict[str, Any], request: Request) -> dict:
                  "docParagraphs": len((result.get("lensDocument") or {}).get("paragraphs") or []),
                  "hasEraseBoxes": bool(result.get("eraseBoxes")),
                  "hasImageDataUri": bool(result.get("imageDataUri")),
+                 "hasBackgroundArtifact": bool(result.get("backgroundArtifact")),
+                 "hasErasePatches": bool(result.get("erasePatches")),
                  "hasOriginalHtml": bool((result.get("original") or {}).get("originalhtml")),
                  "hasTranslatedHtml": bool((result.get("translated") or {}).get("translatedhtml")),
                  "hasAiHtml": bool((result.get("Ai") or {}).get("aihtml")),
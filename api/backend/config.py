@@ -61,6 +61,13 @@ class Settings:
     # stay gated or batches inflate from ~1s to tens of seconds.
     max_workers: int = field(default_factory=lambda: _env_int("SERVER_MAX_WORKERS", 15))
     cpu_concurrency: int = field(default_factory=lambda: max(1, _env_int("TP_CPU_CONCURRENCY", 2)))
+    # Optional process lane for the post-Lens image stages (erase, bubble
+    # detect, background encode); see backend/jobs/cpu_lane.py. 0 keeps them on
+    # threads. On 4-8 vCPU boxes the threaded lane tops out near two cores from
+    # GIL contention; set this to the core count to scale past that.
+    cpu_process_workers: int = field(
+        default_factory=lambda: max(0, _env_int("TP_CPU_PROCESS_WORKERS", 0))
+    )
     job_ttl_sec: int = field(default_factory=lambda: _env_int("JOB_TTL_SEC", 3600))
     http_timeout_sec: float = field(default_factory=lambda: _env_float("HTTP_TIMEOUT_SEC", 120.0))
     # Multi-user safety: bound the pending queue + per-job wall-clock timeout so
@@ -164,6 +171,61 @@ class Settings:
     # Result caches ----------------------------------------------------------
     result_cache_max: int = field(default_factory=lambda: _env_int("TP_RESULT_CACHE_MAX", 512))
     ai_result_cache_max: int = field(default_factory=lambda: _env_int("TP_AI_RESULT_CACHE_MAX", 128))
+    # Second tier behind both in-memory caches. The memory tiers die with the
+    # process, and a Hugging Face Space restarts every time it wakes from
+    # sleep, so without this every page a reader already opened pays the Lens
+    # round trip (and, for AI, the provider tokens) again after a nap.
+    # Compressed SQLite file; see backend/jobs/disk_cache.py for the path rules.
+    result_disk_cache: bool = field(default_factory=lambda: _env_bool("TP_RESULT_DISK_CACHE", True))
+    result_disk_cache_path: str = field(default_factory=lambda: _env_str("TP_RESULT_DISK_CACHE_PATH"))
+    result_disk_cache_max_mb: int = field(
+        default_factory=lambda: max(1, _env_int("TP_RESULT_DISK_CACHE_MAX_MB", 256))
+    )
+    result_disk_cache_ttl_sec: float = field(
+        default_factory=lambda: max(60.0, _env_float("TP_RESULT_DISK_CACHE_TTL_SEC", 3 * 24 * 3600.0))
+    )
+
+    # Per-page stage outputs (Lens response, decoded page, erased background,
+    # bubbles, text blocks) kept in memory so the same page requested with
+    # another source skips everything but the text layer; see
+    # backend/jobs/intermediates.py. Two page images per entry dominate the
+    # budget. 0 turns it off.
+    intermediates_max_mb: int = field(default_factory=lambda: max(0, _env_int("TP_INTERMEDIATES_MAX_MB", 128)))
+    intermediates_ttl_sec: float = field(
+        default_factory=lambda: max(1.0, _env_float("TP_INTERMEDIATES_TTL_SEC", 900.0))
+    )
+
+    # Lens responses get their own persistent tier (backend/lens/store.py),
+    # shared by every worker on the host, with cross-process single-flight so
+    # two workers given one page upload it once. The TTL is short next to the
+    # result tier's because a response may point at Google-hosted images.
+    lens_store: bool = field(default_factory=lambda: _env_bool("TP_LENS_STORE", True))
+    lens_store_path: str = field(default_factory=lambda: _env_str("TP_LENS_STORE_PATH"))
+    lens_store_max_mb: int = field(default_factory=lambda: max(1, _env_int("TP_LENS_STORE_MAX_MB", 64)))
+    lens_store_ttl_sec: float = field(
+        default_factory=lambda: max(60.0, _env_float("TP_LENS_STORE_TTL_SEC", 6 * 3600.0))
+    )
+    # A leaseholder's upload is two requests of up to 60 s each; waiting longer
+    # than that means it died or hung, and the waiter fetches for itself.
+    lens_store_lock_timeout_sec: float = field(
+        default_factory=lambda: max(1.0, _env_float("TP_LENS_STORE_LOCK_TIMEOUT_SEC", 90.0))
+    )
+
+    # Per-unit translation memory for /v1/ai/translate and the job lane's AI
+    # layer (backend/ai/unit_memory.py):
+    # a unit already translated with the same target language, provider, model
+    # and prompt is answered from here and not sent again. Only batches that
+    # opt in use it (``ai.unit_memory`` on a job, ``memory.units`` on
+    # /v1/ai/translate). An in-memory LRU of ``unit_memory_max`` units (0 turns
+    # the memory off for everyone) in front of an optional SQLite tier that
+    # survives restarts.
+    unit_memory_max: int = field(default_factory=lambda: max(0, _env_int("TP_UNIT_MEMORY_MAX", 20000)))
+    unit_memory_disk: bool = field(default_factory=lambda: _env_bool("TP_UNIT_MEMORY_DISK", True))
+    unit_memory_path: str = field(default_factory=lambda: _env_str("TP_UNIT_MEMORY_PATH"))
+    unit_memory_max_mb: int = field(default_factory=lambda: max(1, _env_int("TP_UNIT_MEMORY_MAX_MB", 16)))
+    unit_memory_ttl_sec: float = field(
+        default_factory=lambda: max(60.0, _env_float("TP_UNIT_MEMORY_TTL_SEC", 7 * 24 * 3600.0))
+    )
 
     # Hugging Face throttling ------------------------------------------------
     # No TextPhantom-imposed HF account throttle by default. HF's real 429/503
@@ -193,6 +255,19 @@ class Settings:
     # Fallback policy for providers not listed in RATE_POLICY_DEFAULTS.
     rate_default_rpm: float = field(default_factory=lambda: max(0.0, _env_float("TP_RATE_RPM_DEFAULT", 30.0)))
     rate_default_burst: int = field(default_factory=lambda: max(1, _env_int("TP_RATE_BURST_DEFAULT", 4)))
+    # Cross-page AI coalescing: pages of one batch that reach the AI within
+    # ``ai_coalesce_window_ms`` of each other, or while the first of them is
+    # still waiting for its rate-gate token, share one provider call — see
+    # backend/ai/coalesce.py. A call carries at most ``ai_coalesce_max_pages``
+    # pages and ``ai_coalesce_max_tokens`` estimated source tokens. 0 turns
+    # it off.
+    ai_coalesce_window_ms: int = field(default_factory=lambda: max(0, _env_int("TP_AI_COALESCE_WINDOW_MS", 300)))
+    ai_coalesce_max_pages: int = field(default_factory=lambda: max(1, _env_int("TP_AI_COALESCE_MAX_PAGES", 6)))
+    ai_coalesce_max_tokens: int = field(default_factory=lambda: max(1, _env_int("TP_AI_COALESCE_MAX_TOKENS", 3000)))
+    # Stream the provider answer when someone is listening for units as they
+    # close (the ``ai_unit`` events of ``/v1/translate``) — see
+    # backend/ai/stream_decoder.py. Off sends the plain one-document call.
+    ai_stream: bool = field(default_factory=lambda: _env_bool("TP_AI_STREAM", True))
 
     # AI key fall-back -------------------------------------------------------
     # Used only when the request did NOT carry its own key. A request that
@@ -281,6 +356,16 @@ class Settings:
         # paths must not pay for a multi-session ONNX pool on small HF CPUs.
         default_factory=lambda: max(1, _env_int("TP_TEXTBLOCK_POOL_SIZE", 1))
     )
+    # Micro-batching in front of the session pool. Concurrent jobs' page and
+    # ROI inputs that arrive within the window run as ONE batched tensor on one
+    # session instead of queueing for a lease each. BATCH_MAX=1 turns it off
+    # and restores the plain per-job lease.
+    textblock_batch_max: int = field(
+        default_factory=lambda: max(1, _env_int("TP_TEXTBLOCK_BATCH_MAX", 4))
+    )
+    textblock_batch_window_ms: float = field(
+        default_factory=lambda: max(0.0, _env_float("TP_TEXTBLOCK_BATCH_WINDOW_MS", 4.0))
+    )
     # Conservative Lens-geometry fallback for pages where ONNX produced no
     # usable paragraph stamps. This never overrides a model decision. It only
     # resolves a zero-hit page when every vertical paragraph relation is either
@@ -61,6 +61,7 @@ is fair in name only.
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import hashlib
 import time
 from dataclasses import dataclass, field
@@ -402,14 +403,42 @@ class AdmissionGate:
             self._gate = gate
             self._identity = identity or ANONYMOUS
             self._t0 = 0.0
+            self._held: concurrent.futures.Future | None = None
 
         async def __aenter__(self) -> "AdmissionGate._Slot":
             await self._gate.acquire(self._identity)
             self._t0 = time.perf_counter()
             return self
 
-        async def __aexit__(self, *_exc) -> bool:
+        def hold_until(self, future: concurrent.futures.Future) -> None:
+            """Keep the slot past the ``async with`` until ``future`` is done.
+
+            For a response that goes out before its job has finished (a
+            deferred AI layer): the provider call is still this request's
+            work, and releasing at the end of the block would let the lane
+            start more of them than its limit.
+            """
+            self._held = future
+
+        def _release(self) -> None:
             self._gate.release(self._identity, run_sec=time.perf_counter() - self._t0)
+
+        async def __aexit__(self, *_exc) -> bool:
+            held = self._held
+            if held is None or held.done():
+                self._release()
+                return False
+            loop = asyncio.get_running_loop()
+
+            def _done(_f: concurrent.futures.Future) -> None:
+                try:
+                    loop.call_soon_threadsafe(self._release)
+                except RuntimeError:
+                    # Loop already closed: the server is shutting down and
+                    # the gate goes with it.
+                    pass
+
+            held.add_done_callback(_done)
             return False
 
     def slot(self, identity: str = ANONYMOUS) -> "AdmissionGate._Slot":
@@ -0,0 +1,98 @@
+"""Bounded process-local handles for AI layers still being generated.
+
+A ``render.ai: "deferred"`` job answers as soon as the Lens layers are
+rendered and names its AI layer with a token; the provider call keeps running
+and the token resolves to the small patch that completes the result. See
+``process_payload`` and ``GET /v1/translate/ai/{token}``.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+TTL_SEC = max(30.0, float(os.environ.get("TP_AI_PENDING_TTL_SEC", "600")))
+MAX_ENTRIES = max(16, int(os.environ.get("TP_AI_PENDING_MAX", "1024")))
+
+
+class PendingError(LookupError):
+    def __init__(self, code: str, message: str, status: int) -> None:
+        super().__init__(message)
+        self.code, self.status = code, status
+
+
+@dataclass(frozen=True)
+class _Record:
+    future: concurrent.futures.Future
+    expires: float
+
+
+class AiPendingStore:
+    def __init__(self, *, ttl_sec: float = TTL_SEC, max_entries: int = MAX_ENTRIES,
+                 clock=time.monotonic) -> None:
+        self.ttl_sec = max(0.01, float(ttl_sec))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._items: OrderedDict[str, _Record] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {k: 0 for k in ("stored", "hit", "miss", "expired", "evicted", "rejected")}
+
+    @staticmethod
+    def _valid(token: str) -> bool:
+        return token.startswith("ap_") and 35 <= len(token) <= 80 and token[3:].replace("-", "").replace("_", "").isalnum()
+
+    def _drop(self, token: str, reason: str) -> None:
+        if self._items.pop(token, None) is not None:
+            self._counts[reason] += 1
+
+    def put(self, future: concurrent.futures.Future) -> tuple[str, float]:
+        now = self._clock()
+        token = "ap_" + secrets.token_urlsafe(32)
+        with self._lock:
+            for key, rec in list(self._items.items()):
+                if rec.expires <= now:
+                    self._drop(key, "expired")
+            if len(self._items) >= self.max_entries:
+                # Only a finished layer may make room: its patch is the one
+                # thing a client has not fetched yet, but an unfinished one is
+                # a provider call somebody is still paying for.
+                done = next((k for k, r in self._items.items() if r.future.done()), None)
+                if done is None:
+                    self._counts["rejected"] += 1
+                    raise PendingError(
+                        "ai_pending_full", "too many AI layers in flight to defer another", 503,
+                    )
+                self._drop(done, "evicted")
+            self._items[token] = _Record(future, now + self.ttl_sec)
+            self._counts["stored"] += 1
+        return token, self.ttl_sec
+
+    def get(self, token: str) -> concurrent.futures.Future:
+        if not isinstance(token, str) or not self._valid(token):
+            raise PendingError("ai_pending_malformed", "AI layer token is malformed", 400)
+        now = self._clock()
+        with self._lock:
+            rec = self._items.get(token)
+            if rec is None:
+                self._counts["miss"] += 1
+                raise PendingError("ai_pending_unavailable", "AI layer expired, was evicted, or belongs to another server process", 410)
+            if rec.expires <= now:
+                self._drop(token, "expired")
+                raise PendingError("ai_pending_expired", "AI layer expired", 410)
+            self._counts["hit"] += 1
+            return rec.future
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for r in self._items.values() if not r.future.done())
+            return {**self._counts, "entries": len(self._items), "running": running,
+                    "maxEntries": self.max_entries, "ttlSec": self.ttl_sec}
+
+
+ai_pending = AiPendingStore()
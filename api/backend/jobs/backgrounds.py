@@ -0,0 +1,131 @@
+"""Erased backgrounds served as binary artifacts instead of data URIs.
+
+With ``render.background: "artifact"`` a result names its background by id
+and ``GET /v1/background/{id}`` serves the encoded file. The data URI it
+replaces is the largest field in a response: base64 adds a third to the
+bytes, and the client has to parse the whole string out of the JSON before it
+can decode the image at all.
+
+Ids are content addresses (a sha256 prefix of the file), so two jobs that
+produce the same background share one entry and an id cannot name anything
+else. Unlike an uploaded image artifact, a background can always be rebuilt,
+so the store evicts the least recently used entry to make room; a result that
+names an evicted background is a cache miss (see ``process_payload``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+TTL_SEC = max(30.0, float(os.environ.get("TP_BACKGROUND_ARTIFACT_TTL_SEC", "1800")))
+BYTE_BUDGET = max(1 << 20, int(os.environ.get("TP_BACKGROUND_ARTIFACT_BYTES", str(128 << 20))))
+
+
+class BackgroundError(LookupError):
+    def __init__(self, code: str, message: str, status: int) -> None:
+        super().__init__(message)
+        self.code, self.status = code, status
+
+
+@dataclass(frozen=True)
+class _Record:
+    data: bytes
+    mime: str
+    expires: float
+
+
+class BackgroundStore:
+    def __init__(self, *, ttl_sec: float = TTL_SEC, byte_budget: int = BYTE_BUDGET,
+                 clock=time.monotonic) -> None:
+        self.ttl_sec = max(0.01, float(ttl_sec))
+        self.byte_budget = max(1, int(byte_budget))
+        self._clock = clock
+        self._items: OrderedDict[str, _Record] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {k: 0 for k in ("stored", "shared", "hit", "miss", "expired", "evicted", "rejected")}
+
+    @staticmethod
+    def _valid(artifact_id: str) -> bool:
+        return artifact_id.startswith("bg_") and len(artifact_id) == 43 and all(
+            c in "0123456789abcdef" for c in artifact_id[3:]
+        )
+
+    def _drop(self, artifact_id: str, reason: str) -> None:
+        rec = self._items.pop(artifact_id, None)
+        if rec is not None:
+            self._bytes -= len(rec.data)
+            self._counts[reason] += 1
+
+    def put(self, data: bytes, mime: str) -> tuple[str, float]:
+        """Store ``data``; returns ``(id, ttl_sec)``. Raises when it can never fit."""
+        immutable = bytes(data)
+        if not immutable or len(immutable) > self.byte_budget:
+            self._counts["rejected"] += 1
+            raise BackgroundError("background_too_large", "background cannot fit in artifact store", 413)
+        artifact_id = "bg_" + hashlib.sha256(immutable).hexdigest()[:40]
+        now = self._clock()
+        with self._lock:
+            for key, rec in list(self._items.items()):
+                if rec.expires <= now:
+                    self._drop(key, "expired")
+            held = self._items.pop(artifact_id, None)
+            if held is not None:
+                self._bytes -= len(held.data)
+                self._counts["shared"] += 1
+            else:
+                self._counts["stored"] += 1
+            while self._items and self._bytes + len(immutable) > self.byte_budget:
+                self._drop(next(iter(self._items)), "evicted")
+            self._items[artifact_id] = _Record(immutable, str(mime), now + self.ttl_sec)
+            self._bytes += len(immutable)
+        return artifact_id, self.ttl_sec
+
+    def get(self, artifact_id: str) -> tuple[bytes, str]:
+        """``(data, mime)`` for ``artifact_id``."""
+        if not isinstance(artifact_id, str) or not self._valid(artifact_id):
+            raise BackgroundError("background_malformed", "background id is malformed", 400)
+        now = self._clock()
+        with self._lock:
+            rec = self._items.get(artifact_id)
+            if rec is None:
+                self._counts["miss"] += 1
+                raise BackgroundError(
+                    "background_unavailable",
+                    "background expired, was evicted, or belongs to another server process", 410,
+                )
+            if rec.expires <= now:
+                self._drop(artifact_id, "expired")
+                raise BackgroundError("background_expired", "background expired", 410)
+            self._items.move_to_end(artifact_id)
+            self._counts["hit"] += 1
+            return rec.data, rec.mime
+
+    def touch(self, artifact_id: str) -> bool:
+        """Keep ``artifact_id`` for another TTL; False when it is already gone.
+
+        A cached result that names a background is only worth replaying while
+        the background can still be fetched after the reply goes out.
+        """
+        now = self._clock()
+        with self._lock:
+            rec = self._items.get(artifact_id)
+            if rec is None or rec.expires <= now:
+                return False
+            self._items[artifact_id] = _Record(rec.data, rec.mime, now + self.ttl_sec)
+            self._items.move_to_end(artifact_id)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counts, "entries": len(self._items), "bytes": self._bytes,
+                    "byteBudget": self.byte_budget, "ttlSec": self.ttl_sec}
+
+
+backgrounds = BackgroundStore()
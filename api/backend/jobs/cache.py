@@ -4,11 +4,15 @@
 Two caches are kept separate because AI results depend on extra inputs
 (provider / model / prompt) and tend to be larger and slower to recompute,
 so they get their own size budget.
+
+Both sit in front of one persistent tier (:mod:`backend.jobs.disk_cache`),
+which survives restarts. ``process_payload`` consults it only after a memory
+miss and promotes what it finds back into memory, and writes to it behind the
+response (:meth:`~backend.jobs.disk_cache.DiskCache.set_behind`).
 """
 
 from __future__ import annotations
 
-import copy
 import hashlib
 import json
 from collections import OrderedDict
@@ -17,13 +21,49 @@ from typing import Any
 
 from backend.ai.translate import AiConfig
 from backend.config import settings
+from backend.jobs.disk_cache import DiskCache, default_path
 from backend.lens.languages import normalize as normalize_lang
 
 
-class LruCache:
-    """A small thread-safe LRU cache that deep-copies values in and out.
+# Top-level fields a reader is expected to replace on every hit. They are
+# dropped from the stored entry so a reader that mutates its copy of them in
+# place (the queue writes into ``perf``) never reaches the cache.
+_PER_READ_FIELDS = ("perf",)
+
+
+def _detach(value: dict[str, Any]) -> dict[str, Any]:
+    """``value`` and its direct dict / list values as new containers."""
+    return {
+        k: dict(v) if isinstance(v, dict) else list(v) if isinstance(v, list) else v
+        for k, v in value.items()
+    }
+
 
-    Deep-copying avoids callers accidentally mutating cached trees.
+def stored_form(value: dict[str, Any]) -> dict[str, Any]:
+    """What a cache tier keeps of ``value``: new top-level containers, no per-read fields.
+
+    Safe to hand to another thread while the caller goes on filling its own
+    ``value`` the way the pipeline and routes do (see :class:`LruCache`).
+    """
+    return _detach({k: v for k, v in value.items() if k not in _PER_READ_FIELDS})
+
+
+class LruCache:
+    """A small thread-safe LRU cache whose hits cost no copying.
+
+    Values used to be deep-copied in AND out. A finished result is trees,
+    markup and a multi-hundred-KB data URI, and ``copy.deepcopy`` walked every
+    node of it on each hit — tens of milliseconds of GIL-held CPU on the path
+    that is supposed to be free (see ``scripts/dev/bench-cache-hit.py``).
+
+    Now only the first two levels are copied, both ways: a new top-level dict,
+    and a new dict or list for each of its values — ``original``,
+    ``translated``, ``Ai``, ``htmlMeta`` and the like, a few keys each. So
+    ``result["perf"] = ...`` and ``result["Ai"]["meta"] = ...``, the way the
+    pipeline and the routes fill a result, never reach the cache. What those
+    hold (render trees, paragraph lists, markup) is shared and frozen by
+    contract: every consumer of ``process_payload`` only reads it — the CLI has
+    always replayed one Lens dict across runs on the same assumption.
     """
 
     def __init__(self, max_items: int) -> None:
@@ -39,13 +79,15 @@ class LruCache:
             if value is None:
                 return None
             self._store.move_to_end(key)
-            return copy.deepcopy(value)
+        return _detach(value)
 
     def set(self, key: str, value: dict[str, Any]) -> None:
+        """Store ``value``. The caller hands over its nested objects for good."""
         if not key or not isinstance(value, dict) or self._max <= 0:
             return
+        frozen = stored_form(value)
         with self._lock:
-            self._store[key] = copy.deepcopy(value)
+            self._store[key] = frozen
             self._store.move_to_end(key)
             while len(self._store) > self._max:
                 self._store.popitem(last=False)
@@ -54,6 +96,15 @@ class LruCache:
 # Module-level singletons.
 result_cache = LruCache(settings.result_cache_max)
 ai_result_cache = LruCache(settings.ai_result_cache_max)
+# One file for both: the keys already differ by source (and by provider /
+# model / prompt for AI), and one byte budget is simpler to size than two.
+result_disk_cache = DiskCache(
+    (settings.result_disk_cache_path or default_path("result-cache.sqlite3"))
+    if settings.result_disk_cache
+    else None,
+    max_bytes=settings.result_disk_cache_max_mb * 1024 * 1024,
+    ttl_sec=settings.result_disk_cache_ttl_sec,
+)
 
 
 def _ai_prompt_signature(prompt: str) -> str:
@@ -118,6 +169,7 @@ def build_cache_key(
                 # send_image may be False / True / "always" / "auto".
                 f"img_{str(getattr(ai_cfg, 'send_image', False) or 'off').lower()}",
                 "memo" if getattr(ai_cfg, "char_memory", True) else "",
+                "units" if getattr(ai_cfg, "unit_memory", False) else "",
                 # Thinking mode changes the answer -> separate cache entries.
                 f"think_{str(getattr(ai_cfg, 'thinking', '') or 'default').lower()}",
             ]
@@ -0,0 +1,343 @@
+"""Optional process lane for the post-Lens image stages.
+
+``_CPU_GATE`` in :mod:`backend.jobs.pipeline` bounds how many jobs compute at
+once, but they all compute in ONE interpreter. Erase, bubble detection and
+the background encode are pixel loops wrapped in Python, and on a 4-8 vCPU
+box a burst of them tops out near two cores of useful work: the rest is GIL
+hand-off. This lane runs those three stages in a small pool of worker
+processes instead.
+
+The page image is the only large input and it is never pickled. The parent
+copies the decoded RGB pixels into a :mod:`multiprocessing.shared_memory`
+block, the worker maps the same block, and an erased result comes back the
+same way through a second block the parent allocated. What does cross the
+pipe is small: token quads, paragraph boxes, a bubble map, and for the
+encode the finished file.
+
+What stays in the parent, deliberately:
+
+* text-block detection — onnxruntime already runs its own native threads
+  outside the GIL and has a session pool sized to the cores
+  (``backend/render/textblocks.py``); a second copy of the model per worker
+  would only cost memory;
+* font fitting and HTML rendering — they mutate the render trees in place,
+  and shipping those trees out and back would cost what the lane saves.
+
+The pool is started from the app's startup hook (:func:`warm`), one no-op
+task per worker, so spawning the interpreters and :func:`_warm_worker` happen
+at boot rather than inside the first chapter's first pages.
+
+Off by default (``TP_CPU_PROCESS_WORKERS=0``). When it is on and a worker
+dies or the pool cannot start, the stage runs in-process and the failure is
+logged once per pool — a broken lane is slower, never wrong.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import multiprocessing
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from backend.config import settings
+from backend.log import event
+from backend.render import bg_encode
+from backend.render.bubble import detect_bubble_bounds_combined
+from backend.render.erase import erase_text_with_boxes
+from backend.utils.cpu_runtime import effective_cpu_count
+
+# (shared-memory name, (height, width, 3)) — all a worker needs to map a page.
+_Handle = tuple[str, tuple[int, int, int]]
+
+_lock = threading.Lock()
+_pool: concurrent.futures.ProcessPoolExecutor | None = None
+_pool_failed = False
+_stats = {"tasks": 0, "fallbacks": 0, "restarts": 0}
+
+
+def workers() -> int:
+    """Configured worker count, capped to the cores this container may use."""
+    n = int(settings.cpu_process_workers or 0)
+    return max(0, min(n, effective_cpu_count())) if n > 0 else 0
+
+
+def enabled() -> bool:
+    return workers() > 0 and not _pool_failed
+
+
+# --- worker side ------------------------------------------------------------
+
+def _warm_worker() -> None:
+    """Pay the imports and first-call costs before the first real job.
+
+    A spawned worker starts from a bare interpreter: OpenCV, the erase and
+    bubble modules and the background encoder are all cold, and the first job
+    to land on it would absorb a second or more of imports. A tiny erase and
+    encode here moves that to pool start.
+    """
+    probe = Image.new("RGB", (32, 32), (255, 255, 255))
+    tokens = [{"quad": [[4, 4], [20, 4], [20, 12], [4, 12]]}]
+    base = erase_text_with_boxes(probe, tokens)
+    detect_bubble_bounds_combined(base, [], 32, 32)
+    bg_encode.encode(base)
+
+
+def _noop() -> None:
+    pass
+
+
+def _attach(handle: _Handle) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape = handle
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _read_image(handle: _Handle) -> Image.Image:
+    shm, view = _attach(handle)
+    try:
+        # fromarray copies an RGB array, so nothing outlives the mapping.
+        return Image.fromarray(view, "RGB")
+    finally:
+        del view
+        shm.close()
+
+
+def _write_image(handle: _Handle, img: Image.Image) -> None:
+    shm, view = _attach(handle)
+    try:
+        view[...] = np.asarray(img.convert("RGB"), dtype=np.uint8)
+    finally:
+        del view
+        shm.close()
+
+
+def _erase_task(src: _Handle, dst: _Handle, tokens: list[dict]) -> dict[str, Any]:
+    timings: dict[str, Any] = {}
+    _write_image(dst, erase_text_with_boxes(_read_image(src), tokens, timings=timings))
+    return timings
+
+
+def _erase_bubbles_task(
+    src: _Handle, dst: _Handle, tokens: list[dict], paragraphs: list[dict], w: int, h: int
+) -> tuple[dict[int, Any], dict[str, Any]]:
+    img = _read_image(src)
+    timings: dict[str, Any] = {}
+    base = erase_text_with_boxes(img, tokens, timings=timings) if tokens else img
+    _write_image(dst, base)
+    return detect_bubble_bounds_combined(base, paragraphs, w, h), timings
+
+
+def _encode_task(src: _Handle) -> bg_encode.EncodedBackground:
+    return bg_encode.encode(_read_image(src))
+
+
+# --- parent side ------------------------------------------------------------
+
+class _SharedPage:
+    """An input block holding ``img`` and, optionally, an output block.
+
+    Both are unlinked on exit whatever the worker did, so a crashed job cannot
+    leak ``/dev/shm`` segments.
+    """
+
+    def __init__(self, img: Image.Image, *, with_output: bool) -> None:
+        arr = np.asarray(img.convert("RGB"), dtype=np.uint8)
+        self.shape: tuple[int, int, int] = tuple(arr.shape)  # type: ignore[assignment]
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.src = self._alloc(arr)
+        self.dst = self._alloc(None) if with_output else None
+
+    def _alloc(self, arr: np.ndarray | None) -> _Handle:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(self.shape))))
+        self._blocks.append(shm)
+        if arr is not None:
+            view = np.ndarray(self.shape, dtype=np.uint8, buffer=shm.buf)
+            view[...] = arr
+            del view
+        return (shm.name, self.shape)
+
+    def output(self) -> Image.Image:
+        shm = self._blocks[-1]
+        view = np.ndarray(self.shape, dtype=np.uint8, buffer=shm.buf)
+        try:
+            return Image.fromarray(view, "RGB")
+        finally:
+            del view
+
+    def __enter__(self) -> "_SharedPage":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        for shm in self._blocks:
+            try:
+                shm.close()
+                shm.unlink()
+            except (OSError, BufferError):
+                pass
+
+
+def _get_pool() -> concurrent.futures.ProcessPoolExecutor | None:
+    global _pool, _pool_failed
+    with _lock:
+        if _pool is not None or _pool_failed:
+            return _pool
+        n = workers()
+        if n <= 0:
+            return None
+        try:
+            # spawn, not fork: the parent is full of threads (executors, the
+            # pooled HTTP clients, Lens sessions) and a forked child inherits their
+            # locks in whatever state they were in.
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=n,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        except (OSError, ValueError) as exc:
+            _pool_failed = True
+            event("cpu_lane.unavailable", {"error": f"{type(exc).__name__}: {exc}"}, ok=False)
+            return None
+        event("cpu_lane.start", {"workers": n})
+        return _pool
+
+
+def _drop_pool(exc: BaseException) -> None:
+    """Forget a broken pool; the next job builds a fresh one."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+        _stats["restarts"] += 1
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    event("cpu_lane.broken", {"error": f"{type(exc).__name__}: {exc}"}, ok=False)
+
+
+def _run(fn: Any, *args: Any) -> tuple[bool, Any]:
+    """Run ``fn`` on the pool. ``(False, None)`` means: do it in-process."""
+    pool = _get_pool()
+    if pool is None:
+        return False, None
+    try:
+        result = pool.submit(fn, *args).result()
+    except BrokenProcessPool as exc:
+        _drop_pool(exc)
+        with _lock:
+            _stats["fallbacks"] += 1
+        return False, None
+    with _lock:
+        _stats["tasks"] += 1
+    return True, result
+
+
+def erase(img: Image.Image, tokens: list[dict], *, timings: dict[str, Any] | None = None) -> Image.Image:
+    """:func:`erase_text_with_boxes` on the lane when enabled.
+
+    ``timings`` receives the erase's own stats (the inpaint tiles) from
+    whichever side ran it.
+    """
+    if not tokens or not enabled():
+        return erase_text_with_boxes(img, tokens, timings=timings)
+    with _SharedPage(img, with_output=True) as page:
+        ok, erase_timings = _run(_erase_task, page.src, page.dst, tokens)
+        if ok:
+            if timings is not None:
+                timings.update(erase_timings)
+            return page.output()
+    return erase_text_with_boxes(img, tokens, timings=timings)
+
+
+def erase_and_detect_bubbles(
+    img: Image.Image,
+    tokens: list[dict],
+    paragraphs: list[dict],
+    w: int,
+    h: int,
+    *,
+    timings: dict[str, Any] | None = None,
+) -> tuple[Image.Image, dict[int, Any]]:
+    """Erase then detect bubbles on the erased page, in one round trip.
+
+    The two stages are adjacent in the self-block path and the second reads
+    the first's output, so running them together keeps the erased page in the
+    worker instead of crossing shared memory twice. ``timings`` receives
+    ``erase_ms`` / ``bubble_ms``; on the lane only their sum is measurable,
+    so it is reported as ``erase_ms`` with ``bubble_ms`` 0. The erase's own
+    stats (the inpaint tiles) land there too.
+    """
+    timings = timings if timings is not None else {}
+    if enabled():
+        _t = time.perf_counter()
+        with _SharedPage(img, with_output=True) as page:
+            ok, result = _run(_erase_bubbles_task, page.src, page.dst, tokens, paragraphs, w, h)
+            if ok:
+                bubble_map, erase_timings = result
+                timings.update(erase_timings)
+                base = page.output()
+                timings["erase_ms"] = round((time.perf_counter() - _t) * 1000, 1)
+                timings["bubble_ms"] = 0.0
+                return base, bubble_map
+    _t = time.perf_counter()
+    base = erase_text_with_boxes(img, tokens, timings=timings) if tokens else img
+    timings["erase_ms"] = round((time.perf_counter() - _t) * 1000, 1)
+    _t = time.perf_counter()
+    bubble_map = detect_bubble_bounds_combined(base, paragraphs, w, h)
+    timings["bubble_ms"] = round((time.perf_counter() - _t) * 1000, 1)
+    return base, bubble_map
+
+
+def encode_background(img: Image.Image) -> bg_encode.EncodedBackground:
+    """:func:`backend.render.bg_encode.encode` on the lane when enabled."""
+    if not enabled():
+        return bg_encode.encode(img)
+    with _SharedPage(img, with_output=False) as page:
+        ok, encoded = _run(_encode_task, page.src)
+        if ok:
+            return encoded
+    return bg_encode.encode(img)
+
+
+def warm() -> None:
+    """Start the pool and bring every worker up. Blocks; call it off the loop.
+
+    A spawn pool only starts a process when a task finds no idle one, so one
+    no-op per worker, submitted together, starts them all — each running
+    :func:`_warm_worker` before its no-op.
+    """
+    if not enabled():
+        return
+    pool = _get_pool()
+    if pool is None:
+        return
+    started = time.perf_counter()
+    try:
+        for future in [pool.submit(_noop) for _ in range(workers())]:
+            future.result()
+    except BrokenProcessPool as exc:
+        _drop_pool(exc)
+        return
+    event("cpu_lane.warm", {"workers": workers(), "ms": round((time.perf_counter() - started) * 1000, 1)})
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            "enabled": enabled(),
+            "workers": workers(),
+            "running": _pool is not None,
+            **_stats,
+        }
+
+
+def shutdown() -> None:
+    """Stop the workers. Safe to call when the lane never started."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
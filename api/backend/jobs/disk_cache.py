@@ -0,0 +1,449 @@
+"""Persistent second tier for the result caches.
+
+
+The in-memory :class:`backend.jobs.cache.LruCache` tiers are fast and small,
+and they are thrown away on every restart. This tier sits behind them: one
+SQLite file holding zlib-compressed JSON results, keyed by the same
+``build_cache_key`` string, with a byte budget, a TTL and least-recently-used
+eviction.
+
+It is a cache, not a store. Every failure — an unwritable disk, a corrupt
+file, a value that will not decode — is counted and reported by :meth:`stats`
+and otherwise behaves like a miss: the pipeline simply runs again, which is
+what it would have done without this tier.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+# Level 3 keeps most of level 9's ratio on JSON trees at a fraction of the CPU;
+# the data URIs inside results are already-compressed base64 and barely shrink
+# at any level, so spending more here buys nothing.
+_ZLIB_LEVEL = 3
+# Evicting a little past the budget means a full cache does not run one DELETE
+# per insert; the next few writes then fit without touching the index.
+_EVICT_HEADROOM = 0.9
+# Keys per ``IN (...)``: under SQLite's oldest bound-parameter limit (999).
+_IN_CHUNK = 500
+# A hit moves an entry up the LRU order only when its ``accessed`` is older
+# than this. Eviction needs the order to the minute, not to the request, and
+# a hit that changes nothing commits nothing.
+_TOUCH_SEC = 60.0
+# Writes waiting for the background writer (:meth:`DiskCache.set_behind`), and
+# how many of them it takes into one transaction.
+_BEHIND_MAX = 256
+_BEHIND_BATCH = 32
+
+
+def default_path(file_name: str) -> Path:
+    """Where a cache file lives when no explicit path is configured.
+
+    Same order as the AI rate memory (``backend/ai/rategate.py``) and for the
+    same reason: it is about WRITABILITY. A Docker Space runs as a non-root
+    user against a read-only checkout; `/data` is the only mount that survives
+    a restart, and the temp dir at least survives an in-container reload.
+    """
+    for candidate in (
+        Path("/data") / "textphantom",                      # HF persistent storage
+        Path(__file__).resolve().parents[2] / "state",      # local install
+    ):
+        parent = candidate if candidate.is_dir() else candidate.parent
+        if parent.is_dir() and os.access(parent, os.W_OK):
+            return candidate / file_name
+    return Path(tempfile.gettempdir()) / f"textphantom-{file_name}"
+
+
+def _chunks(keys: list[str]) -> Iterator[tuple[list[str], str]]:
+    """``keys`` in ``IN``-sized slices, each with its ``?, ?, ...`` placeholders."""
+    for i in range(0, len(keys), _IN_CHUNK):
+        chunk = keys[i:i + _IN_CHUNK]
+        yield chunk, ", ".join("?" * len(chunk))
+
+
+class DiskCache:
+    """A thread-safe, size-bounded, TTL'd LRU cache of JSON dicts on disk.
+
+    One connection is shared behind a lock: results are written once per job
+    and read once per repeat, so contention here is negligible next to the
+    pipeline it saves.
+
+    Several worker processes may share one file, so the byte budget is never
+    a per-process counter. The total lives in the file, in the one-row
+    ``usage`` table: every insert, replace and delete adjusts it in the same
+    write transaction, so it always matches what every process has committed.
+    It is re-summed from the entries only when a process opens the file.
+    """
+
+    def __init__(self, path: Path | str | None, max_bytes: int, ttl_sec: float) -> None:
+        self._path = Path(path) if path else None
+        self._max_bytes = max(0, int(max_bytes))
+        self._ttl = max(0.0, float(ttl_sec))
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._opened = False
+        # The file's total as of this process's last write; stats re-read it.
+        self._bytes = 0
+        self._error = ""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.writes = 0
+        self.errors = 0
+        self.dropped_writes = 0
+        self._behind: queue.Queue | None = None
+        self._behind_lock = threading.Lock()
+
+    # --- connection ---------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection | None:
+        """Open (once) and return the connection, or None when unusable.
+
+        Called with the lock held. Opening lazily keeps import free of I/O,
+        and a failed open is remembered so a read-only disk costs one attempt
+        per process, not one per request.
+        """
+        if self._opened:
+            return self._conn
+        self._opened = True
+        if self._path is None or self._max_bytes <= 0:
+            return None
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), timeout=5.0, check_same_thread=False)
+            # WAL lets a second uvicorn worker read while this one writes.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL,"
+                " expires REAL)"
+            )
+            # Files written before per-entry TTLs existed lack the column; NULL
+            # means "the cache-wide TTL", which is what those entries had.
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "expires" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN expires REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " bytes INTEGER NOT NULL)"
+            )
+            # Also repairs files last written before the table existed.
+            conn.execute(
+                "INSERT OR REPLACE INTO usage (id, bytes)"
+                " VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM entries))"
+            )
+            conn.commit()
+            self._bytes = self._total(conn)
+            self._conn = conn
+        except (OSError, sqlite3.Error) as exc:
+            self._error = f"{type(exc).__name__}: {exc}"
+            self.errors += 1
+            self._conn = None
+        return self._conn
+
+    def close(self) -> None:
+        """Close the file. The next call reopens it. For tests and shutdown.
+
+        Waits briefly for :meth:`set_behind` writes still queued.
+        """
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+            self._conn = None
+            self._opened = False
+
+    # --- public API ---------------------------------------------------------
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a fresh dict for ``key`` or ``None`` (miss, expired, error)."""
+        return self.get_many([key]).get(key) if key else None
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """:meth:`get` for several keys in one query; only the hits come back."""
+        wanted = [k for k in dict.fromkeys(keys) if k]
+        if not wanted:
+            return {}
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            now = time.time()
+            try:
+                rows = []
+                for chunk, marks in _chunks(wanted):
+                    rows += conn.execute(
+                        f"SELECT key, value, created, expires, accessed FROM entries WHERE key IN ({marks})",
+                        chunk,
+                    ).fetchall()
+                stale = [row[0] for row in rows if self._stale(now, row[2], row[3])]
+                fresh = [(row[0], row[1]) for row in rows if not self._stale(now, row[2], row[3])]
+                touch = [row[0] for row in rows
+                         if not self._stale(now, row[2], row[3]) and now - float(row[4]) >= _TOUCH_SEC]
+                if stale:
+                    for chunk, marks in _chunks(stale):
+                        self._unaccount(conn, f"key IN ({marks})", chunk)
+                        conn.execute(f"DELETE FROM entries WHERE key IN ({marks})", chunk)
+                    self._bytes = self._total(conn)
+                    self.expired += len(stale)
+                if touch:
+                    conn.executemany(
+                        "UPDATE entries SET accessed = ? WHERE key = ?", [(now, key) for key in touch],
+                    )
+                if stale or touch:
+                    conn.commit()
+                self.misses += len(wanted) - len(fresh)
+            except sqlite3.Error as exc:
+                self._error = f"{type(exc).__name__}: {exc}"
+                self.errors += 1
+                return {}
+        # Decompression and parsing happen outside the lock: they are the
+        # expensive part, and they only touch this caller's bytes.
+        found: dict[str, dict[str, Any]] = {}
+        for key, blob in fresh:
+            try:
+                value = json.loads(zlib.decompress(blob).decode("utf-8"))
+            except (zlib.error, UnicodeDecodeError, ValueError) as exc:
+                with self._lock:
+                    self._error = f"{type(exc).__name__}: {exc}"
+                    self.errors += 1
+                continue
+            if isinstance(value, dict):
+                found[key] = value
+        with self._lock:
+            self.hits += len(found)
+        return found
+
+    def _stale(self, now: float, created: float, expires: float | None) -> bool:
+        return bool((self._ttl and now - float(created) > self._ttl)
+                    or (expires is not None and now > float(expires)))
+
+    def contains(self, key: str) -> bool:
+        """Whether ``get`` would hit, without decoding or counting the lookup."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None or not key:
+                return False
+            try:
+                row = conn.execute(
+                    "SELECT created, expires FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return False
+        if row is None:
+            return False
+        return not self._stale(time.time(), *row)
+
+    def set(self, key: str, value: dict[str, Any], ttl_sec: float | None = None) -> None:
+        """Store ``value`` under ``key``, evicting LRU entries past the budget.
+
+        ``ttl_sec`` expires this entry sooner than the cache-wide TTL.
+        """
+        if key:
+            self.set_many({key: value}, ttl_sec=ttl_sec)
+
+    def set_many(self, values: dict[str, dict[str, Any]], ttl_sec: float | None = None) -> None:
+        """:meth:`set` for several entries in one write transaction."""
+        if self._max_bytes <= 0 or self._path is None:
+            return
+        blobs: list[tuple[str, bytes]] = []
+        for key, value in values.items():
+            if not key or not isinstance(value, dict):
+                continue
+            try:
+                blob = zlib.compress(
+                    json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                    _ZLIB_LEVEL,
+                )
+            except (TypeError, ValueError) as exc:
+                with self._lock:
+                    self._error = f"{type(exc).__name__}: {exc}"
+                    self.errors += 1
+                continue
+            # One result larger than the whole budget would evict everything
+            # else and then be evicted itself on the next write.
+            if len(blob) <= self._max_bytes:
+                blobs.append((key, blob))
+        if not blobs:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            now = time.time()
+            try:
+                expires = now + max(0.0, float(ttl_sec)) if ttl_sec is not None else None
+                for key, blob in blobs:
+                    # The first statement takes the file's write lock, so the
+                    # size it replaces is the one every other worker sees.
+                    self._unaccount(conn, "key = ?", (key,))
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, size, created, accessed, expires)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, sqlite3.Binary(blob), len(blob), now, now, expires),
+                    )
+                conn.execute(
+                    "UPDATE usage SET bytes = bytes + ? WHERE id = 0", (sum(len(b) for _, b in blobs),),
+                )
+                self._bytes = self._total(conn)
+                self.writes += len(blobs)
+                if self._bytes > self._max_bytes:
+                    self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as exc:
+                self._error = f"{type(exc).__name__}: {exc}"
+                self.errors += 1
+
+    def set_behind(self, key: str, value: dict[str, Any], ttl_sec: float | None = None) -> None:
+        """:meth:`set` on a background thread, off the caller's request path.
+
+        Encoding and compressing a whole result is milliseconds of CPU that
+        the response does not need to wait for. ``value`` is handed over: the
+        caller must not change it afterwards. Writes queued together go into
+        one transaction. A full queue drops the write and counts it; the entry
+        is simply missing, as after an eviction.
+        """
+        if not key or self._max_bytes <= 0 or self._path is None:
+            return
+        try:
+            self._behind_queue().put_nowait((key, value, ttl_sec, None))
+        except queue.Full:
+            with self._lock:
+                self.dropped_writes += 1
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until the :meth:`set_behind` writes queued so far are written."""
+        if self._behind is None:
+            return True
+        done = threading.Event()
+        try:
+            self._behind.put(("", None, None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _behind_queue(self) -> queue.Queue:
+        with self._behind_lock:
+            if self._behind is None:
+                self._behind = queue.Queue(maxsize=_BEHIND_MAX)
+                threading.Thread(
+                    target=self._run_behind, args=(self._behind,), name="tp-disk-cache", daemon=True,
+                ).start()
+            return self._behind
+
+    def _run_behind(self, pending: queue.Queue) -> None:
+        while True:
+            items = [pending.get()]
+            while len(items) < _BEHIND_BATCH:
+                try:
+                    items.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            by_ttl: dict[float | None, dict[str, dict[str, Any]]] = {}
+            for key, value, ttl_sec, _done in items:
+                if key:
+                    by_ttl.setdefault(ttl_sec, {})[key] = value
+            try:
+                for ttl_sec, values in by_ttl.items():
+                    self.set_many(values, ttl_sec=ttl_sec)
+            except Exception as exc:  # noqa: BLE001 - the writer outlives one bad value
+                with self._lock:
+                    self._error = f"{type(exc).__name__}: {exc}"
+                    self.errors += 1
+            for *_, done in items:
+                if done is not None:
+                    done.set()
+
+    @staticmethod
+    def _total(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()
+        return int(row[0] or 0) if row else 0
+
+    @staticmethod
+    def _unaccount(conn: sqlite3.Connection, where: str, params: tuple) -> None:
+        """Take the entries matching ``where`` off the total, before deleting them."""
+        conn.execute(
+            "UPDATE usage SET bytes = bytes -"
+            f" (SELECT COALESCE(SUM(size), 0) FROM entries WHERE {where}) WHERE id = 0",
+            params,
+        )
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently used, to the headroom.
+
+        Called with the lock held and inside the caller's transaction.
+        """
+        # Without a cache-wide TTL only per-entry expiries apply.
+        oldest = now - self._ttl if self._ttl else float("-inf")
+        where = "created < ? OR expires < ?"
+        cur = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE {where}", (oldest, now),
+        ).fetchone()
+        if cur and cur[0]:
+            conn.execute(f"DELETE FROM entries WHERE {where}", (oldest, now))
+            conn.execute("UPDATE usage SET bytes = bytes - ? WHERE id = 0", (int(cur[1]),))
+            self._bytes -= int(cur[1])
+            self.expired += int(cur[0])
+        target = int(self._max_bytes * _EVICT_HEADROOM)
+        if self._bytes <= target:
+            return
+        doomed: list[str] = []
+        freed = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if self._bytes - freed <= target:
+                break
+            doomed.append(key)
+            freed += int(size)
+        conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in doomed])
+        conn.execute("UPDATE usage SET bytes = bytes - ? WHERE id = 0", (freed,))
+        self._bytes -= freed
+        self.evictions += len(doomed)
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for sizing the tier. Reported, never inferred."""
+        with self._lock:
+            conn = self._connect()
+            entries = 0
+            if conn is not None:
+                try:
+                    entries = int(conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+                    self._bytes = self._total(conn)
+                except sqlite3.Error:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                "enabled": conn is not None,
+                "path": str(self._path) if self._path else "",
+                "entries": entries,
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+                "ttlSec": self._ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "pendingWrites": self._behind.qsize() if self._behind is not None else 0,
+                "droppedWrites": self.dropped_writes,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "errors": self.errors,
+                "error": self._error,
+            }
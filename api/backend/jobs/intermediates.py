@@ -0,0 +1,255 @@
+"""Per-page stage outputs reused when a page comes back with another source.
+
+The result caches are keyed by everything that shapes the answer — source,
+provider, model, prompt, layout — so switching a page from translated to AI
+is a miss, and the miss used to re-run :func:`process_image` from the top:
+Lens, image decode, text-block detection, erase, bubble detection and the
+background encode, none of which depend on the source. This cache keeps those
+per page, keyed by image hash + target language, so the switch costs the
+provider call plus render.
+
+What an entry holds, and how it is handed back:
+
+* the Lens response and the decoded page — shared, read-only by contract,
+  exactly as the Lens client's own cache already shares its dicts;
+* the erased background — copied on every read, because the partial-answer
+  restore paints into the job's image;
+* the encoded background — an immutable :class:`EncodedBackground` — and
+  the erased-patches payload with its atlas encode;
+* bubble bounds, and text blocks per ROI layer with the paragraph stamps the
+  detection pass left — deep-copied, they are small.
+
+Decoded trees are not kept: a deep copy of one costs more than decoding it
+again from the Lens paragraphs (``decode_tree`` ~15 ms against ~23 ms for the
+copy, 40 paragraphs).
+
+Entries are bounded by bytes (the two page images dominate) and by age, and
+dropped whole, least recently used first. An entry is only ever filled with
+what one Lens response produced: a job that arrives with a different response
+for the same page empties it first (:meth:`PageIntermediates.bind_lens`).
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from PIL import Image
+
+from backend.config import settings
+from backend.render.bg_encode import EncodedBackground
+
+# Rough size of a small deep-copied slot (bubble map, blocks) per element.
+# Only the images and strings matter to the byte budget.
+_SMALL_ITEM_BYTES = 256
+
+_SLOTS = ("lens", "image", "blocks", "erased", "bubbles", "background", "patches")
+
+
+def _image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+def _lens_bytes(data: dict[str, Any]) -> int:
+    return sum(
+        len(s) for key in ("originalParagraphs", "translatedParagraphs")
+        for s in (data.get(key) or []) if isinstance(s, str)
+    ) + len(data.get("originalTextFull") or "") + len(data.get("translatedTextFull") or "")
+
+
+def _same_lens(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    return a is b or all(
+        a.get(k) == b.get(k)
+        for k in ("originalParagraphs", "translatedParagraphs", "originalTextFull", "translatedTextFull")
+    )
+
+
+class PageIntermediates:
+    """One page's reusable stage outputs. Slots fill as the stages run.
+
+    The first writer of a slot wins: every job on the page computes the same
+    value from the same inputs, so a second writer has nothing to add.
+    """
+
+    def __init__(self, owner: "IntermediatesCache", key: str, expires: float) -> None:
+        self._owner = owner
+        self.key = key
+        self.expires = expires
+        self.nbytes = 0
+        self._slots: dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, slot: Any) -> Any:
+        with self._lock:
+            value = self._slots.get(slot)
+        self._owner._count(slot[0] if isinstance(slot, tuple) else slot, value is not None)
+        return value
+
+    def _put(self, slot: Any, value: Any, nbytes: int) -> None:
+        with self._lock:
+            if slot in self._slots:
+                return
+            self._slots[slot] = value
+            self.nbytes += nbytes
+        self._owner._grew(self, nbytes)
+
+    def bind_lens(self, data: dict[str, Any]) -> None:
+        """Tie the entry to the Lens response this job is working from.
+
+        Everything else in the entry was derived from the stored response. A
+        different one (the Lens tier expired and Google answered differently)
+        makes all of it stale, so the entry starts over from this response.
+        """
+        if not data.get("originalParagraphs"):
+            return
+        with self._lock:
+            held = self._slots.get("lens")
+            if held is not None and _same_lens(held, data):
+                return
+            image = self._slots.get("image")
+            self._slots = {"image": image} if image is not None else {}
+            freed = self.nbytes - (_image_bytes(image) if image is not None else 0)
+            self.nbytes -= freed
+        self._owner._grew(self, -freed)
+        self._put("lens", data, _lens_bytes(data))
+
+    def lens(self) -> dict[str, Any] | None:
+        return self._get("lens")
+
+    def image(self) -> Image.Image | None:
+        return self._get("image")
+
+    def set_image(self, img: Image.Image) -> None:
+        self._put("image", img, _image_bytes(img))
+
+    def blocks(self, layer: str) -> tuple[list, dict[str, Any], dict[int, dict[str, Any]]] | None:
+        """``(text_blocks, stage fields, paragraph stamps)`` detected on ``layer``."""
+        held = self._get(("blocks", layer))
+        return copy.deepcopy(held) if held is not None else None
+
+    def set_blocks(self, layer: str, blocks: list, info: dict[str, Any],
+                   stamps: dict[int, dict[str, Any]]) -> None:
+        held = copy.deepcopy((list(blocks), dict(info), stamps))
+        self._put(("blocks", layer), held, _SMALL_ITEM_BYTES * (len(blocks) + len(stamps) + 1))
+
+    def erased(self) -> Image.Image | None:
+        held = self._get("erased")
+        return held.copy() if held is not None else None
+
+    def set_erased(self, img: Image.Image) -> None:
+        self._put("erased", img.copy(), _image_bytes(img))
+
+    def bubbles(self) -> dict[int, Any] | None:
+        held = self._get("bubbles")
+        return copy.deepcopy(held) if held is not None else None
+
+    def set_bubbles(self, bubble_map: dict[int, Any]) -> None:
+        self._put("bubbles", copy.deepcopy(bubble_map), _SMALL_ITEM_BYTES * (len(bubble_map) + 1))
+
+    def background(self) -> EncodedBackground | None:
+        """:meth:`erased` as encoded for a reply, before any restore."""
+        return self._get("background")
+
+    def set_background(self, encoded: EncodedBackground) -> None:
+        if encoded.data:
+            self._put("background", encoded, len(encoded.data))
+
+    def patches(self) -> tuple[dict[str, Any], EncodedBackground | None, dict[str, Any]] | None:
+        """:func:`erase_patches.build`'s result for :meth:`erased`, before any restore."""
+        held = self._get("patches")
+        if held is None:
+            return None
+        payload, encoded, perf = held
+        return copy.deepcopy(payload), encoded, dict(perf)
+
+    def set_patches(self, payload: dict[str, Any], encoded: EncodedBackground | None,
+                    perf: dict[str, Any]) -> None:
+        nbytes = len(payload.get("image") or "") + _SMALL_ITEM_BYTES * (len(payload.get("patches") or []) + 1)
+        self._put("patches", (copy.deepcopy(payload), encoded, dict(perf)), nbytes)
+
+
+class IntermediatesCache:
+    """Byte- and age-bounded LRU of :class:`PageIntermediates`."""
+
+    def __init__(self, max_bytes: int, ttl_sec: float, *, clock: Any = time.monotonic) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_sec = max(1.0, float(ttl_sec))
+        self._clock = clock
+        self._items: OrderedDict[str, PageIntermediates] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = {slot: 0 for slot in _SLOTS}
+        self._misses = {slot: 0 for slot in _SLOTS}
+        self._evicted = 0
+        self._expired = 0
+
+    def page(self, image_hash: str, lang: str) -> PageIntermediates | None:
+        """The entry for this page, created empty on a miss. None when off."""
+        if self.max_bytes <= 0 or not image_hash:
+            return None
+        key = f"{image_hash}|{lang or ''}"
+        now = self._clock()
+        with self._lock:
+            self._purge(now)
+            entry = self._items.get(key)
+            if entry is None:
+                entry = PageIntermediates(self, key, now + self.ttl_sec)
+                self._items[key] = entry
+            self._items.move_to_end(key)
+        return entry
+
+    def peek_lens(self, image_hash: str, lang: str) -> bool:
+        """Whether a live entry already holds this page's Lens response."""
+        with self._lock:
+            entry = self._items.get(f"{image_hash}|{lang or ''}")
+            if entry is None or entry.expires <= self._clock():
+                return False
+        with entry._lock:
+            return entry._slots.get("lens") is not None
+
+    def _purge(self, now: float) -> None:
+        for key, entry in list(self._items.items()):
+            if entry.expires <= now:
+                self._drop(key)
+                self._expired += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._items.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _grew(self, entry: PageIntermediates, nbytes: int) -> None:
+        with self._lock:
+            if self._items.get(entry.key) is not entry:
+                return  # evicted while the stage ran; its bytes left with it
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._items:
+                oldest = next(iter(self._items))
+                self._drop(oldest)
+                self._evicted += 1
+
+    def _count(self, slot: str, hit: bool) -> None:
+        with self._lock:
+            (self._hits if hit else self._misses)[slot] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.max_bytes > 0,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "byteBudget": self.max_bytes,
+                "ttlSec": self.ttl_sec,
+                "hits": dict(self._hits),
+                "misses": dict(self._misses),
+                "evicted": self._evicted,
+                "expired": self._expired,
+            }
+
+
+intermediates = IntermediatesCache(
+    settings.intermediates_max_mb * 1024 * 1024, settings.intermediates_ttl_sec,
+)
@@ -15,28 +15,36 @@ Two modes:
 
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures
 import contextlib
 import copy
 import io
 import os
-import tempfile
 import threading
 import time
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Callable
 
-import numpy as np
 from PIL import Image
 
+from backend import cancellation
 from backend.ai import markers
-from backend.ai.translate import AiConfig, translate as ai_translate
+from backend.ai.coalesce import ai_coalescer, group_key as coalesce_group_key
+from backend.ai.prompts import prompt_metadata
+from backend.ai.translate import AiConfig, resolve_generation_model, translate as ai_translate
+from backend.ai.unit_memory import rememberable, signature as memory_signature, unit_hash, unit_memory
 from backend.config import settings
+from backend.jobs import ai_pending as ai_pending_mod
+from backend.jobs.backgrounds import BackgroundError, backgrounds
 from backend.jobs import cache as cache_mod
+from backend.jobs import cpu_lane
 from backend.jobs.fonts import resolve_font_pair
+from backend.jobs.intermediates import PageIntermediates, intermediates as intermediates_cache
 from backend.lens import client as lens_client
 from backend.lens import document as lens_document
 from backend.lens.languages import normalize as normalize_lang
-from backend.ai.providers import is_local_provider
+from backend.ai.providers import is_local_provider, resolve_provider
 from backend.lens.tree import (
     decode_tree,
     flatten_spans,
@@ -47,9 +55,12 @@ from backend.lens.tree import (
 )
 from backend.log import dbg, event
 from backend.api.errors import future_result_with_stage
-from backend.render.bubble import attach_bubble_bounds, detect_bubble_bounds_combined
-from backend.render.colors import region_is_dark
+from backend.render import bg_encode
+from backend.render.bubble import attach_bubble_bounds
+from backend.render.colors import ColorSampler
 from backend.render.textblocks_pass import (
+    apply_block_stamps,
+    block_stamps,
     copy_geometry_fallback_stamps,
     detect_blocks_with_second_look,
 )
@@ -59,8 +70,9 @@ from backend.render.textblocks import (
     available as textblocks_available,
     detect_text_blocks_in_rois,
 )
-from backend.render.erase import erase_text_with_boxes, restore_token_regions
+from backend.render.erase import restore_token_regions
 from backend.render import erase_boxes as erase_boxes_mod
+from backend.render import erase_patches
 from backend.render.groups import (
     group_paragraphs_into_bubbles,
     merge_groups_sharing_canvas,
@@ -107,154 +119,18 @@ def _image_to_rgb(src: Image.Image) -> Image.Image:
     white = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
     return Image.alpha_composite(white, rgba).convert("RGB")
 
-# --- Background-image encoding ----------------------------------------------
-# The erased background does not need to be lossless. Scanned/JPEG-sourced
-# pages carry sensor+compression noise that PNG must encode exactly (multi-MB
-# payloads); WebP discards it and is typically several times smaller. Clean
-# digital pages with large flat areas go the other way: PNG is both smaller
-# AND faster on line art.
-#
-# This used to encode BOTH formats and return the smaller blob. That is the
-# right answer for BYTES and the wrong one for CPU — it paid for two full
-# encodes of every page on a 2-vCPU container where encoding is already the
-# hottest stage of the direct lane. It now encodes ONCE, choosing the format
-# from a sampled flatness measurement taken on a small native-resolution crop
-# (tens of microseconds, versus ~0.3-1.5 s for the encode it replaces).
-#
-# TP_LENS_DIRECT_IMG_FORMAT:
-#   auto (default) — sample the image, run exactly one encode
-#   webp / png     — force one format, skip the sampling
-#   compare        — the old behaviour: encode both, return the smaller.
-#                    Roughly 2x the encode CPU; kept for A/B measurement.
-_BG_FORMAT = (os.environ.get("TP_LENS_DIRECT_IMG_FORMAT", "auto") or "auto").strip().lower()
-_WEBP_QUALITY = max(1, min(100, int(os.environ.get("TP_LENS_DIRECT_WEBP_QUALITY", "80"))))
-# Pillow's WebP effort knob (0 fastest .. 6 smallest). 2 keeps most of the size
-# win at a fraction of the default (4) cost.
-_WEBP_METHOD = max(0, min(6, int(os.environ.get("TP_LENS_DIRECT_WEBP_METHOD", "2"))))
-# --- "auto" format heuristic ---
-# PNG only beats WebP on QUANTIZED art: screentone/halftone, line art, flat
-# webtoon colour. On a measured 1400x2000 halftone page PNG is 54 KB and WebP
-# q80 is 872 KB — 16x larger and 4x slower — so getting this class wrong is
-# far more expensive than the sampling. On anything scanned or JPEG-sourced
-# the ordering reverses hard (2374 KB PNG vs 125 KB WebP).
-#
-# Neither signal is sufficient alone:
-#   • colour count alone misfires on flat-toned grey scans, which have few
-#     distinct values but compress terribly as PNG because of pixel noise;
-#   • flatness alone misfires on halftone, whose 2-3 px dither pattern puts
-#     adjacency near 0.67 — well inside the range real scans occupy.
-# Requiring BOTH is what separates them: quantized art has few colours AND
-# long identical runs, scan noise has neither.
-#
-# Accepted trade: pure line art and flat webtoon colour would still be a few
-# tens of KB smaller as WebP, and they are routed to PNG here. Those pages are
-# 40-100 KB either way, so the loss is bounded and absolute; the cases this
-# protects (halftone at 16x, scans at 19x) are measured in megabytes.
-_MAX_PALETTE_COLORS = max(2, int(os.environ.get("TP_LENS_DIRECT_COLOR_LIMIT", "256")))
-# Stride for the colour sample. NEAREST keeps exact pixel values, so counting
-# distinct colours on the subsample stays meaningful (unlike the noise
-# measurement below, which must be taken at native resolution).
-_COLOR_SAMPLE_STEP = max(1, int(os.environ.get("TP_LENS_DIRECT_COLOR_STEP", "3")))
-# Side of the native-resolution centre crop used to measure flatness.
-_FLAT_SAMPLE_PX = max(32, int(os.environ.get("TP_LENS_DIRECT_SAMPLE_PX", "256")))
-# Fraction of horizontally-adjacent identical pixels. Scans sit at 0.04-0.13,
-# halftone at ~0.67, line art and flat colour above 0.98.
-_FLAT_THRESHOLD = min(1.0, max(0.0, float(os.environ.get("TP_LENS_DIRECT_FLAT_THRESHOLD", "0.45"))))
-
-# WebP support is a property of the Pillow BUILD, not of any single image, so
-# it is resolved once here. Doing it per-call inside a bare `except` hid a
-# permanently-degraded deployment behind a silent PNG fallback.
-try:
-    from PIL import features as _pil_features
-
-    _WEBP_AVAILABLE = bool(_pil_features.check("webp"))
-except Exception:  # noqa: BLE001 - very old Pillow without PIL.features
-    _WEBP_AVAILABLE = False
-if not _WEBP_AVAILABLE and _BG_FORMAT in ("auto", "webp"):
-    event(
-        "encode.webp_unavailable",
-        {
-            "requested_format": _BG_FORMAT,
-            "detail": "Pillow was built without WebP; every background will be "
-            "encoded as PNG (much larger payloads). Install a Pillow wheel "
-            "with WebP support or set TP_LENS_DIRECT_IMG_FORMAT=png to make "
-            "this explicit.",
-        },
-        ok=False,
-    )
-
-
-def _encode_png(img: Image.Image) -> bytes:
-    buf = io.BytesIO()
-    img.save(buf, format="PNG", compress_level=1)
-    return buf.getvalue()
-
-
-def _encode_webp(img: Image.Image) -> bytes:
-    buf = io.BytesIO()
-    img.save(buf, format="WEBP", quality=_WEBP_QUALITY, method=_WEBP_METHOD)
-    return buf.getvalue()
-
-
-def _flatness(img: Image.Image) -> float:
-    """Fraction of horizontally-adjacent identical pixels in a centre crop.
-
-    Sampled at NATIVE resolution — downscaling first would smear exactly the
-    per-pixel noise the measurement is looking for. The crop is capped at
-    ``_FLAT_SAMPLE_PX`` per side, so this reads at most ~65k pixels regardless
-    of page size.
-    """
-    w, h = img.size
-    side = min(_FLAT_SAMPLE_PX, w, h)
-    left = (w - side) // 2
-    top = (h - side) // 2
-    crop = img.crop((left, top, left + side, top + side)).convert("L")
-    arr = np.asarray(crop, dtype=np.uint8)
-    if arr.ndim != 2 or arr.shape[1] < 2:
-        raise ValueError(f"flatness sample has unusable shape {arr.shape}")
-    return float(np.mean(arr[:, 1:] == arr[:, :-1]))
-
-
-def _is_quantized_art(img: Image.Image) -> bool:
-    """True for screentone / line art / flat colour — the pages PNG wins on."""
-    w, h = img.size
-    step = _COLOR_SAMPLE_STEP
-    small = img.resize((max(1, w // step), max(1, h // step)), Image.NEAREST)
-    # getcolors returns None past maxcolors, so this early-exits on real scans.
-    if small.getcolors(maxcolors=_MAX_PALETTE_COLORS) is None:
-        return False
-    return _flatness(img) >= _FLAT_THRESHOLD
-
-
-def _encode_bg_data_uri(img: Image.Image) -> str:
-    """Encode the (erased) background image as a compact data URI.
-
-    Runs exactly one encode unless ``TP_LENS_DIRECT_IMG_FORMAT=compare``.
-    """
-    if _BG_FORMAT == "png" or not _WEBP_AVAILABLE:
-        return bytes_to_data_uri(_encode_png(img), "image/png")
-    if _BG_FORMAT == "webp":
-        return bytes_to_data_uri(_encode_webp(img), "image/webp")
-    if _BG_FORMAT == "compare":
-        png_bytes = _encode_png(img)
-        webp_bytes = _encode_webp(img)
-        if len(webp_bytes) < len(png_bytes):
-            return bytes_to_data_uri(webp_bytes, "image/webp")
-        return bytes_to_data_uri(png_bytes, "image/png")
-
-    # "auto": sample (<1 ms), then run exactly one encode.
-    if _is_quantized_art(img):
-        return bytes_to_data_uri(_encode_png(img), "image/png")
-    return bytes_to_data_uri(_encode_webp(img), "image/webp")
-
 
 # CPU gate: workers may all wait on the Lens network call in parallel (cheap),
 # but only this many jobs may run the CPU-heavy stages (erase / bubble detect /
 # render / PNG) at once. Without the gate, a 14-image burst inflated those
 # stage times 3-10x from GIL contention; with too few workers, the Lens waits
 # serialized instead. I/O parallel + CPU gated gets both right.
+#
+# With the process lane on (TP_CPU_PROCESS_WORKERS) the image stages no longer
+# share this interpreter's GIL, so the gate widens to the worker count: fewer
+# slots than workers would leave processes idle behind it.
 _CPU_GATE = threading.Semaphore(
-    max(1, min(settings.cpu_concurrency, effective_cpu_count()))
+    max(1, min(max(settings.cpu_concurrency, cpu_lane.workers()), effective_cpu_count()))
 )
 
 # Warn LOUDLY (once per process) when the text-block model could not be used:
@@ -392,6 +268,7 @@ def _layout_options(payload: dict | None) -> dict[str, bool]:
 
     render = payload.get("render") if isinstance(payload, dict) else None
     render = render if isinstance(render, dict) else {}
+    background = _background_mode(payload)
 
     return {
         "relayout_translated": _flag(
@@ -400,25 +277,36 @@ def _layout_options(payload: dict | None) -> dict[str, bool]:
         # Emit the canonical tp.lens-document/1 alongside the rendered overlay.
         # It changes the response, so it belongs in the cache key.
         "lens_document": bool(render.get("lensDocument")),
-        # Who paints the text-erased background. These produce different
-        # responses from the same image, so this belongs in the cache key
-        # alongside the relayout switches — see build_cache_key.
-        "client_background": _background_is_client(payload),
+        # Who paints the text-erased background, and how the server's one
+        # travels. These produce different responses from the same image, so
+        # they belong in the cache key alongside the relayout switches — see
+        # build_cache_key.
+        "client_background": background == "boxes",
+        # Present only when set, so every key minted before these modes
+        # existed still names the same (data URI) result.
+        **({"background_artifact": True} if background == "artifact" else {}),
+        **({"background_patches": True} if background == "patches" else {}),
     }
 
 
 # --- Background ownership ---------------------------------------------------
 
-_BACKGROUND_MODES = ("image", "boxes")
+_BACKGROUND_MODES = ("image", "boxes", "artifact", "patches")
 
 
-def _background_is_client(payload: dict | None) -> bool:
-    """Whether the CLIENT will paint the background for this request.
+def _background_mode(payload: dict | None) -> str:
+    """Who paints the background for this request, and how it is delivered.
 
     ``{"render": {"background": "boxes"}}`` means the extension erases the
     text itself on a canvas, so the server skips the inpaint/re-encode and
     returns the boxes instead. ``"image"`` (the default, and what every older
-    build sends by not sending anything) keeps the server-rendered background.
+    build sends by not sending anything) keeps the server-rendered background
+    as a data URI. ``"artifact"`` is the same server-rendered background as a
+    separate file: the result carries ``backgroundArtifact`` and the bytes
+    come from ``GET /v1/background/{id}`` (:mod:`backend.jobs.backgrounds`).
+    ``"patches"`` sends only the erased regions, packed into one small image,
+    for the client to draw over its own copy of the page
+    (:mod:`backend.render.erase_patches`).
 
     An unrecognised value raises rather than falling back to the default: a
     client that asked for something specific and silently got the opposite
@@ -428,13 +316,39 @@ def _background_is_client(payload: dict | None) -> bool:
     raw = raw if isinstance(raw, dict) else {}
     value = raw.get("background")
     if value is None or value == "":
-        return False
+        return "image"
     mode = str(value).strip().lower()
     if mode not in _BACKGROUND_MODES:
         raise ValueError(
             f"render.background must be one of {_BACKGROUND_MODES}, got {value!r}"
         )
-    return mode == "boxes"
+    return mode
+
+
+_AI_DELIVERY_MODES = ("inline", "deferred")
+
+
+def _ai_is_deferred(payload: dict | None) -> bool:
+    """Whether the AI layer may arrive after the rest of the result.
+
+    ``{"render": {"ai": "deferred"}}`` asks for the Lens layers as soon as
+    they are rendered, with an ``aiPending`` token in place of the AI layer;
+    see :func:`_defer_ai_layer`. ``"inline"`` (the default) waits for the
+    provider as before. Unlike the background mode this is NOT part of the
+    cache key: the finished result is the same either way, only its delivery
+    differs.
+    """
+    raw = payload.get("render") if isinstance(payload, dict) else None
+    raw = raw if isinstance(raw, dict) else {}
+    value = raw.get("ai")
+    if value is None or value == "":
+        return False
+    mode = str(value).strip().lower()
+    if mode not in _AI_DELIVERY_MODES:
+        raise ValueError(
+            f"render.ai must be one of {_AI_DELIVERY_MODES}, got {value!r}"
+        )
+    return mode == "deferred"
 
 
 # --- Text-colour annotation -------------------------------------------------
@@ -461,14 +375,15 @@ def _para_rect_px(para: dict) -> tuple[int, int, int, int] | None:
     return int(min(xs1)), int(min(ys1)), int(max(xs2)), int(max(ys2))
 
 
-def _annotate_text_light(tree: dict | None, base_img: Image.Image | None) -> None:
+def _annotate_text_light(tree: dict | None, colors: ColorSampler | None) -> None:
     """Flag paragraphs sitting on a DARK background with ``text_light``.
 
     The renderer turns the flag into the ``tp-on-dark`` wrapper (white text +
     dark halo) so overlays stay readable on black/dark panels.  Sampling uses
-    the erased image, where the original glyphs are already gone.
+    the erased image, where the original glyphs are already gone; one
+    ``colors`` sampler serves every tree of the job.
     """
-    if not isinstance(tree, dict) or base_img is None:
+    if not isinstance(tree, dict) or colors is None:
         return
     for para in tree.get("paragraphs") or []:
         if not isinstance(para, dict):
@@ -477,7 +392,7 @@ def _annotate_text_light(tree: dict | None, base_img: Image.Image | None) -> Non
         if rect is None:
             continue
         try:
-            para["text_light"] = region_is_dark(base_img, rect)
+            para["text_light"] = colors.region_is_dark(rect)
         except Exception:
             para["text_light"] = False
 
@@ -509,6 +424,93 @@ def _encode_vision_image(img: Image.Image) -> tuple[str, str]:
     return base64.b64encode(buf.getvalue()).decode("ascii"), "image/jpeg"
 
 
+def _encode_page_background(
+    page: PageIntermediates | None, base_img: Image.Image, reused: list[str],
+) -> bg_encode.EncodedBackground:
+    """The erased page encoded: ``page``'s earlier encode of it, else a fresh one.
+
+    Called before any partial-answer restore touches ``base_img``, so what is
+    stored is always the plain erased page.
+    """
+    held = page.background() if page is not None else None
+    if held is not None:
+        reused.append("background")
+        return held.reused()
+    encoded = cpu_lane.encode_background(base_img)
+    if page is not None:
+        page.set_background(encoded)
+    return encoded
+
+
+def _publish_background(
+    out: dict[str, Any], encoded: bg_encode.EncodedBackground, stages: dict[str, Any],
+    *, artifact: bool,
+) -> None:
+    """Put the background in ``out`` the way the request asked for it.
+
+    Inline as ``imageDataUri``, or with ``artifact`` as a file in
+    :mod:`backend.jobs.backgrounds` named by ``backgroundArtifact``. A
+    background too large for that store goes inline rather than missing.
+    """
+    stages.update(encoded.perf())
+    if artifact:
+        try:
+            artifact_id, ttl = backgrounds.put(encoded.data, encoded.mime)
+        except BackgroundError as exc:
+            stages["bg_artifact_error"] = exc.code
+        else:
+            out["backgroundArtifact"] = {
+                "id": artifact_id,
+                "url": f"/v1/background/{artifact_id}",
+                "mime": encoded.mime,
+                "bytes": len(encoded.data),
+                "ttlSec": ttl,
+            }
+            out["imageDataUri"] = ""
+            return
+    out["imageDataUri"] = encoded.data_uri()
+
+
+def _publish_patches(
+    out: dict[str, Any], page: PageIntermediates | None, source_img: Image.Image,
+    base_img: Image.Image, tokens: list[dict], reused: list[str], stages: dict[str, Any],
+) -> None:
+    """``render.background: "patches"``: the erased regions instead of the page.
+
+    ``page``'s earlier build is reused on the same terms as the full-page
+    encode in :func:`_encode_page_background`.
+    """
+    held = page.patches() if page is not None else None
+    if held is not None:
+        reused.append("patches")
+        payload, encoded, perf = held
+        encoded = encoded.reused() if encoded is not None else None
+    else:
+        payload, encoded, perf = erase_patches.build(source_img, base_img, tokens)
+        if page is not None:
+            page.set_patches(payload, encoded, perf)
+    stages.update(perf)
+    if encoded is not None:
+        stages.update(encoded.perf())
+    out["erasePatches"] = payload
+    out["imageDataUri"] = ""
+
+
+def _publish_page_background(
+    out: dict[str, Any], page: PageIntermediates | None, source_img: Image.Image,
+    base_img: Image.Image, tokens: list[dict], reused: list[str], stages: dict[str, Any],
+    *, delivery: str,
+) -> None:
+    """The erased page in ``out`` as ``delivery`` ("image", "artifact", "patches") asks."""
+    if delivery == "patches":
+        _publish_patches(out, page, source_img, base_img, tokens, reused, stages)
+        return
+    _publish_background(
+        out, _encode_page_background(page, base_img, reused), stages,
+        artifact=delivery == "artifact",
+    )
+
+
 @contextlib.contextmanager
 def _stage(stages: dict[str, Any], name: str):
     """Name the step being run, and stamp that name onto anything it raises.
@@ -531,6 +533,91 @@ def _stage(stages: dict[str, Any], name: str):
         raise
 
 
+# ``progress(stage, data)``: told each time a stage a client could act on has
+# finished. Called on the pipeline's own thread, and ``ai_unit`` on the AI
+# layer's.
+Progress = Callable[[str, dict[str, Any]], None]
+
+
+def _emit(progress: Progress | None, stage: str, data: dict[str, Any] | None = None) -> None:
+    """Report a finished stage to a streaming caller.
+
+    A listener that raises (a closed stream, a full queue) is logged and
+    ignored: the job it is watching must still finish and be cached.
+    """
+    if progress is None:
+        return
+    try:
+        progress(stage, data or {})
+    except Exception as exc:
+        dbg("progress.error", {"stage": stage, "error": f"{type(exc).__name__}: {exc}"})
+
+
+def _overlay_snapshot(out: dict[str, Any], *, ai_pending: bool) -> dict[str, Any]:
+    """What a client needs to paint the Lens layers before the AI answers.
+
+    The rendered markup, its CSS and base size, and the background in
+    whichever form this request asked for. Trees stay out: they are the bulk
+    of the result and the final ``result`` carries them anyway.
+    """
+    snap: dict[str, Any] = {
+        "mode": out.get("mode"),
+        "pipelinePath": out.get("pipelinePath"),
+        "backgroundMode": out.get("backgroundMode"),
+        "original": {"originalhtml": (out.get("original") or {}).get("originalhtml", "")},
+        "translated": {"translatedhtml": (out.get("translated") or {}).get("translatedhtml", "")},
+        "htmlCss": out.get("htmlCss", ""),
+        "htmlMeta": out.get("htmlMeta") or {},
+        "aiPending": ai_pending,
+    }
+    if out.get("imageDataUri"):
+        snap["imageDataUri"] = out["imageDataUri"]
+    if out.get("backgroundArtifact"):
+        snap["backgroundArtifact"] = out["backgroundArtifact"]
+    if "eraseBoxes" in out:
+        snap["eraseBoxes"] = out["eraseBoxes"]
+    if "erasePatches" in out:
+        snap["erasePatches"] = out["erasePatches"]
+    if out.get("lensDocument"):
+        snap["lensDocument"] = out["lensDocument"]
+    return snap
+
+
+def _defer_ai_layer(
+    out: dict[str, Any],
+    stages: dict[str, Any],
+    executor: concurrent.futures.ThreadPoolExecutor,
+    join: Callable[[], None],
+    on_done: Callable[[dict[str, Any]], Any],
+) -> dict[str, Any]:
+    """Return the Lens layers now; finish the AI layer on ``executor``.
+
+    ``join`` is the tail the inline path runs after the provider answers. It
+    is queued behind the provider call on the job's own one-worker executor,
+    then ``on_done(out)`` receives the completed result; the returned copy
+    carries that as the ``aiFuture`` for :func:`process_payload`.
+
+    The copy is taken before anything else writes to ``out``: the AI thread
+    and ``join`` go on mutating the original while the first response is
+    being serialised, so the two must not share a dict the tail writes into.
+    """
+    first = dict(out)
+    first["Ai"] = {}
+    first["AiTextFull"] = ""
+    first["perfStages"] = {**stages, "ai_deferred": True}
+    if isinstance(out.get("lensDocument"), dict):
+        # attach_ai_layer mutates the document in place.
+        out["lensDocument"] = copy.deepcopy(out["lensDocument"])
+
+    def _tail() -> Any:
+        join()
+        return on_done(out)
+
+    first["aiFuture"] = executor.submit(_tail)
+    executor.shutdown(wait=False)
+    return first
+
+
 def _restore_unanswered_paragraphs(
     out: dict[str, Any],
     original_tree: dict | None,
@@ -539,6 +626,7 @@ def _restore_unanswered_paragraphs(
     *,
     client_background: bool,
     stages: dict[str, Any],
+    delivery: str = "image",
 ) -> int:
     """Undo the erase for paragraphs the model did not answer.
 
@@ -556,19 +644,22 @@ def _restore_unanswered_paragraphs(
     if not tokens:
         return 0
 
+    keep = spans_for_paragraphs(
+        original_tree,
+        [i for i, _ in iter_paragraphs(original_tree) if i not in set(indices)],
+    )
     if client_background:
         # The client paints the boxes: simply do not send the ones whose text
         # is staying on screen.
-        keep = spans_for_paragraphs(
-            original_tree,
-            [i for i, _ in iter_paragraphs(original_tree) if i not in set(indices)],
-        )
         out["eraseBoxes"] = erase_boxes_mod.build(keep)
     elif base_img is not None and source_img is not None:
         _t = time.perf_counter()
         restore_token_regions(base_img, source_img, tokens)
         if settings.lens_direct_png:
-            out["imageDataUri"] = _encode_bg_data_uri(base_img)
+            # Not the page's stored encode: that one still has these erased.
+            _publish_page_background(
+                out, None, source_img, base_img, keep, [], {}, delivery=delivery,
+            )
         stages["ai_partial_restore_ms"] = round((time.perf_counter() - _t) * 1000, 1)
     else:
         return 0
@@ -578,6 +669,39 @@ def _restore_unanswered_paragraphs(
     return len(indices)
 
 
+def _coalesce_stages(out: dict[str, Any], stages: dict[str, Any]) -> None:
+    """``perfStages`` fields for the provider call this page's AI answer came from."""
+    shared = ((out.get("Ai") or {}).get("meta") or {}).get("coalesced") or {}
+    stages["ai_pages_per_call"] = int(shared.get("pages") or 1)
+    stages["ai_saved_rpm"] = ai_coalescer.saved_rpm()
+
+
+def _unit_memory_signature(target_lang: str, ai_cfg: AiConfig) -> str:
+    """The :func:`backend.ai.unit_memory.signature` ``/v1/ai/translate`` uses for ``ai_cfg``."""
+    provider = resolve_provider(ai_cfg.provider, ai_cfg.api_key)
+    return memory_signature(
+        target_lang, provider, resolve_generation_model(provider, ai_cfg.model),
+        prompt_metadata(target_lang, ai_cfg.prompt_editable),
+    )
+
+
+def _with_remembered_units(ai_text_full: str, sent: list[int], remembered: dict[int, str], n_src: int) -> str:
+    """The model's answer for the ``sent`` units, re-marked as all ``n_src`` units.
+
+    Raises like the full answer would when the partial one is incomplete, so a
+    broken answer is never hidden behind the remembered units.
+    """
+    texts = dict(remembered)
+    if sent:
+        if not markers.has_complete_sequence(ai_text_full, len(sent)):
+            raise RuntimeError(f"AI returned incomplete text units (expected {len(sent)})")
+        extracted = markers.extract_paragraphs(ai_text_full, len(sent))
+        if extracted is None:
+            raise RuntimeError("AI returned no attributable text units")
+        texts.update(zip(sent, extracted[0]))
+    return markers.apply([texts[i] for i in range(n_src)])
+
+
 def _run_ai_layer(
     out: dict[str, Any],
     original_tree: dict | None,
@@ -590,16 +714,23 @@ def _run_ai_layer(
     latin_font: str,
     *,
     base_img: Image.Image | None = None,
+    colors: ColorSampler | None = None,
     vision_img: Image.Image | None = None,
     capture_request: bool = False,
     use_lens_template: bool = False,
     layout_meta: dict[str, Any] | None = None,
+    progress: Progress | None = None,
 ) -> dict | None:
     """Translate with AI, patch into a tree, and write the ``Ai`` result.
 
     Returns the AI tree (or ``None`` when there is nothing to translate).
     Mutates ``out`` (sets ``AiTextFull`` / ``Ai``) and the passed-in trees
     (font sizes are shared across all three layers).
+
+    With ``progress``, each unit is also reported as an ``ai_unit`` stage the
+    moment its translation closes in the streamed answer (called on this
+    function's thread). Those are previews; ``ai_answered`` and the result
+    carry the accepted answer.
     """
     src_paras_raw = paragraph_texts(original_tree or {})
 
@@ -685,6 +816,21 @@ def _run_ai_layer(
         out["Ai"] = {"meta": {"skipped": True, "skipped_reason": "no_text"}}
         return None
 
+    # When the batch opts in (ai_cfg.unit_memory), units this provider, model
+    # and prompt already translated are answered from the translation memory
+    # (backend/ai/unit_memory.py), shared with /v1/ai/translate, and only the
+    # rest go to the model. A captured request is the page's whole request,
+    # so it skips the memory.
+    memory_sig = ""
+    unit_hashes: list[str] = []
+    remembered: dict[int, str] = {}
+    if unit_memory.enabled and ai_cfg.unit_memory and not capture_request:
+        memory_sig = _unit_memory_signature(target_lang, ai_cfg)
+        unit_hashes = [unit_hash(p) if rememberable(p) else "" for p in merged_src_paras]
+        found = unit_memory.get_many(memory_sig, [h for h in unit_hashes if h])
+        remembered = {i: found[h] for i, h in enumerate(unit_hashes) if h in found}
+    sent = [i for i in range(n_src) if i not in remembered]
+
     # The model now sees only the source — no Lens MT reference block.
     # This halves the prompt input and lets it translate freely, which
     # produced noticeably more natural Thai/JP/ZH/KO dialogue than the
@@ -704,7 +850,7 @@ def _run_ai_layer(
     if _send_mode == "auto":
         known_chars = len(getattr(ai_cfg, "characters", None) or [])
         want_image = n_src >= 5 and known_chars < 4
-    if want_image and not getattr(ai_cfg, "image_b64", ""):
+    if want_image and sent and not getattr(ai_cfg, "image_b64", ""):
         vimg = vision_img if vision_img is not None else base_img
         if vimg is not None:
             try:
@@ -749,22 +895,61 @@ def _run_ai_layer(
                 if _name:
                     _remapped[str(_gi)] = _name
                     break
-        ai_cfg.speakers = _remapped
+        # Markers are numbered over the units actually sent.
+        ai_cfg.speakers = {
+            str(k): _remapped[str(gi)] for k, gi in enumerate(sent) if str(gi) in _remapped
+        } if remembered else _remapped
 
     # Exactly one AI generation for this image. Provider-native JSON Schema
     # constrains P0..Pn where available; universal JSON prompting covers every
     # other model. Incomplete output is terminal inside ai_translate — never
     # repaired from Lens and never offered to the model a second time.
-    result = ai_translate(
-        src_text, target_lang, ai_cfg,
-        capture_request=capture_request,
-    )
+    # Pages of one batch that get here together share the call
+    # (backend/ai/coalesce.py). A captured request is this page's own.
+    for index, text in remembered.items():
+        _emit(progress, "ai_unit", {
+            "index": index,
+            "paragraphs": group_para_indices[index],
+            "text": text,
+        })
+    sent_paras = [merged_src_paras[i] for i in sent] if remembered else merged_src_paras
+    coalesce_key = None if capture_request else coalesce_group_key("job", target_lang, ai_cfg)
+    if not sent_paras:
+        provider = resolve_provider(ai_cfg.provider, ai_cfg.api_key)
+        result = {"aiTextFull": "", "meta": {
+            "provider": provider, "model": resolve_generation_model(provider, ai_cfg.model),
+            "target_lang": target_lang, "ai_flow": "unit_memory",
+        }}
+    elif coalesce_key:
+        result = ai_coalescer.run_blocking(
+            coalesce_key, sent_paras,
+            lambda marked: ai_translate(marked, target_lang, ai_cfg),
+        )
+    else:
+        on_unit = None
+        if progress is not None:
+            def on_unit(index: int, text: str) -> None:
+                if 0 <= index < len(sent):
+                    _emit(progress, "ai_unit", {
+                        "index": sent[index],
+                        "paragraphs": group_para_indices[sent[index]],
+                        "text": text,
+                    })
+        result = ai_translate(
+            markers.apply(sent_paras) if remembered else src_text, target_lang, ai_cfg,
+            capture_request=capture_request,
+            on_unit=on_unit,
+        )
 
     # OUTPUT clamp — deterministic, always on. A repetition runaway in the
     # model's answer (thousands of repeated chars/clusters) can strike at any
     # time; collapsing it here guarantees it never reaches parsing/rendering.
     ai_text_full = markers.clamp_output_repeats(str(result.get("aiTextFull") or ""))
+    if remembered:
+        ai_text_full = _with_remembered_units(ai_text_full, sent, remembered, n_src)
     meta = dict(result.get("meta") or {})
+    meta["memory_hits"] = len(remembered)
+    meta["sent_units"] = len(sent)
     if isinstance(layout_meta, dict):
         meta.update({f"layout_{k}": v for k, v in layout_meta.items() if k != "rotation_samples"})
         if "rotation_samples" in layout_meta:
@@ -792,6 +977,11 @@ def _run_ai_layer(
         raise RuntimeError("AI returned no usable text for any unit")
     if passthrough_texts:
         ai_group_texts = list(ai_group_texts) + list(passthrough_texts)
+    if memory_sig:
+        unit_memory.put_many(memory_sig, {
+            unit_hashes[i]: ai_group_texts[i]
+            for i in sent if unit_hashes[i] and str(ai_group_texts[i] or "").strip()
+        })
     meta["missing_units"] = missing_units
     meta["passthrough_units"] = len(passthrough_texts)
     meta["units"] = n_src
@@ -886,7 +1076,9 @@ def _run_ai_layer(
 
     # Flag dark-background paragraphs BEFORE rendering so the overlay flips
     # to white text + dark halo where the panel behind the bubble is dark.
-    _annotate_text_light(ai_tree, base_img)
+    if colors is None and base_img is not None:
+        colors = ColorSampler(base_img)
+    _annotate_text_light(ai_tree, colors)
 
     # AI HTML overlay — ``target_lang`` drives the deterministic reading
     # direction (see backend.render.region.resolve_text_direction).
@@ -900,24 +1092,52 @@ def _run_ai_layer(
 # --- Core processing -------------------------------------------------------
 
 def process_image(
-    image_path: str,
+    image_path: str | None,
     lang: str,
     mode: str,
     ai_cfg: AiConfig | None,
     *,
     source: str = "translated",
     lens_data: dict[str, Any] | None = None,
+    lens_ms: float = 0.0,
     capture_ai_request: bool = False,
     layout_opts: dict[str, bool] | None = None,
+    image_bytes: bytes | None = None,
+    image_hash: str | None = None,
+    progress: Progress | None = None,
+    defer_ai: Callable[[dict[str, Any]], Any] | None = None,
 ) -> dict[str, Any]:
-    """Run the full pipeline on a local image file.
+    """Run the full pipeline on one image.
+
+    The image is ``image_bytes`` when given — the server path, which already
+    holds the upload in memory and must not round-trip it through a temp file
+    — otherwise the local file at ``image_path`` (``backend.cli``). It is
+    decoded once here and the same bytes go to Lens; ``image_hash`` (sha256
+    hex) is forwarded so the Lens cache key is not recomputed.
 
     ``lens_data`` may be passed in to skip the Google Lens fetch — useful for
     the local CLI (``backend.cli``), which can save and replay a Lens response
-    so the Lens round-trip isn't repeated on every run.
+    so the Lens round-trip isn't repeated on every run, and for the job queue,
+    which awaits Lens before handing the job to a thread (:func:`prefetch_lens`);
+    ``lens_ms`` is what that earlier fetch took, reported as this job's.
+
+    For ``lens_text`` the source-independent stages — Lens, image decode,
+    text blocks, erase, bubbles, background encode — are shared through
+    :mod:`backend.jobs.intermediates` with every other job on the same image
+    and language; perf ``reused`` lists the ones this job did not run.
 
     ``layout_opts`` carries the per-request relayout switch
     (``relayout_translated``); see :func:`_layout_options`.
+
+    ``progress`` is told as stages finish — ``lens_fetch``,
+    ``trees_decoded``, ``erase_done``, ``html_ready`` (with an
+    :func:`_overlay_snapshot` of the Lens layers, sent before the AI join)
+    and ``ai_answered`` — so a streaming client can paint before the whole
+    job is done. The return value is unchanged either way.
+
+    ``defer_ai``: when given and the provider is still answering once the
+    Lens layers are rendered, return those now — see :func:`_defer_ai_layer`
+    — and call ``defer_ai`` with the completed result afterwards.
     """
     mode_id = mode if mode in SUPPORTED_MODES else "lens_images"
     source_id = str(source or "translated").strip().lower() or "translated"
@@ -925,10 +1145,17 @@ def process_image(
     layout = layout_opts if isinstance(layout_opts, dict) else _layout_options(None)
 
     # `lens_images` returns Lens's own translated PICTURE — there is no erased
-    # background to hand over, so the boxes mode does not apply to it. The
-    # answer is reported in the result (`backgroundMode`) rather than left for
-    # the client to infer from a missing field.
+    # background to hand over, so neither the boxes nor the artifact mode
+    # applies to it. The answer is reported in the result (`backgroundMode`)
+    # rather than left for the client to infer from a missing field.
     client_background = bool(layout.get("client_background")) and mode_id == "lens_text"
+    # How the server's own erased background travels when it sends one.
+    bg_delivery = "image"
+    if mode_id == "lens_text" and not client_background:
+        if layout.get("background_artifact"):
+            bg_delivery = "artifact"
+        elif layout.get("background_patches"):
+            bg_delivery = "patches"
     want_lens_document = bool(layout.get("lens_document")) and mode_id == "lens_text"
 
     # IMPORTANT pipeline contract:
@@ -950,12 +1177,40 @@ def process_image(
 
     # Per-stage wall-clock timings (ms), surfaced via the translate.perf log
     # line so slow jobs can be diagnosed from the logs alone.
-    stages: dict[str, Any] = {"pipeline_path": "lens_direct"}
+    stages: dict[str, Any] = {
+        "pipeline_path": "lens_direct",
+        # Where erase / bubble detect / background encode run: "process" when
+        # the TP_CPU_PROCESS_WORKERS lane is up, otherwise "thread".
+        "cpu_lane": "process" if cpu_lane.enabled() else "thread",
+    }
+
+    if image_bytes is None:
+        with _stage(stages, "image_read"):
+            with open(str(image_path), "rb") as f:
+                image_bytes = f.read()
+
+    # What an earlier job on this page (another source, another AI setting)
+    # already computed; see backend/jobs/intermediates.py. ``reused`` names
+    # every stage served from it, in the perf line.
+    page = (
+        intermediates_cache.page(image_hash or sha256_hex(image_bytes), target_lang)
+        if mode_id == "lens_text" else None
+    )
+    reused: list[str] = []
+    stages["reused"] = reused
 
-    with _stage(stages, "image_decode"):
-        with Image.open(image_path) as src_img:
-            img = _image_to_rgb(src_img)
-        W, H = img.size
+    _t = time.perf_counter()
+    img = page.image() if page is not None else None
+    if img is not None:
+        reused.append("image")
+    else:
+        with _stage(stages, "image_decode"):
+            with Image.open(io.BytesIO(image_bytes)) as src_img:
+                img = _image_to_rgb(src_img)
+        if page is not None:
+            page.set_image(img)
+    W, H = img.size
+    stages["decode_ms"] = round((time.perf_counter() - _t) * 1000, 1)
     thai_font, latin_font = resolve_font_pair(target_lang)
 
     # =========================================================
@@ -981,19 +1236,32 @@ def process_image(
     _tb_timings: dict = {}
     text_blocks: list = []
     stages["blocks_ms"] = 0.0
+    _page_lens = page.lens() if page is not None and not isinstance(lens_data, dict) else None
     if isinstance(lens_data, dict):
-        # Lens result pre-supplied (CLI replay): no HTTP call to time.
+        # Lens result pre-supplied (CLI replay, queue prefetch): no HTTP call
+        # to time here.
         data: dict = lens_data
+        stages["lens_ms"] = round(float(lens_ms), 1)
+    elif _page_lens is not None:
+        data = _page_lens
         stages["lens_ms"] = 0.0
+        reused.append("lens")
     else:
         _t_p1 = time.perf_counter()
         with _stage(stages, "lens_fetch"):
-            _raw = lens_client.fetch_lens_data(image_path, target_lang, settings.firebase_url)
+            _raw = lens_client.fetch_lens_data(
+                image_path, target_lang, settings.firebase_url,
+                image_bytes=image_bytes, image_hash=image_hash,
+            )
         stages["lens_ms"] = round((time.perf_counter() - _t_p1) * 1000, 1)
         data = _raw if isinstance(_raw, dict) else {}
+    _emit(progress, "lens_fetch", {"lens_ms": stages["lens_ms"], "width": W, "height": H})
 
     if not isinstance(data, dict):
         data = {}
+    if page is not None:
+        page.bind_lens(data)
+    stages["lens_reused"] = "lens" in reused
     stages["blocks"] = len(text_blocks)
     # Split: in batches most of blocks_ms is WAITING for the shared model
     # lock (other jobs' inference), not this job's own inference.
@@ -1019,7 +1287,7 @@ def process_image(
         # Who painted the background, stated rather than implied. A client that
         # asked for "boxes" and got "image" (lens_images, or an older server)
         # can see that immediately instead of discovering it as a missing field.
-        "backgroundMode": "boxes" if client_background else "image",
+        "backgroundMode": "boxes" if client_background else bg_delivery,
     }
 
     # --- lens_images: just hand back the image -----------------------------
@@ -1032,8 +1300,7 @@ def process_image(
                 blob, mime = download(image_url)
                 out["imageDataUri"] = bytes_to_data_uri(blob, mime or "image/jpeg")
         if not out["imageDataUri"]:
-            with open(image_path, "rb") as f:
-                out["imageDataUri"] = bytes_to_data_uri(f.read(), "image/jpeg")
+            out["imageDataUri"] = bytes_to_data_uri(image_bytes, "image/jpeg")
         return out
 
     # --- lens_text: decode trees -------------------------------------------
@@ -1061,6 +1328,10 @@ def process_image(
     }
     dbg("tree.original", tree_stats(original_tree))
     dbg("tree.translated", tree_stats(translated_tree))
+    _emit(progress, "trees_decoded", {
+        "original_paragraphs": len(original_tree.get("paragraphs") or []),
+        "translated_paragraphs": len(translated_tree.get("paragraphs") or []),
+    })
 
     if wants_ai:
         needs_self_blocks, ai_layout_meta = _should_use_onnx_for_ai(
@@ -1121,42 +1392,64 @@ def process_image(
             if (not wants_ai and source_id == "translated")
             else original_tree
         )
-        _t_roi = time.perf_counter()
-        _rois = build_vertical_rois(
-            _roi_tree, W, H, margin_ratio=settings.vertical_roi_margin_ratio
-        )
-        stages["roi_build_ms"] = round((time.perf_counter() - _t_roi) * 1000, 1)
+        _roi_layer = "translated" if _roi_tree is translated_tree else "original"
+        _held_blocks = page.blocks(_roi_layer) if page is not None else None
+        if _held_blocks is not None:
+            # The detector already ran over this page's layer: take its blocks,
+            # what the pass reported, and the stamps it left on the tree.
+            text_blocks, _tb_info, _tb_stamps = _held_blocks
+            apply_block_stamps(_roi_tree, _tb_stamps)
+            stages.update(_tb_info)
+            stages["blocks_ms"] = 0.0
+            stages["blocks_load_ms"] = 0.0
+            stages["blocks_lock_ms"] = 0.0
+            stages["blocks_infer_ms"] = 0.0
+            reused.append("blocks")
+        else:
+            _t_roi = time.perf_counter()
+            _rois = build_vertical_rois(
+                _roi_tree, W, H, margin_ratio=settings.vertical_roi_margin_ratio
+            )
+            stages["roi_build_ms"] = round((time.perf_counter() - _t_roi) * 1000, 1)
 
-        _t = time.perf_counter()
-        # Same first-pass / second-look / recovery as `/v1/groups`. Before this
-        # the server took one detector view and accepted whatever it returned:
-        # 10 of 20 vertical AI pages on 2026-08-15 came back with zero blocks,
-        # which silently became one translation unit per Lens column.
-        text_blocks, _tb_pass = detect_blocks_with_second_look(
-            detect_text_blocks_in_rois, img, _roi_tree, _rois,
-            build_rois=lambda t, w, h: build_vertical_rois(
-                t, w, h, margin_ratio=settings.vertical_roi_margin_ratio
-            ),
-            width=W, height=H, timings=_tb_timings,
-        )
-        stages["blocks_ms"] = round((time.perf_counter() - _t) * 1000, 1)
-        stages["blocks"] = len(text_blocks)
-        stages["blocks_second_look"] = str(_tb_pass.get("reason") or "none")
-        stages["blocks_initial_outcome"] = str(_tb_pass.get("initialOutcome") or "")
-        stages["blocks_stamped"] = int(_tb_pass.get("stamped") or 0)
-        stages["blocks_recovered"] = len(_tb_pass.get("recovered") or [])
-        _geom_fb = _tb_pass.get("geometryFallback") or {}
-        stages["blocks_geometry_fallback"] = bool(_geom_fb.get("applied"))
-        stages["blocks_geometry_groups"] = len(_geom_fb.get("groups") or [])
-        stages["blocks_geometry_ambiguous"] = len(_geom_fb.get("ambiguousPairs") or [])
-        stages["blocks_load_ms"] = float(_tb_timings.get("load_ms", 0.0))
-        stages["blocks_lock_ms"] = float(_tb_timings.get("lock_ms", 0.0))
-        stages["blocks_infer_ms"] = float(_tb_timings.get("infer_ms", 0.0))
-        # Which path actually ran — never leave "ROI on but full page ran"
-        # invisible, or a before/after benchmark means nothing.
-        stages["roi_reason"] = str(_tb_timings.get("roi_reason", ""))
-        stages["roi_candidates"] = int(_tb_timings.get("roi_candidates", 0))
-        stages["roi_calls"] = int(_tb_timings.get("roi_calls", 0))
+            _t = time.perf_counter()
+            # Same first-pass / second-look / recovery as `/v1/groups`. Before
+            # this the server took one detector view and accepted whatever it
+            # returned: 10 of 20 vertical AI pages on 2026-08-15 came back with
+            # zero blocks, which silently became one translation unit per Lens
+            # column.
+            text_blocks, _tb_pass = detect_blocks_with_second_look(
+                detect_text_blocks_in_rois, img, _roi_tree, _rois,
+                build_rois=lambda t, w, h: build_vertical_rois(
+                    t, w, h, margin_ratio=settings.vertical_roi_margin_ratio
+                ),
+                width=W, height=H, timings=_tb_timings,
+            )
+            stages["blocks_ms"] = round((time.perf_counter() - _t) * 1000, 1)
+            _geom_fb = _tb_pass.get("geometryFallback") or {}
+            _tb_info = {
+                "blocks": len(text_blocks),
+                "blocks_second_look": str(_tb_pass.get("reason") or "none"),
+                "blocks_initial_outcome": str(_tb_pass.get("initialOutcome") or ""),
+                "blocks_stamped": int(_tb_pass.get("stamped") or 0),
+                "blocks_recovered": len(_tb_pass.get("recovered") or []),
+                "blocks_geometry_fallback": bool(_geom_fb.get("applied")),
+                "blocks_geometry_groups": len(_geom_fb.get("groups") or []),
+                "blocks_geometry_ambiguous": len(_geom_fb.get("ambiguousPairs") or []),
+                # Which path actually ran — never leave "ROI on but full page
+                # ran" invisible, or a before/after benchmark means nothing.
+                "roi_reason": str(_tb_timings.get("roi_reason", "")),
+                "roi_candidates": int(_tb_timings.get("roi_candidates", 0)),
+                "roi_calls": int(_tb_timings.get("roi_calls", 0)),
+            }
+            stages.update(_tb_info)
+            stages["blocks_load_ms"] = float(_tb_timings.get("load_ms", 0.0))
+            stages["blocks_lock_ms"] = float(_tb_timings.get("lock_ms", 0.0))
+            stages["blocks_infer_ms"] = float(_tb_timings.get("infer_ms", 0.0))
+            # A pass without the model is a fallback answer; the next job
+            # may find it loaded, so only the model's view is kept.
+            if page is not None and textblocks_available():
+                page.set_blocks(_roi_layer, text_blocks, _tb_info, block_stamps(_roi_tree))
     elif wants_ai:
         text_blocks = []
         stages["blocks_ms"] = 0.0
@@ -1184,7 +1477,14 @@ def process_image(
                 # is the point of the mode — the boxes go out instead.
                 out["eraseBoxes"] = erase_boxes_mod.build(original_span_tokens)
             elif settings.lens_direct_erase and original_span_tokens:
-                base_img = erase_text_with_boxes(img, original_span_tokens)
+                _held_erased = page.erased() if page is not None else None
+                if _held_erased is not None:
+                    base_img = _held_erased
+                    reused.append("erase")
+                else:
+                    base_img = cpu_lane.erase(img, original_span_tokens, timings=stages)
+                    if page is not None:
+                        page.set_erased(base_img)
             stages["erase_ms"] = round((time.perf_counter() - _t) * 1000, 1)
             stages["bubble_ms"] = 0.0
 
@@ -1197,8 +1497,9 @@ def process_image(
             # rather than left to be discovered: it is the one quality
             # difference between the two background modes.
             stages["text_light_source"] = "original" if client_background else "erased"
-            _annotate_text_light(original_tree, base_img)
-            _annotate_text_light(translated_tree, base_img)
+            colors = ColorSampler(base_img)
+            _annotate_text_light(original_tree, colors)
+            _annotate_text_light(translated_tree, colors)
 
             # The canonical document: paragraphs, text and the geometry needed
             # to draw them, with none of Lens's protobuf field names. This is
@@ -1215,6 +1516,7 @@ def process_image(
                 )
         finally:
             _CPU_GATE.release()
+        _emit(progress, "erase_done", {"erase_ms": stages["erase_ms"]})
 
         # Optional fast AI path: translate text, then patch AI wording into
         # Lens's own template geometry.  This avoids ONNX entirely for
@@ -1272,10 +1574,12 @@ def process_image(
                 _run_ai_layer,
                 out, ai_original_tree, ai_translated_tree, ai_cfg, target_lang, W, H, thai_font, latin_font,
                 base_img=base_img,
+                colors=colors,
                 vision_img=img,
                 capture_request=capture_ai_request,
                 use_lens_template=True,
                 layout_meta=ai_layout_meta,
+                progress=progress,
             )
 
         _t = time.perf_counter()
@@ -1297,25 +1601,38 @@ def process_image(
                 stages["png_ms"] = 0.0
             elif settings.lens_direct_png:
                 _t = time.perf_counter()
-                out["imageDataUri"] = _encode_bg_data_uri(base_img)
+                # With the erase switched off this is the untouched page, which
+                # is not what the page's stored background means.
+                _bg_page = page if (settings.lens_direct_erase or not original_span_tokens) else None
+                _publish_page_background(
+                    out, _bg_page, img, base_img, original_span_tokens, reused, stages,
+                    delivery=bg_delivery,
+                )
                 stages["png_ms"] = round((time.perf_counter() - _t) * 1000, 1)
             else:
                 stages["png_ms"] = 0.0
         finally:
             _CPU_GATE.release()
+        _emit(progress, "html_ready", {
+            "render_ms": stages["render_ms"],
+            "overlay": _overlay_snapshot(out, ai_pending=_f_ai is not None),
+        })
 
-        if _f_ai is not None:
+        def _join_ai() -> None:
             try:
                 future_result_with_stage(_f_ai, "provider_request")
             finally:
                 _ai_executor.shutdown(wait=False)  # type: ignore[union-attr]
             stages["ai_ms"] = round((time.perf_counter() - _t_ai_submit) * 1000, 1)
+            _coalesce_stages(out, stages)
+            _emit(progress, "ai_answered", {"ai_ms": stages["ai_ms"]})
             # The background was encoded above while the model was still
             # answering, so this runs after the join and re-encodes only when
             # the answer actually came back short.
             _restore_unanswered_paragraphs(
                 out, original_tree, img, base_img,
                 client_background=client_background, stages=stages,
+                delivery=bg_delivery,
             )
             # The AI layer's own per-line geometry, now that it exists. Without
             # it the client renderer refuses the "ai" source on any page with a
@@ -1325,8 +1642,13 @@ def process_image(
                 out.get("lensDocument"), (out.get("Ai") or {}).get("aiTree")
             )
             stages["doc_ai_paras"] = _attached
-        else:
+
+        if _f_ai is None:
             stages.setdefault("ai_ms", 0.0)
+        elif defer_ai is not None and not _f_ai.done():
+            return _defer_ai_layer(out, stages, _ai_executor, _join_ai, defer_ai)  # type: ignore[arg-type]
+        else:
+            _join_ai()
         return out
 
     # ONNX already done in Phase 1 — annotate trees now.
@@ -1370,18 +1692,21 @@ def process_image(
     _CPU_GATE.acquire()
     stages["gate_wait_ms"] = round((time.perf_counter() - _t) * 1000, 1)
     try:
-        _t = time.perf_counter()
-        if original_span_tokens:
-            base_img = erase_text_with_boxes(img, original_span_tokens)
+        _held_bubbles = page.bubbles() if page is not None else None
+        _held_erased = page.erased() if _held_bubbles is not None else None
+        if _held_bubbles is not None and _held_erased is not None:
+            base_img, bubble_map = _held_erased, _held_bubbles
+            stages["erase_ms"] = 0.0
+            stages["bubble_ms"] = 0.0
+            reused.extend(("erase", "bubbles"))
         else:
-            base_img = img
-        stages["erase_ms"] = round((time.perf_counter() - _t) * 1000, 1)
-
-        _t = time.perf_counter()
-        bubble_map = detect_bubble_bounds_combined(
-            base_img, original_tree.get("paragraphs") or [], W, H
-        )
-        stages["bubble_ms"] = round((time.perf_counter() - _t) * 1000, 1)
+            base_img, bubble_map = cpu_lane.erase_and_detect_bubbles(
+                img, original_span_tokens, original_tree.get("paragraphs") or [], W, H,
+                timings=stages,
+            )
+            if page is not None:
+                page.set_erased(base_img)
+                page.set_bubbles(bubble_map)
         attach_bubble_bounds(original_tree, bubble_map)
         attach_bubble_bounds(translated_tree, bubble_map)
         dbg("bubble.detected", {"paragraphs": len(bubble_map), "hits": sum(1 for v in bubble_map.values() if v)})
@@ -1480,12 +1805,14 @@ def process_image(
 
         # Per-paragraph background luminance → text colour flag, sampled on
         # the erased image (original glyphs removed). Cheap: ≤24x24 median.
-        _annotate_text_light(original_tree, base_img)
-        _annotate_text_light(translated_tree, base_img)
+        colors = ColorSampler(base_img)
+        _annotate_text_light(original_tree, colors)
+        _annotate_text_light(translated_tree, colors)
         if translated_render_tree is not translated_tree:
-            _annotate_text_light(translated_render_tree, base_img)
+            _annotate_text_light(translated_render_tree, colors)
     finally:
         _CPU_GATE.release()
+    _emit(progress, "erase_done", {"erase_ms": stages.get("erase_ms", 0.0)})
 
     # =========================================================
     # Phase 2 — AI call || HTML render + PNG encode (independent)
@@ -1519,15 +1846,23 @@ def process_image(
     _ai_executor: concurrent.futures.ThreadPoolExecutor | None = None
     _t_ai_submit = time.perf_counter()
     if _run_ai:
+        # A deferred layer outlives the first response, which serialises these
+        # trees; the AI thread writes font sizes into the ones it is given.
+        _ai_trees = (
+            (copy.deepcopy(original_tree), copy.deepcopy(translated_tree))
+            if defer_ai is not None else (original_tree, translated_tree)
+        )
         _ai_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
         _f_ai = _ai_executor.submit(
             _run_ai_layer,
-            out, original_tree, translated_tree, ai_cfg, target_lang, W, H, thai_font, latin_font,
+            out, *_ai_trees, ai_cfg, target_lang, W, H, thai_font, latin_font,
             base_img=base_img,
+            colors=colors,
             vision_img=img,
             capture_request=capture_ai_request,
             use_lens_template=False,
             layout_meta=ai_layout_meta,
+            progress=progress,
         )
 
     # HTML render + PNG encode in the main thread while AI runs above.
@@ -1578,29 +1913,43 @@ def process_image(
             stages["png_ms"] = 0.0
         else:
             _t = time.perf_counter()
-            out["imageDataUri"] = _encode_bg_data_uri(base_img)
+            _publish_page_background(
+                out, page, img, base_img, original_span_tokens, reused, stages,
+                delivery=bg_delivery,
+            )
             stages["png_ms"] = round((time.perf_counter() - _t) * 1000, 1)
     finally:
         _CPU_GATE.release()
+    _emit(progress, "html_ready", {
+        "render_ms": stages["render_ms"],
+        "overlay": _overlay_snapshot(out, ai_pending=_f_ai is not None),
+    })
 
-    # Wait for AI (will be instant if render+PNG took longer than AI).
-    if _f_ai is not None:
-        try:
-            future_result_with_stage(_f_ai, "provider_request")
-        finally:
-            _ai_executor.shutdown(wait=False)  # type: ignore[union-attr]
-        stages["ai_ms"] = round((time.perf_counter() - _t_ai_submit) * 1000, 1)
-        _restore_unanswered_paragraphs(
-            out, original_tree, img, base_img,
-            client_background=client_background, stages=stages,
-        )
+    def _join_ai() -> None:
+        # Wait for AI (will be instant if render+PNG took longer than AI).
+        if _f_ai is not None:
+            try:
+                future_result_with_stage(_f_ai, "provider_request")
+            finally:
+                _ai_executor.shutdown(wait=False)  # type: ignore[union-attr]
+            stages["ai_ms"] = round((time.perf_counter() - _t_ai_submit) * 1000, 1)
+            _coalesce_stages(out, stages)
+            _emit(progress, "ai_answered", {"ai_ms": stages["ai_ms"]})
+            _restore_unanswered_paragraphs(
+                out, original_tree, img, base_img,
+                client_background=client_background, stages=stages,
+                delivery=bg_delivery,
+            )
 
-    # Re-group the AI tree after patching (AI text may change para boundaries).
-    ai_tree = (out.get("Ai") or {}).get("aiTree")
-    if isinstance(ai_tree, dict):
-        group_paragraphs_into_bubbles(ai_tree, W, H)
-        dbg("groups.ai", {"bubble_groups": len(ai_tree.get("bubble_groups") or [])})
+        # Re-group the AI tree after patching (AI text may change para boundaries).
+        ai_tree = (out.get("Ai") or {}).get("aiTree")
+        if isinstance(ai_tree, dict):
+            group_paragraphs_into_bubbles(ai_tree, W, H)
+            dbg("groups.ai", {"bubble_groups": len(ai_tree.get("bubble_groups") or [])})
 
+    if _f_ai is not None and defer_ai is not None and not _f_ai.done():
+        return _defer_ai_layer(out, stages, _ai_executor, _join_ai, defer_ai)  # type: ignore[arg-type]
+    _join_ai()
     return out
 
 
@@ -1651,6 +2000,7 @@ def _build_ai_config(payload: dict, mode: str, source: str) -> AiConfig | None:
         glossary=ai.get("glossary") if isinstance(ai.get("glossary"), list) else [],
         characters=ai.get("characters") if isinstance(ai.get("characters"), list) else [],
         char_memory=bool(ai.get("char_memory", True)),
+        unit_memory=bool(ai.get("unit_memory", False)),
         # False / True / "always" / "auto" — keep the mode string intact.
         send_image=(
             ai.get("send_image").strip().lower()
@@ -1664,6 +2014,7 @@ def _build_ai_config(payload: dict, mode: str, source: str) -> AiConfig | None:
         speakers=ai.get("speakers") if isinstance(ai.get("speakers"), dict) else {},
         prev_context=ai.get("prev_context") if isinstance(ai.get("prev_context"), list) else [],
         context_frozen=bool(ai.get("context_frozen", False)),
+        batch_id=cancellation.batch_id_of(payload),
     )
 
 
@@ -1692,8 +2043,125 @@ def _result_worth_caching(mode: str, source: str, out: dict[str, Any]) -> bool:
     return has_overlay and has_text
 
 
-def process_payload(payload: dict) -> dict[str, Any]:
-    """Process one queued job payload end to end (with result caching)."""
+def _replayable(cached: dict[str, Any] | None) -> dict[str, Any] | None:
+    """``cached``, unless it names a background artifact that is gone.
+
+    The file behind ``backgroundArtifact`` lives in a bounded store with its
+    own TTL and dies with the process; a result pointing at a missing one
+    would answer 410 on the client's follow-up fetch, so it is a miss
+    instead. The rerun is cheap: the page's intermediates still hold the
+    encoded background.
+    """
+    artifact = (cached or {}).get("backgroundArtifact")
+    if isinstance(artifact, dict) and not backgrounds.touch(str(artifact.get("id") or "")):
+        return None
+    return cached
+
+
+def _result_cache_for(
+    img_hash: str, lang: str, mode: str, source: str,
+    ai_cfg: AiConfig | None, layout: dict[str, bool],
+) -> tuple[str, Any]:
+    """``(key, memory tier)`` a finished result of this job is cached under."""
+    # Cache direct Lens results too. This avoids repeating the Lens round-trip
+    # after extension retries/reconnects. AI still gets its separate cache
+    # because prompt/model/provider affect the result.
+    cache_source = "ai" if source == "ai" else source or "translated"
+    # The relayout switches change the rendered geometry, so they MUST be
+    # part of the key — otherwise flipping a toggle would serve the old
+    # layout back from cache and look like the switch did nothing.
+    cache_key = cache_mod.build_cache_key(
+        img_hash, lang, mode, cache_source, ai_cfg, layout=layout
+    )
+    return cache_key, cache_mod.ai_result_cache if source == "ai" else cache_mod.result_cache
+
+
+@dataclass(frozen=True)
+class PrefetchedLens:
+    """A Lens response awaited on the event loop, for :func:`process_payload`."""
+
+    image_bytes: bytes
+    image_hash: str
+    data: dict[str, Any]
+    lens_ms: float
+
+
+def _prefetch_target(payload: dict) -> tuple[bytes, str, str] | None:
+    """``(bytes, sha256, lang)`` to send Lens ahead of the job, or None.
+
+    Only for an inline image (a download stays with the pipeline, which owns
+    its errors and referer) and only when neither the result nor the page's
+    Lens response is cached, since then the job never reaches Lens at all. Anything unexpected returns None and
+    the pipeline does what it always did.
+    """
+    mode = payload.get("mode") or "lens_images"
+    src = (payload.get("src") or "").strip()
+    if mode not in SUPPORTED_MODES or not settings.firebase_url:
+        return None
+    if not payload.get("imageDataUri") and not src.startswith("data:"):
+        return None
+    try:
+        img_bytes, _ = _extract_image_bytes(payload)
+        if not img_bytes:
+            return None
+        lang = payload.get("lang") or "en"
+        source = str(payload.get("source") or "").strip().lower() or "translated"
+        img_hash = sha256_hex(img_bytes)
+        cache_key, cache = _result_cache_for(
+            img_hash, lang, mode, source, _build_ai_config(payload, mode, source),
+            _layout_options(payload),
+        )
+        if cache.get(cache_key) is not None or cache_mod.result_disk_cache.contains(cache_key):
+            return None
+        # Another source of this page already fetched it: the pipeline takes
+        # the response from the page's intermediates without a round trip.
+        if intermediates_cache.peek_lens(img_hash, normalize_lang(lang)):
+            return None
+    except Exception:  # noqa: BLE001 - the pipeline reports it properly
+        return None
+    return img_bytes, img_hash, normalize_lang(lang)
+
+
+async def prefetch_lens(payload: dict) -> PrefetchedLens | None:
+    """Await a queued job's Lens round trip before it takes a worker thread.
+
+    The 2-3 s Lens wait is most of a direct job and none of its CPU, so the
+    queue awaits it here on the async client and the thread that follows
+    only decodes, erases and renders. The image decode and cache check are
+    short and go to a thread. A Lens failure is raised stamped
+    ``lens_fetch``, exactly as the pipeline would have.
+    """
+    target = await asyncio.to_thread(_prefetch_target, payload)
+    if target is None:
+        return None
+    img_bytes, img_hash, lang = target
+    t0 = time.perf_counter()
+    try:
+        data = await lens_client.fetch_lens_data_async(
+            img_bytes, lang, settings.firebase_url, image_hash=img_hash,
+        )
+    except BaseException as exc:
+        if getattr(exc, "tp_stage", None) is None:
+            try:
+                exc.tp_stage = "lens_fetch"  # type: ignore[attr-defined]
+            except Exception:
+                pass
+        raise
+    return PrefetchedLens(
+        img_bytes, img_hash, data if isinstance(data, dict) else {},
+        (time.perf_counter() - t0) * 1000,
+    )
+
+
+def process_payload(
+    payload: dict, *, progress: Progress | None = None, lens: PrefetchedLens | None = None,
+) -> dict[str, Any]:
+    """Process one queued job payload end to end (with result caching).
+
+    ``progress`` is forwarded to :func:`process_image`; a cache hit reports
+    no stages, it simply returns. ``lens`` is the :func:`prefetch_lens`
+    result for this payload, when the caller awaited it first.
+    """
     t_start = time.perf_counter()
     mode = payload.get("mode") or "lens_images"
     lang = payload.get("lang") or "en"
@@ -1702,7 +2170,7 @@ def process_payload(payload: dict) -> dict[str, Any]:
     # The download / data-URI decode is the first thing that can fail, and it
     # fails before any stage counter inside process_image exists.
     try:
-        img_bytes, mime = _extract_image_bytes(payload)
+        img_bytes, mime = (lens.image_bytes, "") if lens is not None else _extract_image_bytes(payload)
     except BaseException as exc:
         if getattr(exc, "tp_stage", None) is None:
             try:
@@ -1718,45 +2186,47 @@ def process_payload(payload: dict) -> dict[str, Any]:
     layout = _layout_options(payload)
 
     # --- cache lookup ------------------------------------------------------
-    img_hash = sha256_hex(img_bytes)
+    img_hash = lens.image_hash if lens is not None else sha256_hex(img_bytes)
     cache_key = ""
     cache_used = False
     if mode in ("lens_images", "lens_text") and img_hash:
-        # Cache direct Lens results too. This avoids repeating the Lens round-trip
-        # after extension retries/reconnects. AI still gets its separate cache
-        # because prompt/model/provider affect the result.
-        cache_source = "ai" if source == "ai" else source or "translated"
-        # The relayout switches change the rendered geometry, so they MUST be
-        # part of the key — otherwise flipping a toggle would serve the old
-        # layout back from cache and look like the switch did nothing.
-        cache_key = cache_mod.build_cache_key(
-            img_hash, lang, mode, cache_source, ai_cfg, layout=layout
-        )
-        cache = cache_mod.ai_result_cache if source == "ai" else cache_mod.result_cache
-        cached = cache.get(cache_key)
+        cache_key, cache = _result_cache_for(img_hash, lang, mode, source, ai_cfg, layout)
+        cached = _replayable(cache.get(cache_key))
+        cache_tier = "hit"
+        disk_ms = 0.0
+        if not cached:
+            # Memory miss: the persistent tier still has everything finished
+            # before the last restart. A hit is promoted so the next repeat
+            # does not pay the decompress again.
+            _t = time.perf_counter()
+            cached = _replayable(cache_mod.result_disk_cache.get(cache_key))
+            disk_ms = round((time.perf_counter() - _t) * 1000, 1)
+            if cached:
+                cache_tier = "disk_hit"
+                cache.set(cache_key, cached)
         if cached:
             cached["perf"] = {
-                "cache": "hit",
+                "cache": cache_tier,
                 "total_ms": round((time.perf_counter() - t_start) * 1000, 1),
                 "img_ms": round((t_img - t_start) * 1000, 1),
             }
+            if cache_tier == "disk_hit":
+                cached["perf"]["disk_ms"] = disk_ms
             return cached
         cache_used = True
 
-    # --- run the pipeline against a temp file ------------------------------
-    suffix = ".png" if (mime or "").endswith("png") else ".jpg"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as f:
-        f.write(img_bytes)
-        tmp_path = f.name
-    t_tmp = time.perf_counter()
-    try:
-        out = process_image(tmp_path, lang, mode, ai_cfg, source=source, layout_opts=layout)
+    # --- run the pipeline on the bytes already in memory -------------------
+    # This used to write a NamedTemporaryFile that process_image re-opened and
+    # Lens re-read: a disk write, two reads and an unlink per job, for bytes
+    # that were already here. `tmp_ms` stays in perf, now always 0, so
+    # dashboards comparing before/after keep their column.
+    def _finish(out: dict[str, Any]) -> dict[str, Any]:
         stages = out.pop("perfStages", {}) or {}
         out["perf"] = {
             "cache": "miss" if cache_used else "off",
             "total_ms": round((time.perf_counter() - t_start) * 1000, 1),
             "img_ms": round((t_img - t_start) * 1000, 1),
-            "tmp_ms": round((t_tmp - t_img) * 1000, 1),
+            "tmp_ms": 0.0,
             **stages,
         }
 
@@ -1783,22 +2253,90 @@ def process_payload(payload: dict) -> dict[str, Any]:
                     "ai_characters_out": len(ai_meta.get("characters") or []),
                     "ai_series_state_chars": len(str(getattr(ai_cfg, "series_state", "") or "")),
                     "ai_flow": str(ai_meta.get("ai_flow") or ""),
+                    # Connections the provider call had to open. Pooled
+                    # clients make this 0 on every page after the first.
+                    "ai_handshakes": int(ai_meta.get("http_handshakes") or 0),
                 }
             )
-        # NO-SILENT-FALLBACK: brief pass-2 jobs ask to reuse pass-1 Lens data
-        # (reuse_lens). Server-side reuse is not implemented yet, so the second
-        # OCR round-trip must be VISIBLE in translate.perf instead of silent.
-        if payload.get("reuse_lens"):
-            out["perf"]["lens_reused"] = False
+        # `lens_reused` (from the stages) says whether this job's Lens data came
+        # from the page's intermediates. Brief pass-2 jobs ask for exactly that
+        # (reuse_lens); a second OCR round trip stays visible here.
+        if lens is not None:
+            out["perf"]["lens_prefetched"] = True
         # One compact perf line per processed job (cache hits don't get here),
         # so slow stages are visible straight from the production logs.
         event("translate.perf", {"mode": mode, "lang": lang, "source": source, **out["perf"]})
         if cache_used and cache_key and _result_worth_caching(mode, source, out):
             cache = cache_mod.ai_result_cache if source == "ai" else cache_mod.result_cache
             cache.set(cache_key, out)
+            # Encoding the result for disk is the slow half; it runs behind
+            # the response on its own snapshot.
+            cache_mod.result_disk_cache.set_behind(cache_key, cache_mod.stored_form(out))
         return out
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+
+    prefetched: dict[str, Any] = (
+        {"lens_data": lens.data, "lens_ms": lens.lens_ms} if lens is not None else {}
+    )
+    if not _ai_is_deferred(payload) or ai_cfg is None:
+        return _finish(process_image(
+            None, lang, mode, ai_cfg, source=source, layout_opts=layout,
+            image_bytes=img_bytes, image_hash=img_hash, progress=progress, **prefetched,
+        ))
+
+    # --- deferred AI layer ---------------------------------------------------
+    # Answer with the Lens layers as soon as they are rendered; the AI layer
+    # follows as a patch behind an `aiPending` token. The completed result is
+    # logged and cached exactly as an inline one would be, when it completes.
+    finished: dict[str, Any] = {}
+
+    def _complete(final: dict[str, Any]) -> dict[str, Any]:
+        finished["result"] = _finish(final)
+        return _ai_patch(finished["result"])
+
+    out = process_image(
+        None, lang, mode, ai_cfg, source=source, layout_opts=layout,
+        image_bytes=img_bytes, image_hash=img_hash, progress=progress,
+        defer_ai=_complete, **prefetched,
+    )
+    ai_future = out.pop("aiFuture", None)
+    if ai_future is None:
+        # The provider had already answered by the time the page was rendered.
+        return _finish(out)
+    try:
+        token, ttl = ai_pending_mod.ai_pending.put(ai_future)
+    except ai_pending_mod.PendingError as exc:
+        # No room to park it: wait, and answer the way an inline job does.
+        event("ai.deferred.unavailable", {"reason": exc.code}, ok=False)
+        ai_future.result()
+        return finished["result"]
+    stages = out.pop("perfStages", {}) or {}
+    out["perf"] = {
+        "cache": "miss" if cache_used else "off",
+        "first_ms": round((time.perf_counter() - t_start) * 1000, 1),
+        "img_ms": round((t_img - t_start) * 1000, 1),
+        **stages,
+    }
+    out["aiPending"] = {"token": token, "ttlSec": ttl}
+    return out
+
+
+def _ai_patch(result: dict[str, Any]) -> dict[str, Any]:
+    """The part of a completed result a deferred job did not send first.
+
+    The AI layer, the finished perf record, and — only when unanswered
+    paragraphs had their source pixels put back — the background again. A
+    client applies it by assigning these keys over the first response.
+    """
+    perf = result.get("perf") or {}
+    patch: dict[str, Any] = {
+        "Ai": result.get("Ai") or {},
+        "AiTextFull": result.get("AiTextFull") or "",
+        "perf": perf,
+    }
+    if result.get("lensDocument"):
+        patch["lensDocument"] = result["lensDocument"]
+    if int(perf.get("ai_partial_restored_paragraphs") or 0):
+        for key in ("imageDataUri", "backgroundArtifact", "eraseBoxes", "erasePatches"):
+            if key in result:
+                patch[key] = result[key]
+    return patch
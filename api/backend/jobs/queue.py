@@ -17,14 +17,15 @@ automatic split.
 from __future__ import annotations
 
 import asyncio
+import functools
 import re
 import time
 import traceback
 import uuid
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
 from backend.config import settings
-from backend.log import dbg, event
+from backend.log import aevent, dbg, event
 from backend.ai.failure_reason import is_rate_limited as _ai_is_rate_limited
 from backend.ai.failure_reason import retry_after_sec as _ai_retry_after_sec
 from backend.ai.rategate import rate_gate, RateGateTimeout, RateGateRejected
@@ -133,8 +134,17 @@ class JobQueue:
     DIRECT = "direct"
     AI = "ai"
 
-    def __init__(self, processor: Callable[[dict], dict]) -> None:
+    def __init__(
+        self,
+        processor: Callable[..., dict],
+        *,
+        lens_prefetch: Callable[[dict], Awaitable[Any]] | None = None,
+    ) -> None:
+        # ``lens_prefetch(payload)`` is awaited before the job takes a thread;
+        # whatever it returns (None to skip) reaches ``processor`` as ``lens=``.
+        # It is how a job waits on Google without occupying a worker thread.
         self._processor = processor
+        self._lens_prefetch = lens_prefetch
         self._jobs: dict[str, Job] = {}
         self._idempotency: dict[str, str] = {}
         self._conditions: dict[str, asyncio.Condition] = {}
@@ -337,7 +347,7 @@ class JobQueue:
                  "retry_after_ms": int(retry_after * 1000),
                  "ts": time.time(), "queue_kind": self.AI},
             )
-            event("translate.ratelimited", {"job_id": job_id, "provider": provider,
+            await aevent("translate.ratelimited", {"job_id": job_id, "provider": provider,
                                             "retry_after_ms": int(retry_after * 1000),
                                             "error": str(exc)[:160]}, ok=False)
             _trace_ai_terminal(payload, job_id, "rate_gate", exc=exc, attempts=0)
@@ -448,7 +458,13 @@ class JobQueue:
             subs.discard(q)
 
     async def run_inline(self, payload: dict) -> dict:
-        return await asyncio.to_thread(self._processor, payload)
+        return await self._run(payload)
+
+    async def _run(self, payload: dict) -> dict:
+        lens = await self._lens_prefetch(payload) if self._lens_prefetch is not None else None
+        if lens is None:
+            return await asyncio.to_thread(self._processor, payload)
+        return await asyncio.to_thread(functools.partial(self._processor, payload, lens=lens))
 
     # --- public metadata helpers ------------------------------------------
     def public_record(self, job_id: str) -> Job:
@@ -598,7 +614,7 @@ class JobQueue:
                     continue
                 gate_wait_ms = round((time.perf_counter() - _t_gate) * 1000, 1)
                 if not granted:
-                    event(
+                    await aevent(
                         "translate.gatewait",
                         {"job_id": job_id, "ai_gate_wait_ms": gate_wait_ms, "granted": False},
                         ok=False,
@@ -621,7 +637,7 @@ class JobQueue:
                 prev = dict(self._jobs.get(job_id) or {})
                 await self._set_job(job_id, {**prev, "status": "running", "ts": time.time(), "queue_kind": kind})
                 result = await asyncio.wait_for(
-                    asyncio.to_thread(self._processor, payload),
+                    self._run(payload),
                     timeout=max(10.0, settings.job_run_timeout_sec),
                 )
                 # Surface both waits in the result the client receives, so the
@@ -647,7 +663,7 @@ class JobQueue:
                     job_id,
                     {**prev, "status": "error", "result": "job timed out", "ts": time.time(), "queue_kind": kind},
                 )
-                event(
+                await aevent(
                     "translate.error",
                     {**summary, "dt_ms": round((time.perf_counter() - t0) * 1000, 1), "error": "job timed out"},
                     ok=False,
@@ -662,7 +678,7 @@ class JobQueue:
             except Exception as e:  # noqa: BLE001
                 tb = traceback.format_exc()
                 dbg("jobs.error", {"job_id": job_id, "error": str(e), "traceback": tb})
-                event(
+                await aevent(
                     "translate.error",
                     {**summary, "dt_ms": round((time.perf_counter() - t0) * 1000, 1), "error": str(e)[:240]},
                     ok=False,
@@ -10,8 +10,9 @@ Two-step flow:
 
 from __future__ import annotations
 
+import asyncio
 import base64
-import copy
+import concurrent.futures
 import hashlib
 import json
 import os
@@ -23,7 +24,7 @@ from urllib.parse import parse_qs, urlencode, urlparse
 
 import httpx
 
-from backend.lens import cookie
+from backend.lens import cookie, store as lens_store
 from backend import trace
 
 _UPLOAD_URL = "https://lens.google.com/v3/upload"
@@ -74,7 +75,6 @@ def _session(ck: dict) -> httpx.Client:
     with _client_lock:
         if _client is not None and _client_jar_key == key:
             return _client
-        stale = _client
         _client = httpx.Client(
             cookies=ck,
             headers=_REQUEST_HEADERS,
@@ -83,13 +83,8 @@ def _session(ck: dict) -> httpx.Client:
             limits=_limits,
         )
         _client_jar_key = key
-    if stale is not None:
-        # Outside the lock: closing drains sockets and must not block a request
-        # that is only waiting to read the new client.
-        try:
-            stale.close()
-        except Exception:  # noqa: BLE001 - a client we are discarding anyway
-            pass
+    # The replaced client is not closed: other workers may be mid-request on
+    # it. It is released, sockets included, when the last of them returns.
     return _client
 
 
@@ -101,6 +96,44 @@ def close_session() -> None:
     if stale is not None:
         stale.close()
 
+
+# The async twin. An AsyncClient belongs to the event loop that opened its
+# connections, so it is keyed by loop as well as jar; in the server there is
+# one loop and, as above, one jar, so this is one client too.
+_aclient: httpx.AsyncClient | None = None
+_aclient_key: tuple[int, str] = (0, "")
+
+
+async def _async_session(ck: dict) -> httpx.AsyncClient:
+    """The pooled async client for this loop and cookie jar.
+
+    Only ever touched from the loop itself, so no lock: nothing awaits
+    between the check and the swap. The replaced client is not closed:
+    requests already awaiting on it finish on it, and it is released when
+    the last of them lets go.
+    """
+    global _aclient, _aclient_key
+    key = (id(asyncio.get_running_loop()), _jar_key(ck))
+    if _aclient is not None and _aclient_key == key:
+        return _aclient
+    _aclient = httpx.AsyncClient(
+        cookies=ck,
+        headers=_REQUEST_HEADERS,
+        follow_redirects=False,
+        timeout=60,
+        limits=_limits,
+    )
+    _aclient_key = key
+    return _aclient
+
+
+async def aclose_session() -> None:
+    """Drop the pooled async client. Call from the loop that used it."""
+    global _aclient, _aclient_key
+    stale, _aclient, _aclient_key = _aclient, None, (0, "")
+    if stale is not None:
+        await stale.aclose()
+
 # --- Lens response cache (in-process, TTL LRU) -------------------------------
 # Keyed by (sha256(image), lang). Switching source (original / translated /
 # AI) re-sends the SAME image+lang, so the ~2 s Google roundtrip (measured
@@ -108,6 +141,12 @@ def close_session() -> None:
 # only — the HTTP requests themselves are untouched.
 # Sized for translated->AI passes over large batches (100+ images); entries
 # are Lens JSON dicts, typically tens of KB each. Override via env if needed.
+#
+# Entries are shared, not copied: a hit returns a new top-level dict over the
+# cached nested objects, the same read-only contract as
+# ``backend.jobs.cache.LruCache``. Every consumer (the pipeline, /v1/lens/raw,
+# the CLI's replay) only reads a Lens response, so the deep copy each way was
+# paying for protection nobody needed.
 _LENS_CACHE_MAX = max(8, int(os.environ.get("TP_LENS_CACHE_MAX", "256")))
 _LENS_CACHE_TTL_SEC = 600.0
 _lens_cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
@@ -115,10 +154,10 @@ _lens_cache_lock = threading.Lock()
 
 
 class _Flight:
+    # A concurrent Future, not an Event: a thread waits on .result() and a
+    # coroutine awaits it wrapped, so the sync and async paths share flights.
     def __init__(self) -> None:
-        self.done = threading.Event()
-        self.data: dict[str, Any] | None = None
-        self.error: BaseException | None = None
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
 
 
 _FLIGHT_MAX = max(1, int(os.environ.get("TP_LENS_SINGLEFLIGHT_MAX", "128")))
@@ -143,13 +182,12 @@ def _lens_cache_get(key: str) -> dict[str, Any] | None:
             _lens_cache.pop(key, None)
             return None
         _lens_cache.move_to_end(key)
-        # Deep-copy out so callers can never mutate the cached response.
-        return copy.deepcopy(data)
+    return dict(data)
 
 
 def _lens_cache_set(key: str, data: dict[str, Any]) -> None:
     with _lens_cache_lock:
-        _lens_cache[key] = (time.time(), copy.deepcopy(data))
+        _lens_cache[key] = (time.time(), data)
         _lens_cache.move_to_end(key)
         while len(_lens_cache) > _LENS_CACHE_MAX:
             _lens_cache.popitem(last=False)
@@ -209,14 +247,27 @@ def _fetch_lens_once(img_bytes: bytes, lang: str, ck: dict) -> dict[str, Any]:
     """
     c = _session(ck)
     r = c.post(_UPLOAD_URL, files={"encoded_image": ("file.jpg", img_bytes, "image/jpeg")})
-    if r.status_code not in (302, 303):
+    translated_response = c.get(_translated_url_of(r, lang))
+    return _parse_result(translated_response)
+
+
+async def _fetch_lens_once_async(img_bytes: bytes, lang: str, ck: dict) -> dict[str, Any]:
+    """:func:`_fetch_lens_once` on the pooled async client."""
+    c = await _async_session(ck)
+    r = await c.post(_UPLOAD_URL, files={"encoded_image": ("file.jpg", img_bytes, "image/jpeg")})
+    translated_response = await c.get(_translated_url_of(r, lang))
+    return _parse_result(translated_response)
+
+
+def _translated_url_of(upload: httpx.Response, lang: str) -> str:
+    if upload.status_code not in (302, 303):
         # Never include the raw upstream body: gateways can echo request data
         # and HTML error pages only make the public/log message noisy.
-        raise RuntimeError(f"Lens HTTP {r.status_code} (operation=upload)")
-    redirect = r.headers["location"]
+        raise RuntimeError(f"Lens HTTP {upload.status_code} (operation=upload)")
+    return _to_translated_url(upload.headers["location"], lang)
+
 
-    translated_url = _to_translated_url(redirect, lang)
-    translated_response = c.get(translated_url)
+def _parse_result(translated_response: httpx.Response) -> dict[str, Any]:
     if not translated_response.is_success:
         raise RuntimeError(
             f"Lens HTTP {translated_response.status_code} (operation=result)"
@@ -229,90 +280,204 @@ def _fetch_lens_once(img_bytes: bytes, lang: str, ck: dict) -> dict[str, Any]:
     return json.loads(body)
 
 
-def fetch_lens_data(image_path: str, lang: str, firebase_url: str | None = None) -> dict[str, Any]:
-    """Upload ``image_path`` to Lens and return the parsed translation JSON.
+def fetch_lens_data(
+    image_path: str | None,
+    lang: str,
+    firebase_url: str | None = None,
+    *,
+    image_bytes: bytes | None = None,
+    image_hash: str | None = None,
+) -> dict[str, Any]:
+    """Upload the image to Lens and return the parsed translation JSON.
+
+    The image is ``image_bytes`` when given (the server already holds the
+    upload in memory), otherwise the file at ``image_path`` (the CLI).
+    ``image_hash`` is its sha256 hex when the caller has already computed it,
+    so a page is not hashed twice on its way through the pipeline.
 
     Repeats of the same image+lang within the cache TTL are served from the
-    in-process cache (no Google roundtrip). A stale-cookie redirect (missing
-    ``gsessionid``) triggers ONE forced cookie refresh + retry instead of
-    failing the job.
+    in-process cache (no Google roundtrip), then from the shared
+    :mod:`backend.lens.store` tier, which also makes concurrent fetches of one
+    image from several worker processes wait for a single upload. A
+    stale-cookie redirect (missing ``gsessionid``) triggers ONE forced cookie
+    refresh + retry instead of failing the job.
     """
-    with open(image_path, "rb") as f:
-        img_bytes = f.read()
+    if image_bytes is not None:
+        img_bytes = bytes(image_bytes)
+    else:
+        with open(str(image_path), "rb") as f:
+            img_bytes = f.read()
 
-    cache_key = hashlib.sha256(img_bytes).hexdigest() + "|" + (lang or "")
+    cache_key = (image_hash or hashlib.sha256(img_bytes).hexdigest()) + "|" + (lang or "")
     cached = _lens_cache_get(cache_key)
     if cached is not None:
         return cached
 
-    leader = False
-    with _flights_lock:
-        flight = _flights.get(cache_key)
-        if flight is None and len(_flights) < _FLIGHT_MAX:
-            flight = _Flight()
-            _flights[cache_key] = flight
-            leader = True
+    flight, leader = _join_flight(cache_key)
     if flight is not None and not leader:
         # The route's admission/cancellation boundary remains outside this
         # synchronous client. Waiting shares the leader's network result; it
         # never starts a second Google upload.
-        flight.done.wait()
-        if flight.error is not None:
-            raise flight.error
-        return copy.deepcopy(flight.data or {})
+        return dict(flight.future.result() or {})
 
     try:
+        data = lens_store.fetch_through(
+            cache_key, lambda: _fetch_lens_with_refresh(img_bytes, lang, firebase_url), _has_lens_text,
+        )
+    except BaseException as exc:
+        _land_flight(cache_key, flight if leader else None, error=exc)
+        raise
+    return _land_flight(cache_key, flight if leader else None, data=data)
+
+
+async def fetch_lens_data_async(
+    image_bytes: bytes,
+    lang: str,
+    firebase_url: str | None = None,
+    *,
+    image_hash: str | None = None,
+) -> dict[str, Any]:
+    """:func:`fetch_lens_data` for the event loop.
+
+    Same caches, same single-flight (a sync and an async caller asking for
+    one image share one upload) and the same one-shot cookie refresh, but
+    the network wait is awaited on a pooled ``httpx.AsyncClient``: an
+    in-flight Lens request holds a socket, not a thread. Only a cold cookie
+    jar and the shared store's disk reads briefly go to a thread.
+    """
+    img_bytes = bytes(image_bytes)
+    cache_key = (image_hash or hashlib.sha256(img_bytes).hexdigest()) + "|" + (lang or "")
+    cached = _lens_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    flight, leader = _join_flight(cache_key)
+    if flight is not None and not leader:
+        # shield: one cancelled waiter must not cancel the leader's future.
+        return dict(await asyncio.shield(asyncio.wrap_future(flight.future)) or {})
+
+    async def _lead() -> dict[str, Any]:
         try:
-            initial = cookie.state(firebase_url)
-            _cookie_trace("initial", generation=initial.generation)
-            data = _fetch_lens_once(img_bytes, lang, initial.data)
-        except LensSessionError as initial_error:
-            # Refresh is global across image keys, while result singleflight is
-            # per image. Generation/epoch prevents every image in one stale
-            # batch from independently fetching the same Firebase jar.
-            try:
-                refreshed = cookie.refresh_after(initial, firebase_url, timeout_sec=30.0)
-            except BaseException as refresh_error:
-                _cookie_trace("refresh_failed", errorType=type(refresh_error).__name__)
-                raise LensSessionError("Lens cookie refresh failed") from refresh_error
-            changed = refreshed.generation != initial.generation
-            _cookie_trace(
-                "refreshed" if changed else "refresh_unchanged",
-                generation=refreshed.generation, coalesced=refreshed.coalesced,
-            )
-            if not changed:
-                # Retrying the identical rejected jar only repeats an upload and
-                # makes a stale Firebase value look transient.
-                raise LensSessionError("Lens cookie source still serves the rejected jar") from initial_error
-            try:
-                data = _fetch_lens_once(img_bytes, lang, refreshed.data)
-            except LensSessionError as refreshed_error:
-                _cookie_trace(
-                    "refreshed_failed", generation=refreshed.generation,
-                    coalesced=refreshed.coalesced,
-                )
-                raise LensSessionError("Lens rejected the refreshed cookie jar") from refreshed_error
-            _cookie_trace(
-                "refreshed_success", generation=refreshed.generation,
-                coalesced=refreshed.coalesced,
+            data = await lens_store.fetch_through_async(
+                cache_key, lambda: _fetch_lens_with_refresh_async(img_bytes, lang, firebase_url),
+                _has_lens_text,
             )
+        except BaseException as exc:
+            _land_flight(cache_key, flight if leader else None, error=exc)
+            raise
+        return _land_flight(cache_key, flight if leader else None, data=data)
 
-        # Cache only responses that carry text. Genuinely textless images are
-        # cheap to re-check; transient empty responses must never stick.
-        if isinstance(data, dict) and _has_lens_text(data):
-            _lens_cache_set(cache_key, data)
-        if leader and flight is not None:
-            flight.data = copy.deepcopy(data)
-        return data
-    except BaseException as exc:
-        if leader and flight is not None:
-            flight.error = exc
-        raise
-    finally:
-        if leader and flight is not None:
-            flight.done.set()
-            with _flights_lock:
-                _flights.pop(cache_key, None)
+    # The upload runs as its own task: a leader whose request is cancelled
+    # stops waiting, but the followers (and the caches) still get the answer,
+    # exactly as a thread in the sync path would have finished regardless.
+    task = asyncio.ensure_future(_lead())
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return await asyncio.shield(task)
+
+
+def _join_flight(cache_key: str) -> tuple[_Flight | None, bool]:
+    """``(flight, leader)``: lead a new flight for this key, or follow one."""
+    with _flights_lock:
+        flight = _flights.get(cache_key)
+        if flight is None and len(_flights) < _FLIGHT_MAX:
+            flight = _Flight()
+            _flights[cache_key] = flight
+            return flight, True
+    return flight, False
+
+
+def _land_flight(
+    cache_key: str,
+    flight: _Flight | None,
+    *,
+    data: dict[str, Any] | None = None,
+    error: BaseException | None = None,
+) -> dict[str, Any]:
+    """Cache the leader's answer and hand it (or its error) to the followers."""
+    # Cache only responses that carry text. Genuinely textless images are
+    # cheap to re-check; transient empty responses must never stick.
+    if error is None and isinstance(data, dict) and _has_lens_text(data):
+        _lens_cache_set(cache_key, data)
+    if flight is not None:
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(data)
+        with _flights_lock:
+            _flights.pop(cache_key, None)
+    return data  # type: ignore[return-value]
+
+
+def _fetch_lens_with_refresh(img_bytes: bytes, lang: str, firebase_url: str | None) -> dict[str, Any]:
+    """One Lens fetch, with the single cookie refresh + retry on a stale jar."""
+    initial = cookie.state(firebase_url)
+    _cookie_trace("initial", generation=initial.generation)
+    try:
+        return _fetch_lens_once(img_bytes, lang, initial.data)
+    except LensSessionError as initial_error:
+        refreshed = _refreshed_jar(initial, firebase_url, initial_error)
+    try:
+        data = _fetch_lens_once(img_bytes, lang, refreshed.data)
+    except LensSessionError as refreshed_error:
+        raise _refreshed_rejected(refreshed) from refreshed_error
+    _cookie_trace(
+        "refreshed_success", generation=refreshed.generation,
+        coalesced=refreshed.coalesced,
+    )
+    return data
+
+
+async def _fetch_lens_with_refresh_async(
+    img_bytes: bytes, lang: str, firebase_url: str | None
+) -> dict[str, Any]:
+    """:func:`_fetch_lens_with_refresh` awaiting Lens; cookie fetches use a thread."""
+    initial = cookie.cached(firebase_url) or await asyncio.to_thread(cookie.state, firebase_url)
+    _cookie_trace("initial", generation=initial.generation)
+    try:
+        return await _fetch_lens_once_async(img_bytes, lang, initial.data)
+    except LensSessionError as initial_error:
+        refreshed = await asyncio.to_thread(_refreshed_jar, initial, firebase_url, initial_error)
+    try:
+        data = await _fetch_lens_once_async(img_bytes, lang, refreshed.data)
+    except LensSessionError as refreshed_error:
+        raise _refreshed_rejected(refreshed) from refreshed_error
+    _cookie_trace(
+        "refreshed_success", generation=refreshed.generation,
+        coalesced=refreshed.coalesced,
+    )
+    return data
+
+
+def _refreshed_jar(
+    initial: cookie.CookieState, firebase_url: str | None, initial_error: LensSessionError
+) -> cookie.CookieState:
+    """The jar to retry with after Lens rejected ``initial``, or raise."""
+    # Refresh is global across image keys, while result singleflight is
+    # per image. Generation/epoch prevents every image in one stale
+    # batch from independently fetching the same Firebase jar.
+    try:
+        refreshed = cookie.refresh_after(initial, firebase_url, timeout_sec=30.0)
+    except BaseException as refresh_error:
+        _cookie_trace("refresh_failed", errorType=type(refresh_error).__name__)
+        raise LensSessionError("Lens cookie refresh failed") from refresh_error
+    changed = refreshed.generation != initial.generation
+    _cookie_trace(
+        "refreshed" if changed else "refresh_unchanged",
+        generation=refreshed.generation, coalesced=refreshed.coalesced,
+    )
+    if not changed:
+        # Retrying the identical rejected jar only repeats an upload and
+        # makes a stale Firebase value look transient.
+        raise LensSessionError("Lens cookie source still serves the rejected jar") from initial_error
+    return refreshed
+
+
+def _refreshed_rejected(refreshed: cookie.CookieState) -> LensSessionError:
+    _cookie_trace(
+        "refreshed_failed", generation=refreshed.generation,
+        coalesced=refreshed.coalesced,
+    )
+    return LensSessionError("Lens rejected the refreshed cookie jar")
 
 
 def _b64_pad(s: str) -> str:
@@ -106,6 +106,19 @@ def state(firebase_url: str | None = None, *, timeout_sec: float = 30.0) -> Cook
     return _refresh(url, observed_epoch=epoch, timeout_sec=timeout_sec)
 
 
+def cached(firebase_url: str | None = None) -> CookieState | None:
+    """The fresh snapshot if one is held, else None. Never does I/O.
+
+    The async Lens path reads the jar on the event loop; only a cold or stale
+    jar sends it to a thread for :func:`state`.
+    """
+    url = _url(firebase_url)
+    with _condition:
+        if _fresh(url, time.time()):
+            return CookieState(dict(_cache.get("data") or {}), _generation, _refresh_epoch)
+    return None
+
+
 def refresh_after(
     prior: CookieState, firebase_url: str | None = None, *, timeout_sec: float = 30.0
 ) -> CookieState:
@@ -15,7 +15,7 @@ message layout is not documented — we identify "item" sub-messages by their
 from __future__ import annotations
 
 import struct
-from typing import NamedTuple
+from typing import Iterator, NamedTuple
 
 # A decoded field is (field_number, wire_type, value).
 ProtoField = tuple[int, int, object]
@@ -27,12 +27,17 @@ ProtoField = tuple[int, int, object]
 MAX_EXACT_VARINT = 2**53 - 1
 
 
-def read_varint(buf: bytes, i: int) -> tuple[int, int]:
-    """Read a base-128 varint starting at ``buf[i]``; return ``(value, next_i)``."""
+# A field located in place: (field_number, wire_type, value_start, value_end).
+# The value is ``buf[value_start:value_end]`` — for a varint, its encoded bytes.
+FieldSpan = tuple[int, int, int, int]
+
+
+def _varint(buf: bytes, i: int, end: int) -> tuple[int, int]:
+    """:func:`read_varint` that stops at ``end`` instead of ``len(buf)``."""
     shift = 0
     result = 0
     while True:
-        if i >= len(buf):
+        if i >= end:
             raise ValueError("eof varint")
         b = buf[i]
         i += 1
@@ -46,39 +51,115 @@ def read_varint(buf: bytes, i: int) -> tuple[int, int]:
             raise ValueError("varint too long")
 
 
-def parse(buf: bytes, start: int = 0, end: int | None = None) -> list[ProtoField]:
-    """Decode every top-level field in ``buf[start:end]``."""
+def read_varint(buf: bytes, i: int) -> tuple[int, int]:
+    """Read a base-128 varint starting at ``buf[i]``; return ``(value, next_i)``."""
+    return _varint(buf, i, len(buf))
+
+
+def iter_fields(buf: bytes, start: int = 0, end: int | None = None) -> Iterator[FieldSpan]:
+    """Walk the top-level fields of ``buf[start:end]`` without copying any.
+
+    Yields :data:`FieldSpan` offsets into ``buf`` itself, so a nested message
+    is read by calling this again on the same buffer with its range. A value
+    that runs past ``end`` is clamped to it, exactly where slicing the
+    enclosing message would have cut it. Works on anything indexable as
+    bytes (``bytes``, ``bytearray``, ``memoryview``).
+    """
     if end is None:
         end = len(buf)
     i = start
-    out: list[ProtoField] = []
     while i < end:
-        key, i = read_varint(buf, i)
+        key = buf[i]
+        if key < 0x80:  # one-byte key: every field number below 16
+            i += 1
+        else:
+            key, i = _varint(buf, i, end)
         field = key >> 3
         wire = key & 7
         if wire == 0:  # varint
-            val, i = read_varint(buf, i)
-            out.append((field, wire, val))
+            s = i
+            _, i = _varint(buf, i, end)
+            yield field, wire, s, i
         elif wire == 1:  # 64-bit
-            out.append((field, wire, buf[i : i + 8]))
-            i += 8
+            s, i = i, i + 8
+            yield field, wire, s, min(i, end)
         elif wire == 2:  # length-delimited
-            length, i = read_varint(buf, i)
-            out.append((field, wire, buf[i : i + length]))
-            i += length
+            length, s = _varint(buf, i, end)
+            i = s + length
+            yield field, wire, s, min(i, end)
         elif wire == 5:  # 32-bit
-            out.append((field, wire, buf[i : i + 4]))
-            i += 4
+            s, i = i, i + 4
+            yield field, wire, s, min(i, end)
+        else:
+            raise ValueError(f"wiretype {wire}")
+
+
+def _fields(buf: bytes, start: int, end: int) -> list[FieldSpan]:
+    """:func:`iter_fields`, materialised, with the loop inlined.
+
+    Every reader below walks a whole message before acting on any field, as
+    `parse` did: a malformed tail must fail the message, not be skipped by a
+    reader that happened to stop early. One-byte keys and lengths — nearly
+    all of a Lens paragraph — skip the general varint decode.
+    """
+    out: list[FieldSpan] = []
+    append = out.append
+    i = start
+    while i < end:
+        key = buf[i]
+        if key < 0x80:
+            i += 1
+        else:
+            key, i = _varint(buf, i, end)
+        wire = key & 7
+        if wire == 2:
+            n = buf[i] if i < end else 0x80
+            if n < 0x80:
+                s = i + 1
+            else:
+                n, s = _varint(buf, i, end)
+            i = s + n
+            append((key >> 3, 2, s, i if i < end else end))
+        elif wire == 5:
+            s, i = i, i + 4
+            append((key >> 3, 5, s, i if i < end else end))
+        elif wire == 0:
+            s = i
+            if i < end and buf[i] < 0x80:
+                i += 1
+            else:
+                _, i = _varint(buf, i, end)
+            append((key >> 3, 0, s, i))
+        elif wire == 1:
+            s, i = i, i + 8
+            append((key >> 3, 1, s, i if i < end else end))
         else:
             raise ValueError(f"wiretype {wire}")
     return out
 
 
+def parse(buf: bytes, start: int = 0, end: int | None = None) -> list[ProtoField]:
+    """Decode every top-level field in ``buf[start:end]``."""
+    out: list[ProtoField] = []
+    for f, w, s, e in iter_fields(buf, start, end):
+        out.append((f, w, _varint(buf, s, e)[0] if w == 0 else bytes(buf[s:e])))
+    return out
+
+
 def f32(b4: bytes) -> float:
     """Decode a little-endian 32-bit float."""
     return struct.unpack("<f", b4)[0]
 
 
+_POINT = struct.Struct("<xfxf")
+
+
+def _f32_at(buf: bytes, s: int, e: int) -> float:
+    if e - s != 4:
+        return f32(bytes(buf[s:e]))  # a truncated value: raises as it always has
+    return struct.unpack_from("<f", buf, s)[0]
+
+
 def to_hex(b: bytes) -> str:
     return b.hex()
 
@@ -92,6 +173,83 @@ def get_float_field(fields: list[ProtoField], field_num: int) -> float | None:
 
 
 # --- Shape heuristics ------------------------------------------------------
+# The public functions take and return bytes; each reads its message in place
+# through the offset readers underneath, so a paragraph is no longer copied
+# once per nesting level per heuristic that looks at it.
+
+def _point_at(buf: bytes, s: int, e: int, strict: bool) -> tuple[float, float] | None:
+    """``(x, y)`` of a point message, or None when either is missing.
+
+    ``strict`` decodes y even without an x, as the geometry extractors always
+    have; the shape checks skip it, so a truncated y behind a missing x does
+    not fail them.
+    """
+    # Nearly every point is exactly `0d <x:f32> 15 <y:f32>`; read that shape
+    # directly. Anything else takes the general walk, with the same answer.
+    if e - s == 10 and buf[s] == 0x0D and buf[s + 5] == 0x15:
+        return _POINT.unpack_from(buf, s)
+    x_at: tuple[int, int] | None = None
+    y_at: tuple[int, int] | None = None
+    for f, w, vs, ve in _fields(buf, s, e):
+        if w == 5:
+            if f == 1 and x_at is None:
+                x_at = (vs, ve)
+            elif f == 2 and y_at is None:
+                y_at = (vs, ve)
+    x = _f32_at(buf, *x_at) if x_at is not None else None
+    y = _f32_at(buf, *y_at) if y_at is not None and (strict or x is not None) else None
+    if x is None or y is None:
+        return None
+    return x, y
+
+
+def _geom_at(
+    buf: bytes, s: int, e: int, strict: bool = False,
+) -> tuple[list[tuple[float, float]], tuple[int, int] | None]:
+    """Points of a geometry message, and where its (last) height field is.
+
+    The height is located, not decoded: the shape checks only ask whether it
+    is there, and must not fail on a truncated one that nobody reads.
+    """
+    pts: list[tuple[float, float]] = []
+    height: tuple[int, int] | None = None
+    for f, w, vs, ve in _fields(buf, s, e):
+        if f == 1 and w == 2:
+            pt = _point_at(buf, vs, ve, strict)
+            if pt is not None:
+                pts.append(pt)
+        elif f == 3 and w == 5:
+            height = (vs, ve)
+    return pts, height
+
+
+def _geom_points(buf: bytes) -> tuple[list[tuple[float, float]], float | None]:
+    pts, at = _geom_at(buf, 0, len(buf), strict=True)
+    return pts, _f32_at(buf, *at) if at is not None else None
+
+
+def _span_shape_at(buf: bytes, s: int, e: int) -> bool:
+    has_t = False
+    has_range = False
+    for f, w, _vs, _ve in _fields(buf, s, e):
+        if f in (3, 4) and w == 5:
+            has_t = True
+        elif f in (1, 2) and w == 0:
+            has_range = True
+    return has_t and has_range
+
+
+def _is_item_at(buf: bytes, s: int, e: int) -> bool:
+    geom_ok = False
+    span_ok = 0
+    for f, w, vs, ve in _fields(buf, s, e):
+        if f == 1 and w == 2 and not geom_ok:
+            pts, height = _geom_at(buf, vs, ve)
+            geom_ok = len(pts) >= 2 and height is not None
+        elif f == 2 and w == 2 and _span_shape_at(buf, vs, ve):
+            span_ok += 1
+    return geom_ok and span_ok > 0
+
 
 def get_points_from_geom(
     geom_bytes: bytes,
@@ -110,17 +268,7 @@ def get_points_from_geom(
     normalised text height.  Returns ``(None, None, None)`` when the message
     isn't a geometry block.
     """
-    pts: list[tuple[float, float]] = []
-    height: float | None = None
-    for f, w, v in parse(geom_bytes):
-        if f == 1 and w == 2:
-            p_fields = parse(v)  # type: ignore[arg-type]
-            x = get_float_field(p_fields, 1)
-            y = get_float_field(p_fields, 2)
-            if x is not None and y is not None:
-                pts.append((x, y))
-        elif f == 3 and w == 5:
-            height = f32(v)  # type: ignore[arg-type]
+    pts, height = _geom_points(geom_bytes)
     if len(pts) >= 2 and height is not None:
         return pts[0], pts[-1], height
     return None, None, None
@@ -134,59 +282,23 @@ def get_polyline_from_geom(
     Used by the renderer when an exact curve trace is needed.  Returns
     ``([], None)`` when the message isn't a geometry block.
     """
-    pts: list[tuple[float, float]] = []
-    height: float | None = None
-    for f, w, v in parse(geom_bytes):
-        if f == 1 and w == 2:
-            p_fields = parse(v)  # type: ignore[arg-type]
-            x = get_float_field(p_fields, 1)
-            y = get_float_field(p_fields, 2)
-            if x is not None and y is not None:
-                pts.append((x, y))
-        elif f == 3 and w == 5:
-            height = f32(v)  # type: ignore[arg-type]
-    return pts, height
+    return _geom_points(geom_bytes)
 
 
 def looks_like_geom(geom_bytes: bytes) -> bool:
     """True if ``geom_bytes`` has >=2 points and a height field."""
-    pts = 0
-    has_height = False
-    for f, w, v in parse(geom_bytes):
-        if f == 1 and w == 2:
-            p_fields = parse(v)  # type: ignore[arg-type]
-            if (
-                get_float_field(p_fields, 1) is not None
-                and get_float_field(p_fields, 2) is not None
-            ):
-                pts += 1
-        elif f == 3 and w == 5:
-            has_height = True
-    return pts >= 2 and has_height
+    pts, height = _geom_at(geom_bytes, 0, len(geom_bytes))
+    return len(pts) >= 2 and height is not None
 
 
 def looks_like_span(span_bytes: bytes) -> bool:
     """True if ``span_bytes`` has both a t0/t1 float pair and a start/end range."""
-    has_t = False
-    has_range = False
-    for f, w, _v in parse(span_bytes):
-        if f in (3, 4) and w == 5:
-            has_t = True
-        elif f in (1, 2) and w == 0:
-            has_range = True
-    return has_t and has_range
+    return _span_shape_at(span_bytes, 0, len(span_bytes))
 
 
 def is_item_message(msg_bytes: bytes) -> bool:
     """True if ``msg_bytes`` is an OCR "item" (geometry + >=1 span)."""
-    geom_ok = False
-    span_ok = 0
-    for f, w, v in parse(msg_bytes):
-        if f == 1 and w == 2 and not geom_ok:
-            geom_ok = looks_like_geom(v)  # type: ignore[arg-type]
-        elif f == 2 and w == 2 and looks_like_span(v):  # type: ignore[arg-type]
-            span_ok += 1
-    return geom_ok and span_ok > 0
+    return _is_item_at(msg_bytes, 0, len(msg_bytes))
 
 
 class ParagraphItems(NamedTuple):
@@ -208,53 +320,58 @@ class ParagraphItems(NamedTuple):
 
 def extract_items_from_paragraph(par_bytes: bytes) -> ParagraphItems:
     """Find every item sub-message inside a paragraph message."""
+    buf = par_bytes
     shallow = [
-        v
-        for _, w, v in parse(par_bytes)
-        if w == 2 and is_item_message(v)  # type: ignore[arg-type]
+        bytes(buf[s:e])
+        for _, w, s, e in _fields(buf, 0, len(buf))
+        if w == 2 and _is_item_at(buf, s, e)
     ]
     if shallow:
-        return ParagraphItems(shallow, deep=False, exhausted=False)  # type: ignore[arg-type]
+        return ParagraphItems(shallow, deep=False, exhausted=False)
 
     found: list[bytes] = []
     seen: set[bytes] = set()
     nodes = 0
     exhausted = False
 
-    def walk(buf: bytes, depth: int) -> None:
+    def walk(start: int, end: int, depth: int) -> None:
         nonlocal nodes, exhausted
         if depth >= 4 or nodes > 20000:
             if nodes > 20000:
                 exhausted = True
             return
-        for _, w, v in parse(buf):
+        for _, w, s, e in _fields(buf, start, end):
             if w != 2:
                 continue
             nodes += 1
             if nodes > 20000:
                 exhausted = True
                 return
-            if is_item_message(v):  # type: ignore[arg-type]
-                if v not in seen:
-                    seen.add(v)  # type: ignore[arg-type]
-                    found.append(v)  # type: ignore[arg-type]
+            if _is_item_at(buf, s, e):
+                item = bytes(buf[s:e])
+                if item not in seen:
+                    seen.add(item)
+                    found.append(item)
             else:
-                walk(v, depth + 1)  # type: ignore[arg-type]
+                walk(s, e, depth + 1)
 
-    walk(par_bytes, 0)
+    walk(0, len(buf), 0)
     return ParagraphItems(found, deep=True, exhausted=exhausted)
 
 
 def extract_item_geom_spans(item_bytes: bytes) -> tuple[bytes | None, list[bytes]]:
     """Split an item message into ``(geometry_bytes, [span_bytes, ...])``."""
-    geom_bytes: bytes | None = None
-    spans_bytes: list[bytes] = []
-    for f, w, v in parse(item_bytes):
+    geom: tuple[int, int] | None = None
+    spans: list[tuple[int, int]] = []
+    for f, w, s, e in _fields(item_bytes, 0, len(item_bytes)):
         if f == 1 and w == 2:
-            geom_bytes = v  # type: ignore[assignment]
+            geom = (s, e)
         elif f == 2 and w == 2:
-            spans_bytes.append(v)  # type: ignore[arg-type]
-    return geom_bytes, spans_bytes
+            spans.append((s, e))
+    return (
+        bytes(item_bytes[geom[0]:geom[1]]) if geom is not None else None,
+        [bytes(item_bytes[s:e]) for s, e in spans],
+    )
 
 
 def extract_span(
@@ -269,13 +386,13 @@ def extract_span(
     end: int | None = None
     t0: float | None = None
     t1: float | None = None
-    for f, w, v in parse(span_bytes):
+    for f, w, s, e in _fields(span_bytes, 0, len(span_bytes)):
         if f == 1 and w == 0:
-            start = int(v)  # type: ignore[arg-type]
+            start = _varint(span_bytes, s, e)[0]
         elif f == 2 and w == 0:
-            end = int(v)  # type: ignore[arg-type]
+            end = _varint(span_bytes, s, e)[0]
         elif f == 3 and w == 5:
-            t0 = f32(v)  # type: ignore[arg-type]
+            t0 = _f32_at(span_bytes, s, e)
         elif f == 4 and w == 5:
-            t1 = f32(v)  # type: ignore[arg-type]
+            t1 = _f32_at(span_bytes, s, e)
     return start, end, t0, t1
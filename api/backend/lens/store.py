@@ -0,0 +1,381 @@
+"""Shared, restart-surviving tier for Lens responses.
+
+The in-process cache in :mod:`backend.lens.client` dies with the process and
+is private to it: two uvicorn workers that get the same page both upload it,
+and a Space that wakes from sleep uploads every page again. This tier sits
+behind that cache:
+
+* :class:`DiskLensStore` (the default) keeps responses in a
+  :class:`backend.jobs.disk_cache.DiskCache` file with its own byte budget and
+  a TTL per entry, and coalesces concurrent fetches of one image across
+  processes with a lock file per key, removed again on release.
+* :class:`LensStore` is the whole contract. A deployment with a shared
+  key-value service installs its own implementation with :func:`install`
+  (``get``/``set`` with an expiry, ``flight`` as a ``SET NX`` lease).
+
+Like the result tier it is a cache, not a store of record: a failure to read,
+write or lock behaves like a miss and the request simply goes to Lens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, ContextManager, Iterator, Protocol,
+)
+
+from backend.config import settings
+from backend.jobs.disk_cache import DiskCache, default_path
+
+_LOCK_POLL_SEC = 0.05
+
+
+class LensStore(Protocol):
+    def get(self, key: str) -> dict[str, Any] | None: ...
+
+    def set(self, key: str, value: dict[str, Any], ttl_sec: float) -> None: ...
+
+    def flight(self, key: str, timeout_sec: float) -> ContextManager[bool]:
+        """Hold the cross-process fetch lease for ``key`` while the block runs.
+
+        Yields whether the lease was taken. False (timeout, no locking
+        primitive) means "fetch anyway": a duplicate upload beats a failed job.
+        """
+        ...
+
+    def aflight(self, key: str, timeout_sec: float) -> AsyncContextManager[bool]:
+        """:meth:`flight` for the event loop: waits without holding a thread."""
+        ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class NullLensStore:
+    """The tier switched off: every lookup misses, nothing is kept or locked."""
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return None
+
+    def set(self, key: str, value: dict[str, Any], ttl_sec: float) -> None:
+        return None
+
+    @contextlib.contextmanager
+    def flight(self, key: str, timeout_sec: float) -> Iterator[bool]:
+        yield False
+
+    @contextlib.asynccontextmanager
+    async def aflight(self, key: str, timeout_sec: float) -> AsyncIterator[bool]:
+        yield False
+
+    def stats(self) -> dict[str, Any]:
+        return {"enabled": False, "backend": "none"}
+
+
+class DiskLensStore:
+    """Lens responses in a local SQLite file, fetches coalesced by file locks.
+
+    Every process on the host opens the same file and the same lock
+    directory, so this is what makes the tier shared between workers. The
+    lock is an OS file lock (``flock``/``msvcrt.locking``) and dies with its
+    process, so a worker killed mid-upload never wedges the key.
+
+    Each key has its own lock file, so only fetches of the same page ever wait
+    on each other (within a process the client's flight already lets one
+    caller through). The holder deletes the file when it is done, which keeps
+    the directory down to the pages in flight.
+    """
+
+    def __init__(self, path: Path | str | None, max_bytes: int, ttl_sec: float,
+                 lock_dir: Path | str | None = None) -> None:
+        # The file-wide TTL is the upper bound; each entry carries its own.
+        self._cache = DiskCache(path, max_bytes=max_bytes, ttl_sec=ttl_sec)
+        self._lock_dir = Path(lock_dir) if lock_dir else (
+            Path(path).parent / (Path(path).name + ".locks") if path else None
+        )
+        self._counts_lock = threading.Lock()
+        self.lock_acquired = 0
+        self.lock_waits = 0
+        self.lock_timeouts = 0
+        self.lock_errors = 0
+        self.lock_wait_ms = 0.0
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: dict[str, Any], ttl_sec: float) -> None:
+        self._cache.set(key, value, ttl_sec=ttl_sec)
+
+    def _lock_path(self, key: str) -> Path | None:
+        if self._lock_dir is None:
+            return None
+        return self._lock_dir / f"lens-{hashlib.sha1(key.encode('utf-8')).hexdigest()}.lock"
+
+    def _count(self, **deltas: float) -> None:
+        with self._counts_lock:
+            for name, value in deltas.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _open_lock(self, path: Path | None) -> Any:
+        if path is None:
+            return None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return open(path, "a+b")  # noqa: SIM115 - held for the block
+        except OSError:
+            self._count(lock_errors=1)
+            return None
+
+    def _note_lock(self, held: bool, waited: float) -> None:
+        if held:
+            self._count(lock_acquired=1, lock_waits=1 if waited else 0,
+                        lock_wait_ms=waited * 1000.0)
+        else:
+            self._count(lock_timeouts=1)
+
+    @contextlib.contextmanager
+    def flight(self, key: str, timeout_sec: float) -> Iterator[bool]:
+        path = self._lock_path(key)
+        deadline = time.monotonic() + timeout_sec
+        waited = 0.0
+        while True:
+            handle = self._open_lock(path)
+            if handle is None:
+                yield False
+                return
+            held, w = _lock_file(handle, max(0.0, deadline - time.monotonic()))
+            waited += w
+            if not held or _still_linked(handle, path):
+                break
+            # The holder removed the file between our open and our lock.
+            _unlock_file(handle)
+            handle.close()
+        try:
+            self._note_lock(held, waited)
+            yield held
+        finally:
+            _release(handle, path, held)
+
+    @contextlib.asynccontextmanager
+    async def aflight(self, key: str, timeout_sec: float) -> AsyncIterator[bool]:
+        path = self._lock_path(key)
+        deadline = time.monotonic() + timeout_sec
+        waited = 0.0
+        while True:
+            handle = self._open_lock(path)
+            if handle is None:
+                yield False
+                return
+            held, w = await _alock_file(handle, max(0.0, deadline - time.monotonic()))
+            waited += w
+            if not held or _still_linked(handle, path):
+                break
+            _unlock_file(handle)
+            handle.close()
+        try:
+            self._note_lock(held, waited)
+            yield held
+        finally:
+            _release(handle, path, held)
+
+    def stats(self) -> dict[str, Any]:
+        out = self._cache.stats()
+        with self._counts_lock:
+            out.update({
+                "backend": "disk",
+                "lockDir": str(self._lock_dir) if self._lock_dir else "",
+                "lockAcquired": self.lock_acquired,
+                "lockWaits": self.lock_waits,
+                "lockWaitMs": round(self.lock_wait_ms, 1),
+                "lockTimeouts": self.lock_timeouts,
+                "lockErrors": self.lock_errors,
+            })
+        return out
+
+
+def _try_lock(handle: Any) -> bool:
+    """One non-blocking attempt. Raises ImportError without a primitive."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _lock_file(handle: Any, timeout_sec: float) -> tuple[bool, float]:
+    """Poll for the lock until ``timeout_sec``; returns (held, seconds waited).
+
+    Polling rather than a blocking call keeps the wait bounded on every
+    platform, and the lease is only ever held for one Lens round trip.
+    """
+    t0 = time.monotonic()
+    try:
+        if _try_lock(handle):
+            return True, 0.0
+        while not _try_lock(handle):
+            if time.monotonic() - t0 >= timeout_sec:
+                return False, time.monotonic() - t0
+            time.sleep(_LOCK_POLL_SEC)
+    except ImportError:
+        return False, 0.0
+    return True, time.monotonic() - t0
+
+
+async def _alock_file(handle: Any, timeout_sec: float) -> tuple[bool, float]:
+    """:func:`_lock_file` polling with ``asyncio.sleep`` between attempts."""
+    t0 = time.monotonic()
+    try:
+        if _try_lock(handle):
+            return True, 0.0
+        while not _try_lock(handle):
+            if time.monotonic() - t0 >= timeout_sec:
+                return False, time.monotonic() - t0
+            await asyncio.sleep(_LOCK_POLL_SEC)
+    except ImportError:
+        return False, 0.0
+    return True, time.monotonic() - t0
+
+
+def _unlock_file(handle: Any) -> None:
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    except (OSError, ImportError):
+        pass  # closing the handle releases it anyway
+
+
+def _still_linked(handle: Any, path: Path) -> bool:
+    """Whether ``handle`` is still the file at ``path``, not one unlinked since.
+
+    Windows refuses to delete a file someone has open, so there it always is.
+    """
+    if os.name == "nt":
+        return True
+    try:
+        return os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino
+    except OSError:
+        return False
+
+
+def _release(handle: Any, path: Path, held: bool) -> None:
+    """Drop the lease and, when we held it, the lock file.
+
+    On POSIX the file is unlinked while still locked, so a process that opens
+    the path afterwards gets a fresh file, and one already waiting on the old
+    file sees :func:`_still_linked` fail and opens again. Windows cannot delete
+    an open file, so there the unlink comes last and fails harmlessly while
+    anyone else has it open.
+    """
+    if held and os.name != "nt":
+        with contextlib.suppress(OSError):
+            path.unlink()
+    if held:
+        _unlock_file(handle)
+    handle.close()
+    if held and os.name == "nt":
+        with contextlib.suppress(OSError):
+            path.unlink()
+
+
+def _default_store() -> LensStore:
+    if not settings.lens_store:
+        return NullLensStore()
+    return DiskLensStore(
+        settings.lens_store_path or default_path("lens-cache.sqlite3"),
+        max_bytes=settings.lens_store_max_mb * 1024 * 1024,
+        ttl_sec=settings.lens_store_ttl_sec,
+    )
+
+
+_store: LensStore = _default_store()
+_coalesced = 0
+_coalesced_lock = threading.Lock()
+
+
+def install(store: LensStore) -> LensStore:
+    """Replace the process-wide store; returns the previous one."""
+    global _store
+    previous, _store = _store, store
+    return previous
+
+
+def get_store() -> LensStore:
+    return _store
+
+
+def fetch_through(key: str, fetch: Callable[[], dict[str, Any]],
+                  keep: Callable[[dict[str, Any]], bool]) -> dict[str, Any]:
+    """Serve ``key`` from the store, or run ``fetch`` under its lease.
+
+    Whoever takes the lease fetches; everyone who waited for it reads the
+    answer the holder left behind. ``keep`` decides what is worth storing, so
+    an empty Lens response never reaches the other processes.
+    """
+    store = _store
+    hit = store.get(key)
+    if hit is not None:
+        return hit
+    with store.flight(key, settings.lens_store_lock_timeout_sec) as held:
+        if held:
+            # Another process may have finished the same page while we waited.
+            hit = store.get(key)
+            if hit is not None:
+                global _coalesced
+                with _coalesced_lock:
+                    _coalesced += 1
+                return hit
+        data = fetch()
+        if isinstance(data, dict) and keep(data):
+            store.set(key, data, settings.lens_store_ttl_sec)
+        return data
+
+
+async def fetch_through_async(key: str, fetch: Callable[[], Awaitable[dict[str, Any]]],
+                              keep: Callable[[dict[str, Any]], bool]) -> dict[str, Any]:
+    """:func:`fetch_through` for the event loop.
+
+    The store reads and writes are short and go to a thread; the lease wait
+    and the fetch itself are awaited, so a waiting request holds no thread.
+    """
+    store = _store
+    hit = await asyncio.to_thread(store.get, key)
+    if hit is not None:
+        return hit
+    async with store.aflight(key, settings.lens_store_lock_timeout_sec) as held:
+        if held:
+            hit = await asyncio.to_thread(store.get, key)
+            if hit is not None:
+                global _coalesced
+                with _coalesced_lock:
+                    _coalesced += 1
+                return hit
+        data = await fetch()
+        if isinstance(data, dict) and keep(data):
+            await asyncio.to_thread(store.set, key, data, settings.lens_store_ttl_sec)
+        return data
+
+
+def stats() -> dict[str, Any]:
+    with _coalesced_lock:
+        coalesced = _coalesced
+    return {**_store.stats(), "coalesced": coalesced}
@@ -9,6 +9,7 @@ important outcomes only (for example a translation job finishing or failing).
 
 from __future__ import annotations
 
+import asyncio
 import json
 from datetime import datetime, timedelta, timezone
 from typing import Any
@@ -82,6 +83,19 @@ def event(tag: str, data: Any | None = None, *, ok: bool = True) -> None:
         pass
 
 
+async def aevent(tag: str, data: Any | None = None, *, ok: bool = True) -> None:
+    """:func:`event` for the event loop.
+
+    A failure line is written and fsynced before :func:`event` returns (see
+    :mod:`backend.logfile`), so it goes to a worker thread rather than stall
+    the loop; other lines only queue and are emitted in place.
+    """
+    if ok or not logfile.is_enabled():
+        event(tag, data, ok=ok)
+    else:
+        await asyncio.to_thread(event, tag, data, ok=ok)
+
+
 def dbg(tag: str, data: Any | None = None) -> None:
     """Print a tagged debug line only when ``TP_DEBUG`` is enabled.
 
@@ -15,9 +15,33 @@ an assistant with access to the folder) without reproducing the problem first.
 Format
 ------
 JSON Lines: one object per line, so a broken line loses one event rather than
-the file, and `grep` still works. Written with a lock because the server is
-threaded, and flushed on every write because the interesting line is always
-the last one before something stopped.
+the file, and `grep` still works.
+
+Writing
+-------
+Every record used to take a global lock, create the folder, open the day's
+file, write one line and flush it — on the request thread. Under batch load
+(``/v1/logs`` ingest plus a ``translate.perf`` line per job) that was several
+syscalls per event, one thread at a time. Now :func:`write` only serialises
+an ordinary record and puts it on a bounded queue; one writer thread writes
+whatever has queued up as one batch to the stream's open file, flushes it,
+and reopens on the next day's name. A full queue drops the line and counts it
+rather than stall a request; the counts are on ``/v1/logs/where``.
+
+The interesting line is still the last one before something stopped, so:
+
+* the writer flushes every batch to the OS as soon as it is written — a
+  crashed process loses only what had not reached the thread yet, which is
+  the last few milliseconds;
+* an ``ok: false`` record never waits on the queue. :func:`write` writes it on
+  the calling thread, through the same open handles, after everything queued
+  ahead of it, and flushes (and by default fsyncs) before returning: when it
+  returns, the line is in the file. Async code that must not block calls
+  :func:`backend.log.aevent`, which does this on a worker thread;
+* ``TP_LOG_FSYNC`` decides what also goes to the disk itself, for a machine
+  that dies rather than a process: ``error`` (default) fsyncs with every
+  ``ok: false`` line, ``always`` every batch, ``off`` none;
+* :func:`close` drains the queue at shutdown and at interpreter exit.
 
 Files rotate by day and are pruned after ``TP_LOG_KEEP_DAYS``: a debugging aid
 that quietly fills a disk stops being an aid.
@@ -37,8 +61,10 @@ cost a directory in every deployment.
 
 from __future__ import annotations
 
+import atexit
 import json
 import os
+import queue
 import threading
 import time
 from datetime import datetime, timedelta, timezone
@@ -61,6 +87,23 @@ _SECRET_KEYS = (
 _ROOT = Path(os.environ.get("TP_LOG_DIR") or (Path(__file__).resolve().parents[1] / "logs"))
 _KEEP_DAYS = max(1, int(os.environ.get("TP_LOG_KEEP_DAYS", "7") or 7))
 _ENABLED = (os.environ.get("TP_LOG_FILE", "0") or "0").strip().lower() in ("1", "true", "on", "yes")
+_QUEUE_MAX = max(1, int(os.environ.get("TP_LOG_QUEUE", "10000") or 10000))
+_FSYNC = (os.environ.get("TP_LOG_FSYNC", "error") or "error").strip().lower()
+if _FSYNC not in ("off", "error", "always"):
+    _FSYNC = "error"
+# How much of a backlog one batch takes.
+_BATCH_MAX = 500
+
+# (stream, line, failed, done). ``failed`` marks an ``ok: false`` line for the
+# fsync policy; ``done`` is set once the line is written, and only :func:`flush`
+# passes one (with an empty line, as a barrier).
+_Item = tuple[str, str, bool, "threading.Event | None"]
+_queue: "queue.Queue[_Item]" = queue.Queue(maxsize=_QUEUE_MAX)
+_writer: threading.Thread | None = None
+# Set whenever something is queued or the writer should stop.
+_wake = threading.Event()
+_stopping = False
+_counts = {"queued": 0, "written": 0, "dropped": 0, "writeErrors": 0, "fsyncs": 0, "batches": 0}
 
 
 def log_dir() -> Path:
@@ -131,7 +174,10 @@ def sanitize(value: Any) -> Any:
 
 
 def write(stream: str, record: dict[str, Any]) -> None:
-    """Append one record. Never raises — logging must not break the request."""
+    """Queue one record for the writer thread, or write an ``ok: false`` one now.
+
+    Never raises — logging must not break the request.
+    """
     if not _ENABLED:
         return
     try:
@@ -141,17 +187,209 @@ def write(stream: str, record: dict[str, Any]) -> None:
             **(safe_record if isinstance(safe_record, dict) else {}),
         }
         text = json.dumps(line, ensure_ascii=False, default=str)
-        with _LOCK:
-            _ROOT.mkdir(parents=True, exist_ok=True)
-            with open(_path(stream), "a", encoding="utf-8") as handle:
-                handle.write(text + "\n")
-                # The line that matters is always the last one written before
-                # something stopped, so buffering it is exactly wrong here.
-                handle.flush()
+        if line.get("ok") is False:
+            _write_now(stream, text + "\n")
+        else:
+            _enqueue((stream, text + "\n", False, None))
     except Exception:  # noqa: BLE001 - a logger that can fail a request is worse than no logger
         pass
 
 
+def _start_writer() -> None:
+    global _writer, _stopping
+    if _writer is not None and _writer.is_alive():
+        return
+    with _LOCK:
+        if _writer is not None and _writer.is_alive():
+            return
+        _stopping = False
+        _writer = threading.Thread(target=_run_writer, name="tp-logfile", daemon=True)
+        _writer.start()
+
+
+def _enqueue(item: _Item) -> bool:
+    """Hand one line to the writer; False (and counted) when the queue is full."""
+    _start_writer()
+    try:
+        _queue.put_nowait(item)
+    except queue.Full:
+        with _LOCK:
+            _counts["dropped"] += 1
+        return False
+    with _LOCK:
+        _counts["queued"] += 1
+    _wake.set()
+    return True
+
+
+def _write_now(stream: str, line: str) -> None:
+    """Write one ``ok: false`` line on this thread, behind everything queued."""
+    with _FILES_LOCK:
+        batch = _drain()
+        batch.append((stream, line, True, None))
+        _write_out(batch)
+
+
+class _Files:
+    """The open handles, one per stream, on today's name. Used under ``_FILES_LOCK``."""
+
+    def __init__(self) -> None:
+        self._handles: dict[str, tuple[Path, Any]] = {}
+
+    def handle(self, stream: str) -> Any:
+        target = _path(stream)
+        held = self._handles.get(stream)
+        if held is not None and held[0] == target:
+            return held[1]
+        if held is not None:
+            # A new day: close yesterday's file and let the retention window
+            # catch up with it.
+            self.drop(stream)
+            _prune()
+        _ROOT.mkdir(parents=True, exist_ok=True)
+        handle = open(target, "a", encoding="utf-8")
+        self._handles[stream] = (target, handle)
+        return handle
+
+    def drop(self, stream: str) -> None:
+        held = self._handles.pop(stream, None)
+        if held is not None:
+            try:
+                held[1].close()
+            except Exception:  # noqa: BLE001 - a handle we are discarding anyway
+                pass
+
+    def close(self) -> None:
+        for stream in list(self._handles):
+            self.drop(stream)
+
+
+# Shared by the writer thread and synchronous ok:false writes.
+_FILES_LOCK = threading.Lock()
+_files = _Files()
+
+
+def _write_batch(files: _Files, batch: list[_Item]) -> None:
+    by_stream: dict[str, list[str]] = {}
+    errors: set[str] = set()
+    for stream, text, failed, _done in batch:
+        if not text:
+            continue  # a flush barrier
+        by_stream.setdefault(stream, []).append(text)
+        if failed:
+            errors.add(stream)
+    for stream, lines in by_stream.items():
+        try:
+            handle = files.handle(stream)
+            handle.write("".join(lines))
+            # The line that matters is always the last one written before
+            # something stopped, so it never waits in our buffer.
+            handle.flush()
+            fsynced = _FSYNC == "always" or (_FSYNC == "error" and stream in errors)
+            if fsynced:
+                os.fsync(handle.fileno())
+            ok = True
+        except Exception:  # noqa: BLE001 - a read-only disk must not kill the writer
+            files.drop(stream)
+            ok = fsynced = False
+        with _LOCK:
+            _counts["written" if ok else "writeErrors"] += len(lines)
+            _counts["fsyncs"] += int(fsynced)
+
+
+def _drain() -> list[_Item]:
+    """Everything queued right now, in order. Called under ``_FILES_LOCK``."""
+    batch: list[_Item] = []
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+
+def _write_out(batch: list[_Item]) -> None:
+    """Write ``batch`` and release its barriers. Called under ``_FILES_LOCK``."""
+    if not batch:
+        return
+    try:
+        _write_batch(_files, batch)
+    finally:
+        for _stream, _text, _failed, done in batch:
+            if done is not None:
+                done.set()
+    with _LOCK:
+        _counts["batches"] += 1
+
+
+def _run_writer() -> None:
+    while True:
+        _wake.wait()
+        _wake.clear()
+        # Taking the queue and writing it under one lock keeps a synchronous
+        # ok:false line from overtaking lines queued before it.
+        with _FILES_LOCK:
+            while True:
+                batch = _drain()
+                if not batch:
+                    break
+                for i in range(0, len(batch), _BATCH_MAX):
+                    _write_out(batch[i:i + _BATCH_MAX])
+            if _stopping:
+                _files.close()
+                return
+
+
+def flush(timeout: float = 2.0) -> bool:
+    """Wait until everything queued so far is in the file."""
+    if not _ENABLED or _writer is None:
+        return True
+    done = threading.Event()
+    try:
+        _queue.put(("", "", False, done), timeout=timeout)
+    except queue.Full:
+        return False
+    _wake.set()
+    return done.wait(timeout)
+
+
+def close(timeout: float = 2.0) -> None:
+    """Drain the queue and stop the writer. Called at shutdown and at exit.
+
+    A later :func:`write` starts a new writer.
+    """
+    global _writer, _stopping
+    writer = _writer
+    if writer is None or not writer.is_alive():
+        # Only synchronous writes ever opened a file.
+        with _FILES_LOCK:
+            _files.close()
+        return
+    with _LOCK:
+        _stopping = True
+    _wake.set()
+    writer.join(timeout)
+    with _LOCK:
+        if _writer is writer and not writer.is_alive():
+            _writer = None
+
+
+atexit.register(close)
+
+
+def stats() -> dict[str, Any]:
+    """Writer queue counters, for ``/v1/logs/where``."""
+    with _LOCK:
+        counts = dict(_counts)
+    return {
+        **counts,
+        "depth": _queue.qsize(),
+        "max": _QUEUE_MAX,
+        "fsync": _FSYNC,
+        "writer": _writer is not None and _writer.is_alive(),
+        "duplicatesDropped": _dupes_dropped,
+    }
+
+
 def api(tag: str, data: dict[str, Any] | None = None, *, ok: bool = True) -> None:
     """One server-side event."""
     write("api", {"side": "api", "tag": tag, "ok": ok, **(data or {})})
@@ -24,7 +24,7 @@ from backend.api.middleware import access_log_middleware, configure_uvicorn_acce
 from backend.api.errors import (
     ERROR_SCHEMA,
     payload as error_payload,
-    failure_event,
+    afailure_event,
     request_correlation,
     safe_cause_class,
     safe_validation_reason,
@@ -43,13 +43,17 @@ from backend.api.routes import (
     translate_v1,
 )
 from backend import logfile, trace, trace_install
+from backend.ai.clients import pool as ai_pool
 from backend.ai.rategate import rate_gate
 from backend.jobs.admission import AdmissionGate
 from backend.config import settings
-from backend.jobs.pipeline import process_payload
+from backend.jobs.pipeline import prefetch_lens, process_payload
 from backend.jobs.queue import JobQueue
+from backend.jobs import cache as cache_mod
+from backend.jobs import cpu_lane
+from backend.lens import client as lens_client
 from backend.lens import cookie as lens_cookie
-from backend.log import event
+from backend.log import aevent, event
 from backend.utils.cpu_runtime import cpu_runtime_info, effective_cpu_count
 from backend.warmup import warmup as run_warmup
 
@@ -60,7 +64,7 @@ async def _warm_at_boot() -> None:
         result = await asyncio.to_thread(run_warmup, settings.warmup_lang)
         event("warmup.boot", {"lang": result.get("lang"), "cookie_ok": result.get("cookie_ok")})
     except Exception as e:  # noqa: BLE001 - warmup must never block startup
-        event("warmup.boot", {"error": str(e)[:200]}, ok=False)
+        await aevent("warmup.boot", {"error": str(e)[:200]}, ok=False)
 
 
 async def _cookie_refresh_loop() -> None:
@@ -83,7 +87,7 @@ async def _cookie_refresh_loop() -> None:
 async def lifespan(app: FastAPI):
     """Start the job queue's worker pool when the server boots."""
     configure_uvicorn_access_log()
-    queue = JobQueue(process_payload)
+    queue = JobQueue(process_payload, lens_prefetch=prefetch_lens)
     queue.start()
     app.state.job_queue = queue
     print(f"[TextPhantom][api] starting workers={settings.max_workers} direct_workers={getattr(queue, '_direct_workers', '?')} ai_workers={getattr(queue, '_ai_workers', '?')} ai_http_threads={settings.ai_thread_workers}", flush=True)
@@ -183,8 +187,20 @@ async def lifespan(app: FastAPI):
             flush=True,
         )
     asyncio.create_task(_warm_at_boot())
+    if cpu_lane.enabled():
+        asyncio.create_task(asyncio.to_thread(cpu_lane.warm))
     asyncio.create_task(_cookie_refresh_loop())
     yield
+    # Pooled keep-alive connections (AI providers, Lens) are closed here so a
+    # reload does not leave sockets for the OS to reap.
+    ai_pool.close_all()
+    lens_client.close_session()
+    await lens_client.aclose_session()
+    cpu_lane.shutdown()
+    # Results still queued for the disk tier are written rather than lost.
+    await asyncio.to_thread(cache_mod.result_disk_cache.flush)
+    # Whatever the log writer still holds goes to disk before the process does.
+    logfile.close()
 
 
 app = FastAPI(title="TextPhantom OCR API", version="2.0", lifespan=lifespan)
@@ -231,7 +247,7 @@ async def tp_http_exception_handler(request: Request, exc: HTTPException) -> JSO
             correlation=request_correlation(request),
         )
         if not expected_cancel and not diagnostics_disabled:
-            failure_event(request.url.path, detail)
+            await afailure_event(request.url.path, detail)
     headers = dict(exc.headers or {})
     # Internal marker used only to prevent the access middleware from emitting
     # a second, cause-less "Bad Gateway" line for this already-classified error.
@@ -246,7 +262,7 @@ async def tp_validation_exception_handler(request: Request, exc: RequestValidati
         exc.errors(), trace_id=str(request.headers.get("x-tp-trace-id") or ""),
         correlation=request_correlation(request),
     )
-    failure_event(request.url.path, detail)
+    await afailure_event(request.url.path, detail)
     # A canonical body is required here: advertising tp.error/1 while returning
     # FastAPI's raw list made the schema header false and could echo `input`.
     return JSONResponse(status_code=422, content={"detail": detail},
@@ -265,7 +281,7 @@ async def tp_unhandled_exception_handler(request: Request, exc: Exception) -> JS
         extra={"errorType": type(exc).__name__, "causeClass": safe_cause_class(exc)},
         correlation=request_correlation(request),
     )
-    failure_event(request.url.path, detail)
+    await afailure_event(request.url.path, detail)
     return JSONResponse(status_code=500, content={"detail": detail},
                         headers={"X-TP-Error-Schema": ERROR_SCHEMA})
 
@@ -292,11 +308,12 @@ app.state.ai_executor = ThreadPoolExecutor(
 _ADAPTIVE = str(os.environ.get("TP_ADAPTIVE", "1")).strip().lower() not in ("0", "false", "no", "off")
 _LENS_LIMIT = max(1, settings.sync_max_concurrency or settings.max_workers)
 app.state.adaptive_gates = _ADAPTIVE
-# Lens is synchronous remote I/O. Keep its executor and admission limit exactly
-# aligned so an admitted upload can start immediately instead of entering an
-# invisible ThreadPoolExecutor FIFO. User-configured TP_SYNC_MAX_CONCURRENCY /
-# SERVER_MAX_WORKERS still define the size; we only make the implementation
-# honour that value literally.
+# The Lens routes await Google on the async client (lens/client.py), so this
+# pool no longer carries the network wait; it runs /v1/lens/fallback's decode.
+# Keep its executor and admission limit exactly aligned so an admitted decode
+# can start immediately instead of entering an invisible ThreadPoolExecutor
+# FIFO. User-configured TP_SYNC_MAX_CONCURRENCY / SERVER_MAX_WORKERS still
+# define the size; we only make the implementation honour that value literally.
 app.state.lens_executor = ThreadPoolExecutor(
     max_workers=_LENS_LIMIT,
     thread_name_prefix="tp-lens-http",
@@ -0,0 +1,367 @@
+"""Encode the erased background: one format chosen from the page, optional size target.
+
+The erased background does not need to be lossless. Scanned/JPEG-sourced
+pages carry sensor+compression noise that PNG must encode exactly (multi-MB
+payloads); a lossy codec discards it and is typically several times smaller.
+Clean digital pages with large flat areas go the other way: PNG is both
+smaller AND faster on line art.
+
+This used to encode BOTH formats and return the smaller blob. That is the
+right answer for BYTES and the wrong one for CPU — it paid for two full
+encodes of every page on a 2-vCPU container where encoding is already the
+hottest stage of the direct lane. It now encodes ONCE, choosing the format
+from a sampled flatness measurement taken on a small native-resolution crop
+(tens of microseconds, versus ~0.3-1.5 s for the encode it replaces).
+
+TP_LENS_DIRECT_IMG_FORMAT:
+  auto (default)         — sample the image, run exactly one encode: PNG for
+                           quantized art, the lossy format otherwise
+  png / webp / avif / jxl — force one format, skip the sampling
+  compare                — encode PNG and the lossy format side by side and
+                           return the smaller. Roughly 2x the encode CPU;
+                           kept for A/B measurement.
+
+TP_LENS_DIRECT_LOSSY_FORMAT picks the lossy codec ``auto`` uses (webp by
+default; avif and jxl when this Pillow build can write them — AVIF is built
+into Pillow >= 11.2, JPEG XL needs the ``pillow-jxl-plugin`` package).
+
+TP_LENS_DIRECT_TARGET_KB (0 = off) caps the encoded size. A page whose one
+encode comes out larger is re-encoded lossily at a quality found by search:
+each round encodes a few candidate qualities at once (the codecs release the
+GIL, so the probes run in parallel) and narrows to the best one that fits.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from backend.log import event
+from backend.utils.cpu_runtime import effective_cpu_count
+from backend.utils.images import bytes_to_data_uri
+
+_FORMAT = (os.environ.get("TP_LENS_DIRECT_IMG_FORMAT", "auto") or "auto").strip().lower()
+_LOSSY_FORMAT = (os.environ.get("TP_LENS_DIRECT_LOSSY_FORMAT", "webp") or "webp").strip().lower()
+_WEBP_QUALITY = max(1, min(100, int(os.environ.get("TP_LENS_DIRECT_WEBP_QUALITY", "80"))))
+# Pillow's WebP effort knob (0 fastest .. 6 smallest). 2 keeps most of the size
+# win at a fraction of the default (4) cost.
+_WEBP_METHOD = max(0, min(6, int(os.environ.get("TP_LENS_DIRECT_WEBP_METHOD", "2"))))
+# AVIF's quality scale sits lower than WebP's for the same look; speed 8 of 10
+# keeps one encode of a full page in the WebP range instead of seconds.
+_AVIF_QUALITY = max(1, min(100, int(os.environ.get("TP_LENS_DIRECT_AVIF_QUALITY", "60"))))
+_AVIF_SPEED = max(0, min(10, int(os.environ.get("TP_LENS_DIRECT_AVIF_SPEED", "8"))))
+_JXL_QUALITY = max(1, min(100, int(os.environ.get("TP_LENS_DIRECT_JXL_QUALITY", "80"))))
+_JXL_EFFORT = max(1, min(9, int(os.environ.get("TP_LENS_DIRECT_JXL_EFFORT", "3"))))
+# --- size target ---
+_TARGET_BYTES = max(0, int(os.environ.get("TP_LENS_DIRECT_TARGET_KB", "0"))) * 1024
+# Below this the search gives up and returns its smallest attempt, flagged as
+# over target: a page mush of 8x8 blocks is worse than a large one.
+_MIN_QUALITY = max(1, min(100, int(os.environ.get("TP_LENS_DIRECT_MIN_QUALITY", "30"))))
+_SEARCH_ROUNDS = max(1, int(os.environ.get("TP_LENS_DIRECT_SEARCH_ROUNDS", "3")))
+_SEARCH_WIDTH = max(1, int(os.environ.get("TP_LENS_DIRECT_SEARCH_PARALLEL", "0")) or min(3, effective_cpu_count()))
+
+# --- "auto" format heuristic ---
+# PNG only beats WebP on QUANTIZED art: screentone/halftone, line art, flat
+# webtoon colour. On a measured 1400x2000 halftone page PNG is 54 KB and WebP
+# q80 is 872 KB — 16x larger and 4x slower — so getting this class wrong is
+# far more expensive than the sampling. On anything scanned or JPEG-sourced
+# the ordering reverses hard (2374 KB PNG vs 125 KB WebP).
+#
+# Neither signal is sufficient alone:
+#   • colour count alone misfires on flat-toned grey scans, which have few
+#     distinct values but compress terribly as PNG because of pixel noise;
+#   • flatness alone misfires on halftone, whose 2-3 px dither pattern puts
+#     adjacency near 0.67 — well inside the range real scans occupy.
+# Requiring BOTH is what separates them: quantized art has few colours AND
+# long identical runs, scan noise has neither.
+#
+# Accepted trade: pure line art and flat webtoon colour would still be a few
+# tens of KB smaller as WebP, and they are routed to PNG here. Those pages are
+# 40-100 KB either way, so the loss is bounded and absolute; the cases this
+# protects (halftone at 16x, scans at 19x) are measured in megabytes.
+_MAX_PALETTE_COLORS = max(2, int(os.environ.get("TP_LENS_DIRECT_COLOR_LIMIT", "256")))
+# Stride for the colour sample. NEAREST keeps exact pixel values, so counting
+# distinct colours on the subsample stays meaningful (unlike the noise
+# measurement below, which must be taken at native resolution).
+_COLOR_SAMPLE_STEP = max(1, int(os.environ.get("TP_LENS_DIRECT_COLOR_STEP", "3")))
+# Side of the native-resolution centre crop used to measure flatness.
+_FLAT_SAMPLE_PX = max(32, int(os.environ.get("TP_LENS_DIRECT_SAMPLE_PX", "256")))
+# Fraction of horizontally-adjacent identical pixels. Scans sit at 0.04-0.13,
+# halftone at ~0.67, line art and flat colour above 0.98.
+_FLAT_THRESHOLD = min(1.0, max(0.0, float(os.environ.get("TP_LENS_DIRECT_FLAT_THRESHOLD", "0.45"))))
+
+MIME = {"png": "image/png", "webp": "image/webp", "avif": "image/avif", "jxl": "image/jxl"}
+_DEFAULT_QUALITY = {"webp": _WEBP_QUALITY, "avif": _AVIF_QUALITY, "jxl": _JXL_QUALITY}
+
+
+def _check_feature(name: str) -> bool:
+    try:
+        from PIL import features
+
+        return bool(features.check(name))
+    except Exception:  # noqa: BLE001 - very old Pillow without PIL.features
+        return False
+
+
+def _can_save(pil_format: str, plugin: str) -> bool:
+    """Whether Pillow can write ``pil_format``, importing its plugin if there is one."""
+    Image.init()
+    if pil_format in Image.SAVE:
+        return True
+    try:
+        __import__(plugin)
+    except ImportError:
+        return False
+    return pil_format in Image.SAVE
+
+
+# Codec support is a property of the Pillow BUILD, not of any single image, so
+# it is resolved once here. Doing it per-call inside a bare `except` hid a
+# permanently-degraded deployment behind a silent PNG fallback.
+AVAILABLE: dict[str, bool] = {
+    "png": True,
+    "webp": _check_feature("webp"),
+    "avif": _check_feature("avif") or _can_save("AVIF", "pillow_avif"),
+    "jxl": _can_save("JXL", "pillow_jxl"),
+}
+for _name in {_LOSSY_FORMAT, _FORMAT} & {"webp", "avif", "jxl"}:
+    if not AVAILABLE[_name]:
+        event(
+            "encode.format_unavailable",
+            {
+                "format": _name,
+                "requested_format": _FORMAT,
+                "lossy_format": _LOSSY_FORMAT,
+                "detail": f"Pillow cannot write {_name}; backgrounds fall back to "
+                "WebP, or PNG without WebP (much larger payloads). Install a "
+                "Pillow build with the codec or change the format setting to make "
+                "this explicit.",
+            },
+            ok=False,
+        )
+
+
+@dataclass(frozen=True)
+class EncodedBackground:
+    """One encoded background and how it was made."""
+
+    data: bytes
+    format: str
+    # The codec quality used, or None for PNG.
+    quality: int | None
+    # Why this format: "quantized" / "continuous" (auto), "forced", "compare".
+    kind: str
+    encodes: int
+    ms: float
+    # None when no size target applied.
+    target_met: bool | None = None
+
+    @property
+    def mime(self) -> str:
+        return MIME[self.format]
+
+    def data_uri(self) -> str:
+        return bytes_to_data_uri(self.data, self.mime)
+
+    def perf(self) -> dict[str, Any]:
+        """The ``bg_*`` fields this encode contributes to ``perfStages``."""
+        out: dict[str, Any] = {
+            "bg_format": self.format,
+            "bg_kind": self.kind,
+            "bg_bytes": len(self.data),
+            "bg_quality": self.quality,
+            "bg_encode_ms": round(self.ms, 1),
+            "bg_encodes": self.encodes,
+        }
+        if self.target_met is not None:
+            out["bg_target_met"] = self.target_met
+        return out
+
+    def reused(self) -> "EncodedBackground":
+        """This encode as handed to a job that did not run it."""
+        return dataclasses.replace(self, encodes=0, ms=0.0)
+
+
+def _lossy_format() -> str:
+    for name in (_LOSSY_FORMAT, "webp"):
+        if name in _DEFAULT_QUALITY and AVAILABLE.get(name):
+            return name
+    return "png"
+
+
+def _save(img: Image.Image, fmt: str, quality: int | None = None) -> bytes:
+    buf = io.BytesIO()
+    q = _DEFAULT_QUALITY.get(fmt) if quality is None else quality
+    if fmt == "png":
+        img.save(buf, format="PNG", compress_level=1)
+    elif fmt == "webp":
+        img.save(buf, format="WEBP", quality=q, method=_WEBP_METHOD)
+    elif fmt == "avif":
+        img.save(buf, format="AVIF", quality=q, speed=_AVIF_SPEED)
+    elif fmt == "jxl":
+        img.save(buf, format="JXL", quality=q, effort=_JXL_EFFORT)
+    else:
+        raise ValueError(f"unknown background format {fmt!r}")
+    return buf.getvalue()
+
+
+def _flatness(img: Image.Image) -> float:
+    """Fraction of horizontally-adjacent identical pixels in a centre crop.
+
+    Sampled at NATIVE resolution — downscaling first would smear exactly the
+    per-pixel noise the measurement is looking for. The crop is capped at
+    ``_FLAT_SAMPLE_PX`` per side, so this reads at most ~65k pixels regardless
+    of page size.
+    """
+    w, h = img.size
+    side = min(_FLAT_SAMPLE_PX, w, h)
+    left = (w - side) // 2
+    top = (h - side) // 2
+    crop = img.crop((left, top, left + side, top + side)).convert("L")
+    arr = np.asarray(crop, dtype=np.uint8)
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        raise ValueError(f"flatness sample has unusable shape {arr.shape}")
+    return float(np.mean(arr[:, 1:] == arr[:, :-1]))
+
+
+def is_quantized_art(img: Image.Image) -> bool:
+    """True for screentone / line art / flat colour — the pages PNG wins on."""
+    w, h = img.size
+    step = _COLOR_SAMPLE_STEP
+    small = img.resize((max(1, w // step), max(1, h // step)), Image.NEAREST)
+    # getcolors returns None past maxcolors, so this early-exits on real scans.
+    if small.getcolors(maxcolors=_MAX_PALETTE_COLORS) is None:
+        return False
+    return _flatness(img) >= _FLAT_THRESHOLD
+
+
+def choose_format(img: Image.Image) -> tuple[str, str]:
+    """``(format, kind)`` for one encode of ``img`` under the configured policy."""
+    if _FORMAT in MIME:
+        if AVAILABLE[_FORMAT]:
+            return _FORMAT, "forced"
+        return _lossy_format(), "forced"
+    if is_quantized_art(img):
+        return "png", "quantized"
+    return _lossy_format(), "continuous"
+
+
+_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _map(fn: Any, items: list) -> list:
+    """``fn`` over ``items``, concurrently when there is more than one core to use.
+
+    ``fn`` must not save one image from several threads: ``Image.save`` keeps
+    its options on the image (``encoderinfo``), so concurrent saves of the same
+    object encode with each other's quality. Each call works on a copy.
+    """
+    global _pool
+    if _SEARCH_WIDTH <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_SEARCH_WIDTH, thread_name_prefix="tp-bg-encode"
+            )
+    return list(_pool.map(fn, items))
+
+
+def _probes(lo: int, hi: int, n: int) -> list[int]:
+    """Up to ``n`` distinct qualities spread over ``[lo, hi]``, ``lo`` included.
+
+    One probe is a plain bisection step: the midpoint.
+    """
+    if hi - lo + 1 <= n:
+        return list(range(lo, hi + 1))
+    if n == 1:
+        return [(lo + hi) // 2]
+    step = (hi - lo) / max(1, n - 1)
+    return sorted({lo + round(i * step) for i in range(n)})
+
+
+def _search(img: Image.Image, fmt: str, ceiling: int, target: int) -> tuple[bytes, int, int, bool]:
+    """Best quality below ``ceiling`` whose encode fits ``target`` bytes.
+
+    Returns ``(data, quality, encodes, fits)``. Sizes are treated as
+    monotonic in quality, which every codec here is to within noise; a probe
+    that breaks that only costs the search some precision.
+    """
+    lo, hi = _MIN_QUALITY, max(_MIN_QUALITY, ceiling - 1)
+    best: tuple[int, bytes] | None = None
+    smallest: tuple[int, bytes] | None = None
+    encodes = 0
+    for _ in range(_SEARCH_ROUNDS):
+        if lo > hi:
+            break
+        qualities = _probes(lo, hi, _SEARCH_WIDTH)
+        results = _map(lambda q: (q, _save(img.copy(), fmt, q)), qualities)
+        encodes += len(results)
+        for q, data in results:
+            if smallest is None or len(data) < len(smallest[1]):
+                smallest = (q, data)
+        fits = [(q, data) for q, data in results if len(data) <= target]
+        if not fits and best is None and min(qualities) == _MIN_QUALITY:
+            break  # even the floor is too large
+        if fits:
+            top = max(fits, key=lambda r: r[0])
+            if best is None or top[0] > best[0]:
+                best = top
+            lo = top[0] + 1
+        over = [q for q, data in results if len(data) > target and q >= lo]
+        if over:
+            hi = min(over) - 1
+    if best is not None:
+        return best[1], best[0], encodes, True
+    assert smallest is not None
+    return smallest[1], smallest[0], encodes, False
+
+
+def encode(img: Image.Image, *, target_bytes: int | None = None) -> EncodedBackground:
+    """Encode the (erased) background under the configured format policy.
+
+    Runs exactly one encode unless the format is ``compare`` or the result is
+    over the size target (``target_bytes``, default ``TP_LENS_DIRECT_TARGET_KB``).
+    """
+    t0 = time.perf_counter()
+    target = _TARGET_BYTES if target_bytes is None else max(0, int(target_bytes))
+    if _FORMAT == "compare" and _lossy_format() != "png":
+        lossy = _lossy_format()
+        png_data, lossy_data = _map(lambda f: _save(img.copy(), f), ["png", lossy])
+        fmt, kind, encodes = ("png", "compare", 2) if len(png_data) <= len(lossy_data) else (lossy, "compare", 2)
+        data = png_data if fmt == "png" else lossy_data
+    else:
+        fmt, kind = choose_format(img)
+        data, encodes = _save(img, fmt), 1
+    quality = _DEFAULT_QUALITY.get(fmt)
+    target_met: bool | None = None
+    if target:
+        target_met = len(data) <= target
+        # PNG cannot trade quality for size; a page over the target as PNG
+        # goes to the lossy codec instead.
+        lossy = fmt if fmt != "png" else _lossy_format()
+        if not target_met and lossy != "png":
+            ceiling = (quality or _DEFAULT_QUALITY[lossy]) + (1 if fmt == "png" else 0)
+            found, q, n, target_met = _search(img, lossy, ceiling, target)
+            encodes += n
+            if target_met or len(found) < len(data):
+                data, fmt, quality = found, lossy, q
+    return EncodedBackground(
+        data=data, format=fmt, quality=quality, kind=kind, encodes=encodes,
+        ms=(time.perf_counter() - t0) * 1000, target_met=target_met,
+    )
+
+
+def encode_data_uri(img: Image.Image) -> str:
+    """:func:`encode` as a data URI."""
+    return encode(img).data_uri()
@@ -4,6 +4,11 @@
 When the renderer erases original text it needs to know the surrounding
 background colour; when it draws translated text it needs a legible
 foreground colour.  Both jobs live here.
+
+A page is sampled once per token or paragraph, so the per-call functions only
+ever convert the pixels they read. :class:`ColorSampler` converts a whole page
+to one NumPy array up front and answers the same questions with slicing — use
+it when a job samples the same page many times.
 """
 
 from __future__ import annotations
@@ -59,24 +64,53 @@ def pick_bw_text_color(bg_rgb: RGB) -> RGBA:
     return TEXT_COLOR_DARK
 
 
-def region_is_dark(base_rgb: Image.Image, rect: Rect) -> bool:
-    """True when the area inside ``rect`` reads as a DARK background.
+def _median_px(px: np.ndarray) -> RGB | None:
+    """Channel-wise median of an ``(n, 3)`` uint8 array.
 
-    Used to flip overlay text from the default near-black-with-white-halo to
-    white-with-dark-halo on dark panels.  Sampling happens on the *erased*
-    image (original text already removed), so the median is the real
-    bubble/panel colour, not the glyphs.  The crop is shrunk to ≤ 24×24 first
-    — a median over ~500 pixels is plenty and keeps this O(1) per paragraph.
+    The upper median, like :func:`median_rgba`: the element at ``n // 2`` of
+    each sorted channel, found with a partition instead of a sort.
     """
-    W, H = base_rgb.size
+    n = int(px.shape[0])
+    if n == 0:
+        return None
+    mid = np.partition(px, n // 2, axis=0)[n // 2]
+    return int(mid[0]), int(mid[1]), int(mid[2])
+
+
+def _frame_median(px: np.ndarray, rect: Rect, margin_px: int) -> RGB | None:
+    """Median of the ``margin_px`` frame just outside ``rect``, clipped to ``px``."""
+    H, W = px.shape[:2]
+    l, t, r, b = (int(v) for v in rect)
+    m = max(1, int(margin_px))
+    strips = []
+    for x0, y0, x1, y1 in ((l, t - m, r, t), (l, b, r, b + m), (l - m, t, l, b), (r, t, r + m, b)):
+        x0, x1 = max(0, min(W, x0)), max(0, min(W, x1))
+        y0, y1 = max(0, min(H, y0)), max(0, min(H, y1))
+        if x1 > x0 and y1 > y0:
+            strips.append(px[y0:y1, x0:x1].reshape(-1, 3))
+    return _median_px(np.concatenate(strips)) if strips else None
+
+
+def _clamp_rect(rect: Rect, W: int, H: int) -> Rect:
     l, t, r, b = rect
-    l, r = max(0, min(W, int(l))), max(0, min(W, int(r)))
-    t, b = max(0, min(H, int(t))), max(0, min(H, int(b)))
-    if r - l < 2 or b - t < 2:
-        return False
-    region = base_rgb.crop((l, t, r, b)).convert("RGB")
+    return (
+        max(0, min(W, int(l))), max(0, min(H, int(t))),
+        max(0, min(W, int(r))), max(0, min(H, int(b))),
+    )
+
+
+def _dark_margin(rect: Rect) -> int:
+    l, t, r, b = rect
+    return max(2, min(16, round(min(r - l, b - t) * 0.2)))
+
+
+def _dark_votes(px: np.ndarray, rect: Rect, outside: RGB | None) -> bool:
+    """The :func:`region_is_dark` vote over ``px[rect]`` (already clamped)."""
+    l, t, r, b = rect
+    region = Image.fromarray(np.ascontiguousarray(px[t:b, l:r]))
     region.thumbnail((32, 32))
-    rw, rh = region.size
+    thumb = np.asarray(region)
+    rh, rw = thumb.shape[:2]
 
     # Three independent background readings make this work before *and* after
     # erasure. Client-painted overlays annotate the original image, where a
@@ -85,23 +119,21 @@ def region_is_dark(base_rgb: Image.Image, rect: Rect) -> bool:
     # full black bubble can have a white outside frame, while its perimeter
     # and full crop remain dark. Requiring two votes handles both cases.
     readings: list[RGB] = []
-    full = median_rgba(list(region.getdata()))
+    full = _median_px(thumb.reshape(-1, 3))
     if full:
-        readings.append(full[:3])
+        readings.append(full)
 
     edge = max(1, min(rw, rh) // 5)
-    edge_pixels = (
-        list(region.crop((0, 0, rw, edge)).getdata())
-        + list(region.crop((0, max(0, rh - edge), rw, rh)).getdata())
-        + list(region.crop((0, edge, edge, max(edge, rh - edge))).getdata())
-        + list(region.crop((max(0, rw - edge), edge, rw, max(edge, rh - edge))).getdata())
-    )
-    inside = median_rgba(edge_pixels)
+    inner = slice(edge, max(edge, rh - edge))
+    inside = _median_px(np.concatenate((
+        thumb[0:edge, :].reshape(-1, 3),
+        thumb[max(0, rh - edge):rh, :].reshape(-1, 3),
+        thumb[inner, 0:edge].reshape(-1, 3),
+        thumb[inner, max(0, rw - edge):rw].reshape(-1, 3),
+    )))
     if inside:
-        readings.append(inside[:3])
+        readings.append(inside)
 
-    margin = max(2, min(16, round(min(r - l, b - t) * 0.2)))
-    outside = sample_bg_color(base_rgb, (l, t, r, b), margin)
     if outside:
         readings.append(outside)
 
@@ -111,27 +143,57 @@ def region_is_dark(base_rgb: Image.Image, rect: Rect) -> bool:
     return dark_votes * 2 >= len(readings)
 
 
-def sample_bg_color(base_rgb: Image.Image, rect: Rect, margin_px: int) -> RGB:
-    """Median colour of a thin frame just *outside* ``rect``."""
-    W, H = base_rgb.size
+def _border_mask(quad: Quad, rect: Rect, border_px: int) -> np.ndarray:
+    """Boolean mask of the ``border_px`` band inside ``quad``, in ``rect`` coordinates."""
     l, t, r, b = rect
-    m = max(1, int(margin_px))
-    samples: list = []
+    w, h = r - l, b - t
+    mask = Image.new("L", (w, h), 0)
+    ImageDraw.Draw(mask).polygon([(x - l, y - t) for x, y in quad], fill=255)
 
-    def add_strip(x0: int, y0: int, x1: int, y1: int) -> None:
-        x0, x1 = max(0, min(W, x0)), max(0, min(W, x1))
-        y0, y1 = max(0, min(H, y0)), max(0, min(H, y1))
-        if x1 > x0 and y1 > y0:
-            samples.extend(list(base_rgb.crop((x0, y0, x1, y1)).getdata()))
+    bp = int(max(0, border_px or 0))
+    if bp > 0:
+        bp = min(bp, max(1, (min(w, h) - 1) // 2))
+        eroded = mask.filter(ImageFilter.MinFilter(size=bp * 2 + 1))
+        border = ImageChops.subtract(mask, eroded)
+    else:
+        border = mask
+    return np.asarray(border) > 0
+
+
+def region_is_dark(base_rgb: Image.Image, rect: Rect) -> bool:
+    """True when the area inside ``rect`` reads as a DARK background.
+
+    Used to flip overlay text from the default near-black-with-white-halo to
+    white-with-dark-halo on dark panels.  Sampling happens on the *erased*
+    image (original text already removed), so the median is the real
+    bubble/panel colour, not the glyphs.  The crop is shrunk to ≤ 24×24 first
+    — a median over ~500 pixels is plenty and keeps this O(1) per paragraph.
+    """
+    W, H = base_rgb.size
+    l, t, r, b = _clamp_rect(rect, W, H)
+    if r - l < 2 or b - t < 2:
+        return False
+    m = _dark_margin((l, t, r, b))
+    ox, oy = max(0, l - m), max(0, t - m)
+    px = np.asarray(base_rgb.crop((ox, oy, min(W, r + m), min(H, b + m))).convert("RGB"))
+    inner = (l - ox, t - oy, r - ox, b - oy)
+    outside = _frame_median(px, inner, m)
+    if outside is None:
+        outside = sample_bg_color(base_rgb, (l, t, r, b), m)
+    return _dark_votes(px, inner, outside)
 
-    add_strip(l, t - m, r, t)      # top
-    add_strip(l, b, r, b + m)      # bottom
-    add_strip(l - m, t, l, b)      # left
-    add_strip(r, t, r + m, b)      # right
 
-    med = median_rgba(samples)
-    if med:
-        return med[:3]
+def sample_bg_color(base_rgb: Image.Image, rect: Rect, margin_px: int) -> RGB:
+    """Median colour of a thin frame just *outside* ``rect``."""
+    W, H = base_rgb.size
+    l, t, r, b = (int(v) for v in rect)
+    m = max(1, int(margin_px))
+    ox, oy, ex, ey = _clamp_rect((l - m, t - m, r + m, b + m), W, H)
+    if ex > ox and ey > oy:
+        px = np.asarray(base_rgb.crop((ox, oy, ex, ey)).convert("RGB"))
+        med = _frame_median(px, (l - ox, t - oy, r - ox, b - oy), m)
+        if med:
+            return med
     return base_rgb.getpixel((max(0, min(W - 1, l)), max(0, min(H - 1, t))))  # type: ignore[return-value]
 
 
@@ -148,28 +210,76 @@ def sample_bg_color_from_quad(
     small to yield enough samples.
     """
     l, t, r, b = rect
-    w, h = r - l, b - t
-    if w <= 0 or h <= 0:
+    if r - l <= 0 or b - t <= 0:
         return sample_bg_color(base_rgb, rect, margin_px)
+    region = np.asarray(base_rgb.crop((l, t, r, b)).convert("RGB"))
+    samples = region[_border_mask(quad, rect, border_px)]
+    if len(samples) < 24:
+        return sample_bg_color(base_rgb, rect, margin_px)
+    return _median_px(samples) or sample_bg_color(base_rgb, rect, margin_px)
 
-    mask = Image.new("L", (w, h), 0)
-    ImageDraw.Draw(mask).polygon([(x - l, y - t) for x, y in quad], fill=255)
 
-    bp = int(max(0, border_px or 0))
-    if bp > 0:
-        bp = min(bp, max(1, (min(w, h) - 1) // 2))
-        eroded = mask.filter(ImageFilter.MinFilter(size=bp * 2 + 1))
-        border = ImageChops.subtract(mask, eroded)
-    else:
-        border = mask
+class ColorSampler:
+    """Background sampling over one page converted to NumPy once.
 
-    region = base_rgb.crop((l, t, r, b))
-    samples = [p for p, m in zip(region.getdata(), border.getdata()) if m > 0]
-    if len(samples) < 24:
-        return sample_bg_color(base_rgb, rect, margin_px)
+    Same answers as :func:`sample_bg_color`, :func:`region_is_dark` and
+    :func:`sample_bg_color_from_quad`, but every call slices one shared array
+    instead of cropping and converting the image again. The array is built on
+    first use. Whoever paints into ``image`` afterwards must :meth:`refresh`
+    the painted rectangle, or later samples see the old pixels.
+    """
 
-    med = median_rgba(samples)
-    return med[:3] if med else sample_bg_color(base_rgb, rect, margin_px)
+    def __init__(self, image: Image.Image) -> None:
+        self.image = image
+        self._px: np.ndarray | None = None
+
+    @property
+    def px(self) -> np.ndarray:
+        if self._px is None:
+            self._px = np.array(self.image.convert("RGB"), dtype=np.uint8)
+        return self._px
+
+    def refresh(self, rect: Rect) -> None:
+        """Re-read ``rect`` from ``image`` after it was painted over."""
+        if self._px is None:
+            return
+        H, W = self._px.shape[:2]
+        l, t, r, b = _clamp_rect(rect, W, H)
+        if r > l and b > t:
+            self._px[t:b, l:r] = np.asarray(self.image.crop((l, t, r, b)).convert("RGB"))
+
+    def _pixel(self, x: int, y: int) -> RGB:
+        H, W = self.px.shape[:2]
+        p = self.px[max(0, min(H - 1, int(y))), max(0, min(W - 1, int(x)))]
+        return int(p[0]), int(p[1]), int(p[2])
+
+    def sample_bg_color(self, rect: Rect, margin_px: int) -> RGB:
+        return _frame_median(self.px, rect, margin_px) or self._pixel(rect[0], rect[1])
+
+    def region_is_dark(self, rect: Rect) -> bool:
+        H, W = self.px.shape[:2]
+        rect = _clamp_rect(rect, W, H)
+        l, t, r, b = rect
+        if r - l < 2 or b - t < 2:
+            return False
+        return _dark_votes(self.px, rect, self.sample_bg_color(rect, _dark_margin(rect)))
+
+    def sample_bg_color_from_quad(
+        self, quad: Quad, rect: Rect, border_px: int = 3, margin_px: int = 6,
+    ) -> RGB:
+        l, t, r, b = rect
+        H, W = self.px.shape[:2]
+        if r - l <= 0 or b - t <= 0:
+            return self.sample_bg_color(rect, margin_px)
+        if l < 0 or t < 0 or r > W or b > H:
+            # Off-page: fall back to PIL's zero-padded crop, as the function does.
+            region = np.asarray(self.image.crop((l, t, r, b)).convert("RGB"))
+        else:
+            region = self.px[t:b, l:r]
+        samples = region[_border_mask(quad, rect, border_px)]
+        if len(samples) < 24:
+            return self.sample_bg_color(rect, margin_px)
+        return _median_px(samples) or self.sample_bg_color(rect, margin_px)
 
 
 def sample_bg_color_from_quad_ring(
@@ -11,21 +11,42 @@ Several strategies are available; the public entry point is
 - ``blend_patch``       — average several neighbouring patches over the box.
 
 ``clone`` / ``blend_patch`` fall back to ``solid`` if no donor region fits.
+
+``inpaint`` runs per tile: the token quads are grouped into disjoint tiles
+padded past the inpaint radius, so two bubbles at opposite ends of a long
+strip do not drag the whole strip through ``cv2.inpaint``. The tiles are
+independent and OpenCV releases the GIL, so several run at once on a small
+thread pool (``TP_INPAINT_THREADS``; 0 = up to four, capped to the cores).
+``solid`` on a busy page
+(:data:`MASK_ENGINE_MIN_TOKENS` or more tokens) can run on the mask engine
+(``TP_ERASE_ENGINE=mask``; the default ``token`` keeps the per-token
+crop/mask/paste loop, which the other modes always use). Tokens with no other
+token within a sampling margin go into a single label image, their fill
+colours are computed together, and their pixels are written in one array
+assignment. Tokens that are close to others still go through the loop in
+their original order, so the page comes out identical to the loop's.
 """
 
 from __future__ import annotations
 
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 import cv2
 import numpy as np
 from PIL import Image, ImageChops, ImageDraw, ImageFilter
 
-from backend.render.colors import sample_bg_color_from_quad
+from backend.render.colors import ColorSampler
 from backend.render.geometry import (
     quad_bbox,
     token_box_px,
     token_box_quad_px,
     token_quad_px,
 )
+from backend.utils.cpu_runtime import effective_cpu_count
 
 Rect = tuple[int, int, int, int]
 
@@ -47,6 +68,16 @@ BLEND_FEATHER_PX = 4
 INPAINT_RADIUS = 3
 INPAINT_METHOD = "telea"  # "telea" or "ns"
 INPAINT_DILATE_PX = 1
+# Context kept around each tile. Must exceed INPAINT_RADIUS + INPAINT_DILATE_PX
+# so a tile holds every pixel its inpainting reads.
+INPAINT_SLACK_PX = 8
+INPAINT_THREADS = max(0, int(os.environ.get("TP_INPAINT_THREADS", "0") or 0))
+_INPAINT_TILE_TIMINGS_MAX = 32
+
+ERASE_ENGINE = (os.environ.get("TP_ERASE_ENGINE", "") or "token").strip().lower()
+# Below this many tokens the per-token loop wins: the mask engine pays a fixed
+# cost for converting the tokens' whole union bbox to an array and back.
+MASK_ENGINE_MIN_TOKENS = 64
 
 
 # --- Small image utilities -------------------------------------------------
@@ -203,8 +234,77 @@ def _token_mask_quad(token: dict, W: int, H: int, pad_px: int):
     return None
 
 
-def _erase_with_inpaint(base: Image.Image, box_tokens: list[dict], pad_px: int = 2) -> Image.Image:
-    """OpenCV inpaint every token region. Returns a new image."""
+_inpaint_pool: ThreadPoolExecutor | None = None
+_inpaint_pool_lock = threading.Lock()
+
+
+def _inpaint_threads() -> int:
+    return INPAINT_THREADS or min(4, effective_cpu_count())
+
+
+def _inpaint_executor() -> ThreadPoolExecutor | None:
+    global _inpaint_pool
+    n = _inpaint_threads()
+    if n <= 1:
+        return None
+    with _inpaint_pool_lock:
+        if _inpaint_pool is None:
+            _inpaint_pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="inpaint")
+        return _inpaint_pool
+
+
+def _inpaint_tiles(rects: list[Rect], W: int, H: int, slack: int) -> list[Rect]:
+    """Disjoint tiles covering every rect plus ``slack`` px around it.
+
+    Rects whose grown boxes overlap share a tile, and tiles are merged again
+    until no two overlap. Each mask pixel therefore has its whole ``slack``
+    neighbourhood inside its own tile, and no other tile's mask within reach.
+    """
+    tiles: list[list[int]] = []
+    for l, t, r, b in sorted(rects):
+        box = [max(0, l - slack), max(0, t - slack), min(W, r + slack), min(H, b + slack)]
+        merged = True
+        while merged:
+            merged = False
+            for i, o in enumerate(tiles):
+                if o[0] < box[2] and box[0] < o[2] and o[1] < box[3] and box[1] < o[3]:
+                    box = [min(box[0], o[0]), min(box[1], o[1]), max(box[2], o[2]), max(box[3], o[3])]
+                    del tiles[i]
+                    merged = True
+                    break
+        tiles.append(box)
+    return [(l, t, r, b) for l, t, r, b in tiles]
+
+
+def _inpaint_tile(crop_rgb: np.ndarray, crop_mask: np.ndarray) -> tuple[np.ndarray, int, float]:
+    """Inpaint one tile. Returns the RGB result, its masked pixel count and ms."""
+    t0 = time.perf_counter()
+    if INPAINT_DILATE_PX > 0:
+        k = cv2.getStructuringElement(
+            cv2.MORPH_ELLIPSE, (INPAINT_DILATE_PX * 2 + 1, INPAINT_DILATE_PX * 2 + 1)
+        )
+        crop_mask = cv2.dilate(crop_mask, k, iterations=1)
+
+    bgr = cv2.cvtColor(crop_rgb, cv2.COLOR_RGB2BGR)
+    flag = cv2.INPAINT_TELEA if INPAINT_METHOD.lower() in ("telea", "t") else cv2.INPAINT_NS
+    out_bgr = cv2.inpaint(bgr, crop_mask, float(INPAINT_RADIUS), flag)
+    out_rgb = cv2.cvtColor(out_bgr, cv2.COLOR_BGR2RGB)
+    return out_rgb, int(cv2.countNonZero(crop_mask)), (time.perf_counter() - t0) * 1000
+
+
+def _erase_with_inpaint(
+    base: Image.Image,
+    box_tokens: list[dict],
+    pad_px: int = 2,
+    timings: dict[str, Any] | None = None,
+) -> Image.Image:
+    """OpenCV inpaint every token region, tile by tile. Returns a new image.
+
+    ``timings`` receives ``inpaint_tiles``, ``inpaint_px`` (masked pixels),
+    ``inpaint_tile_px`` (pixels run through ``cv2.inpaint``),
+    ``inpaint_threads`` and ``inpaint_tile_ms`` (the first
+    ``_INPAINT_TILE_TIMINGS_MAX`` tiles, in page order).
+    """
     if not box_tokens:
         return base
 
@@ -212,44 +312,252 @@ def _erase_with_inpaint(base: Image.Image, box_tokens: list[dict], pad_px: int =
     W, H = rgb.size
     mask = Image.new("L", (W, H), 0)
     draw = ImageDraw.Draw(mask)
+    rects: list[Rect] = []
     for token in box_tokens:
         quad = _token_mask_quad(token, W, H, pad_px)
         if quad:
             draw.polygon(quad, fill=255)
+            rect = quad_bbox(quad, W, H)
+            if rect:
+                rects.append(rect)
+
+    # Only the padded neighbourhoods of the quads are inpainted — the bbox of
+    # ALL of them can be most of a long webtoon strip.
+    jobs = []
+    for tile in _inpaint_tiles(rects, W, H, INPAINT_SLACK_PX):
+        crop_mask = np.array(mask.crop(tile), dtype=np.uint8)
+        if cv2.countNonZero(crop_mask):
+            jobs.append((tile, np.array(rgb.crop(tile), dtype=np.uint8), crop_mask))
+
+    pool = _inpaint_executor() if len(jobs) > 1 else None
+    if pool is not None:
+        results = list(pool.map(lambda job: _inpaint_tile(job[1], job[2]), jobs))
+    else:
+        results = [_inpaint_tile(crop_rgb, crop_mask) for _, crop_rgb, crop_mask in jobs]
+
+    for (tile, _, _), (out_rgb, _, _) in zip(jobs, results):
+        rgb.paste(Image.fromarray(out_rgb), tile[:2])
+
+    if timings is not None:
+        timings["inpaint_tiles"] = len(jobs)
+        timings["inpaint_px"] = sum(px for _, px, _ in results)
+        timings["inpaint_tile_px"] = sum((r - l) * (b - t) for (l, t, r, b), _, _ in jobs)
+        timings["inpaint_threads"] = _inpaint_threads() if pool is not None else 1
+        timings["inpaint_tile_ms"] = [round(ms, 1) for _, _, ms in results[:_INPAINT_TILE_TIMINGS_MAX]]
+    return rgb
+
+
+# --- Mask engine -------------------------------------------------------------
+
+def _token_quads(
+    box_tokens: list[dict], W: int, H: int, pad_px: int,
+) -> tuple[list[list | None], list[Rect | None]]:
+    """Each token's erase quad and its bbox; ``None`` for both when it has none."""
+    quads: list[list | None] = []
+    rects: list[Rect | None] = []
+    for token in box_tokens:
+        quad = _token_mask_quad(token, W, H, pad_px)
+        rect = quad_bbox(quad, W, H) if quad else None
+        quads.append(quad if rect else None)
+        rects.append(rect)
+    return quads, rects
 
-    m = np.array(mask, dtype=np.uint8)
-    ys, xs = np.where(m > 0)
-    if xs.size == 0 or ys.size == 0:
-        return rgb
-
-    # Crop to the dirty region (+8px slack) — inpainting the whole image is slow.
-    l = int(max(0, xs.min() - 8))
-    t = int(max(0, ys.min() - 8))
-    r = int(min(W, xs.max() + 1 + 8))
-    b = int(min(H, ys.max() + 1 + 8))
-    if r <= l or b <= t:
-        return rgb
-
-    crop_rgb = np.array(rgb.crop((l, t, r, b)), dtype=np.uint8)
-    crop_mask = m[t:b, l:r]
-    if INPAINT_DILATE_PX > 0:
-        k = cv2.getStructuringElement(
-            cv2.MORPH_ELLIPSE, (INPAINT_DILATE_PX * 2 + 1, INPAINT_DILATE_PX * 2 + 1)
-        )
-        crop_mask = cv2.dilate(crop_mask, k, iterations=1)
 
-    bgr = cv2.cvtColor(crop_rgb, cv2.COLOR_RGB2BGR)
-    flag = cv2.INPAINT_TELEA if INPAINT_METHOD.lower() in ("telea", "t") else cv2.INPAINT_NS
-    out_bgr = cv2.inpaint(bgr, crop_mask, float(INPAINT_RADIUS), flag)
-    out_rgb = cv2.cvtColor(out_bgr, cv2.COLOR_BGR2RGB)
+def _isolated(rects: list[Rect | None], margin_px: int) -> list[bool]:
+    """Which rects have no other rect within ``margin_px`` of them.
+
+    A ``solid`` erase reads only its own bbox and the ``margin_px`` frame
+    around it, and writes only inside its bbox. An isolated token therefore
+    reads nothing another token writes and vice versa, so it gets the same
+    colour whenever it is erased; tokens that are not isolated keep their order.
+    """
+    live = [i for i, r in enumerate(rects) if r]
+    out = [False] * len(rects)
+    if not live:
+        return out
+    m = max(1, int(margin_px))
+    a = np.array([rects[i] for i in live], dtype=np.int64)
+    for s in range(0, len(a), 1024):
+        blk = a[s:s + 1024, None]
+        near = ((blk[..., 0] < a[:, 2] + m) & (blk[..., 2] > a[:, 0] - m)
+                & (blk[..., 1] < a[:, 3] + m) & (blk[..., 3] > a[:, 1] - m))
+        near[np.arange(len(blk)), np.arange(s, s + len(blk))] = False
+        for i, hit in zip(live[s:s + 1024], near.any(axis=1)):
+            out[i] = not hit
+    return out
+
+
+def _label_mask(
+    quads: list[list | None], rects: list[Rect | None], W: int, H: int, margin_px: int = 0,
+) -> tuple[np.ndarray, list[Rect | None], tuple[int, int]]:
+    """Rasterise quads into one int32 label image.
+
+    The image covers only the quads' union bbox grown by ``margin_px``
+    (clamped to the page); ``origin`` is its top-left in page pixels and the
+    returned rects are relative to it. Label ``k`` (1-based) is
+    ``quads[k - 1]``; where quads overlap the later one owns the pixel.
+    """
+    live = [r for r in rects if r]
+    if not live:
+        return np.zeros((0, 0), dtype=np.int32), [None] * (len(rects) + 1), (0, 0)
+    m = max(0, int(margin_px))
+    ox, oy = max(0, min(r[0] for r in live) - m), max(0, min(r[1] for r in live) - m)
+    ex, ey = min(W, max(r[2] for r in live) + m), min(H, max(r[3] for r in live) + m)
+
+    # Each quad is drawn in its own bbox exactly as the per-token loop draws
+    # it, so both engines erase the same pixels; only the writes are batched.
+    labels = np.zeros((ey - oy, ex - ox), dtype=np.int32)
+    shifted: list[Rect | None] = [None]
+    for k, (quad, rect) in enumerate(zip(quads, rects), start=1):
+        if not rect:
+            shifted.append(None)
+            continue
+        l, t, r, b = rect
+        mask = Image.new("L", (r - l, b - t), 0)
+        ImageDraw.Draw(mask).polygon([(x - l, y - t) for x, y in quad], fill=255)
+        l, t, r, b = l - ox, t - oy, r - ox, b - oy
+        labels[t:b, l:r][np.asarray(mask) > 0] = k
+        shifted.append((l, t, r, b))
+    return labels, shifted, (ox, oy)
+
 
-    out = rgb.copy()
-    out.paste(Image.fromarray(out_rgb), (l, t))
+def _label_medians(ids: np.ndarray, values: np.ndarray, n_labels: int) -> np.ndarray:
+    """Per-label channel-wise upper median of ``values`` (``(n, 3)`` uint8).
+
+    One stable sort per channel over every sample of every label; the median
+    of label ``k`` is the element ``count // 2`` into its run, the same pick
+    as :func:`backend.render.colors.median_rgba`.
+    """
+    out = np.zeros((n_labels + 1, 3), dtype=np.uint8)
+    if ids.size == 0:
+        return out
+    counts = np.bincount(ids, minlength=n_labels + 1)
+    present = np.nonzero(counts)[0]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    pick = starts[present] + counts[present] // 2
+    for c in range(3):
+        order = np.lexsort((values[:, c], ids))
+        out[present, c] = values[order[pick], c]
     return out
 
 
+def _frame_samples(px: np.ndarray, rect: Rect, margin_px: int) -> np.ndarray:
+    """Pixels of the ``margin_px`` frame just outside ``rect``, clipped to ``px``.
+
+    The frame :meth:`~backend.render.colors.ColorSampler.sample_bg_color`
+    takes its median over, with the same top-left pixel when nothing is left.
+    """
+    H, W = px.shape[:2]
+    l, t, r, b = rect
+    m = max(1, int(margin_px))
+    strips = []
+    for x0, y0, x1, y1 in ((l, t - m, r, t), (l, b, r, b + m), (l - m, t, l, b), (r, t, r + m, b)):
+        x0, x1 = max(0, min(W, x0)), max(0, min(W, x1))
+        y0, y1 = max(0, min(H, y0)), max(0, min(H, y1))
+        if x1 > x0 and y1 > y0:
+            strips.append(px[y0:y1, x0:x1].reshape(-1, 3))
+    if not strips:
+        return px[max(0, min(H - 1, t)), max(0, min(W - 1, l))].reshape(1, 3)
+    return np.concatenate(strips)
+
+
+def _solid_fill(px: np.ndarray, labels: np.ndarray, rects: list[Rect | None],
+                border_px: int, margin_px: int) -> np.ndarray:
+    """Fill colour per label, from ``px`` before anything is erased.
+
+    Same sample as :func:`~backend.render.colors.sample_bg_color_from_quad`:
+    the ``border_px`` band inside the quad, eroded within the quad's own bbox,
+    or the outside frame when the band holds fewer than 24 pixels. Exact only
+    for isolated labels, whose frames hold no other label.
+    """
+    ids, values = [], []
+    for k, rect in enumerate(rects):
+        if not rect:
+            continue
+        l, t, r, b = rect
+        own = labels[t:b, l:r] == k
+        if not own.any():
+            continue
+        bp = int(max(0, border_px or 0))
+        if bp > 0:
+            bp = min(bp, max(1, (min(r - l, b - t) - 1) // 2))
+            kernel = np.ones((bp * 2 + 1, bp * 2 + 1), np.uint8)
+            # cv2's default erode border counts as "inside", like the edge
+            # replication of PIL's MinFilter on the bbox crop.
+            band = own & (cv2.erode(own.view(np.uint8), kernel) == 0)
+        else:
+            band = own
+        sample = px[t:b, l:r][band]
+        if len(sample) < 24:
+            sample = _frame_samples(px, rect, margin_px)
+        ids.append(np.full(len(sample), k, dtype=np.int64))
+        values.append(sample)
+    if not ids:
+        return np.zeros((len(rects), 3), dtype=np.uint8)
+    return _label_medians(np.concatenate(ids), np.concatenate(values), len(rects) - 1)
+
+
+def _erase_with_label_mask(
+    base: Image.Image,
+    box_tokens: list[dict],
+    pad_px: int,
+    sample_margin_px: int,
+) -> Image.Image:
+    """``solid`` erase of every token, the isolated ones in one pass, in place.
+
+    Isolated tokens (:func:`_isolated`) are filled together from one label
+    mask. The rest go through the per-token loop in their original order.
+    Neither group reads what the other writes, so the result is the loop's,
+    pixel for pixel.
+    """
+    W, H = base.size
+    quads, rects = _token_quads(box_tokens, W, H, pad_px)
+    alone = _isolated(rects, sample_margin_px)
+    labels, shifted, (ox, oy) = _label_mask(
+        [q if a else None for q, a in zip(quads, alone)],
+        [r if a else None for r, a in zip(rects, alone)],
+        W, H, max(1, sample_margin_px),
+    )
+    erased = np.flatnonzero(labels)
+    if erased.size:
+        h, w = labels.shape
+        px = np.array(base.crop((ox, oy, ox + w, oy + h)), dtype=np.uint8)
+        palette = _solid_fill(px, labels, shifted, BG_SAMPLE_BORDER_PX, sample_margin_px)
+        px.reshape(-1, 3)[erased] = palette[labels.reshape(-1)[erased]]
+        base.paste(Image.fromarray(px), (ox, oy))
+    _erase_tokens(
+        base,
+        [q for q, a in zip(quads, alone) if not a],
+        [r for r, a in zip(rects, alone) if not a],
+        "solid", MOSAIC_BLOCK_PX, sample_margin_px,
+    )
+    return base
+
+
 # --- Public entry point ----------------------------------------------------
 
+def erased_regions(
+    box_tokens: list[dict],
+    W: int,
+    H: int,
+    pad_px: int = PADDING_PX,
+    margin_px: int = INPAINT_DILATE_PX + 1,
+) -> list[Rect]:
+    """Disjoint rects covering every pixel :func:`erase_text_with_boxes` may change.
+
+    Each token's padded quad bbox, grown by ``margin_px`` (the inpaint mask is
+    dilated past the quad) and merged where they touch. Every mode paints
+    inside its quad's rect, so outside these the erased page is the source.
+    """
+    rects: list[Rect] = []
+    for token in box_tokens or []:
+        quad = _token_mask_quad(token, W, H, pad_px)
+        rect = quad_bbox(quad, W, H) if quad else None
+        if rect:
+            rects.append(rect)
+    return _inpaint_tiles(rects, W, H, margin_px)
+
+
 def restore_token_regions(
     base: Image.Image,
     source: Image.Image,
@@ -271,19 +579,20 @@ def restore_token_regions(
     src = source.convert("RGB")
     if src.size != base.size:
         return base
-    for token in box_tokens:
-        quad = _token_mask_quad(token, width, height, pad_px)
-        if not quad:
-            continue
-        rect = quad_bbox(quad, width, height)
+    quads, rects = _token_quads(box_tokens, width, height, pad_px)
+    # One page mask, each quad drawn in its own bbox as the erase draws it,
+    # then one paste per disjoint group of quads.
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for quad, rect in zip(quads, rects):
         if not rect:
             continue
         left, top, right, bottom = rect
-        mask = Image.new("L", (right - left, bottom - top), 0)
-        ImageDraw.Draw(mask).polygon([(x - left, y - top) for x, y in quad], fill=255)
-        region = base.crop((left, top, right, bottom))
-        region.paste(src.crop((left, top, right, bottom)), mask=mask)
-        base.paste(region, (left, top))
+        drawn = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(drawn).polygon([(x - left, y - top) for x, y in quad], fill=255)
+        np.maximum(mask[top:bottom, left:right], np.asarray(drawn), out=mask[top:bottom, left:right])
+    for tile in _inpaint_tiles([r for r in rects if r], width, height, 0):
+        left, top, right, bottom = tile
+        base.paste(src.crop(tile), (left, top), Image.fromarray(mask[top:bottom, left:right]))
     return base
 
 
@@ -294,49 +603,80 @@ def erase_text_with_boxes(
     sample_margin_px: int = SAMPLE_MARGIN_PX,
     mode: str | None = None,
     mosaic_block_px: int | None = None,
+    timings: dict[str, Any] | None = None,
 ) -> Image.Image:
-    """Erase every token region in ``box_tokens`` from a copy of ``img``."""
+    """Erase every token region in ``box_tokens`` from a copy of ``img``.
+
+    ``timings``, when given, receives the inpaint tile stats (see
+    :func:`_erase_with_inpaint`).
+    """
     if not box_tokens:
         return img
 
     mode = (mode or DEFAULT_MODE or "solid").strip().lower()
     mosaic_block_px = int(mosaic_block_px or MOSAIC_BLOCK_PX)
-    base = img.convert("RGB").copy()
+    base = img.convert("RGB")  # always a new image, even from RGB
 
     if mode in ("inpaint", "cv2", "opencv"):
-        return _erase_with_inpaint(base, box_tokens, pad_px=pad_px)
+        return _erase_with_inpaint(base, box_tokens, pad_px=pad_px, timings=timings)
+    if ERASE_ENGINE == "mask" and mode == "solid" and len(box_tokens) >= MASK_ENGINE_MIN_TOKENS:
+        return _erase_with_label_mask(base, box_tokens, pad_px, sample_margin_px)
 
     W, H = base.size
-    for token in box_tokens:
-        quad = _token_mask_quad(token, W, H, pad_px)
-        if not quad:
-            continue
-        rect = quad_bbox(quad, W, H)
+    quads, rects = _token_quads(box_tokens, W, H, pad_px)
+    _erase_tokens(base, quads, rects, mode, mosaic_block_px, sample_margin_px)
+    return base
+
+
+def _erase_tokens(
+    base: Image.Image,
+    quads: list[list | None],
+    rects: list[Rect | None],
+    mode: str,
+    mosaic_block_px: int,
+    sample_margin_px: int,
+) -> None:
+    """Erase each quad in turn, in place, skipping the ``None`` ones."""
+    # Later tokens sample around earlier ones, so the sampler must see each
+    # erase: every branch of _erase_token paints only inside ``rect``,
+    # refreshed after.
+    colors = ColorSampler(base)
+    for quad, rect in zip(quads, rects):
         if not rect:
             continue
+        _erase_token(base, quad, rect, mode, mosaic_block_px, sample_margin_px, colors)
+        colors.refresh(rect)
 
-        l, t, r, b = rect
-        region = base.crop((l, t, r, b))
-        mask = Image.new("L", (r - l, b - t), 0)
-        ImageDraw.Draw(mask).polygon([(x - l, y - t) for x, y in quad], fill=255)
-
-        token_mode = mode
-        if token_mode in ("blend_patch", "blend", "avg_patch", "patch"):
-            if _erase_with_blend_patches(base, rect, mask, BLEND_GAP_PX, BLEND_FEATHER_PX):
-                continue
-            token_mode = "solid"
-
-        if token_mode == "clone":
-            if _erase_with_clone(base, rect, mask, CLONE_GAP_PX, CLONE_BORDER_PX, CLONE_FEATHER_PX):
-                continue
-            token_mode = "solid"
-
-        if token_mode == "mosaic":
-            pixelated = _pixelate(region, mosaic_block_px)
-            base.paste(Image.composite(pixelated, region, mask), (l, t))
-        else:  # solid
-            color = sample_bg_color_from_quad(base, quad, rect, BG_SAMPLE_BORDER_PX, sample_margin_px)
-            region.paste(color, mask=mask)
-            base.paste(region, (l, t))
 
-    return base
+def _erase_token(
+    base: Image.Image,
+    quad: list,
+    rect: Rect,
+    mode: str,
+    mosaic_block_px: int,
+    sample_margin_px: int,
+    colors: ColorSampler,
+) -> None:
+    """Erase one token's ``quad`` from ``base`` in place, painting only inside ``rect``."""
+    l, t, r, b = rect
+    region = base.crop((l, t, r, b))
+    mask = Image.new("L", (r - l, b - t), 0)
+    ImageDraw.Draw(mask).polygon([(x - l, y - t) for x, y in quad], fill=255)
+
+    if mode in ("blend_patch", "blend", "avg_patch", "patch"):
+        if _erase_with_blend_patches(base, rect, mask, BLEND_GAP_PX, BLEND_FEATHER_PX):
+            return
+        mode = "solid"
+
+    if mode == "clone":
+        if _erase_with_clone(base, rect, mask, CLONE_GAP_PX, CLONE_BORDER_PX, CLONE_FEATHER_PX):
+            return
+        mode = "solid"
+
+    if mode == "mosaic":
+        pixelated = _pixelate(region, mosaic_block_px)
+        base.paste(Image.composite(pixelated, region, mask), (l, t))
+    else:  # solid
+        color = colors.sample_bg_color_from_quad(quad, rect, BG_SAMPLE_BORDER_PX, sample_margin_px)
+        region.paste(color, mask=mask)
+        base.paste(region, (l, t))
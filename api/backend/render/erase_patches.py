@@ -0,0 +1,119 @@
+"""Ship only the erased regions of a page, packed into one small atlas.
+
+For ``lens_text`` the client already holds the original page; of the erased
+background the server sends back, only the pixels under the text differ from
+it. On a typical manga page that is a few percent of the area, so encoding and
+base64-ing the whole page spends most of the encode CPU and most of the
+response bytes on pixels the client already has.
+
+With ``render.background: "patches"`` the server still erases, then cuts the
+changed regions out of the erased page (the same regions
+:mod:`backend.render.erase_boxes` describes, grown by what the erase may touch
+around them and trimmed to the pixels that actually changed), packs them into
+an atlas and encodes that instead. The client draws each patch from the atlas
+over its copy of the page.
+
+Schema ``tp.erase-patches/1``::
+
+    {
+      "schema": "tp.erase-patches/1",
+      "width": 1200, "height": 1700,
+      "image": "data:image/png;base64,...",
+      "patches": [ {"x": 310, "y": 88, "w": 140, "h": 62, "ax": 0, "ay": 0}, ... ]
+    }
+
+Coordinates are integer pixels: ``x/y/w/h`` on a page of ``width`` x
+``height`` (scale them if the client's copy is displayed at another size),
+``ax/ay`` the patch's top-left in the atlas. ``image`` is empty when nothing
+on the page changed.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from backend.render import bg_encode
+from backend.render.erase import Rect, erased_regions
+
+SCHEMA = "tp.erase-patches/1"
+
+# Gap between patches in the atlas. A lossy codec smears across block edges;
+# two pixels keeps one patch's neighbour out of its border.
+_GUTTER_PX = 2
+
+
+def _changed(source: Image.Image, erased: Image.Image, rect: Rect) -> Rect | None:
+    """``rect`` trimmed to the pixels that differ, or None when none do.
+
+    Reads only the crop: the regions are a small part of the page, and
+    converting both whole pages to arrays costs more than every diff here.
+    """
+    l, t = rect[:2]
+    diff = np.any(np.asarray(source.crop(rect)) != np.asarray(erased.crop(rect)), axis=-1)
+    rows = np.flatnonzero(diff.any(axis=1))
+    if not rows.size:
+        return None
+    cols = np.flatnonzero(diff.any(axis=0))
+    return l + int(cols[0]), t + int(rows[0]), l + int(cols[-1]) + 1, t + int(rows[-1]) + 1
+
+
+def _pack(sizes: list[tuple[int, int]]) -> tuple[list[tuple[int, int]], int, int]:
+    """Shelf-pack ``(w, h)`` boxes. Returns each box's origin and the atlas size.
+
+    Tallest first onto rows of a width near the square root of the total area,
+    which keeps the atlas roughly square and its empty space small.
+    """
+    g = _GUTTER_PX
+    area = sum((w + g) * (h + g) for w, h in sizes)
+    width = max(max(w for w, _ in sizes), math.ceil(math.sqrt(area)))
+    origins: list[tuple[int, int]] = [(0, 0)] * len(sizes)
+    x = y = row_h = 0
+    used_w = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x and x + w > width:
+            x, y, row_h = 0, y + row_h + g, 0
+        origins[i] = (x, y)
+        used_w = max(used_w, x + w)
+        x += w + g
+        row_h = max(row_h, h)
+    return origins, used_w, y + row_h
+
+
+def build(
+    source: Image.Image, erased: Image.Image, tokens: list[dict] | None,
+) -> tuple[dict[str, Any], bg_encode.EncodedBackground | None, dict[str, Any]]:
+    """The ``tp.erase-patches/1`` payload for ``erased`` against ``source``.
+
+    ``tokens`` are the ones the erase ran on. Returns the payload, the atlas
+    encode (None when there is nothing to send) and the ``patch_*`` fields for
+    ``perfStages``.
+    """
+    W, H = erased.size
+    src = source if source.mode == "RGB" else source.convert("RGB")
+    out = erased if erased.mode == "RGB" else erased.convert("RGB")
+    rects = [
+        rect for rect in (
+            _changed(src, out, region) for region in erased_regions(tokens or [], W, H)
+        ) if rect is not None
+    ] if src.size == out.size else [(0, 0, W, H)]
+
+    payload: dict[str, Any] = {"schema": SCHEMA, "width": W, "height": H, "image": "", "patches": []}
+    px = sum((r - l) * (b - t) for l, t, r, b in rects)
+    perf = {"patches": len(rects), "patch_px": px, "patch_page_frac": round(px / max(1, W * H), 4)}
+    if not rects:
+        return payload, None, perf
+
+    origins, aw, ah = _pack([(r - l, b - t) for l, t, r, b in rects])
+    atlas = Image.new("RGB", (aw, ah), (255, 255, 255))
+    for (l, t, r, b), (ax, ay) in zip(rects, origins):
+        atlas.paste(out.crop((l, t, r, b)), (ax, ay))
+        payload["patches"].append({"x": l, "y": t, "w": r - l, "h": b - t, "ax": ax, "ay": ay})
+    encoded = bg_encode.encode(atlas)
+    payload["image"] = encoded.data_uri()
+    perf["patch_atlas"] = [aw, ah]
+    return payload, encoded, perf
@@ -140,6 +140,16 @@ def pick_font(text: str, thai_path: str, latin_path: str, size: int) -> PILFont:
     return ImageFont.load_default()
 
 
+def font_for(text: str, thai_path: str, latin_path: str, size: int) -> PILFont:
+    """:func:`pick_font`'s choice for ``text``, served from :func:`font_pair`.
+
+    ``pick_font`` opens the font file on every call; a line wrapper asking
+    once per word at every candidate size should not.
+    """
+    f_thai, f_latin = font_pair(thai_path, latin_path, size)
+    return f_thai if contains_thai(text) else f_latin
+
+
 def font_pair(thai_path: str, latin_path: str, size: int) -> tuple[PILFont, PILFont]:
     """Return cached ``(thai_font, latin_font)`` objects at ``size``."""
     key = (str(thai_path or ""), str(latin_path or ""), int(size))
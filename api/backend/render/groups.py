@@ -15,6 +15,8 @@ import math
 import unicodedata
 from typing import Any
 
+import numpy as np
+
 from backend.render.region import (
     box_rotation_deg,
     classify_item_axis,
@@ -433,16 +435,15 @@ def _ink_barrier_between(
         y2 = min(ra[3], rb[3])
         if y2 - y1 < 8:
             return False
-        crop = base_img.convert("L").crop((int(left), int(y1), int(right), int(y2)))
+        # Crop THEN convert: the conversion is per pixel, so the strip comes
+        # out identical, and a dense page no longer converts the whole image
+        # to greyscale once per candidate pair.
+        crop = base_img.crop((int(left), int(y1), int(right), int(y2))).convert("L")
         w, h = crop.size
         if w < 1 or h < 8:
             return False
-        px = list(crop.getdata())
-        for x in range(w):
-            col = px[x::w]
-            if sum(1 for v in col if v < 96) >= 0.6 * len(col):
-                return True
-        return False
+        dark_per_column = (np.asarray(crop) < 96).sum(axis=0)
+        return bool((dark_per_column >= 0.6 * h).any())
     except Exception:
         return False  # image evidence is optional — never break grouping
 
@@ -520,6 +521,91 @@ def _should_merge(
     return not _ink_barrier_between(base_img, ra, rb)
 
 
+# The widest column gap `_should_merge` can ever accept, in glyphs (the
+# same-blob rule; the plain geometric rule allows 1.3). Candidate pairs farther
+# apart than this cannot merge, so they are never tested.
+_MAX_MERGE_GAP_GLYPHS: float = 3.5
+# Smallest grid cell, px: keeps tiny glyphs from shattering the index.
+_MIN_GRID_CELL_PX: float = 64.0
+
+
+def _merge_candidates(
+    ordered: list[dict], img_h: int, tb_authority: bool = False
+) -> list[tuple[int, int]]:
+    """The ``(i, j)`` pairs, ``i < j``, that ``_should_merge`` could accept.
+
+    Testing every pair is O(n²) ``_should_merge`` calls — each one re-reading
+    axis and script, and the geometric ones scanning image strips — which is
+    what made dense webtoon strips and long vertical pages slow. This returns
+    a superset of the pairs that can merge, so the clusters are unchanged:
+
+    * a paragraph that is not strictly vertical, or has no bounds, merges with
+      nothing, so it is dropped up front;
+    * under model authority a merge needs the same ``_tb_block``, so pairs come
+      straight from grouping by block id;
+    * otherwise a merge needs the y-extents to overlap and the x-gap to be at
+      most ``_MAX_MERGE_GAP_GLYPHS`` x the larger glyph of the two. Each rect
+      is widened by its own reach and dropped into a uniform grid; only rects
+      sharing a cell are paired.
+
+    Union-find roots are component minima whatever order unions happen in, so
+    testing fewer pairs cannot change which run a paragraph lands in.
+    """
+    require_cjk = not tb_authority
+    eligible: list[int] = []
+    rects: dict[int, tuple[float, float, float, float]] = {}
+    for i, p in enumerate(ordered):
+        r = _para_xyxy(p)
+        if r is None or not _is_strict_vertical(p, require_cjk):
+            continue
+        eligible.append(i)
+        rects[i] = r
+
+    if tb_authority:
+        by_block: dict[Any, list[int]] = {}
+        for i in eligible:
+            key = ordered[i].get("_tb_block")
+            if key is not None:
+                by_block.setdefault(key, []).append(i)
+        return sorted(
+            (m[a], m[b])
+            for m in by_block.values()
+            for a in range(len(m))
+            for b in range(a + 1, len(m))
+        )
+
+    if len(eligible) < 2:
+        return []
+    boxes: dict[int, tuple[float, float, float, float]] = {}
+    for i in eligible:
+        x1, y1, x2, y2 = rects[i]
+        reach = _MAX_MERGE_GAP_GLYPHS * max(_para_font_px(ordered[i], img_h), 1.0)
+        boxes[i] = (x1 - reach, y1, x2 + reach, y2)
+    sides = sorted(max(b[2] - b[0], b[3] - b[1]) for b in boxes.values())
+    cell = max(_MIN_GRID_CELL_PX, sides[len(sides) // 2])
+
+    grid: dict[tuple[int, int], list[int]] = {}
+    for i in eligible:
+        x1, y1, x2, y2 = boxes[i]
+        for gx in range(math.floor(x1 / cell), math.floor(x2 / cell) + 1):
+            for gy in range(math.floor(y1 / cell), math.floor(y2 / cell) + 1):
+                grid.setdefault((gx, gy), []).append(i)
+
+    pairs: set[tuple[int, int]] = set()
+    for members in grid.values():
+        for a in range(len(members)):
+            i = members[a]
+            bi = boxes[i]
+            for b in range(a + 1, len(members)):
+                j = members[b]
+                bj = boxes[j]
+                # Closed-interval tests: a superset of the strict ones inside
+                # `_should_merge`, so rounding can never drop a real pair.
+                if bi[0] <= bj[2] and bj[0] <= bi[2] and bi[1] <= bj[3] and bj[1] <= bi[3]:
+                    pairs.add((i, j) if i < j else (j, i))
+    return sorted(pairs)
+
+
 # Columns of ONE vertical utterance share nearly their whole vertical extent.
 # Two balloons in a diagonal pair share almost none of it.  0.35 is well below
 # the ~0.9+ a real bubble scores (even a strongly staircased one) and well above
@@ -700,10 +786,9 @@ def _merge_paragraphs(
         if ri != rj:
             parent[max(ri, rj)] = min(ri, rj)
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            if _should_merge(ordered[i], ordered[j], img_h, base_img, tb_authority):
-                union(i, j)
+    for i, j in _merge_candidates(ordered, img_h, tb_authority):
+        if _should_merge(ordered[i], ordered[j], img_h, base_img, tb_authority):
+            union(i, j)
 
     clusters: dict[int, list[dict]] = {}
     for i in range(n):
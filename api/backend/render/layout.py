@@ -10,8 +10,8 @@ original OCR items.  This module owns that pour:
   continua scripts always have a break point available.
 - :func:`wrap_tokens_to_lines` — greedily wrap tokens into per-item lines,
   respecting each item's pixel width "cap".
-- :func:`fit_para_size_and_lines` — shrink the font until every line fits its
-  item's height.
+- :func:`fit_para_size_and_lines` — find the largest font at which every line
+  fits its item's height (see :func:`_largest_fitting`).
 - :func:`distribute_to_template` — mirror Lens's own per-item word
   distribution by pouring AI text into the template proportionally.
 - :func:`apply_line_to_item`   — given a line of tokens, write ``spans`` (with
@@ -38,9 +38,9 @@ from typing import Any, Final
 
 from PIL import Image, ImageDraw
 
-from backend.render.fonts import is_truetype, pick_font
+from backend.render.fonts import font_for, is_truetype
 from backend.render.geometry import ensure_box_fields
-from backend.render.text_metrics import baseline_offset_px, line_metrics_px
+from backend.render.text_metrics import advance_px, baseline_offset_px, line_metrics_px
 from backend.render.text_utils import contains_thai, sanitize_draw_text
 from backend.utils.text import ZWSP
 
@@ -227,6 +227,11 @@ def tokens_with_spaces(text: str, parser, lang: str) -> list[RawToken]:
 
 
 def _measure_width(font, text: str) -> float:
+    """Pixel advance width of ``text`` in ``font``, cached per font file and size."""
+    return advance_px(font, text, _measure_width_uncached)
+
+
+def _measure_width_uncached(font, text: str) -> float:
     """Pixel advance width of ``text`` in ``font`` (robust to old Pillow)."""
     try:
         return float(font.getlength(text))
@@ -297,13 +302,13 @@ def wrap_tokens_to_lines(
         if not txt:
             continue
 
-        word_w = _measure_width(pick_font(txt, thai_font, latin_font, int(font_size)), txt)
+        word_w = _measure_width(font_for(txt, thai_font, latin_font, int(font_size)), txt)
 
         space_w = 0.0
         if pending_space:
             hint = last_word_hint or txt
             space_w = _measure_width(
-                pick_font(hint, thai_font, latin_font, int(font_size)), pending_space
+                font_for(hint, thai_font, latin_font, int(font_size)), pending_space
             )
 
         cap = cap_for_line(li)
@@ -408,9 +413,10 @@ def fit_para_size_and_lines(
 ) -> tuple[int, list[list[LineToken]]]:
     """Find the largest font size at which ``ptext`` fits the item boxes.
 
-    Returns ``(font_size, wrapped_lines)``.  Tries ``base_size`` down to 10,
-    accepting the first size where every line's measured height fits its
-    item's box height.  Falls back to size 10 if nothing fits.
+    Returns ``(font_size, wrapped_lines)``: the largest size in
+    ``10..base_size`` where every line's measured height fits its item's box
+    height, found with :func:`_largest_fitting`. Falls back to size 10 if
+    nothing fits.
     """
     tokens = tokens_with_spaces(ptext, parser, lang)
     if not tokens or not items:
@@ -425,29 +431,21 @@ def fit_para_size_and_lines(
         for it in items
     ]
 
-    size = max(10, int(base_size))
-    while size >= 10:
+    wrapped: dict[int, list[list[LineToken]]] = {}
+
+    def fits(size: int) -> bool:
         lines = wrap_tokens_to_lines(
             tokens, items, img_w, img_h, thai_font, latin_font, size, min_lines=desired_lines
         )
         lines = ensure_min_lines_by_split(lines, desired_lines, max_lines)
+        wrapped[size] = lines
+        return len(lines) <= max_lines and _lines_fit_heights(
+            lines, heights, thai_font, latin_font, size
+        )
 
-        if len(lines) <= max_lines:
-            fits = True
-            for ii, seg in enumerate(lines):
-                words = [s for k, s, _ in seg if k == "word" and s != ZWSP]
-                if not words:
-                    continue
-                metrics = line_metrics_px("".join(words), thai_font, latin_font, size)
-                if metrics is None:
-                    continue
-                _w, line_h, _c = metrics
-                if ii < len(heights) and heights[ii] > 0.0 and line_h > heights[ii] * 1.01:
-                    fits = False
-                    break
-            if fits:
-                return size, lines
-        size -= 1
+    size = _largest_fitting(10, max(10, int(base_size)), fits)
+    if size is not None:
+        return size, wrapped[size]
 
     lines10 = wrap_tokens_to_lines(
         tokens, items, img_w, img_h, thai_font, latin_font, 10, min_lines=desired_lines
@@ -456,6 +454,74 @@ def fit_para_size_and_lines(
     return 10, lines10
 
 
+def _lines_fit_heights(
+    lines: list[list[LineToken]],
+    heights: list[float],
+    thai_font: str,
+    latin_font: str,
+    size: int,
+) -> bool:
+    """Whether every line's measured height at ``size`` fits its item's height."""
+    for ii, seg in enumerate(lines):
+        words = [s for k, s, _ in seg if k == "word" and s != ZWSP]
+        if not words:
+            continue
+        metrics = line_metrics_px("".join(words), thai_font, latin_font, size)
+        if metrics is None:
+            continue
+        _w, line_h, _c = metrics
+        if ii < len(heights) and heights[ii] > 0.0 and line_h > heights[ii] * 1.01:
+            return False
+    return True
+
+
+# Sizes above the bisected answer re-probed before trusting it (see
+# :func:`_largest_fitting`).
+_FIT_VERIFY_SIZES: int = 3
+
+
+def _largest_fitting(lo: int, hi: int, fits) -> int | None:
+    """Largest size in ``lo..hi`` for which ``fits(size)``, or ``None``.
+
+    These searches used to step down one pixel at a time from ``hi``, a full
+    wrap and measure per step — dozens of passes for a long paragraph in a
+    big box. Bigger glyphs are never shorter, so fitting is monotone in the
+    size and this bisects instead: about log2(hi - lo) probes.
+
+    Wrapping is the one place monotonicity can bend — a different line break
+    can move a tall glyph into a taller item — and there bisection may settle
+    on a lower fitting boundary than the scan did. So the answer is checked:
+    the ``_FIT_VERIFY_SIZES`` sizes above it that bisection skipped are
+    probed, and if any of them fits the search falls back to the old scan
+    down from ``hi``, reusing every probe already made. ``scripts/dev/bench-fit.py``
+    compares the result against the scan.
+    """
+    if hi < lo:
+        return None
+    probed: dict[int, bool] = {}
+
+    def probe(size: int) -> bool:
+        if size not in probed:
+            probed[size] = bool(fits(size))
+        return probed[size]
+
+    if probe(hi):
+        return hi
+    # Invariant: fits(good) (or good is below the range), not fits(bad).
+    good, bad = lo - 1, hi
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if probe(mid):
+            good = mid
+        else:
+            bad = mid
+    above = range(max(lo, good + 1), min(hi, good + 1 + _FIT_VERIFY_SIZES))
+    if any(probe(size) for size in above):
+        # Not monotone here: take the first fit scanning down, as before.
+        good = next((size for size in range(hi - 1, good, -1) if probe(size)), good)
+    return good if good >= lo else None
+
+
 def pad_lines(lines: list[list[LineToken]], max_lines: int) -> list[list[LineToken]]:
     """Truncate or pad ``lines`` to exactly ``max_lines`` entries."""
     max_lines = int(max_lines)
@@ -587,24 +653,11 @@ def fit_font_size_for_lines(
     ]
     floor = int(min_size_px) if min_size_px is not None else font_size_minimum_for_image(img_w, img_h)
     floor = max(8, floor)
-    size = max(floor, int(base_size))
-    while size >= floor:
-        fits = True
-        for ii, seg in enumerate(lines):
-            words = [s for k, s, _ in seg if k == "word" and s != ZWSP]
-            if not words:
-                continue
-            metrics = line_metrics_px("".join(words), thai_font, latin_font, size)
-            if metrics is None:
-                continue
-            _w, line_h, _c = metrics
-            if ii < len(heights) and heights[ii] > 0.0 and line_h > heights[ii] * 1.01:
-                fits = False
-                break
-        if fits:
-            return size
-        size -= 1
-    return floor
+    size = _largest_fitting(
+        floor, max(floor, int(base_size)),
+        lambda s: _lines_fit_heights(lines, heights, thai_font, latin_font, s),
+    )
+    return floor if size is None else size
 
 
 def apply_line_to_item(
@@ -680,7 +733,7 @@ def apply_line_to_item(
     # downstream fit-size) explode. Detect that here and use a height-based
     # heuristic + equal proportional shares per word: visually similar to
     # what Lens emits, and recoverable once the font finally loads.
-    if not is_truetype(pick_font(item_text or "a", thai_path, latin_path, base_size)):
+    if not is_truetype(font_for(item_text or "a", thai_path, latin_path, base_size)):
         final_size = int(forced_size_px) if forced_size_px else max(10, int(base_h_px * 0.85))
         item["font_size_px"] = final_size
         word_count = sum(1 for k, _s, _w in tokens if k == "word")
@@ -771,11 +824,11 @@ def apply_line_to_item(
                     if layout_units[j][0] == "word":
                         hint = layout_units[j][1]
                         break
-            font = pick_font(hint or "a", thai_path, latin_path, base_size)
+            font = font_for(hint or "a", thai_path, latin_path, base_size)
             widths_px.append(max(0.0, _measure_width(font, text)))
             continue
 
-        font = pick_font(text, thai_path, latin_path, base_size)
+        font = font_for(text, thai_path, latin_path, base_size)
         try:
             ascent, descent = font.getmetrics()
         except Exception:
@@ -4,10 +4,17 @@
 Both helpers walk the Thai/Latin runs of a string, measure each run with its
 own font, and aggregate the result.  They share the same scan loop — the only
 difference is what they return.
+
+A run's extents at a given font and size never change, and a size search
+asks for the same runs at the same sizes again and again, so each one is
+measured once: :func:`_run_extent` is a bounded LRU over
+``(font pair, size, run)``.
 """
 
 from __future__ import annotations
 
+import functools
+
 from PIL import Image, ImageDraw
 
 from backend.render.fonts import font_pair
@@ -16,6 +23,49 @@ from backend.render.text_utils import sanitize_draw_text, split_runs_for_fallbac
 # A scratch canvas reused for all text measurement (Pillow needs a draw ctx).
 _SCRATCH = ImageDraw.Draw(Image.new("RGBA", (16, 16), (0, 0, 0, 0)))
 
+# Distinct runs across a few pages of fitting at every size tried; ~100 bytes
+# each, so the cap bounds the cache to a couple of MB.
+_RUN_CACHE_SIZE = 16384
+
+
+@functools.lru_cache(maxsize=_RUN_CACHE_SIZE)
+def _run_extent(
+    thai_path: str, latin_path: str, size: int, is_thai: bool, run: str
+) -> tuple[float, float, float]:
+    """``(right, top, bottom)`` of ``run`` drawn at x=0, baseline-anchored.
+
+    ``textbbox`` only adds the draw origin to the box, so the right edge at
+    any ``x`` is ``x + right``. Raises (uncached) where Pillow cannot measure.
+    """
+    f_thai, f_latin = font_pair(thai_path, latin_path, size)
+    bb = _SCRATCH.textbbox((0, 0), run, font=f_thai if is_thai else f_latin, anchor="ls")
+    return float(bb[2]), float(bb[1]), float(bb[3])
+
+
+# Advance widths keyed by the font's file, size and layout engine rather than
+# the font object: callers may hold a fresh object per call, and keying on it
+# would both miss and keep every one of them alive.
+_advance_cache: dict[tuple, float] = {}
+
+
+def advance_px(font, text: str, measure) -> float:
+    """``measure(font, text)``, remembered per ``(font file, size, text)``.
+
+    Only file-backed TrueType fonts are cached; Pillow's bitmap default has
+    no path to key on and is measured every time.
+    """
+    path = getattr(font, "path", None)
+    if not isinstance(path, str):
+        return measure(font, text)
+    key = (path, getattr(font, "size", 0), getattr(font, "layout_engine", None), text)
+    width = _advance_cache.get(key)
+    if width is None:
+        width = measure(font, text)
+        if len(_advance_cache) >= _RUN_CACHE_SIZE:
+            _advance_cache.clear()
+        _advance_cache[key] = width
+    return width
+
 
 def _scan_runs(text: str, thai_path: str, latin_path: str, size: int):
     """Measure ``text`` run by run.
@@ -27,7 +77,7 @@ def _scan_runs(text: str, thai_path: str, latin_path: str, size: int):
     if not t:
         return None
 
-    f_thai, f_latin = font_pair(thai_path, latin_path, size)
+    thai_path, latin_path, size = str(thai_path or ""), str(latin_path or ""), int(size)
     x = 0.0
     min_top = 0.0
     max_bottom = 0.0
@@ -35,14 +85,15 @@ def _scan_runs(text: str, thai_path: str, latin_path: str, size: int):
     for run, is_thai in split_runs_for_fallback(t):
         if run == "\n":
             continue
-        font = f_thai if is_thai else f_latin
         try:
-            bb = _SCRATCH.textbbox((x, 0), run, font=font, anchor="ls")
-            min_top = min(min_top, float(bb[1]))
-            max_bottom = max(max_bottom, float(bb[3]))
-            x = float(bb[2])
+            right, top, bottom = _run_extent(thai_path, latin_path, size, bool(is_thai), run)
+            min_top = min(min_top, top)
+            max_bottom = max(max_bottom, bottom)
+            x = x + right
         except Exception:
             # Very old Pillow / bitmap font fallback.
+            f_thai, f_latin = font_pair(thai_path, latin_path, size)
+            font = f_thai if is_thai else f_latin
             try:
                 w, h = _SCRATCH.textsize(run, font=font)  # type: ignore[attr-defined]
             except Exception:
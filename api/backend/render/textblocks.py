@@ -178,6 +178,9 @@ def runtime_info() -> dict[str, Any]:
         "requestedSessions": max(1, int(settings.textblock_pool_size)),
         "effectiveCpu": int(cpu["effective"]),
         "cpu": cpu,
+        "batchMax": int(settings.textblock_batch_max),
+        "batchWindowMs": float(settings.textblock_batch_window_ms),
+        "batching": _batcher.stats(),
     }
 
 
@@ -228,6 +231,102 @@ def _session_lease(timings: dict | None = None, *, wait_sec: float = 60.0):
         _pool.put(session)
 
 
+# --- Pre/post-processing -----------------------------------------------------
+#
+# Both ends are NumPy: the page is resized once as uint8 (PIL, in C), written
+# straight into a float32 input buffer that is allocated once per thread and
+# reused, and the up-to-300 detection rows are thresholded, mapped back and
+# clipped as arrays rather than one Python tuple at a time.
+#
+# TP_TEXTBLOCK_LETTERBOX chooses the geometry. Off (default) keeps the
+# historical STRETCH to 1280x1280 — ROI crops of narrow columns rely on that
+# stretch for their zoom, and grouping was tuned against it. On, pages are
+# letterboxed (aspect kept, grey padding) the way YOLO models are trained.
+
+_LETTERBOX = (os.environ.get("TP_TEXTBLOCK_LETTERBOX", "") or "").strip().lower() in (
+    "1", "true", "yes", "on",
+)
+_PAD_VALUE = 114  # Ultralytics' letterbox grey
+_MIN_SIDE_PX = 4.0
+_buffers = threading.local()
+
+
+class _Prepared:
+    """One resized uint8 input plus the map from model space back to pixels."""
+
+    __slots__ = ("pixels", "inv_x", "inv_y", "pad_x", "pad_y", "width", "height")
+
+    def __init__(
+        self, pixels: np.ndarray, inv_x: float, inv_y: float,
+        pad_x: float, pad_y: float, width: int, height: int,
+    ) -> None:
+        self.pixels = pixels
+        self.inv_x = inv_x
+        self.inv_y = inv_y
+        self.pad_x = pad_x
+        self.pad_y = pad_y
+        self.width = width
+        self.height = height
+
+
+def _prepare(img: Image.Image) -> _Prepared:
+    """Resize ``img`` to the model's input as ``(S, S, 3)`` uint8."""
+    W, H = img.size
+    rgb = img.convert("RGB")
+    if not _LETTERBOX:
+        pixels = np.asarray(rgb.resize((_INPUT_SIZE, _INPUT_SIZE), Image.BILINEAR))
+        return _Prepared(pixels, W / float(_INPUT_SIZE), H / float(_INPUT_SIZE), 0.0, 0.0, W, H)
+    r = min(_INPUT_SIZE / float(max(1, W)), _INPUT_SIZE / float(max(1, H)))
+    nw, nh = max(1, int(round(W * r))), max(1, int(round(H * r)))
+    px, py = (_INPUT_SIZE - nw) // 2, (_INPUT_SIZE - nh) // 2
+    pixels = np.full((_INPUT_SIZE, _INPUT_SIZE, 3), _PAD_VALUE, dtype=np.uint8)
+    pixels[py:py + nh, px:px + nw] = np.asarray(rgb.resize((nw, nh), Image.BILINEAR))
+    return _Prepared(pixels, 1.0 / r, 1.0 / r, float(px), float(py), W, H)
+
+
+def _fill(dst: np.ndarray, prepared: _Prepared) -> None:
+    """Write ``prepared`` into one ``(3, S, S)`` float32 slot, scaled to 0..1."""
+    np.divide(
+        prepared.pixels.transpose(2, 0, 1), np.float32(255.0),
+        out=dst, dtype=np.float32, casting="unsafe",
+    )
+
+
+def _input_buffer(n: int) -> np.ndarray:
+    """This thread's reusable ``(n, 3, S, S)`` input, grown on demand.
+
+    Per thread because a buffer is in use for the whole ``session.run``: the
+    lease path and each batch dispatcher own one each, so nothing races on it.
+    """
+    buf = getattr(_buffers, "input", None)
+    if buf is None or buf.shape[0] < n:
+        buf = np.empty((n, 3, _INPUT_SIZE, _INPUT_SIZE), dtype=np.float32)
+        _buffers.input = buf
+    return buf[:n]
+
+
+def _boxes_from(det: Any, prepared: _Prepared) -> list[Box]:
+    """Threshold, map back and clip one input's detections to its pixels."""
+    det = np.asarray(det)
+    det = det.reshape(-1, det.shape[-1])
+    if det.shape[1] < 6:
+        return []
+    det = det[det[:, 4] >= _CONF_THRESH]
+    if not len(det):
+        return []
+    W, H = float(prepared.width), float(prepared.height)
+    xy = det[:, :4].astype(np.float64)
+    a = np.maximum(0.0, (xy[:, 0] - prepared.pad_x) * prepared.inv_x)
+    b = np.minimum(W, (xy[:, 2] - prepared.pad_x) * prepared.inv_x)
+    c = np.maximum(0.0, (xy[:, 1] - prepared.pad_y) * prepared.inv_y)
+    d = np.minimum(H, (xy[:, 3] - prepared.pad_y) * prepared.inv_y)
+    x1, x2 = np.minimum(a, b), np.maximum(a, b)
+    y1, y2 = np.minimum(c, d), np.maximum(c, d)
+    keep = (x2 - x1 >= _MIN_SIDE_PX) & (y2 - y1 >= _MIN_SIDE_PX)
+    out = np.stack([x1, y1, x2, y2], axis=1)[keep]
+    return [tuple(row) for row in out.tolist()]
+
+
 def _detect_with_session(
     img: Image.Image, session: Any, timings: dict | None = None
 ) -> list[Box]:
@@ -236,10 +335,9 @@ def _detect_with_session(
         return []
     try:
         t0 = time.perf_counter()
-        W, H = img.size
-        rgb = img.convert("RGB").resize((_INPUT_SIZE, _INPUT_SIZE), Image.BILINEAR)
-        arr = np.asarray(rgb, dtype=np.float32) / 255.0
-        arr = np.expand_dims(arr.transpose(2, 0, 1), 0)
+        prepared = _prepare(img)
+        arr = _input_buffer(1)
+        _fill(arr[0], prepared)
         t_infer = time.perf_counter()
         input_name = session.get_inputs()[0].name
         out = session.run(None, {input_name: arr})[0]
@@ -247,19 +345,7 @@ def _detect_with_session(
             timings["infer_ms"] = round(
                 timings.get("infer_ms", 0.0) + (time.perf_counter() - t_infer) * 1000, 1
             )
-
-        det = np.asarray(out)
-        det = det.reshape(-1, det.shape[-1])
-        sx, sy = W / float(_INPUT_SIZE), H / float(_INPUT_SIZE)
-        boxes: list[Box] = []
-        for row in det:
-            if len(row) < 6 or float(row[4]) < _CONF_THRESH:
-                continue
-            x1, y1, x2, y2 = (float(v) for v in row[:4])
-            x1, x2 = sorted((max(0.0, x1 * sx), min(float(W), x2 * sx)))
-            y1, y2 = sorted((max(0.0, y1 * sy), min(float(H), y2 * sy)))
-            if x2 - x1 >= 4 and y2 - y1 >= 4:
-                boxes.append((x1, y1, x2, y2))
+        boxes = _boxes_from(out, prepared)
         dbg("textblocks.detect", {
             "boxes": len(boxes),
             "ms": round((time.perf_counter() - t0) * 1000, 1),
@@ -270,6 +356,224 @@ def _detect_with_session(
         return []
 
 
+# --- Micro-batching ----------------------------------------------------------
+#
+# With several AI workers on a few cores, most of `blocks_lock_ms` is jobs
+# queueing for a whole-session lease to run ONE 1280x1280 image each. Adding
+# sessions does not fix that: each owns a native thread pool and they only
+# fight over the same cores. The batcher instead collects whatever inputs
+# arrive within a few milliseconds — full pages and ROI crops, from any job —
+# and runs them as one ``(B, 3, 1280, 1280)`` tensor on one session.
+#
+# One dispatcher thread per loaded session pulls from a shared queue, so a
+# multi-session pool still runs that many batches at once. A model exported
+# with a FIXED batch axis cannot take B > 1; the dispatcher notices (from the
+# input shape, or from the first batched run failing) and runs the collected
+# inputs one by one on the same lease, which still saves the per-job lease
+# hand-offs.
+
+class _Pending:
+    __slots__ = ("tensor", "output", "error", "started", "done", "cancelled", "batch")
+
+    def __init__(self, tensor: _Prepared) -> None:
+        self.tensor = tensor
+        self.output: Any = None
+        self.error: BaseException | None = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = False
+        self.batch = 0
+
+
+class _Batcher:
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._queue: list[_Pending] = []
+        self._dispatchers = 0
+        self._batched_axis: bool | None = None  # None = not probed yet
+        self.batches = 0
+        self.inputs = 0
+        self.max_batch_seen = 0
+
+    def _ensure_dispatchers(self) -> None:
+        with self._cond:
+            while self._dispatchers < _pool_count:
+                self._dispatchers += 1
+                threading.Thread(
+                    target=self._loop, name=f"tp-textblocks-batch-{self._dispatchers}",
+                    daemon=True,
+                ).start()
+
+    def submit(
+        self, tensors: list[_Prepared], timings: dict | None, wait_sec: float
+    ) -> list[Any]:
+        """Queue ``tensors`` and block for their raw outputs, in order.
+
+        Raises :class:`TextBlockBusy` when no batch picked them up within
+        ``wait_sec`` — the same contract as waiting for a lease.
+        """
+        self._ensure_dispatchers()
+        pending = [_Pending(t) for t in tensors]
+        t_wait = time.perf_counter()
+        with self._cond:
+            self._queue.extend(pending)
+            self._cond.notify_all()
+        deadline = t_wait + max(0.0, float(wait_sec))
+        for p in pending:
+            if p.started.wait(timeout=max(0.0, deadline - time.perf_counter())):
+                continue
+            with self._cond:
+                stranded = [q for q in pending if not q.started.is_set()]
+                for q in stranded:
+                    q.cancelled = True
+                self._queue = [q for q in self._queue if not q.cancelled]
+            if stranded:
+                waited_ms = round((time.perf_counter() - t_wait) * 1000, 1)
+                if timings is not None:
+                    timings["lock_ms"] = round(timings.get("lock_ms", 0.0) + waited_ms, 1)
+                    timings["busy"] = True
+                event("textblocks.pool_busy", {"wait_ms": waited_ms}, ok=False)
+                raise TextBlockBusy(wait_sec)
+        if timings is not None:
+            timings["lock_ms"] = round(
+                timings.get("lock_ms", 0.0) + (time.perf_counter() - t_wait) * 1000, 1
+            )
+        t_run = time.perf_counter()
+        for p in pending:
+            p.done.wait()
+        if timings is not None:
+            # The batch's wall time: this job's inputs shared it with others.
+            timings["infer_ms"] = round(
+                timings.get("infer_ms", 0.0) + (time.perf_counter() - t_run) * 1000, 1
+            )
+            timings["batch"] = max(int(timings.get("batch", 0)), max(p.batch for p in pending))
+        for p in pending:
+            if p.error is not None:
+                raise p.error
+        return [p.output for p in pending]
+
+    def _wait_for_work(self) -> None:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+    def _take(self) -> list[_Pending]:
+        """Gather inputs for one window and mark them started.
+
+        Called with a session already leased, so "started" means what the
+        submitter's ``wait_sec`` promises: a session has picked this input up.
+        Empty when another dispatcher took the work first.
+        """
+        window = settings.textblock_batch_window_ms / 1000.0
+        limit = max(1, settings.textblock_batch_max)
+        with self._cond:
+            if not self._queue:
+                return []
+            deadline = time.perf_counter() + window
+            while len(self._queue) < limit:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [p for p in self._queue[:limit] if not p.cancelled]
+            del self._queue[:limit]
+            for p in batch:
+                p.batch = len(batch)
+                p.started.set()
+            return batch
+
+    def _loop(self) -> None:
+        while True:
+            self._wait_for_work()
+            session = _pool.get()
+            batch: list[_Pending] = []
+            try:
+                batch = self._take()
+                if batch:
+                    self._run(session, batch)
+            except BaseException as exc:  # noqa: BLE001 - handed to every waiter
+                for p in batch:
+                    if not p.done.is_set():
+                        p.error = exc
+            finally:
+                _pool.put(session)
+                for p in batch:
+                    p.done.set()
+
+    def _run(self, session: Any, batch: list[_Pending]) -> None:
+        inp = session.get_inputs()[0]
+        if self._batched_axis is None:
+            dim = (getattr(inp, "shape", None) or [None])[0]
+            self._batched_axis = not isinstance(dim, int) or dim != 1
+        with self._cond:
+            self.batches += 1
+            self.inputs += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        if len(batch) > 1 and self._batched_axis:
+            arr = _input_buffer(len(batch))
+            for i, p in enumerate(batch):
+                _fill(arr[i], p.tensor)
+            try:
+                out = session.run(None, {inp.name: arr})[0]
+                for i, p in enumerate(batch):
+                    p.output = out[i]
+                return
+            except Exception as e:  # noqa: BLE001 - fixed batch axis not declared
+                self._batched_axis = False
+                event("textblocks.batch_axis_fixed", {"error": str(e)[:200]}, ok=False)
+        arr = _input_buffer(1)
+        for p in batch:
+            _fill(arr[0], p.tensor)
+            p.output = session.run(None, {inp.name: arr})[0]
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "batches": self.batches,
+                "inputs": self.inputs,
+                "maxBatch": self.max_batch_seen,
+                "meanBatch": round(self.inputs / self.batches, 2) if self.batches else 0.0,
+                "batchedAxis": self._batched_axis,
+            }
+
+
+_batcher = _Batcher()
+
+
+def _batching() -> bool:
+    return settings.textblock_batch_max > 1
+
+
+def _detect_batched(
+    images: list[Image.Image], timings: dict | None, wait_sec: float
+) -> list[list[Box]]:
+    """Boxes for each of ``images``, run through the shared batcher."""
+    _t_load = time.perf_counter()
+    _ensure_pool()
+    if timings is not None:
+        timings["load_ms"] = round(
+            timings.get("load_ms", 0.0) + (time.perf_counter() - _t_load) * 1000, 1
+        )
+    if _session_failed or _pool_count == 0 or not images:
+        return [[] for _ in images]
+    t0 = time.perf_counter()
+    try:
+        prepared = [_prepare(im) for im in images]
+        outputs = _batcher.submit(prepared, timings, wait_sec)
+    except TextBlockBusy:
+        raise
+    except Exception as e:  # noqa: BLE001 - detector failure is not API-fatal
+        event("textblocks.detect_failed", {"error": str(e)[:200]}, ok=False)
+        return [[] for _ in images]
+    result = [_boxes_from(out, p) for out, p in zip(outputs, prepared)]
+    dbg("textblocks.detect", {
+        "inputs": len(images),
+        "boxes": sum(len(b) for b in result),
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    })
+    return result
+
+
 def detect_text_blocks(
     img: Image.Image,
     timings: dict | None = None,
@@ -280,6 +584,8 @@ def detect_text_blocks(
     """Detect text blocks on one image; optionally reuse a caller-owned lease."""
     if session is not None:
         return _detect_with_session(img, session, timings)
+    if _batching():
+        return _detect_batched([img], timings, session_wait_sec)[0]
     with _session_lease(timings, wait_sec=session_wait_sec) as leased:
         return _detect_with_session(img, leased, timings)
 
@@ -332,25 +638,27 @@ def _roi_plan(
 
 
 def dedupe_text_blocks(boxes: list[Box], iou_thresh: float = 0.6) -> list[Box]:
-    """Drop near-duplicate boxes produced by overlapping crops."""
-    kept: list[Box] = []
-    for b in boxes:
-        b_area = max(0.0, b[2] - b[0]) * max(0.0, b[3] - b[1])
-        dup = False
-        for k in kept:
-            ix = max(0.0, min(b[2], k[2]) - max(b[0], k[0]))
-            iy = max(0.0, min(b[3], k[3]) - max(b[1], k[1]))
-            inter = ix * iy
-            if inter <= 0:
-                continue
-            k_area = max(0.0, k[2] - k[0]) * max(0.0, k[3] - k[1])
-            union = b_area + k_area - inter
-            if union > 0 and inter / union >= iou_thresh:
-                dup = True
-                break
-        if not dup:
-            kept.append(b)
-    return kept
+    """Drop near-duplicate boxes produced by overlapping crops.
+
+    Greedy in input order: a box survives unless it overlaps an EARLIER
+    survivor at ``iou_thresh`` or more. The pairwise IoU matrix is computed
+    once as arrays; only the order-dependent keep decision walks the rows.
+    """
+    if len(boxes) < 2:
+        return list(boxes)
+    b = np.asarray(boxes, dtype=np.float64)
+    area = np.maximum(0.0, b[:, 2] - b[:, 0]) * np.maximum(0.0, b[:, 3] - b[:, 1])
+    ix = np.maximum(0.0, np.minimum(b[:, None, 2], b[None, :, 2]) - np.maximum(b[:, None, 0], b[None, :, 0]))
+    iy = np.maximum(0.0, np.minimum(b[:, None, 3], b[None, :, 3]) - np.maximum(b[:, None, 1], b[None, :, 1]))
+    inter = ix * iy
+    union = area[:, None] + area[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dup = (inter > 0) & (union > 0) & (inter / union >= iou_thresh)
+    kept_idx: list[int] = []
+    for i in range(len(boxes)):
+        if not kept_idx or not dup[i, kept_idx].any():
+            kept_idx.append(i)
+    return [boxes[i] for i in kept_idx]
 
 
 def detect_text_blocks_in_rois(
@@ -367,7 +675,9 @@ def detect_text_blocks_in_rois(
 
     Holding the lease for the whole plan is intentional.  On a one-session HF
     Space, releasing it between crop 1/2/3 lets other pages interleave and turns
-    a few seconds of inference into tens of seconds of lock wait.
+    a few seconds of inference into tens of seconds of lock wait.  With
+    batching on, the plan's crops are submitted together instead, which gives
+    the same guarantee without holding a session across the Python work.
     """
     W, H = img.size
     candidates = list(rois or [])
@@ -382,26 +692,41 @@ def detect_text_blocks_in_rois(
         timings["roi_candidates"] = len(rois or [])
         timings["roi_calls"] = len(plan)
 
-    def _run(leased: Any) -> list[Box]:
-        if not plan:
-            return detect_text_blocks(img, timings=timings, session=leased)
+    crops: list[tuple[int, int, Image.Image]] = []
+    for r in plan:
+        x1 = max(0, int(r[0]))
+        y1 = max(0, int(r[1]))
+        x2 = min(W, int(round(r[2])))
+        y2 = min(H, int(round(r[3])))
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            continue
+        crops.append((x1, y1, img.crop((x1, y1, x2, y2))))
+
+    def _merge(per_crop: list[list[Box]]) -> list[Box]:
         boxes: list[Box] = []
-        for r in plan:
-            x1 = max(0, int(r[0]))
-            y1 = max(0, int(r[1]))
-            x2 = min(W, int(round(r[2])))
-            y2 = min(H, int(round(r[3])))
-            if x2 - x1 < 8 or y2 - y1 < 8:
-                continue
-            crop = img.crop((x1, y1, x2, y2))
-            for b in detect_text_blocks(crop, timings=timings, session=leased):
+        for (x1, y1, _), found in zip(crops, per_crop):
+            for b in found:
                 boxes.append((b[0] + x1, b[1] + y1, b[2] + x1, b[3] + y1))
         merged = dedupe_text_blocks(boxes)
         dbg("textblocks.roi", {"crops": len(plan), "boxes": len(merged), "reason": reason})
         return merged
 
+    def _run(leased: Any) -> list[Box]:
+        if not plan:
+            return detect_text_blocks(img, timings=timings, session=leased)
+        return _merge([
+            detect_text_blocks(crop, timings=timings, session=leased)
+            for _, _, crop in crops
+        ])
+
     if session is not None:
         return _run(session)
+    if _batching():
+        # The whole plan goes in together, so its crops share a batch (with
+        # each other and with other jobs' inputs) instead of taking turns.
+        if not plan:
+            return _detect_batched([img], timings, session_wait_sec)[0]
+        return _merge(_detect_batched([c for _, _, c in crops], timings, session_wait_sec))
     with _session_lease(timings, wait_sec=session_wait_sec) as leased:
         return _run(leased)
 
@@ -66,6 +66,25 @@ def clear_block_stamps(tree: dict) -> None:
         para.pop("_tb_source", None)
 
 
+def block_stamps(tree: dict) -> dict[int, dict[str, Any]]:
+    """Every paragraph's text-block stamp, by position, for :func:`apply_block_stamps`."""
+    return {
+        i: {k: para[k] for k in ("_tb_block", "_tb_source") if k in para}
+        for i, para in iter_paragraphs(tree)
+        if "_tb_block" in para or "_tb_source" in para
+    }
+
+
+def apply_block_stamps(tree: dict, stamps: dict[int, dict[str, Any]]) -> None:
+    """Leave ``tree`` stamped exactly as the pass that produced ``stamps`` left it.
+
+    ``tree`` must be decoded from the same Lens response, so positions match.
+    """
+    clear_block_stamps(tree)
+    for i, para in iter_paragraphs(tree):
+        para.update(stamps.get(i) or {})
+
+
 def retry_strategy(*, stamped: int, blocks: int, roi_calls: int,
                    retry_candidates: int) -> str:
     """Choose a second detector view only when it can add new evidence.
@@ -28,6 +28,7 @@ A single :func:`overlay_css` stylesheet covers all three layers.
 
 from __future__ import annotations
 
+import functools
 import math
 from typing import Any, Final
 
@@ -322,6 +323,16 @@ def _visible_char_count(text: str) -> int:
     return sum(1 for ch in text if not ch.isspace())
 
 
+@functools.lru_cache(maxsize=16384)
+def _width_shape(text: str) -> tuple[int, float]:
+    """``(visible chars, glyph width ratio)`` — the per-text half of the fit.
+
+    The box half changes per item; the text half is a character-class scan
+    that every layer of every render repeats for the same strings.
+    """
+    return _visible_char_count(text), _glyph_width_ratio(text)
+
+
 def fit_item_font_size(
     box_width_pct: float,
     box_height_pct: float,
@@ -340,11 +351,10 @@ def fit_item_font_size(
         return _MIN_FONT_PX
 
     fs_height = h_px * 0.85
-    n = _visible_char_count(text)
+    n, ratio = _width_shape(str(text or ""))
     if n <= 0:
         return max(_MIN_FONT_PX, int(round(fs_height)))
 
-    ratio = _glyph_width_ratio(text)
     fs_width = w_px / max(1.0, (n + 0.5) * ratio)
     fs = min(fs_height, fs_width)
     return max(_MIN_FONT_PX, int(round(fs)))
@@ -1,7 +1,8 @@
 """One file, one story: every function an image passes through, both sides.
 
 Compact tracing uses ``TP_TRACE=1``; full function tracing uses
-``TP_TRACE=full``.
+``TP_TRACE=full``; ``TP_TRACE=profile`` times every wrapped function into
+in-memory histograms instead (see "Profile mode" below).
 
 Why this is separate from ``logfile.py``
 ---------------------------------------
@@ -41,11 +42,27 @@ JSON Lines. One object per call:
 ``ev`` is ``->`` (entered), ``<-`` (returned), ``!!`` (raised) or ``..`` (a
 note placed by hand at a decision point). ``trace`` ties one image's whole
 journey together across both sides; ``seq`` orders it within one process.
+
+Profile mode
+------------
+Full mode writes two lines per call with argument summaries, which is far
+too expensive to leave on under real traffic — so there was no per-function
+timing from real traffic at all. ``TP_TRACE=profile`` wraps the same
+functions with a timer only: each call adds its duration to that function's
+histogram in memory (count, total, p50/p95/p99, errors), nothing else. The
+compact notes are still written, every ``TP_TRACE_PROFILE_SEC`` a
+``profile_summary`` line records the busiest functions of that window, and
+``GET /v1/trace/profile`` returns the histograms since start.
+
+``TP_TRACE_SAMPLE=N`` additionally gives one trace id in N the full
+function-by-function lines, chosen from the id itself so every thread of that
+image agrees.
 """
 
 from __future__ import annotations
 
 import atexit
+import contextvars
 import functools
 import inspect
 import json
@@ -53,6 +70,8 @@ import os
 import re
 import threading
 import time
+import zlib
+from bisect import bisect_left
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Callable, TypeVar
@@ -69,6 +88,7 @@ else:
     _RAW_MODE = (_explicit_trace or "0").strip().lower()
 _MODE = (
     "full" if _RAW_MODE in ("full", "verbose", "functions")
+    else "profile" if _RAW_MODE in ("profile", "sample", "sampling")
     else "compact" if _RAW_MODE in ("1", "true", "on", "yes", "compact")
     else "off"
 )
@@ -202,6 +222,16 @@ def full_enabled() -> bool:
     return _MODE == "full"
 
 
+def profiling() -> bool:
+    """Whether wrapped functions are timed into histograms (``TP_TRACE=profile``)."""
+    return _MODE == "profile"
+
+
+def wraps_functions() -> bool:
+    """Whether :func:`wrap_module` wraps anything in this mode."""
+    return _MODE in ("full", "profile")
+
+
 def _allocate_session_path() -> Path:
     """Reserve one collision-safe filename for this API process."""
     global _session_path, _session_id
@@ -387,36 +417,42 @@ def start_session() -> None:
 
 
 # --- the current trace id ----------------------------------------------------
-# Thread-local: the pipeline hands one image to a worker thread and the AI layer
-# to another, and both must stamp the same id. `set_trace` returns the previous
-# value so a caller can restore it, which is what makes nesting safe.
+# A context variable: per thread, like the thread-local it replaced — the
+# pipeline hands one image to a worker thread and the AI layer to another, and
+# both must stamp the same id — and also per asyncio task, so a scope held
+# across an `await` stamps only its own request while the loop runs others.
+# `set_trace` returns the previous value so a caller can restore it, which is
+# what makes nesting safe.
+_trace_id: contextvars.ContextVar[str] = contextvars.ContextVar("tp_trace", default="")
 
 
 def set_trace(trace_id: str) -> str:
-    previous = getattr(_local, "trace", "")
-    _local.trace = str(trace_id or "")
+    previous = _trace_id.get()
+    _trace_id.set(str(trace_id or ""))
     return previous
 
 
 def current_trace() -> str:
-    return getattr(_local, "trace", "")
+    return _trace_id.get()
 
 
 class scope:
     """``with trace.scope(id):`` — stamp every line in this block."""
 
-    __slots__ = ("_id", "_previous")
+    __slots__ = ("_id", "_token")
 
     def __init__(self, trace_id: str) -> None:
         self._id = trace_id
-        self._previous = ""
+        self._token: contextvars.Token | None = None
 
     def __enter__(self) -> "scope":
-        self._previous = set_trace(self._id)
+        self._token = _trace_id.set(str(self._id or ""))
         return self
 
     def __exit__(self, *_exc) -> bool:
-        set_trace(self._previous)
+        if self._token is not None:
+            _trace_id.reset(self._token)
+            self._token = None
         return False
 
 
@@ -687,7 +723,7 @@ def traced(fn: F) -> F:
     naming. When tracing is off this returns the function untouched, so there
     is not even a wrapper frame on the hot path.
     """
-    if not full_enabled():
+    if not wraps_functions():
         return fn
 
     try:
@@ -728,7 +764,47 @@ def traced(fn: F) -> F:
                "ms": round((time.perf_counter() - started) * 1000, 1)})
         return result
 
-    return run  # type: ignore[return-value]
+    if not profiling():
+        return run  # type: ignore[return-value]
+
+    timing = _timing_for(rel, name)
+
+    if inspect.iscoroutinefunction(fn):
+        # Timed to completion, not to the creation of the coroutine.
+        @functools.wraps(fn)
+        async def timed_async(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await (run(*args, **kwargs) if _SAMPLE_EVERY and _sampled() else fn(*args, **kwargs))
+                failed = False
+                return result
+            finally:
+                _record(timing, (time.perf_counter() - started) * 1000, failed)
+
+        return timed_async  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        if _SAMPLE_EVERY and _sampled():
+            entered = time.perf_counter()
+            failed = True
+            try:
+                result = run(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _record(timing, (time.perf_counter() - entered) * 1000, failed)
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:  # noqa: BLE001 - re-raised immediately
+            _record(timing, (time.perf_counter() - started) * 1000, True)
+            raise
+        _record(timing, (time.perf_counter() - started) * 1000, False)
+        return result
+
+    return timed  # type: ignore[return-value]
 
 
 def wrap_module(module: Any, *, skip: tuple[str, ...] = ()) -> int:
@@ -740,7 +816,7 @@ def wrap_module(module: Any, *, skip: tuple[str, ...] = ()) -> int:
     functions called per pixel, where a trace line each would be the slowest
     thing in the program.
     """
-    if not full_enabled():
+    if not wraps_functions():
         return 0
     count = 0
     module_name = getattr(module, "__name__", "")
@@ -818,6 +894,174 @@ def client(records: list[dict[str, Any]]) -> int:
     return written
 
 
+# --- profile mode ------------------------------------------------------------
+# A histogram per wrapped function, in fixed log-spaced buckets: recording a
+# call is a bisect and three additions, whatever the traffic, and a percentile
+# read from them is within one bucket (~33%) of the true value — plenty to say
+# which function is hot, which is the question this answers.
+try:
+    _SAMPLE_EVERY = max(0, int(os.environ.get("TP_TRACE_SAMPLE") or "0"))
+except (TypeError, ValueError):
+    _SAMPLE_EVERY = 0
+try:
+    _SUMMARY_EVERY_SEC = max(5.0, float(os.environ.get("TP_TRACE_PROFILE_SEC") or "60"))
+except (TypeError, ValueError):
+    _SUMMARY_EVERY_SEC = 60.0
+# Upper bounds in ms, 1 µs to 100 s; one more bucket catches anything slower.
+_BOUNDS_MS = tuple(0.001 * 10 ** (i / 8) for i in range(65))
+_PROFILE_LOCK = threading.Lock()
+_timings: dict[tuple[str, str], "_Timing"] = {}
+# The summary line is written by its own thread, never by a request that
+# happened to record the call that made it due.
+_summary_thread: threading.Thread | None = None
+_summary_stop = threading.Event()
+
+
+class _Timing:
+    __slots__ = ("file", "fn", "count", "total_ms", "max_ms", "errors", "buckets", "seen")
+
+    def __init__(self, file: str, fn: str) -> None:
+        self.file = file
+        self.fn = fn
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self.buckets = [0] * (len(_BOUNDS_MS) + 1)
+        # (count, total_ms, errors, buckets) at the last summary line.
+        self.seen: tuple[int, float, int, list[int]] = (0, 0.0, 0, list(self.buckets))
+
+
+def _timing_for(file: str, fn: str) -> _Timing:
+    _start_summaries()
+    with _PROFILE_LOCK:
+        timing = _timings.get((file, fn))
+        if timing is None:
+            timing = _timings[(file, fn)] = _Timing(file, fn)
+        return timing
+
+
+def _sampled() -> bool:
+    """Whether the current trace id is one of the 1-in-N given full lines."""
+    trace_id = current_trace()
+    if not trace_id:
+        return False
+    cached = getattr(_local, "sampled", None)
+    if cached is not None and cached[0] == trace_id:
+        return cached[1]
+    chosen = zlib.crc32(trace_id.encode("utf-8")) % _SAMPLE_EVERY == 0
+    _local.sampled = (trace_id, chosen)
+    return chosen
+
+
+def _record(timing: _Timing, ms: float, failed: bool) -> None:
+    slot = bisect_left(_BOUNDS_MS, ms)
+    with _PROFILE_LOCK:
+        timing.count += 1
+        timing.total_ms += ms
+        if ms > timing.max_ms:
+            timing.max_ms = ms
+        timing.errors += failed
+        timing.buckets[slot] += 1
+
+
+def _start_summaries() -> None:
+    global _summary_thread
+    with _PROFILE_LOCK:
+        if _summary_thread is not None:
+            return
+        _summary_thread = threading.Thread(target=_run_summaries, name="tp-trace-profile", daemon=True)
+        _summary_thread.start()
+
+
+def _run_summaries() -> None:
+    while not _summary_stop.wait(_SUMMARY_EVERY_SEC):
+        try:
+            write_profile_summary()
+        except Exception:  # noqa: BLE001 - a bad window must not end the summaries
+            pass
+
+
+def _quantiles(buckets: list[int], count: int, cap: float = float("inf")) -> dict[str, float]:
+    """p50/p95/p99 as their bucket's upper bound, never above ``cap`` (the max seen)."""
+    out: dict[str, float] = {}
+    for label, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        rank = max(1, int(q * count + 0.999999))
+        seen = 0
+        for slot, n in enumerate(buckets):
+            seen += n
+            if seen >= rank:
+                bound = _BOUNDS_MS[slot] if slot < len(_BOUNDS_MS) else float("inf")
+                out[label] = round(min(bound, cap), 3)
+                break
+    return out
+
+
+def _row(
+    timing: _Timing, count: int, total_ms: float, errors: int, buckets: list[int],
+    cap: float = float("inf"),
+) -> dict[str, Any]:
+    return {
+        "file": timing.file,
+        "fn": timing.fn,
+        "count": count,
+        "totalMs": round(total_ms, 1),
+        "meanMs": round(total_ms / count, 3) if count else 0.0,
+        **_quantiles(buckets, count, cap),
+        "errors": errors,
+    }
+
+
+def profile(top: int = 0) -> dict[str, Any]:
+    """Every timed function since start, busiest (by total time) first."""
+    with _PROFILE_LOCK:
+        rows = [
+            {**_row(t, t.count, t.total_ms, t.errors, list(t.buckets), t.max_ms), "maxMs": round(t.max_ms, 3)}
+            for t in _timings.values() if t.count
+        ]
+    rows.sort(key=lambda row: row["totalMs"], reverse=True)
+    return {
+        "mode": _MODE,
+        "sampleEvery": _SAMPLE_EVERY,
+        "summaryEverySec": _SUMMARY_EVERY_SEC,
+        "since": started_at(),
+        "functions": rows[:top] if top > 0 else rows,
+    }
+
+
+def write_profile_summary() -> None:
+    """One ``profile_summary`` line: the busiest functions since the last one."""
+    if not profiling():
+        return
+    with _PROFILE_LOCK:
+        rows = []
+        for t in _timings.values():
+            count, total_ms, errors, buckets = t.seen
+            if t.count == count:
+                continue
+            rows.append(_row(
+                t, t.count - count, t.total_ms - total_ms, t.errors - errors,
+                [now - before for now, before in zip(t.buckets, buckets)],
+            ))
+            t.seen = (t.count, t.total_ms, t.errors, list(t.buckets))
+    if not rows:
+        return
+    rows.sort(key=lambda row: row["totalMs"], reverse=True)
+    # `_short` keeps _MAX_ITEMS of a list; the rest are still on the endpoint.
+    write("api", "trace.py", "profile_summary", "..", {
+        "functions": rows[:_MAX_ITEMS],
+        "timedFunctions": len(rows),
+        "calls": sum(row["count"] for row in rows),
+    })
+
+
+def _close() -> None:
+    _summary_stop.set()
+    write_profile_summary()
+    flush()
+
+
 # A trace file missing its last batch because the process ended is a trace
-# file that stops mid-sentence exactly when something went wrong.
-atexit.register(flush)
+# file that stops mid-sentence exactly when something went wrong. In profile
+# mode the last window's summary goes out with it.
+atexit.register(_close)
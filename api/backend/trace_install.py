@@ -4,6 +4,8 @@
 ``TP_TRACE=1`` deliberately keeps only explicit route/stage decision notes.
 Those notes retain the workflow and timings without turning every helper call
 into browser/API/file-I/O load during a large batch.
+``TP_TRACE=profile`` wraps the same functions as ``full``, with a timer
+instead of trace lines (see :mod:`backend.trace`).
 
 Called once from ``main.py`` at import time, after every module is loaded. The
 list below is the WHOLE backend, module by module, so a new file that is not
@@ -186,7 +188,7 @@ HOT_FUNCTIONS: dict[str, tuple[str, ...]] = {
 
 def install() -> dict[str, int]:
     """Wrap everything. Returns module -> number of functions wrapped."""
-    if not trace.full_enabled():
+    if not trace.wraps_functions():
         return {}
     wrapped: dict[str, int] = {}
     for name in MODULES:
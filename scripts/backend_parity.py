@@ -0,0 +1,457 @@
+"""Parity checks for engines that replaced a slower original.
+
+Each of these was rewritten for speed, with the first implementation kept as
+the reference it must agree with. The benches under ``scripts/dev/`` time the
+two; this script only asks whether they still agree, quickly enough to run
+on every ``npm run test:unit`` (``scripts/test-backend-parity.mjs``)::
+
+    python scripts/backend_parity.py [--fuzz 3000] [--seed 0]
+
+It lives here, not in ``backend``, so the references never ship with the
+server.
+
+Exits 1 on any disagreement, printing what disagreed.
+
+Erase
+-----
+The label-mask solid erase against the per-token loop
+(:func:`backend.render.erase.erase_text_with_boxes`), and the one-mask
+:func:`~backend.render.erase.restore_token_regions` against the per-token
+paste it replaced (:func:`reference_restore`), on synthetic pages of
+word-sized boxes, many of them touching. Every pixel of the page must match.
+
+Lens protobuf
+-------------
+:mod:`backend.lens.proto` (offsets into one buffer) against the copy-per-field
+reader it replaced, kept below as :class:`ReferenceProto`: every value
+``decode_tree`` asks for on dense synthetic paragraphs, then a fuzz of mutated
+ones (bit flips, truncation, overlong and oversized varints, bad wire types,
+lengths running past the end), where both must return the same value or raise
+the same error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import random
+import struct
+import sys
+from typing import Any
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "api"))
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+from backend.lens import proto  # noqa: E402
+from backend.render import erase  # noqa: E402
+from backend.render.geometry import quad_bbox  # noqa: E402
+
+
+# --- erase -------------------------------------------------------------------
+
+def synthetic_page(n: int, seed: int) -> tuple[Image.Image, list[dict]]:
+    """Word boxes in lines inside coloured panels, with dark glyph strokes."""
+    rng = random.Random(seed)
+    W, H = 1200, max(1700, n * 6)
+    img = Image.new("RGB", (W, H), (245, 243, 238))
+    draw = ImageDraw.Draw(img)
+    tokens: list[dict] = []
+    while len(tokens) < n:
+        px, py = rng.randint(0, W - 400), rng.randint(0, H - 200)
+        panel = tuple(rng.randint(0, 255) for _ in range(3))
+        draw.rectangle([px - 20, py - 20, px + 420, py + 220], fill=panel)
+        for line in range(rng.randint(2, 6)):
+            x, y, h = px, py + line * 34, rng.randint(18, 28)
+            while x < px + 380 and len(tokens) < n:
+                w = rng.randint(20, 90)
+                draw.text((x + 2, y + 2), "w" * max(1, w // 10), fill=(20, 20, 20))
+                box: dict[str, Any] = {"left": x / W, "top": y / H, "width": w / W, "height": h / H}
+                if rng.random() < 0.2:
+                    box["rotation_deg"] = rng.uniform(-12, 12)
+                tokens.append({"box": box})
+                x += w + rng.randint(6, 16)
+    return img, tokens
+
+
+def erase_with(engine: str, img: Image.Image, tokens: list[dict]) -> np.ndarray:
+    """One solid erase on ``engine`` ("token" or "mask"), whatever the page size."""
+    saved = erase.ERASE_ENGINE, erase.MASK_ENGINE_MIN_TOKENS
+    erase.ERASE_ENGINE, erase.MASK_ENGINE_MIN_TOKENS = engine, 0
+    try:
+        return np.asarray(erase.erase_text_with_boxes(img, tokens, mode="solid"))
+    finally:
+        erase.ERASE_ENGINE, erase.MASK_ENGINE_MIN_TOKENS = saved
+
+
+def reference_restore(base: Image.Image, source: Image.Image, tokens: list[dict]) -> Image.Image:
+    """The per-token paste :func:`~backend.render.erase.restore_token_regions` replaced."""
+    W, H = base.size
+    src = source.convert("RGB")
+    for token in tokens:
+        quad = erase._token_mask_quad(token, W, H, erase.PADDING_PX)
+        rect = quad_bbox(quad, W, H) if quad else None
+        if not rect:
+            continue
+        l, t, r, b = rect
+        mask = Image.new("L", (r - l, b - t), 0)
+        ImageDraw.Draw(mask).polygon([(x - l, y - t) for x, y in quad], fill=255)
+        region = base.crop((l, t, r, b))
+        region.paste(src.crop((l, t, r, b)), mask=mask)
+        base.paste(region, (l, t))
+    return base
+
+
+def diff_px(a: np.ndarray, b: np.ndarray) -> int:
+    return int(np.any(a != b, axis=2).sum())
+
+
+def check_erase(sizes: tuple[int, ...] = (25, 100, 300)) -> bool:
+    ok = True
+    for n in sizes:
+        img, tokens = synthetic_page(n, seed=n)
+        token_out = erase_with("token", img, tokens)
+        diff = {"solid_diff_px": diff_px(token_out, erase_with("mask", img, tokens))}
+        # Restore every other token onto the erased page, overlaps included.
+        kept = tokens[::2]
+        erased = Image.fromarray(token_out)
+        fast = erase.restore_token_regions(erased.copy(), img, kept)
+        diff["restore_diff_px"] = diff_px(np.asarray(reference_restore(erased.copy(), img, kept)), np.asarray(fast))
+        if any(diff.values()):
+            ok = False
+            print(json.dumps({"check": "erase", "page": f"synthetic-{n}", **diff}))
+    return ok
+
+
+# --- Lens protobuf ------------------------------------------------------------
+# The copy-per-field reader backend.lens.proto replaced, verbatim but for its
+# name. It is the reference: keep it as it is.
+class ReferenceProto:
+    MAX_EXACT_VARINT = 2**53 - 1
+
+    @staticmethod
+    def read_varint(buf, i):
+        shift = 0
+        result = 0
+        while True:
+            if i >= len(buf):
+                raise ValueError("eof varint")
+            b = buf[i]
+            i += 1
+            result |= (b & 0x7F) << shift
+            if (b & 0x80) == 0:
+                if result > ReferenceProto.MAX_EXACT_VARINT:
+                    raise ValueError(f"varint {result} exceeds the safe integer range")
+                return result, i
+            shift += 7
+            if shift > 70:
+                raise ValueError("varint too long")
+
+    @staticmethod
+    def parse(buf, start=0, end=None):
+        if end is None:
+            end = len(buf)
+        i = start
+        out = []
+        while i < end:
+            key, i = ReferenceProto.read_varint(buf, i)
+            field = key >> 3
+            wire = key & 7
+            if wire == 0:
+                val, i = ReferenceProto.read_varint(buf, i)
+                out.append((field, wire, val))
+            elif wire == 1:
+                out.append((field, wire, buf[i: i + 8]))
+                i += 8
+            elif wire == 2:
+                length, i = ReferenceProto.read_varint(buf, i)
+                out.append((field, wire, buf[i: i + length]))
+                i += length
+            elif wire == 5:
+                out.append((field, wire, buf[i: i + 4]))
+                i += 4
+            else:
+                raise ValueError(f"wiretype {wire}")
+        return out
+
+    @staticmethod
+    def f32(b4):
+        return struct.unpack("<f", b4)[0]
+
+    @staticmethod
+    def get_float_field(fields, field_num):
+        for f, w, v in fields:
+            if f == field_num and w == 5:
+                return ReferenceProto.f32(v)
+        return None
+
+    @staticmethod
+    def get_points_from_geom(geom_bytes):
+        pts = []
+        height = None
+        for f, w, v in ReferenceProto.parse(geom_bytes):
+            if f == 1 and w == 2:
+                p_fields = ReferenceProto.parse(v)
+                x = ReferenceProto.get_float_field(p_fields, 1)
+                y = ReferenceProto.get_float_field(p_fields, 2)
+                if x is not None and y is not None:
+                    pts.append((x, y))
+            elif f == 3 and w == 5:
+                height = ReferenceProto.f32(v)
+        if len(pts) >= 2 and height is not None:
+            return pts[0], pts[-1], height
+        return None, None, None
+
+    @staticmethod
+    def get_polyline_from_geom(geom_bytes):
+        pts = []
+        height = None
+        for f, w, v in ReferenceProto.parse(geom_bytes):
+            if f == 1 and w == 2:
+                p_fields = ReferenceProto.parse(v)
+                x = ReferenceProto.get_float_field(p_fields, 1)
+                y = ReferenceProto.get_float_field(p_fields, 2)
+                if x is not None and y is not None:
+                    pts.append((x, y))
+            elif f == 3 and w == 5:
+                height = ReferenceProto.f32(v)
+        return pts, height
+
+    @staticmethod
+    def looks_like_geom(geom_bytes):
+        pts = 0
+        has_height = False
+        for f, w, v in ReferenceProto.parse(geom_bytes):
+            if f == 1 and w == 2:
+                p_fields = ReferenceProto.parse(v)
+                if ReferenceProto.get_float_field(p_fields, 1) is not None and ReferenceProto.get_float_field(p_fields, 2) is not None:
+                    pts += 1
+            elif f == 3 and w == 5:
+                has_height = True
+        return pts >= 2 and has_height
+
+    @staticmethod
+    def looks_like_span(span_bytes):
+        has_t = False
+        has_range = False
+        for f, w, _v in ReferenceProto.parse(span_bytes):
+            if f in (3, 4) and w == 5:
+                has_t = True
+            elif f in (1, 2) and w == 0:
+                has_range = True
+        return has_t and has_range
+
+    @staticmethod
+    def is_item_message(msg_bytes):
+        geom_ok = False
+        span_ok = 0
+        for f, w, v in ReferenceProto.parse(msg_bytes):
+            if f == 1 and w == 2 and not geom_ok:
+                geom_ok = ReferenceProto.looks_like_geom(v)
+            elif f == 2 and w == 2 and ReferenceProto.looks_like_span(v):
+                span_ok += 1
+        return geom_ok and span_ok > 0
+
+    @staticmethod
+    def extract_items_from_paragraph(par_bytes):
+        shallow = [v for _, w, v in ReferenceProto.parse(par_bytes) if w == 2 and ReferenceProto.is_item_message(v)]
+        if shallow:
+            return proto.ParagraphItems(shallow, deep=False, exhausted=False)
+        found = []
+        seen = set()
+        nodes = 0
+        exhausted = False
+
+        def walk(buf, depth):
+            nonlocal nodes, exhausted
+            if depth >= 4 or nodes > 20000:
+                if nodes > 20000:
+                    exhausted = True
+                return
+            for _, w, v in ReferenceProto.parse(buf):
+                if w != 2:
+                    continue
+                nodes += 1
+                if nodes > 20000:
+                    exhausted = True
+                    return
+                if ReferenceProto.is_item_message(v):
+                    if v not in seen:
+                        seen.add(v)
+                        found.append(v)
+                else:
+                    walk(v, depth + 1)
+
+        walk(par_bytes, 0)
+        return proto.ParagraphItems(found, deep=True, exhausted=exhausted)
+
+    @staticmethod
+    def extract_item_geom_spans(item_bytes):
+        geom_bytes = None
+        spans_bytes = []
+        for f, w, v in ReferenceProto.parse(item_bytes):
+            if f == 1 and w == 2:
+                geom_bytes = v
+            elif f == 2 and w == 2:
+                spans_bytes.append(v)
+        return geom_bytes, spans_bytes
+
+    @staticmethod
+    def extract_span(span_bytes):
+        start = end = t0 = t1 = None
+        for f, w, v in ReferenceProto.parse(span_bytes):
+            if f == 1 and w == 0:
+                start = int(v)
+            elif f == 2 and w == 0:
+                end = int(v)
+            elif f == 3 and w == 5:
+                t0 = ReferenceProto.f32(v)
+            elif f == 4 and w == 5:
+                t1 = ReferenceProto.f32(v)
+        return start, end, t0, t1
+
+
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def ld(field: int, payload: bytes) -> bytes:
+    return varint(field << 3 | 2) + varint(len(payload)) + payload
+
+
+def fl(field: int, x: float) -> bytes:
+    return varint(field << 3 | 5) + struct.pack("<f", x)
+
+
+def vi(field: int, n: int) -> bytes:
+    return varint(field << 3) + varint(n)
+
+
+def synthetic_paragraph(rng: random.Random, items: int, nested: bool) -> bytes:
+    """A Lens-shaped paragraph of ``items`` items, nested one level deeper if asked."""
+    out = b""
+    cursor = 0
+    for _ in range(items):
+        x, y = rng.random(), rng.random()
+        pts = b"".join(ld(1, fl(1, x + k * 0.01) + fl(2, y)) for k in range(rng.randint(2, 6)))
+        geom = pts + fl(3, rng.uniform(0.005, 0.05))
+        spans = b""
+        for _ in range(rng.randint(1, 8)):
+            n = rng.randint(1, 12)
+            spans += ld(2, vi(1, cursor) + vi(2, cursor + n) + fl(3, rng.random()) + fl(4, rng.random()))
+            cursor += n + 1
+        item = ld(1, geom) + spans + vi(3, rng.randint(0, 3))
+        out += ld(2, ld(1, item)) if nested else ld(rng.choice((1, 2, 5)), item)
+    return out + vi(7, rng.randint(0, 1 << 20))
+
+
+def outcome(fn: Any, *args: Any) -> tuple:
+    try:
+        return ("ok", fn(*args))
+    except Exception as exc:  # noqa: BLE001 - the error IS the result here
+        return ("raise", type(exc).__name__, str(exc))
+
+
+def decode_all(reader: Any, par: bytes) -> list:
+    """Everything decode_tree asks the reader for, in the order it asks."""
+    found = reader.extract_items_from_paragraph(par)
+    out = [tuple(found)]
+    for item in found.items:
+        geom, spans = reader.extract_item_geom_spans(item)
+        out.append((geom, spans, reader.get_points_from_geom(geom) if geom is not None else None,
+                    reader.get_polyline_from_geom(geom) if geom is not None else None))
+        out.extend(reader.extract_span(s) for s in spans)
+    return out
+
+
+def same(a: Any, b: Any) -> bool:
+    # NaN floats come out of random bytes; compare them by bit pattern.
+    return json.dumps(a, default=repr).replace("NaN", "nan") == json.dumps(b, default=repr).replace("NaN", "nan")
+
+
+def mutate(rng: random.Random, buf: bytes) -> bytes:
+    b = bytearray(buf)
+    for _ in range(rng.randint(1, 4)):
+        op = rng.randrange(7)
+        i = rng.randrange(len(b)) if b else 0
+        if op == 0 and b:
+            b[i] ^= 1 << rng.randrange(8)
+        elif op == 1:
+            del b[rng.randrange(len(b) + 1):]
+        elif op == 2:
+            b[i:i] = b"\xff" * rng.randint(1, 12)                  # overlong varint
+        elif op == 3:
+            b[i:i] = varint(rng.choice((2**53, 2**60, 2**63 - 1)))  # past the exact range
+        elif op == 4:
+            b[i:i] = bytes([rng.randrange(256) & ~7 | rng.choice((3, 4, 6, 7))])  # bad wire type
+        elif op == 5:
+            b[i:i] = varint(1 << 3 | 2) + varint(rng.randint(len(b), len(b) + 1000))  # runs past the end
+        elif b:
+            b[i] = 0x80                                             # unterminated varint
+    return bytes(b)
+
+
+def fuzz(paras: list[bytes], n: int, rng: random.Random) -> bool:
+    bad = 0
+    cases = [b"", b"\x80", b"\xff" * 11, varint(2**53), b"\x08" + varint(2**53),
+             b"\x0a\x05ab", b"\x0d\x00\x00", b"\x0f", b"\x08\x80\x80"]
+    targets = [(c, "case") for c in cases] + [(mutate(rng, rng.choice(paras)), "mutant") for _ in range(n)]
+    for buf, kind in targets:
+        for name in ("parse", "extract_items_from_paragraph", "is_item_message", "looks_like_geom",
+                     "looks_like_span", "get_points_from_geom", "extract_span"):
+            a = outcome(getattr(ReferenceProto, name), buf)
+            b = outcome(getattr(proto, name), buf)
+            if not same(a, b):
+                bad += 1
+                if bad <= 10:
+                    print(json.dumps({"fn": name, "kind": kind, "buf": buf[:64].hex(),
+                                      "old": repr(a)[:160], "new": repr(b)[:160]}))
+        a, b = outcome(decode_all, ReferenceProto, buf), outcome(decode_all, proto, buf)
+        if not same(a, b):
+            bad += 1
+    print(json.dumps({"fuzz_cases": len(targets), "disagreements": bad}))
+    return bad == 0
+
+
+def synthetic_pages(rng: random.Random) -> list[tuple[str, list[bytes]]]:
+    return [
+        ("synthetic-sparse", [synthetic_paragraph(rng, rng.randint(1, 4), False) for _ in range(12)]),
+        ("synthetic-dense", [synthetic_paragraph(rng, rng.randint(4, 16), False) for _ in range(60)]),
+        ("synthetic-nested", [synthetic_paragraph(rng, rng.randint(4, 16), True) for _ in range(60)]),
+    ]
+
+
+def check_proto(rng: random.Random, fuzz_cases: int) -> bool:
+    pages = synthetic_pages(rng)
+    ok = True
+    for name, paras in pages:
+        for par in paras:
+            if not same(decode_all(ReferenceProto, par), decode_all(proto, par)):
+                ok = False
+                print(json.dumps({"check": "proto", "page": name, "buf": par[:64].hex()}))
+                break
+    return fuzz([p for _, paras in pages for p in paras], fuzz_cases, rng) and ok
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python scripts/backend_parity.py")
+    ap.add_argument("--fuzz", type=int, default=3000, help="mutated paragraphs for the proto check")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    results = {
+        "erase": check_erase(),
+        "proto": check_proto(random.Random(args.seed), max(0, args.fuzz)),
+    }
+    print(json.dumps({"parity": results}))
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
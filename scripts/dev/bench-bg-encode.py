@@ -0,0 +1,197 @@
+# Timing and size harness for the background encoder (backend.render.bg_encode)
+# over the page types it has to tell apart:
+#
+#   scan      continuous-tone photo-like page with sensor noise
+#   halftone  screentoned manga page: dot patterns and line art, few colours
+#   webtoon   flat colour panels with soft gradients and anti-aliased edges
+#
+# For each page it encodes once per format this Pillow can write (ms, bytes),
+# reports what the auto policy picks, then runs the size-target search at
+# --target-kb and reports quality / bytes / encodes. Every file is decoded back
+# and compared to the source size.
+#
+# Then it erases --boxes speech-bubble-sized text boxes from the page and
+# compares the full erased page (render.background "image") with the erased
+# patches (backend.render.erase_patches, "patches"): bytes on the wire as
+# base64 and ms to build, and whether the patches drawn over the source page
+# give back the erased page.
+#
+#   python scripts/dev/bench-bg-encode.py [--pages DIR] [--target-kb 120] [--runs 3] [--boxes 24]
+#
+# Exits 1 if a file fails to decode back to the page's size, if the search
+# misses the target while the minimum quality would have fit it, or if the
+# patches do not reproduce the erased page.
+import argparse
+import base64
+import io
+import pathlib
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from backend.render import bg_encode, erase_patches  # noqa: E402
+from backend.render.erase import erase_text_with_boxes  # noqa: E402
+
+W, H = 1200, 1700
+
+
+def scan_page(rng: random.Random) -> Image.Image:
+    img = Image.linear_gradient("L").resize((W, H)).convert("RGB")
+    noise = Image.effect_noise((W, H), 24).convert("RGB")
+    img = Image.blend(img, noise, 0.35)
+    draw = ImageDraw.Draw(img)
+    for _ in range(30):
+        x, y = rng.randrange(W), rng.randrange(H)
+        draw.ellipse((x, y, x + rng.randint(40, 200), y + rng.randint(40, 200)),
+                     fill=tuple(rng.randrange(256) for _ in range(3)))
+    return img.filter(ImageFilter.GaussianBlur(1.2))
+
+
+def halftone_page(rng: random.Random) -> Image.Image:
+    img = Image.new("L", (W, H), 255)
+    draw = ImageDraw.Draw(img)
+    for top in range(0, H, H // 4):
+        draw.rectangle((20, top + 20, W - 20, top + H // 4 - 20), outline=0, width=4)
+        pitch = rng.choice((6, 8, 10))
+        for y in range(top + 40, top + H // 4 - 40, pitch):
+            for x in range(40, W // 2, pitch):
+                r = (x / W) * pitch / 2
+                draw.ellipse((x - r, y - r, x + r, y + r), fill=0)
+        for _ in range(12):
+            draw.line([(rng.randrange(W), rng.randrange(top, top + H // 4)) for _ in range(2)], fill=0, width=3)
+    return img.convert("RGB")
+
+
+def webtoon_page(rng: random.Random) -> Image.Image:
+    img = Image.new("RGB", (W, H), (250, 248, 240))
+    draw = ImageDraw.Draw(img)
+    for top in range(0, H, 420):
+        colour = tuple(rng.randrange(80, 256) for _ in range(3))
+        draw.rounded_rectangle((30, top + 30, W - 30, top + 390), radius=24, fill=colour, outline=(20, 20, 20), width=5)
+        for _ in range(6):
+            x, y = rng.randrange(60, W - 200), rng.randrange(top + 60, top + 300)
+            draw.ellipse((x, y, x + 140, y + 80), fill=tuple(rng.randrange(256) for _ in range(3)))
+    glow = Image.linear_gradient("L").resize((W, H)).convert("RGB")
+    return Image.blend(img, glow, 0.08).filter(ImageFilter.SMOOTH)
+
+
+def load_pages(folder: str | None) -> list[tuple[str, Image.Image]]:
+    if folder:
+        return [
+            (p.name, Image.open(p).convert("RGB"))
+            for p in sorted(pathlib.Path(folder).iterdir())
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".webp"}
+        ]
+    rng = random.Random(0)
+    return [("scan", scan_page(rng)), ("halftone", halftone_page(rng)), ("webtoon", webtoon_page(rng))]
+
+
+def decodes(data: bytes, size: tuple[int, int]) -> bool:
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            im.load()
+            return im.size == size
+    except Exception:  # noqa: BLE001 - any decode failure is a failure here
+        return False
+
+
+def text_tokens(rng: random.Random, n: int) -> list[dict]:
+    """``n`` columns of lines, sized like the text in a speech bubble."""
+    tokens = []
+    for _ in range(n):
+        left, top = rng.uniform(0.05, 0.8), rng.uniform(0.05, 0.9)
+        for line in range(rng.randint(2, 5)):
+            tokens.append({"box": {"left": left + line * 0.022, "top": top, "width": 0.018,
+                                   "height": rng.uniform(0.03, 0.07), "rotation_deg": 0.0}})
+    return tokens
+
+
+def with_text(img: Image.Image, tokens: list[dict]) -> Image.Image:
+    out = img.copy()
+    draw = ImageDraw.Draw(out)
+    for tok in tokens:
+        b = tok["box"]
+        l, t = b["left"] * img.width, b["top"] * img.height
+        draw.rectangle((l, t, l + b["width"] * img.width, t + b["height"] * img.height), fill=(255, 255, 255))
+        for y in range(int(t) + 2, int(t + b["height"] * img.height) - 8, 14):
+            draw.text((l + 3, y), "字", fill=(0, 0, 0))
+    return out
+
+
+def composite(source: Image.Image, payload: dict) -> Image.Image:
+    out = source.convert("RGB")
+    if payload["image"]:
+        atlas = Image.open(io.BytesIO(base64.b64decode(payload["image"].split(",", 1)[1]))).convert("RGB")
+        for p in payload["patches"]:
+            out.paste(atlas.crop((p["ax"], p["ay"], p["ax"] + p["w"], p["ay"] + p["h"])), (p["x"], p["y"]))
+    return out
+
+
+def timed(fn, runs: int):
+    out, samples = None, []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return out, statistics.median(samples)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", help="folder of page images (default: synthetic pages)")
+    ap.add_argument("--target-kb", type=int, default=120)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--boxes", type=int, default=24, help="speech bubbles of text erased per page")
+    args = ap.parse_args()
+
+    formats = [f for f, ok in bg_encode.AVAILABLE.items() if ok]
+    print(f"formats: {', '.join(formats)}  (missing: {', '.join(f for f in bg_encode.AVAILABLE if f not in formats) or '-'})")
+    target = args.target_kb * 1024
+    failed = 0
+    for name, img in load_pages(args.pages):
+        print(f"\n{name} {img.width}x{img.height}")
+        for fmt in formats:
+            data, ms = timed(lambda: bg_encode._save(img, fmt), args.runs)
+            ok = decodes(data, img.size)
+            failed += not ok
+            print(f"  {fmt:5s} {len(data) / 1024:8.1f} KB {ms:8.1f} ms{'' if ok else '  DECODE FAILED'}")
+        fmt, kind = bg_encode.choose_format(img)
+        print(f"  auto  -> {fmt} ({kind})")
+
+        enc, ms = timed(lambda: bg_encode.encode(img, target_bytes=target), args.runs)
+        ok = decodes(enc.data, img.size)
+        failed += not ok
+        line = (f"  target {args.target_kb} KB -> {enc.format} q={enc.quality} "
+                f"{len(enc.data) / 1024:.1f} KB, {enc.encodes} encodes, {ms:.1f} ms, met={enc.target_met}")
+        print(line + ("" if ok else "  DECODE FAILED"))
+        if not enc.target_met:
+            lossy = bg_encode._lossy_format()
+            floor = bg_encode._save(img, lossy, bg_encode._MIN_QUALITY) if lossy != "png" else enc.data
+            if len(floor) <= target:
+                failed += 1
+                print(f"  MISSED: {lossy} at q={bg_encode._MIN_QUALITY} is {len(floor) / 1024:.1f} KB")
+
+        tokens = text_tokens(random.Random(1), args.boxes)
+        source = with_text(img, tokens)
+        erased = erase_text_with_boxes(source, tokens)
+        full, full_ms = timed(lambda: bg_encode.encode(erased).data_uri(), args.runs)
+        (payload, atlas, perf), patch_ms = timed(lambda: erase_patches.build(source, erased, tokens), args.runs)
+        wire = len(payload["image"]) + 40 * len(payload["patches"])
+        err = np.abs(np.asarray(composite(source, payload), dtype=np.int16) - np.asarray(erased, dtype=np.int16))
+        # A lossy atlas differs from the page by codec noise, not by region.
+        ok = err.max() == 0 if atlas is None or atlas.format == "png" else err.mean() < 1.0
+        failed += not ok
+        print(f"  patches: {perf['patches']} ({perf['patch_page_frac'] * 100:.1f}% of page) "
+              f"{wire / 1024:.1f} KB {patch_ms:.1f} ms  vs page {len(full) / 1024:.1f} KB {full_ms:.1f} ms"
+              f"{'' if ok else '  COMPOSITE MISMATCH'}")
+    print("\nOK" if not failed else f"\n{failed} failure(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# Times one result-cache hit for a typical lens_text.ai result, before and
+# after LruCache stopped deep-copying: the old path is reproduced here with
+# copy.deepcopy, the new one is backend.jobs.cache.LruCache.get itself.
+#
+#   python scripts/dev/bench-cache-hit.py [--paragraphs 40] [--repeat 200]
+import argparse
+import base64
+import copy
+import json
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+from backend.jobs.cache import LruCache  # noqa: E402
+
+
+def item(x, y):
+    """Roughly the shape backend/lens/tree.py decodes one Lens line into."""
+    return {
+        "text": "สวัสดีครับ ทุกคน",
+        "valid_text": True,
+        "height_raw": 0.02,
+        "baseline_p1": {"x": x, "y": y},
+        "baseline_p2": {"x": x + 0.2, "y": y},
+        "box": {
+            "left": x, "top": y, "width": 0.2, "height": 0.02,
+            "rotation_deg": 0.0, "rotation_deg_css": 0.0,
+            "center": {"x": x + 0.1, "y": y + 0.01},
+        },
+        "bounds_px": [120, 400, 360, 436],
+        "font_size_px": 28.0,
+        "spans": [
+            {"text": "ab", "box": {"left": x, "top": y, "width": 0.02, "height": 0.02},
+             "quad": [[1, 2], [3, 4], [5, 6], [7, 8]]}
+            for _ in range(6)
+        ],
+    }
+
+
+def tree(side, paragraphs):
+    paras = [
+        {"text": "t", "items": [item(0.1, 0.01 * i) for _ in range(3)],
+         "bounds_px": [120, 400, 360, 520], "text_light": False}
+        for i in range(paragraphs)
+    ]
+    groups = [{"para_indices": [i], "text": "t"} for i in range(paragraphs)]
+    return {"side": side, "paragraphs": paras, "bubble_groups": groups}
+
+
+def typical_ai_result(paragraphs):
+    html = '<div class="tp-line" style="left:1px;top:2px">สวัสดี</div>' * (paragraphs * 3)
+    return {
+        "mode": "lens_text",
+        "imageDataUri": "data:image/webp;base64," + base64.b64encode(os.urandom(300_000)).decode(),
+        "originalParagraphs": [{"geometry": [1, 2, 3, 4], "text": "x"}] * paragraphs,
+        "translatedParagraphs": [{"geometry": [1, 2, 3, 4], "text": "x"}] * paragraphs,
+        "original": {"originalTree": tree("original", paragraphs), "originalhtml": html},
+        "translated": {"translatedTree": tree("translated", paragraphs), "translatedhtml": html},
+        "Ai": {"aiTree": tree("Ai", paragraphs), "aihtml": html, "meta": {"units": paragraphs}},
+        "perf": {"cache": "miss", "total_ms": 9000.0},
+    }
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paragraphs", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    result = typical_ai_result(args.paragraphs)
+    size_kb = len(json.dumps(result, ensure_ascii=False)) / 1024
+
+    stored = copy.deepcopy(result)
+    before = timed(lambda: copy.deepcopy(stored), args.repeat)
+
+    cache = LruCache(8)
+    cache.set("k", result)
+    after = timed(lambda: cache.get("k"), args.repeat)
+
+    print(json.dumps({
+        "paragraphs": args.paragraphs,
+        "result_kb": round(size_kb, 1),
+        "hit_ms_deepcopy": round(before, 4),
+        "hit_ms_shared": round(after, 4),
+        "speedup": round(before / after, 1) if after else None,
+    }))
+
+
+if __name__ == "__main__":
+    main()
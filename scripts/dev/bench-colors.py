@@ -0,0 +1,120 @@
+# Regression + timing harness for background colour sampling: runs the
+# text-light vote (region_is_dark) and the solid-erase border sample over a
+# page once with the previous list-of-pixels sampler (kept verbatim below) and
+# once with backend.render.colors.ColorSampler, asserts every answer matches,
+# and reports ms per page.
+#
+# Pages: a folder of images; rectangles are drawn at random over each one.
+# Without a folder, a synthetic page of coloured panels is generated.
+#
+#   python scripts/dev/bench-colors.py [PAGES_DIR] [--rects 300]
+#
+# Exits 1 if any sample differs.
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+from PIL import Image, ImageDraw  # noqa: E402
+
+from backend.render import colors  # noqa: E402
+
+_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+
+
+def list_sample_bg_color(img, rect, m):
+    W, H = img.size
+    l, t, r, b = rect
+    samples = []
+    for x0, y0, x1, y1 in ((l, t - m, r, t), (l, b, r, b + m), (l - m, t, l, b), (r, t, r + m, b)):
+        x0, x1 = max(0, min(W, x0)), max(0, min(W, x1))
+        y0, y1 = max(0, min(H, y0)), max(0, min(H, y1))
+        if x1 > x0 and y1 > y0:
+            samples.extend(img.crop((x0, y0, x1, y1)).getdata())
+    med = colors.median_rgba(samples)
+    return med[:3] if med else img.getpixel((max(0, min(W - 1, l)), max(0, min(H - 1, t))))
+
+
+def list_region_is_dark(img, rect):
+    W, H = img.size
+    l, t, r, b = rect
+    l, r = max(0, min(W, l)), max(0, min(W, r))
+    t, b = max(0, min(H, t)), max(0, min(H, b))
+    if r - l < 2 or b - t < 2:
+        return False
+    region = img.crop((l, t, r, b))
+    region.thumbnail((32, 32))
+    rw, rh = region.size
+    readings = [colors.median_rgba(list(region.getdata()))[:3]]
+    edge = max(1, min(rw, rh) // 5)
+    edge_pixels = (
+        list(region.crop((0, 0, rw, edge)).getdata())
+        + list(region.crop((0, max(0, rh - edge), rw, rh)).getdata())
+        + list(region.crop((0, edge, edge, max(edge, rh - edge))).getdata())
+        + list(region.crop((max(0, rw - edge), edge, rw, max(edge, rh - edge))).getdata())
+    )
+    readings.append(colors.median_rgba(edge_pixels)[:3])
+    readings.append(list_sample_bg_color(img, (l, t, r, b), max(2, min(16, round(min(r - l, b - t) * 0.2)))))
+    votes = sum(colors.pick_bw_text_color(rgb) == colors.TEXT_COLOR_LIGHT for rgb in readings)
+    return votes * 2 >= len(readings)
+
+
+def synthetic_page(seed):
+    rng = random.Random(seed)
+    img = Image.new("RGB", (1200, 1800), (245, 245, 240))
+    draw = ImageDraw.Draw(img)
+    for _ in range(200):
+        x, y = rng.randint(0, 1200), rng.randint(0, 1800)
+        draw.rectangle([x, y, x + rng.randint(10, 300), y + rng.randint(10, 300)],
+                       fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    return img
+
+
+def bench(name, img, n, seed):
+    rng = random.Random(seed)
+    W, H = img.size
+    rects = []
+    for _ in range(n):
+        l, t = rng.randint(0, W - 8), rng.randint(0, H - 8)
+        rects.append((l, t, min(W, l + rng.randint(8, 320)), min(H, t + rng.randint(8, 160))))
+
+    t0 = time.perf_counter()
+    ref = [(list_region_is_dark(img, r), tuple(list_sample_bg_color(img, r, 6))) for r in rects]
+    list_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    sampler = colors.ColorSampler(img)
+    got = [(sampler.region_is_dark(r), sampler.sample_bg_color(r, 6)) for r in rects]
+    numpy_ms = (time.perf_counter() - t0) * 1000
+
+    same = ref == got
+    print(json.dumps({
+        "page": name,
+        "rects": n,
+        "same": same,
+        "list_ms": round(list_ms, 1),
+        "sampler_ms": round(numpy_ms, 1),
+        "speedup": round(list_ms / numpy_ms, 1) if numpy_ms else None,
+    }))
+    return same
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("pages", type=pathlib.Path, nargs="?")
+    ap.add_argument("--rects", type=int, default=300)
+    args = ap.parse_args()
+    ok = True
+    if args.pages:
+        for path in sorted(p for p in args.pages.iterdir() if p.suffix.lower() in _EXTS):
+            ok &= bench(path.name, Image.open(path).convert("RGB"), args.rects, 0)
+    else:
+        ok &= bench("synthetic", synthetic_page(0), args.rects, 0)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Regression + timing harness for the solid erase: runs
+# backend.render.erase.erase_text_with_boxes once on the per-token loop and
+# once on the label-mask engine, across token counts, and diffs the pixels.
+#
+# The mask engine fills only isolated tokens itself and hands the rest to the
+# loop in their order, so every pixel of the page must match.
+#
+# Pages: a folder of saved Lens responses (the lens_raw.json the CLI's
+# --lens-json replays) next to their images with the same stem. Without a
+# folder, synthetic pages of word-sized boxes in text lines are generated at
+# each --synthetic count.
+#
+#   python scripts/dev/bench-erase.py [--pages DIR] [--synthetic 25,50,100,200,400,800]
+#
+# Exits 1 if any pixel differs. The same check, without the
+# timing, runs on every `npm run test:unit` as `python scripts/backend_parity.py`.
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+import backend_parity as parity  # noqa: E402
+from backend.lens.tree import decode_tree  # noqa: E402
+from backend.render import erase  # noqa: E402
+
+_IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def recorded_pages(folder):
+    for path in sorted(folder.glob("*.json")):
+        img_path = next((path.with_suffix(e) for e in _IMAGE_EXTS if path.with_suffix(e).exists()), None)
+        if img_path is None:
+            continue
+        data = json.loads(path.read_text(encoding="utf-8"))
+        img = Image.open(img_path).convert("RGB")
+        W, H = img.size
+        tree = decode_tree(data.get("originalParagraphs") or [], data.get("originalTextFull") or "", "original", W, H)
+        tokens = [it for p in tree.get("paragraphs") or [] for it in p.get("items") or [] if isinstance(it, dict)]
+        if tokens:
+            yield path.stem, img, tokens
+
+
+def run(name, img, tokens, repeat):
+    results = {}
+    for engine in ("token", "mask"):
+        erase.ERASE_ENGINE = engine
+        erase.MASK_ENGINE_MIN_TOKENS = 0
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = erase.erase_text_with_boxes(img, tokens, mode="solid")
+            ms = (time.perf_counter() - t0) * 1000
+            best = ms if best is None else min(best, ms)
+        results[engine] = (np.asarray(out), best)
+    diff = parity.diff_px(results["token"][0], results["mask"][0])
+    ok = not diff
+    print(json.dumps({
+        "page": name,
+        "tokens": len(tokens),
+        "ok": ok,
+        "diff_px": diff,
+        "token_ms": round(results["token"][1], 1),
+        "mask_ms": round(results["mask"][1], 1),
+        "speedup": round(results["token"][1] / results["mask"][1], 2) if results["mask"][1] else None,
+    }))
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=pathlib.Path)
+    ap.add_argument("--synthetic", default="25,50,100,200,400,800")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    ok = True
+    if args.pages:
+        for name, img, tokens in recorded_pages(args.pages):
+            ok &= run(name, img, tokens, max(1, args.repeat))
+    else:
+        for n in (int(v) for v in args.synthetic.split(",") if v.strip()):
+            img, tokens = parity.synthetic_page(n, seed=n)
+            ok &= run(f"synthetic-{n}", img, tokens, max(1, args.repeat))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Regression + timing harness for font fitting: runs
+# backend.render.layout.fit_para_size_and_lines once the old way (step down
+# one pixel per pass, every font reopened and every run re-measured) and once
+# as shipped (bisection over the cached glyph metrics), asserts both choose
+# the same size and lines, and reports the time per paragraph. It also times
+# tp_html.fit_tree_font_sizes — the fit the live renderer runs on every
+# layer — with and without its per-text cache.
+#
+# Recorded trees: a folder of debug exports / API results holding an
+# "Ai" -> "aiTree" (or a bare tree with "paragraphs" and "width"/"height").
+# Without a folder, synthetic Thai and English paragraphs are generated.
+#
+#   python scripts/dev/bench-fit.py --thai-font TTF --latin-font TTF [--trees DIR] [--paragraphs 200]
+#
+# Exits 1 if any paragraph fits differently.
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+from backend.render import fonts, layout, text_metrics, tp_html  # noqa: E402
+from backend.render.fonts import budoux_parser  # noqa: E402
+from backend.utils.text import ZWSP  # noqa: E402
+
+_THAI_WORDS = ["สวัสดี", "ครับ", "ฉัน", "ไม่", "รู้", "เลย", "ว่า", "เขา", "จะ", "มา", "วันนี้", "ที่นี่", "ทำไม", "ล่ะ"]
+_LATIN_WORDS = ["hello", "there", "I", "don't", "know", "what", "he", "wants", "from", "us", "today", "really", "why", "now"]
+
+
+def synthetic_paragraphs(n, seed):
+    rng = random.Random(seed)
+    W, H = 1200, 1800
+    for i in range(n):
+        lang = "th" if i % 2 == 0 else "en"
+        words = _THAI_WORDS if lang == "th" else _LATIN_WORDS
+        sep = "" if lang == "th" else " "
+        text = sep.join(rng.choice(words) for _ in range(rng.randint(4, 40)))
+        n_items = rng.randint(1, 6)
+        x, y = rng.uniform(0, W - 400), rng.uniform(0, H - 400)
+        w, h = rng.uniform(120, 400), rng.uniform(18, 70)
+        items = []
+        for k in range(n_items):
+            top = y + k * h * 1.1
+            items.append({
+                "box": {"left": x / W, "top": top / H, "width": w / W, "height": h / H},
+                "baseline_p1": {"x": x / W, "y": (top + h * 0.8) / H},
+                "baseline_p2": {"x": (x + w) / W, "y": (top + h * 0.8) / H},
+            })
+        yield f"synthetic-{i}", text, items, W, H, lang, int(h * 1.5)
+
+
+def recorded_paragraphs(folder):
+    for path in sorted(folder.glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        tree = (data.get("Ai") or {}).get("aiTree") or data
+        W, H = int(tree.get("width") or 0), int(tree.get("height") or 0)
+        if not W or not H:
+            continue
+        lang = str(tree.get("target_lang") or data.get("lang") or "th")
+        for para in tree.get("paragraphs") or []:
+            items = [it for it in para.get("items") or [] if isinstance(it, dict)]
+            text = "".join(str(it.get("text") or "") for it in items) or str(para.get("text") or "")
+            if not items or not text.strip():
+                continue
+            base = max(int(float((it.get("box") or {}).get("height") or 0) * H) for it in items)
+            yield f"{path.stem}:{para.get('para_index')}", text, items, W, H, lang, max(12, int(base * 1.5))
+
+
+def step_down(ptext, parser, items, W, H, thai, latin, base, lang):
+    """The pre-bisection search, verbatim: try every size from the top."""
+    tokens = layout.tokens_with_spaces(ptext, parser, lang)
+    if not tokens or not items:
+        return int(base), [[] for _ in items]
+    max_lines = len(items)
+    n_words = sum(1 for k, s in tokens if k == "word" and str(s))
+    desired = max(1, min(max_lines, n_words))
+    heights = [float(layout.ensure_box_fields(it.get("box") or {}).get("height") or 0.0) * H for it in items]
+    size = max(10, int(base))
+    while size >= 10:
+        lines = layout.wrap_tokens_to_lines(tokens, items, W, H, thai, latin, size, min_lines=desired)
+        lines = layout.ensure_min_lines_by_split(lines, desired, max_lines)
+        if len(lines) <= max_lines:
+            fits = True
+            for ii, seg in enumerate(lines):
+                words = [s for k, s, _ in seg if k == "word" and s != ZWSP]
+                if not words:
+                    continue
+                m = text_metrics.line_metrics_px("".join(words), thai, latin, size)
+                if m is not None and ii < len(heights) and heights[ii] > 0.0 and m[1] > heights[ii] * 1.01:
+                    fits = False
+                    break
+            if fits:
+                return size, lines
+        size -= 1
+    lines = layout.wrap_tokens_to_lines(tokens, items, W, H, thai, latin, 10, min_lines=desired)
+    return 10, layout.ensure_min_lines_by_split(lines, desired, max_lines)
+
+
+class uncached:
+    """Reopen fonts and re-measure every run, as the renderer did before."""
+
+    def __enter__(self):
+        self.saved = (layout.font_for, layout.advance_px, text_metrics._run_extent, tp_html._width_shape)
+        layout.font_for = fonts.pick_font
+        layout.advance_px = lambda font, text, measure: measure(font, text)
+        text_metrics._run_extent = text_metrics._run_extent.__wrapped__
+        tp_html._width_shape = tp_html._width_shape.__wrapped__
+
+    def __exit__(self, *exc):
+        layout.font_for, layout.advance_px, text_metrics._run_extent, tp_html._width_shape = self.saved
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--thai-font", required=True)
+    ap.add_argument("--latin-font", required=True)
+    ap.add_argument("--trees", type=pathlib.Path)
+    ap.add_argument("--paragraphs", type=int, default=200)
+    args = ap.parse_args()
+    thai, latin = args.thai_font, args.latin_font
+
+    paras = list(recorded_paragraphs(args.trees) if args.trees else synthetic_paragraphs(args.paragraphs, 7))
+    if not paras:
+        sys.exit("no paragraphs")
+    old_ms = new_ms = 0.0
+    mismatches = []
+    for name, text, items, W, H, lang, base in paras:
+        parser = budoux_parser(lang)
+        with uncached():
+            t0 = time.perf_counter()
+            ref = step_down(text, parser, items, W, H, thai, latin, base, lang)
+            old_ms += (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        got = layout.fit_para_size_and_lines(text, parser, items, W, H, thai, latin, base, len(items), lang)
+        new_ms += (time.perf_counter() - t0) * 1000
+        if got != ref:
+            mismatches.append({"paragraph": name, "step_down": ref[0], "bisect": got[0]})
+
+    # The live fit: closed-form per item over a whole tree, every render.
+    tree = {"paragraphs": [{"items": [dict(it, text=text) for it in items]} for _, text, items, *_ in paras]}
+    W, H = paras[0][3], paras[0][4]
+    with uncached():
+        t0 = time.perf_counter()
+        tp_html.fit_tree_font_sizes(tree, thai, latin, W, H)
+        tree_old = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    tp_html.fit_tree_font_sizes(tree, thai, latin, W, H)
+    tree_new = (time.perf_counter() - t0) * 1000
+
+    for m in mismatches:
+        print(json.dumps(m))
+    print(json.dumps({
+        "paragraphs": len(paras),
+        "same": not mismatches,
+        "mismatches": len(mismatches),
+        "step_down_ms_per_para": round(old_ms / len(paras), 3),
+        "bisect_ms_per_para": round(new_ms / len(paras), 3),
+        "speedup": round(old_ms / new_ms, 1) if new_ms else None,
+        "fit_tree_uncached_ms": round(tree_old, 2),
+        "fit_tree_cached_ms": round(tree_new, 2),
+        "run_cache": text_metrics._run_extent.cache_info()._asdict(),
+    }))
+    sys.exit(0 if not mismatches else 1)
+
+
+if __name__ == "__main__":
+    main()
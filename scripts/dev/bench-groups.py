@@ -0,0 +1,157 @@
+# Regression + timing harness for paragraph grouping: runs
+# backend.render.groups._merge_paragraphs once with the spatial candidate
+# index and once testing every pair (the previous O(n^2) behaviour), asserts
+# both produce the same clusters, and reports the speedup per paragraph count.
+#
+# Recorded pages: a folder of saved Lens responses (the lens_raw.json the CLI's
+# --lens-json replays) next to their images with the same stem, or of debug
+# exports holding an "originalTree"/"translatedTree" (or a bare tree with
+# "paragraphs" and "width"/"height"). Without a folder, synthetic dense
+# vertical pages are generated at each --synthetic size.
+#
+#   python scripts/dev/bench-groups.py [--trees DIR] [--synthetic 50,200,800]
+#
+# Exits 1 if any page groups differently.
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+from PIL import Image, ImageDraw  # noqa: E402
+
+from backend.lens.tree import decode_tree  # noqa: E402
+from backend.render import groups  # noqa: E402
+
+_IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def column(x, y, w, h, text, W, H, index):
+    """One vertical Lens paragraph: two portrait items, CJK text."""
+    items = []
+    for k in range(2):
+        top = y + k * h / 2
+        items.append({
+            "text": text,
+            "box": {
+                "left": x / W, "top": top / H, "width": w / W, "height": (h / 2) / H,
+                "rotation_deg": 90.0,
+                "center": {"x": (x + w / 2) / W, "y": (top + h / 4) / H},
+            },
+        })
+    return {
+        "para_index": index,
+        "text": text * 2,
+        "items": items,
+        "bounds_px": [x, y, x + w, y + h],
+    }
+
+
+def synthetic_page(n, seed):
+    """Bubbles of 2-5 columns scattered down a tall strip, walls drawn round each."""
+    rng = random.Random(seed)
+    W = 1400
+    H = max(2000, n * 40)
+    img = Image.new("RGB", (W, H), "white")
+    draw = ImageDraw.Draw(img)
+    paras = []
+    bubble = 0
+    while len(paras) < n:
+        cols = rng.randint(2, 5)
+        glyph = rng.uniform(18, 36)
+        x0 = rng.uniform(40, W - 40 - cols * glyph * 1.6)
+        y0 = rng.uniform(40, H - 40 - glyph * 10)
+        h = glyph * rng.uniform(5, 9)
+        draw.rectangle([x0 - 12, y0 - 12, x0 + cols * glyph * 1.6 + 12, y0 + h + 12], outline="black", width=3)
+        for c in range(cols):
+            if len(paras) >= n:
+                break
+            x = x0 + (cols - 1 - c) * glyph * 1.6
+            para = column(x, y0 + rng.uniform(0, glyph * 0.2), glyph, h, "あいう", W, H, len(paras))
+            para["_tb_block"] = bubble  # what annotate_paragraph_blocks would stamp
+            paras.append(para)
+        bubble += 1
+    return {"paragraphs": paras}, W, H, img
+
+
+def recorded_pages(folder):
+    for path in sorted(folder.glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        img = next((path.with_suffix(e) for e in _IMAGE_EXTS if path.with_suffix(e).exists()), None)
+        base = Image.open(img).convert("RGB") if img else None
+        for key in ("originalTree", "translatedTree"):
+            tree = data.get(key) or (data.get("original") or {}).get(key) or (data.get("translated") or {}).get(key)
+            if isinstance(tree, dict):
+                yield f"{path.stem}:{key}", tree, int(tree.get("width") or 0), int(tree.get("height") or 0), base
+        if isinstance(data.get("paragraphs"), list):
+            yield path.stem, data, int(data.get("width") or 0), int(data.get("height") or 0), base
+        if data.get("originalParagraphs") and base is not None:
+            W, H = base.size
+            for side in ("original", "translated"):
+                tree = decode_tree(data.get(f"{side}Paragraphs") or [], data.get(f"{side}TextFull") or "", side, W, H)
+                yield f"{path.stem}:{side}", tree, W, H, base
+
+
+def clusters(tree, W, H, img):
+    ordered = sorted(
+        [p for p in tree.get("paragraphs") or [] if groups._para_full_text(p)],
+        key=lambda p: int(p.get("para_index", 0)),
+    )
+    out = {}
+    for authority in (False, True):
+        t0 = time.perf_counter()
+        runs = groups._merge_paragraphs(ordered, W, H, img, authority)
+        out[authority] = ([[id(p) for p in r] for r in runs], (time.perf_counter() - t0) * 1000)
+    return len(ordered), out
+
+
+def all_pairs(ordered, img_h, tb_authority=False):
+    """Every i < j pair: the O(n^2) reference the candidate index must match."""
+    n = len(ordered)
+    return [(i, j) for i in range(n) for j in range(i + 1, n)]
+
+
+def run(name, tree, W, H, img):
+    if not W or not H:
+        print(json.dumps({"page": name, "skipped": "no width/height"}))
+        return True
+    n, fast = clusters(tree, W, H, img)
+    indexed = groups._merge_candidates
+    groups._merge_candidates = all_pairs
+    try:
+        _, slow = clusters(tree, W, H, img)
+    finally:
+        groups._merge_candidates = indexed
+    same = all(fast[a][0] == slow[a][0] for a in fast)
+    geo_fast, geo_slow = fast[False][1], slow[False][1]
+    print(json.dumps({
+        "page": name,
+        "paragraphs": n,
+        "same": same,
+        "all_pairs_ms": round(geo_slow, 1),
+        "indexed_ms": round(geo_fast, 1),
+        "speedup": round(geo_slow / geo_fast, 1) if geo_fast else None,
+    }))
+    return same
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trees", type=pathlib.Path)
+    ap.add_argument("--synthetic", default="50,100,200,400,800")
+    args = ap.parse_args()
+    ok = True
+    if args.trees:
+        for name, tree, W, H, img in recorded_pages(args.trees):
+            ok &= run(name, tree, W, H, img)
+    else:
+        for n in (int(v) for v in args.synthetic.split(",") if v.strip()):
+            tree, W, H, img = synthetic_page(n, seed=n)
+            ok &= run(f"synthetic-{n}", tree, W, H, img)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
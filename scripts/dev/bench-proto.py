@@ -0,0 +1,93 @@
+# Regression, fuzz and timing harness for the Lens protobuf reader: runs
+# backend.lens.proto (offsets into one buffer) against the previous
+# copy-per-field reader (kept verbatim as ReferenceProto in scripts/backend_parity.py) and
+# asserts they agree.
+#
+#   bench  decode every paragraph of each page with both readers, compare the
+#          items / geometry / spans they extract, report ms per page.
+#   fuzz   mutate paragraphs (bit flips, truncation, overlong and oversized
+#          varints, bad wire types, lengths running past the end) and assert
+#          both readers return the same value or raise the same error.
+#
+# Pages: a folder of saved Lens responses (the lens_raw.json the CLI's
+# --lens-json replays). Without a folder, dense synthetic paragraphs shaped
+# like Lens's come from scripts/backend_parity.py.
+#
+#   python scripts/dev/bench-proto.py [--pages DIR] [--fuzz 20000] [--seed 0]
+#
+# Exits 1 on any disagreement. The same checks, without the timing, run on
+# every `npm run test:unit` as `python scripts/backend_parity.py`.
+import argparse
+import base64
+import json
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+import backend_parity as parity  # noqa: E402
+from backend.lens import proto  # noqa: E402
+from backend_parity import ReferenceProto as old, decode_all, same  # noqa: E402
+
+
+def recorded_paragraphs(folder):
+    for path in sorted(folder.glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        paras = [base64.b64decode(s) for key in ("originalParagraphs", "translatedParagraphs")
+                 for s in data.get(key) or []]
+        if paras:
+            yield path.stem, paras
+
+
+def bench(name, paras, repeat):
+    ref = [decode_all(old, p) for p in paras]
+    got = [decode_all(proto, p) for p in paras]
+    ok = all(same(a, b) for a, b in zip(ref, got))
+    times = {}
+    for label, reader in (("old", old), ("new", proto)):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for p in paras:
+                decode_all(reader, p)
+            ms = (time.perf_counter() - t0) * 1000
+            best = ms if best is None else min(best, ms)
+        times[label] = best
+    print(json.dumps({
+        "page": name,
+        "paragraphs": len(paras),
+        "bytes": sum(len(p) for p in paras),
+        "same": ok,
+        "old_ms": round(times["old"], 2),
+        "new_ms": round(times["new"], 2),
+        "speedup": round(times["old"] / times["new"], 2) if times["new"] else None,
+    }))
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=pathlib.Path)
+    ap.add_argument("--fuzz", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+    if args.pages:
+        pages = list(recorded_paragraphs(args.pages))
+    else:
+        pages = parity.synthetic_pages(rng)
+    if not pages:
+        sys.exit("no paragraphs")
+    ok = True
+    for name, paras in pages:
+        ok &= bench(name, paras, max(1, args.repeat))
+    if args.fuzz:
+        ok &= parity.fuzz([p for _, paras in pages for p in paras], args.fuzz, rng)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
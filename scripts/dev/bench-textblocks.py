@@ -0,0 +1,108 @@
+# Times each stage of the text-block detector over a folder of pages:
+# resize (prepare), float fill, ONNX inference, post-processing and the ROI
+# dedupe, in ms per page. Inference runs only when the model is loaded
+# (TP_TEXTBLOCK_MODEL); without it the other stages are still timed, with
+# post-processing fed a synthetic 300-row detection tensor.
+#
+#   python scripts/dev/bench-textblocks.py PAGES_DIR [--repeat 3] [--letterbox]
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+_ap = argparse.ArgumentParser()
+_ap.add_argument("pages", type=pathlib.Path)
+_ap.add_argument("--repeat", type=int, default=3)
+_ap.add_argument("--letterbox", action="store_true")
+args = _ap.parse_args()
+if args.letterbox:
+    # Read once at import by backend.render.textblocks.
+    os.environ["TP_TEXTBLOCK_LETTERBOX"] = "1"
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "api"))
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from backend.render import textblocks  # noqa: E402
+
+_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+
+
+def ms(t0):
+    return (time.perf_counter() - t0) * 1000
+
+
+def synthetic_detections(seed):
+    rng = np.random.default_rng(seed)
+    det = rng.uniform(0, textblocks._INPUT_SIZE, (1, 300, 6)).astype(np.float32)
+    det[..., 4] = rng.uniform(0, 1, (1, 300))
+    return det
+
+
+def bench_page(path, session, repeat):
+    img = Image.open(path).convert("RGB")
+    stages = {"prepare": [], "fill": [], "infer": [], "post": [], "dedupe": []}
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        prepared = textblocks._prepare(img)
+        stages["prepare"].append(ms(t0))
+
+        t0 = time.perf_counter()
+        arr = textblocks._input_buffer(1)
+        textblocks._fill(arr[0], prepared)
+        stages["fill"].append(ms(t0))
+
+        if session is not None:
+            t0 = time.perf_counter()
+            det = session.run(None, {session.get_inputs()[0].name: arr})[0]
+            stages["infer"].append(ms(t0))
+        else:
+            det = synthetic_detections(i)
+
+        t0 = time.perf_counter()
+        boxes = textblocks._boxes_from(det, prepared)
+        stages["post"].append(ms(t0))
+
+        # ROI plans dedupe the union of overlapping crops' boxes; doubling the
+        # page's own boxes is the worst case for it.
+        t0 = time.perf_counter()
+        textblocks.dedupe_text_blocks(boxes + boxes)
+        stages["dedupe"].append(ms(t0))
+    return {
+        "page": path.name,
+        "size": list(img.size),
+        "boxes": len(boxes),
+        **{f"{k}_ms": round(statistics.median(v), 3) for k, v in stages.items() if v},
+    }
+
+
+def main():
+    pages = sorted(p for p in args.pages.iterdir() if p.suffix.lower() in _EXTS)
+    if not pages:
+        sys.exit(f"no images in {args.pages}")
+    session = None
+    if textblocks.ensure_model():
+        session = textblocks._pool.get()
+    rows = []
+    try:
+        for path in pages:
+            row = bench_page(path, session, max(1, args.repeat))
+            rows.append(row)
+            print(json.dumps(row))
+    finally:
+        if session is not None:
+            textblocks._pool.put(session)
+    keys = [k for k in rows[0] if k.endswith("_ms")]
+    print(json.dumps({
+        "pages": len(rows),
+        "model": session is not None,
+        "letterbox": bool(args.letterbox),
+        **{f"mean_{k}": round(statistics.mean(r[k] for r in rows), 3) for k in keys},
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+// The backend's rewritten engines must keep agreeing with the originals they
+// replaced. scripts/dev/bench-*.py time the two; scripts/backend_parity.py
+// is the same agreement check without the timing, run here so a change that
+// breaks it fails the build instead of waiting for someone to run a bench.
+//
+// PYTHON picks the interpreter (default: python3, then python). With no
+// interpreter at all the check is skipped and says so; any other failure,
+// a missing backend dependency included, fails.
+import { spawnSync } from "node:child_process";
+import path from "node:path";
+import { fileURLToPath } from "node:url";
+
+const projectRoot = path.resolve(path.dirname(fileURLToPath(import.meta.url)), "..");
+const candidates = process.env.PYTHON ? [process.env.PYTHON] : ["python3", "python"];
+
+let ran = null;
+for (const python of candidates) {
+  const result = spawnSync(python, [path.join("scripts", "backend_parity.py")], {
+    cwd: projectRoot,
+    stdio: "inherit",
+  });
+  if (result.error?.code === "ENOENT") continue;
+  ran = { python, result };
+  break;
+}
+
+if (ran === null) {
+  console.log(`backend parity test SKIPPED: no Python interpreter (${candidates.join(", ")}); set PYTHON to run it.`);
+} else if (ran.result.error) {
+  throw ran.result.error;
+} else if (ran.result.status !== 0) {
+  console.error(`backend parity test FAILED: ${ran.python} scripts/backend_parity.py exited ${ran.result.status ?? ran.result.signal}`);
+  process.exit(1);
+} else {
+  console.log("backend parity test passed.");
+}